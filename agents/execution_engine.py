@@ -0,0 +1,288 @@
+"""
+并发任务执行引擎
+最多 concurrency 个任务同时处于 认领 -> 执行 -> 提交 流程中：调度循环在有空闲槽位时选取候选任务放入认领队列，
+各阶段的工作协程从自己的队列中取任务处理后交给下一阶段，提交完成（或任一阶段失败）后释放槽位。
+LLM执行耗时远大于链上交易时，单个Worker每小时完成的任务数约为原来的 concurrency 倍
+"""
+
+import asyncio
+import statistics
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, Optional, Set
+
+from blockchain.preflight import PreflightRejected
+
+
+class ExecutionEngine:
+    """
+    并发执行引擎
+
+    run() 持续运行直到 stop() 被调用；stop() 后不再选取新任务，等待已在流程中的任务提交完成后退出，
+    超过 drain_timeout 仍未完成的任务被取消。on_result 在每个任务结束时以与 work_cycle 相同格式的结果字典回调。
+    提交失败时保留执行结果，按 submit_retry_delay 的指数退避重试 submit_retries 次后才释放槽位。
+    stats_interval 大于0时，运行期间每隔 stats_interval 秒以 stats() 的结果回调 on_stats。
+    """
+
+    def __init__(self, agent, concurrency: int = 4, poll_interval: float = 30, execution_order: str = 'ai',
+                 drain_timeout: float = 300, on_result: Optional[Callable[[Dict], None]] = None,
+                 submit_retries: int = 3, submit_retry_delay: float = 5,
+                 stats_interval: float = 0, on_stats: Optional[Callable[[Dict], None]] = None):
+        self.agent = agent
+        self.concurrency = max(concurrency, 1)
+        self.poll_interval = poll_interval
+        self.execution_order = execution_order
+        self.drain_timeout = drain_timeout
+        self.on_result = on_result
+        self.submit_retries = max(submit_retries, 0)
+        self.submit_retry_delay = submit_retry_delay
+        self.stats_interval = stats_interval
+        self.on_stats = on_stats
+
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._queues = {stage: asyncio.Queue() for stage in ('claim', 'execute', 'submit')}
+        self._in_flight: Set[int] = set()
+        # 认领失败（或提交重试耗尽）的任务在 poll_interval 内不再作为候选，避免反复认领同一个任务
+        self._retry_after: Dict[int, float] = {}
+        self._stopping = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers = []
+        self._running = False
+
+        self._counts: Counter = Counter()
+        self._stage_seconds = {stage: deque(maxlen=500) for stage in self._queues}
+        self._rewards = 0
+        self._started_at: Optional[float] = None
+
+    async def run(self) -> None:
+        """启动各阶段的工作协程和调度循环，直到 stop() 后所有在途任务处理完毕"""
+        self._running = True
+        self._started_at = time.monotonic()
+        self._workers = [
+            asyncio.create_task(worker(), name=f"engine-{worker.__name__.strip('_')}-{index}")
+            for worker in (self._claim_worker, self._execute_worker, self._submit_worker)
+            for index in range(self.concurrency)
+        ]
+        if self.stats_interval > 0 and self.on_stats:
+            self._workers.append(asyncio.create_task(self._stats_reporter(), name="engine-stats"))
+        try:
+            await self._dispatch_loop()
+            await self._drain()
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._running = False
+
+    def stop(self) -> None:
+        """停止选取新任务，run() 在在途任务处理完毕后返回"""
+        self._stopping.set()
+
+    def stats(self) -> Dict:
+        """吞吐量计数、各阶段队列长度和平均耗时"""
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0
+        return {
+            'running': self._running,
+            'stopping': self._stopping.is_set(),
+            'concurrency': self.concurrency,
+            'in_flight': sorted(self._in_flight),
+            'queues': {stage: queue.qsize() for stage, queue in self._queues.items()},
+            'counts': dict(self._counts),
+            'rewards': self._rewards,
+            'uptime_seconds': elapsed,
+            'completed_per_hour': self._counts['submitted'] * 3600 / elapsed if elapsed > 0 else None,
+            'avg_stage_seconds': {
+                stage: statistics.mean(seconds) if seconds else None
+                for stage, seconds in self._stage_seconds.items()
+            }
+        }
+
+    # ---- 调度 ----
+
+    async def _dispatch_loop(self) -> None:
+        while not self._stopping.is_set():
+            if not await self._acquire_slot():
+                break
+            free_slots = self.concurrency - len(self._in_flight)
+
+            try:
+                tasks = await self._candidates()
+            except Exception as e:
+                print(f"获取候选任务失败: {e}")
+                tasks = []
+
+            tasks = tasks[:free_slots]
+            if not tasks:
+                self._slots.release()
+                self._counts['idle_polls'] += 1
+                await self._wait_stop(self.poll_interval)
+                continue
+
+            # 第一个任务使用已获取的槽位，其余任务各自获取（获取候选任务期间槽位只会增加，不会阻塞）
+            for index, task in enumerate(tasks):
+                if index > 0:
+                    await self._slots.acquire()
+                self._admit(task)
+
+    async def _acquire_slot(self) -> bool:
+        """等待空闲槽位，停止时返回False（不占用槽位）"""
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        stop = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait({acquire, stop}, return_when=asyncio.FIRST_COMPLETED)
+        stop.cancel()
+        if not acquire.done():
+            acquire.cancel()
+            return False
+        if self._stopping.is_set():
+            self._slots.release()
+            return False
+        return True
+
+    async def _candidates(self):
+        """候选任务：可用任务中排除在途任务和预执行被永久拒绝的任务，按执行顺序排序"""
+        task_ids = await self.agent.async_blockchain_client.get_available_tasks()
+        now = time.monotonic()
+        self._retry_after = {task_id: until for task_id, until in self._retry_after.items() if until > now}
+        task_ids = [
+            task_id for task_id in task_ids
+            if task_id not in self._in_flight and task_id not in self.agent.rejected_tasks
+            and task_id not in self._retry_after
+        ]
+        if not task_ids:
+            return []
+        return await self.agent.rank_tasks(task_ids, self.execution_order)
+
+    def _admit(self, task: Dict) -> None:
+        self._in_flight.add(task['id'])
+        self._idle.clear()
+        self._counts['admitted'] += 1
+        self._queues['claim'].put_nowait(task)
+
+    def _finish(self, task: Dict, result: Dict) -> None:
+        """任务离开流程：释放槽位并回调结果"""
+        self._in_flight.discard(task['id'])
+        if result['status'] != 'success':
+            self._retry_after[task['id']] = time.monotonic() + self.poll_interval
+        self._slots.release()
+        if not self._in_flight:
+            self._idle.set()
+        if self.on_result:
+            try:
+                self.on_result(result)
+            except Exception as e:
+                print(f"任务结果回调失败: {e}")
+
+    async def _drain(self) -> None:
+        """等待在途任务处理完毕，超时后取消"""
+        if self._in_flight:
+            print(f"等待 {len(self._in_flight)} 个在途任务完成...")
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"在途任务 {sorted(self._in_flight)} 未在 {self.drain_timeout} 秒内完成，强制停止")
+            self._counts['abandoned'] += len(self._in_flight)
+
+    async def _stats_reporter(self) -> None:
+        """运行期间定期回调吞吐量统计"""
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            try:
+                self.on_stats(self.stats())
+            except Exception as e:
+                print(f"统计回调失败: {e}")
+
+    async def _wait_stop(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # ---- 各阶段工作协程 ----
+
+    async def _claim_worker(self) -> None:
+        """广播认领交易（预执行被拒绝的任务不广播），交给执行阶段"""
+        client = self.agent.async_blockchain_client
+        while True:
+            task = await self._queues['claim'].get()
+            started = time.monotonic()
+            try:
+                claim_future = await client.submit_claim_task(task['id'])
+            except PreflightRejected as e:
+                self.agent.record_rejection(e)
+                self._counts['rejected'] += 1
+                self._finish(task, {"status": "claim_failed", "task_id": task['id'], "message": str(e)})
+                continue
+            except Exception as e:
+                print(f"认领任务 {task['id']} 失败: {e}")
+                self._counts['claim_failed'] += 1
+                self._finish(task, {"status": "claim_failed", "task_id": task['id'], "message": "任务认领失败"})
+                continue
+            self._stage_seconds['claim'].append(time.monotonic() - started)
+            self._queues['execute'].put_nowait((task, claim_future))
+
+    async def _execute_worker(self) -> None:
+        """执行任务，与等待认领确认并行；认领未成功时丢弃执行结果"""
+        while True:
+            task, claim_future = await self._queues['execute'].get()
+            started = time.monotonic()
+            try:
+                task_result = await self.agent.execute_after_claim(task, claim_future)
+            except Exception as e:
+                print(f"执行任务 {task['id']} 失败: {e}")
+                self._counts['execution_failed'] += 1
+                self._finish(task, {"status": "error", "task_id": task['id'], "message": f"任务执行失败: {e}"})
+                continue
+            if task_result is None:
+                self._counts['claim_failed'] += 1
+                self._finish(task, {"status": "claim_failed", "task_id": task['id'], "message": "任务认领失败"})
+                continue
+            self._counts['claimed'] += 1
+            self._counts['executed'] += 1
+            self._stage_seconds['execute'].append(time.monotonic() - started)
+            self._queues['submit'].put_nowait((task, task_result))
+
+    async def _submit_worker(self) -> None:
+        """提交结果并等待确认；失败时保留执行结果退避重试，任务已由本Worker认领，放弃提交即损失奖励"""
+        while True:
+            task, task_result = await self._queues['submit'].get()
+            started = time.monotonic()
+            submit_success = await self._submit_with_retry(task, task_result)
+            self._stage_seconds['submit'].append(time.monotonic() - started)
+
+            if not submit_success:
+                self._counts['submit_failed'] += 1
+                self._finish(task, {
+                    "status": "submit_failed",
+                    "task_id": task['id'],
+                    "message": f"任务 {task['id']} 提交失败（已重试 {self.submit_retries} 次）"
+                })
+                continue
+
+            self._counts['submitted'] += 1
+            self._rewards += task['reward']
+            task_title = task['title']
+            if isinstance(task_title, dict):
+                task_title = task_title.get('zh', list(task_title.values())[0] if task_title else "")
+            self._finish(task, {
+                "status": "success",
+                "task_id": task['id'],
+                "task_title": task_title,
+                "reward": task['reward'],
+                "result": task_result
+            })
+
+    async def _submit_with_retry(self, task: Dict, task_result: str) -> bool:
+        """提交同一个执行结果，失败后依次等待 submit_retry_delay、2倍、4倍...秒重试"""
+        client = self.agent.async_blockchain_client
+        for attempt in range(self.submit_retries + 1):
+            if attempt:
+                self._counts['submit_retries'] += 1
+                await asyncio.sleep(self.submit_retry_delay * 2 ** (attempt - 1))
+            try:
+                if await client.complete_task(task['id'], task_result):
+                    return True
+                print(f"提交任务 {task['id']} 未成功（第 {attempt + 1} 次）")
+            except Exception as e:
+                print(f"提交任务 {task['id']} 失败（第 {attempt + 1} 次）: {e}")
+        return False
@@ -0,0 +1,67 @@
+"""
+任务执行指标
+按执行模式（direct：已知任务类型直接调用一次LLM；direct_stream：流式的直接调用，响应不含Token用量，只记录调用次数；
+agent：完整的 AgentExecutor 循环；cached：命中响应缓存）统计任务数、失败数、延迟、LLM调用次数和Token用量，用于比较各模式的开销
+"""
+
+import statistics
+import threading
+from collections import Counter, deque
+from typing import Dict
+
+MODES = ('direct', 'direct_stream', 'agent', 'cached')
+
+
+class _ModeMetrics:
+    def __init__(self, max_samples: int):
+        self.tasks = 0
+        self.failures = 0
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.task_types: Counter = Counter()
+        self.latencies = deque(maxlen=max_samples)
+
+    def to_dict(self) -> Dict:
+        latencies = sorted(self.latencies)
+        return {
+            'tasks': self.tasks,
+            'failures': self.failures,
+            'llm_calls': self.llm_calls,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'total_tokens': self.total_tokens,
+            'avg_llm_calls': self.llm_calls / self.tasks if self.tasks else None,
+            'avg_total_tokens': self.total_tokens / self.tasks if self.tasks else None,
+            'avg_seconds': statistics.mean(latencies) if latencies else None,
+            'p95_seconds': latencies[int(len(latencies) * 0.95)] if latencies else None,
+            'task_types': dict(self.task_types)
+        }
+
+
+class ExecutionMetrics:
+    """各执行模式的延迟和Token统计（线程安全，延迟保留最近 max_samples 个样本）"""
+
+    def __init__(self, max_samples: int = 500):
+        self._lock = threading.Lock()
+        self._modes = {mode: _ModeMetrics(max_samples) for mode in MODES}
+
+    def record(self, mode: str, task_type: str, seconds: float, llm_calls: int = 0, prompt_tokens: int = 0,
+               completion_tokens: int = 0, total_tokens: int = 0, success: bool = True) -> None:
+        """记录一次任务执行"""
+        with self._lock:
+            metrics = self._modes[mode]
+            metrics.tasks += 1
+            if not success:
+                metrics.failures += 1
+            metrics.llm_calls += llm_calls
+            metrics.prompt_tokens += prompt_tokens
+            metrics.completion_tokens += completion_tokens
+            metrics.total_tokens += total_tokens
+            metrics.task_types[task_type] += 1
+            metrics.latencies.append(seconds)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {mode: metrics.to_dict() for mode, metrics in self._modes.items()}
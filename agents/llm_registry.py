@@ -0,0 +1,237 @@
+"""
+共享LLM客户端注册表
+所有工具和任务共用一对带连接池的 httpx 客户端（同步/异步），长连接在任务之间复用，
+避免每次执行任务都重新建立TCP连接和TLS握手；模型名、API地址从配置读取，可按任务类型覆盖模型、温度和超时。
+每次新建连接的耗时（TCP连接 + TLS握手）都会被记录，用于比较连接复用前后的开销
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+
+DEFAULT_MODEL = 'deepseek-v3-250324'
+DEFAULT_BASE_URL = 'https://ark.cn-beijing.volces.com/api/v3'
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_TIMEOUT = 120
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60
+
+
+class LLMProfile:
+    """一组模型调用参数；相同参数的任务类型共用同一个 ChatOpenAI 实例"""
+
+    def __init__(self, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE,
+                 timeout: float = DEFAULT_TIMEOUT, max_retries: int = DEFAULT_MAX_RETRIES):
+        self.model = model
+        self.temperature = temperature
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def merge(self, overrides: Dict) -> 'LLMProfile':
+        """用覆盖配置中给出的字段替换当前参数"""
+        unknown = set(overrides) - {'model', 'temperature', 'timeout', 'max_retries'}
+        if unknown:
+            raise ValueError(f"未知的LLM配置项: {', '.join(sorted(unknown))}")
+        return LLMProfile(
+            model=overrides.get('model', self.model),
+            temperature=float(overrides.get('temperature', self.temperature)),
+            timeout=float(overrides.get('timeout', self.timeout)),
+            max_retries=int(overrides.get('max_retries', self.max_retries))
+        )
+
+    def key(self) -> tuple:
+        return (self.model, self.temperature, self.timeout, self.max_retries)
+
+    def to_dict(self) -> Dict:
+        return {
+            'model': self.model,
+            'temperature': self.temperature,
+            'timeout': self.timeout,
+            'max_retries': self.max_retries
+        }
+
+
+class _ConnectionStats:
+    """通过 httpcore 的 trace 扩展统计HTTP请求数、新建连接数和建连耗时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.connect_seconds = 0.0
+
+    def on_request(self, request: httpx.Request) -> None:
+        request.extensions['trace'] = self._tracer()
+
+    async def on_request_async(self, request: httpx.Request) -> None:
+        trace = self._tracer()
+
+        async def async_trace(event_name: str, info: Dict) -> None:
+            trace(event_name, info)
+
+        request.extensions['trace'] = async_trace
+
+    def _tracer(self):
+        with self._lock:
+            self.requests += 1
+        started = []
+
+        def trace(event_name: str, info: Dict) -> None:
+            if event_name == 'connection.connect_tcp.started':
+                started.append(time.perf_counter())
+            elif started and not event_name.startswith('connection.'):
+                # 建连事件（TCP连接及HTTPS的TLS握手）之后的第一个事件是开始发送请求
+                elapsed = time.perf_counter() - started.pop()
+                with self._lock:
+                    self.connections += 1
+                    self.connect_seconds += elapsed
+
+        return trace
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections,
+                'connections_reused': max(self.requests - self.connections, 0),
+                'connect_seconds_total': self.connect_seconds,
+                'connect_seconds_avg': self.connect_seconds / self.connections if self.connections else None
+            }
+
+
+class LLMRegistry:
+    """
+    LLM客户端注册表
+
+    get(task_type) 返回该任务类型对应参数的 ChatOpenAI（按参数缓存），所有实例共用同一个连接池。
+    overrides 为 任务类型 -> LLMProfile，未覆盖的任务类型使用 default
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = DEFAULT_BASE_URL,
+                 default: Optional[LLMProfile] = None, overrides: Optional[Dict[str, LLMProfile]] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 keepalive_connections: int = DEFAULT_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.default = default or LLMProfile()
+        self.overrides = overrides or {}
+
+        self._connection_stats = _ConnectionStats()
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # 超时由每个 ChatOpenAI 的参数决定，这里只设置连接池
+        self._http_client = httpx.Client(
+            limits=limits, timeout=None, event_hooks={'request': [self._connection_stats.on_request]}
+        )
+        self._async_http_client = httpx.AsyncClient(
+            limits=limits, timeout=None, event_hooks={'request': [self._connection_stats.on_request_async]}
+        )
+        self._openai = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=self._http_client)
+        self._async_openai = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self._async_http_client)
+
+        self._lock = threading.Lock()
+        self._clients: Dict[tuple, ChatOpenAI] = {}
+
+    @classmethod
+    def from_env(cls) -> 'LLMRegistry':
+        """
+        从环境变量创建：LLM_MODEL、LLM_BASE_URL、LLM_TEMPERATURE、LLM_TIMEOUT、LLM_MAX_RETRIES、
+        LLM_MAX_CONNECTIONS、LLM_KEEPALIVE_CONNECTIONS、LLM_KEEPALIVE_EXPIRY，
+        LLM_TASK_OVERRIDES 为按任务类型覆盖的JSON，例如 {"programming": {"model": "...", "temperature": 0.2, "timeout": 300}}
+        """
+        default = LLMProfile(
+            model=os.getenv('LLM_MODEL', DEFAULT_MODEL),
+            temperature=float(os.getenv('LLM_TEMPERATURE', str(DEFAULT_TEMPERATURE))),
+            timeout=float(os.getenv('LLM_TIMEOUT', str(DEFAULT_TIMEOUT))),
+            max_retries=int(os.getenv('LLM_MAX_RETRIES', str(DEFAULT_MAX_RETRIES)))
+        )
+        overrides = {
+            task_type: default.merge(config)
+            for task_type, config in json.loads(os.getenv('LLM_TASK_OVERRIDES') or '{}').items()
+        }
+        return cls(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            base_url=os.getenv('LLM_BASE_URL', DEFAULT_BASE_URL),
+            default=default,
+            overrides=overrides,
+            max_connections=int(os.getenv('LLM_MAX_CONNECTIONS', str(DEFAULT_MAX_CONNECTIONS))),
+            keepalive_connections=int(os.getenv('LLM_KEEPALIVE_CONNECTIONS', str(DEFAULT_KEEPALIVE_CONNECTIONS))),
+            keepalive_expiry=float(os.getenv('LLM_KEEPALIVE_EXPIRY', str(DEFAULT_KEEPALIVE_EXPIRY)))
+        )
+
+    def profile_for(self, task_type: Optional[str] = None) -> LLMProfile:
+        return self.overrides.get(task_type, self.default)
+
+    def get(self, task_type: Optional[str] = None) -> ChatOpenAI:
+        """获取任务类型对应的 ChatOpenAI（不指定任务类型时使用默认参数）"""
+        profile = self.profile_for(task_type)
+        key = profile.key()
+        with self._lock:
+            llm = self._clients.get(key)
+            if llm is None:
+                options = {'timeout': profile.timeout, 'max_retries': profile.max_retries}
+                llm = ChatOpenAI(
+                    model=profile.model,
+                    temperature=profile.temperature,
+                    api_key=self.api_key,
+                    openai_api_base=self.base_url,
+                    request_timeout=profile.timeout,
+                    max_retries=profile.max_retries,
+                    # with_options 复制出的客户端共用同一个 httpx 连接池
+                    client=self._openai.with_options(**options).chat.completions,
+                    async_client=self._async_openai.with_options(**options).chat.completions
+                )
+                self._clients[key] = llm
+            return llm
+
+    def stats(self) -> Dict:
+        """连接复用统计和当前配置"""
+        stats = self._connection_stats.snapshot()
+        stats['clients'] = len(self._clients)
+        stats['base_url'] = self.base_url
+        stats['default'] = self.default.to_dict()
+        stats['overrides'] = {task_type: profile.to_dict() for task_type, profile in self.overrides.items()}
+        return stats
+
+    def close(self) -> None:
+        """关闭同步连接池"""
+        self._http_client.close()
+
+    async def aclose(self) -> None:
+        """关闭同步和异步连接池"""
+        self._http_client.close()
+        await self._async_http_client.aclose()
+
+
+_registry: Optional[LLMRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMRegistry:
+    """进程内共享的注册表（首次调用时从环境变量创建）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMRegistry.from_env()
+        return _registry
+
+
+def reset_llm_registry() -> None:
+    """丢弃共享注册表（修改环境变量后调用，下次 get_llm_registry 重新创建）"""
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close()
+        _registry = None
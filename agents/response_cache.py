@@ -0,0 +1,171 @@
+"""
+LLM响应缓存
+任务板上经常出现重复发布、内容相同的任务；执行前先按规范化后的任务内容查找缓存，命中时直接复用之前的结果，
+完全跳过LLM生成。缓存键为 generate_task_hash(任务类型、描述、要求、模型、提示词版本)，
+条目保存在本地SQLite中，按TTL过期，超过条目数或总大小上限时淘汰最久未使用的条目（LRU）
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from utils.helpers import generate_task_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    task_type TEXT,
+    model TEXT,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: Union[str, Dict[str, str], None]) -> Union[str, Dict[str, str]]:
+    """统一Unicode形式（全角/半角等）并合并空白，使只有排版差异的任务得到相同的缓存键；多语言字段逐个语言处理"""
+    if isinstance(text, dict):
+        return {language: normalize_text(value) for language, value in text.items()}
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip()
+
+
+class ResponseCache:
+    """
+    基于SQLite的LLM响应缓存
+
+    ttl 为条目的最长保存时间（秒，0为不过期）；max_entries、max_bytes 为条目数和响应总大小（UTF-8字节）上限，
+    超过时从最久未访问的条目开始淘汰
+    """
+
+    def __init__(self, db_path: str = 'data/llm_cache.db', ttl: float = 7 * 24 * 3600, max_entries: int = 10000,
+                 max_bytes: int = 100 * 1024 * 1024, enabled: bool = True):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @classmethod
+    def from_env(cls) -> 'ResponseCache':
+        """从环境变量创建：LLM_CACHE_ENABLED、LLM_CACHE_DB、LLM_CACHE_TTL、LLM_CACHE_MAX_ENTRIES、LLM_CACHE_MAX_MB"""
+        return cls(
+            db_path=os.getenv('LLM_CACHE_DB', 'data/llm_cache.db'),
+            ttl=float(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600))),
+            max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '10000')),
+            max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', '100')) * 1024 * 1024),
+            enabled=os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+        )
+
+    @staticmethod
+    def make_key(task_type: str, description: str, requirements: str, model: str, prompt_version: str) -> str:
+        """规范化后的任务内容、模型和提示词版本的哈希"""
+        return generate_task_hash({
+            'task_type': normalize_text(task_type),
+            'description': normalize_text(description),
+            'requirements': normalize_text(requirements),
+            'model': model,
+            'prompt_version': prompt_version
+        })
+
+    def get(self, key: str) -> Optional[str]:
+        """查找缓存的响应，未命中或已过期时返回None"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT response, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._db.commit()
+                self._expirations += 1
+                row = None
+            if row is None:
+                self._misses += 1
+                return None
+            self._db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self._db.commit()
+            self._hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, task_type: Optional[str] = None, model: Optional[str] = None) -> None:
+        """保存响应，超过上限时淘汰最久未使用的条目"""
+        if not self.enabled:
+            return
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, response, size, task_type, model, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, response, size, task_type, model, now, now)
+            )
+            self._stores += 1
+            self._evict(now)
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+
+    def stats(self) -> Dict:
+        """命中率、条目数、总大小和淘汰统计"""
+        with self._lock:
+            entries, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'entries': entries,
+                'bytes': size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else None,
+                'stores': self._stores,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _evict(self, now: float) -> None:
+        """删除过期条目，再按最近访问时间从旧到新淘汰，直到条目数和总大小都不超过上限（调用方持有锁）"""
+        if self.ttl:
+            expired = self._db.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,)).rowcount
+            self._expirations += expired
+
+        entries, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        evicted = []
+        for key, entry_size in self._db.execute('SELECT key, size FROM responses ORDER BY accessed_at, rowid'):
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            entries -= 1
+            size -= entry_size
+        self._db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self._evictions += len(evicted)
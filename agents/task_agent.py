@@ -1,17 +1,24 @@
 import os
 import asyncio
 import json
-from typing import Dict, List, Optional, Any
+import time
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
 from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 from langchain.tools import BaseTool
 from langchain.memory import ConversationBufferMemory
+from langchain_community.callbacks import get_openai_callback
 from dotenv import load_dotenv
 
-from blockchain.blockchain_client import BlockchainClient
+from blockchain.blockchain_client import BlockchainClient, CLAIM_TASK_GAS, COMPLETE_TASK_GAS
+from blockchain.async_blockchain_client import AsyncBlockchainClient
+from blockchain.preflight import PreflightRejected, RejectReason
+from agents.execution_metrics import ExecutionMetrics
+from agents.llm_registry import get_llm_registry
+from agents.response_cache import ResponseCache
+from utils.helpers import is_task_profitable
 
 load_dotenv()
 
@@ -49,6 +56,24 @@ class TaskAnalysisTool(BaseTool):
         
         return json.dumps(analysis, ensure_ascii=False)
 
+# 有专用执行策略的任务类型 -> TaskExecutionTool 中生成提示词的方法
+DIRECT_TASK_TYPES = {
+    "content_writing": "_content_writing_prompt",
+    "programming": "_programming_prompt",
+    "design": "_design_prompt",
+    "translation": "_translation_prompt",
+    "research": "_research_prompt"
+}
+
+# 执行提示词的版本，修改提示词时递增，使之前缓存的响应失效
+PROMPT_VERSION = '1'
+
+# AgentExecutor 达到迭代次数或时间上限时返回的固定输出（early_stopping_method='force'），不是任务结果
+AGENT_STOPPED_OUTPUTS = frozenset({
+    "Agent stopped due to iteration limit or time limit.",
+    "Agent stopped due to max iterations."
+})
+
 class TaskExecutionTool(BaseTool):
     name = "task_execution"
     description = "执行具体任务并生成结果"
@@ -64,33 +89,28 @@ class TaskExecutionTool(BaseTool):
             task_description = task_data.get("description", "")
             requirements = task_data.get("requirements", "")
             
-            # 创建LLM实例
-            llm = ChatOpenAI(
-                model="deepseek-v3-250324",
-                temperature=0.7,
-                api_key=os.getenv('OPENAI_API_KEY'),
-                openai_api_base="https://ark.cn-beijing.volces.com/api/v3"
-            )
+            # 使用共享连接池的LLM实例（按任务类型选择模型参数）
+            llm = get_llm_registry().get(task_type)
+            
+            return self.execute_typed(task_type, task_description, requirements, llm)
             
-            # 根据任务类型生成执行策略
-            if task_type == "content_writing":
-                return self._execute_content_writing(task_description, requirements, llm)
-            elif task_type == "programming":
-                return self._execute_programming(task_description, requirements, llm)
-            elif task_type == "design":
-                return self._execute_design(task_description, requirements, llm)
-            elif task_type == "translation":
-                return self._execute_translation(task_description, requirements, llm)
-            elif task_type == "research":
-                return self._execute_research(task_description, requirements, llm)
-            else:
-                return self._execute_general_task(task_description, requirements, llm)
-                
         except Exception as e:
-            return f"任务执行失败: {str(e)}"
+            # 抛出异常而不是返回错误文本，避免错误信息被当作任务结果缓存和提交
+            print(f"任务执行失败: {str(e)}")
+            raise
+    
+    def execute_typed(self, task_type: str, description: str, requirements: str, llm) -> str:
+        """按任务类型选择执行策略，只调用一次LLM；未知任务类型按通用任务执行"""
+        response = llm.invoke(self.build_prompt(task_type, description, requirements))
+        return response.content
     
-    def _execute_content_writing(self, description: str, requirements: str, llm) -> str:
-        """执行内容写作任务"""
+    def build_prompt(self, task_type: str, description: str, requirements: str) -> str:
+        """生成任务类型对应的提示词"""
+        build = getattr(self, DIRECT_TASK_TYPES.get(task_type, '_general_prompt'))
+        return build(description, requirements)
+    
+    def _content_writing_prompt(self, description: str, requirements: str) -> str:
+        """内容写作任务的提示词"""
         prompt = f"""
         请根据以下要求创作内容：
         
@@ -106,11 +126,10 @@ class TaskExecutionTool(BaseTool):
         请直接输出创作的内容：
         """
         
-        response = llm.invoke(prompt)
-        return response.content
+        return prompt
     
-    def _execute_programming(self, description: str, requirements: str, llm) -> str:
-        """执行编程任务"""
+    def _programming_prompt(self, description: str, requirements: str) -> str:
+        """编程任务的提示词"""
         prompt = f"""
         请根据以下要求编写代码：
         
@@ -126,11 +145,10 @@ class TaskExecutionTool(BaseTool):
         请直接输出代码：
         """
         
-        response = llm.invoke(prompt)
-        return response.content
+        return prompt
     
-    def _execute_design(self, description: str, requirements: str, llm) -> str:
-        """执行设计任务"""
+    def _design_prompt(self, description: str, requirements: str) -> str:
+        """设计任务的提示词"""
         prompt = f"""
         请根据以下要求进行设计：
         
@@ -147,11 +165,10 @@ class TaskExecutionTool(BaseTool):
         请直接输出设计方案：
         """
         
-        response = llm.invoke(prompt)
-        return response.content
+        return prompt
     
-    def _execute_translation(self, description: str, requirements: str, llm) -> str:
-        """执行翻译任务"""
+    def _translation_prompt(self, description: str, requirements: str) -> str:
+        """翻译任务的提示词"""
         prompt = f"""
         请根据以下要求进行翻译：
         
@@ -167,11 +184,10 @@ class TaskExecutionTool(BaseTool):
         请直接输出翻译结果：
         """
         
-        response = llm.invoke(prompt)
-        return response.content
+        return prompt
     
-    def _execute_research(self, description: str, requirements: str, llm) -> str:
-        """执行研究任务"""
+    def _research_prompt(self, description: str, requirements: str) -> str:
+        """研究任务的提示词"""
         prompt = f"""
         请根据以下要求进行研究分析：
         
@@ -188,11 +204,10 @@ class TaskExecutionTool(BaseTool):
         请直接输出研究报告：
         """
         
-        response = llm.invoke(prompt)
-        return response.content
+        return prompt
     
-    def _execute_general_task(self, description: str, requirements: str, llm) -> str:
-        """执行通用任务"""
+    def _general_prompt(self, description: str, requirements: str) -> str:
+        """通用任务的提示词"""
         prompt = f"""
         请根据以下要求完成任务：
         
@@ -208,26 +223,31 @@ class TaskExecutionTool(BaseTool):
         请直接输出工作成果：
         """
         
-        response = llm.invoke(prompt)
-        return response.content
+        return prompt
 
 class TaskAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="deepseek-v3-250324",
-            temperature=0.7,
-            api_key=os.getenv('OPENAI_API_KEY'),
-            openai_api_base="https://ark.cn-beijing.volces.com/api/v3"
-        )
+        # 模型和API地址来自配置，与任务执行工具共用连接池
+        self.llm_registry = get_llm_registry()
+        self.llm = self.llm_registry.get()
         
         self.blockchain_client = BlockchainClient()
+        # 异步客户端与同步客户端共享账户和测试模式状态，工作周期中使用它避免阻塞事件循环
+        self.async_blockchain_client = AsyncBlockchainClient(self.blockchain_client)
         
         # 初始化工具
+        self.execution_tool = TaskExecutionTool()
         self.tools = [
             TaskAnalysisTool(),
-            TaskExecutionTool()
+            self.execution_tool
         ]
         
+        # 执行模式：direct 时已知类型的任务直接调用一次LLM，agent 时所有任务都走Agent循环
+        self.execution_mode = os.getenv('AGENT_EXECUTION_MODE', 'direct')
+        self.execution_metrics = ExecutionMetrics()
+        # 内容相同的任务（重复发布）直接复用之前的执行结果
+        self.response_cache = ResponseCache.from_env()
+        
         # 设置Agent提示模板
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """你是一个专业的AI工作代理，专门负责在区块链上认领和执行任务。
@@ -271,15 +291,22 @@ class TaskAgent:
             memory_key="chat_history",
             return_messages=True
         )
+        
+        # 预执行被永久拒绝的任务（已被他人认领、已完成、已过期等），之后的工作周期不再作为候选
+        self.rejected_tasks: Dict[int, RejectReason] = {}
     
-    async def work_cycle(self, claimed_task_ids: List[int] = None, execution_order: str = 'ai', completed_task_ids: List[int] = None, is_manual_execution: bool = False) -> Dict[str, Any]:
-        """执行一个完整的工作周期"""
+    async def work_cycle(self, claimed_task_ids: List[int] = None, execution_order: str = 'ai', completed_task_ids: List[int] = None, is_manual_execution: bool = False, progress: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Any]:
+        """
+        执行一个完整的工作周期
+        
+        progress 为进度回调 (事件, 数据)：claim/execute/submit 阶段的状态变化，以及直接执行模式下逐段生成的 token
+        """
         try:
             # 1. 优先处理已认领的任务（无论手动还是自动执行模式）
             if claimed_task_ids and len(claimed_task_ids) > 0:
                 print(f"发现已认领的任务: {claimed_task_ids}")
                 for task_id in claimed_task_ids:
-                    task = self.blockchain_client.get_task(task_id)
+                    task = await self.async_blockchain_client.get_task(task_id)
                     print(f"检查任务 {task_id}: {task}")
                     
                     if task:
@@ -291,43 +318,43 @@ class TaskAgent:
                             continue
                         
                         if not task['isClaimed']:
-                            print(f"认领任务 {task_id}")
-                            claim_success = self.blockchain_client.claim_task(task_id)
-                            if not claim_success:
+                            print(f"认领任务 {task_id}，认领交易确认前即开始执行")
+                            try:
+                                task_result = await self._claim_and_execute(task, progress)
+                            except PreflightRejected as e:
+                                self.record_rejection(e)
+                                task_result = None
+                            if task_result is None:
                                 print(f"任务 {task_id} 认领失败，跳过")
                                 continue
-                        
-                        if task['isClaimed']: # Ensure it's claimed before executing
+                        else:
                             print(f"开始执行任务 {task_id}: {task['title']}")
-                            task_result = await self._execute_task(task)
-                            
-                            print(f"提交任务 {task_id} 的结果")
-                            submit_success = self.blockchain_client.complete_task(
-                                task_id, 
-                                task_result
-                            )
+                            task_result = await self._execute_task(task, progress)
+                        
+                        print(f"提交任务 {task_id} 的结果")
+                        submit_success = await self._submit_result(task, task_result, progress)
+                        
+                        if submit_success:
+                            print(f"任务 {task_id} 完成成功")
+                            # 处理多语言任务标题
+                            task_title = task['title']
+                            if isinstance(task_title, dict):
+                                # 默认使用中文，如果没有则使用第一个可用的语言
+                                task_title = task_title.get('zh', list(task_title.values())[0] if task_title else "")
                             
-                            if submit_success:
-                                print(f"任务 {task_id} 完成成功")
-                                # 处理多语言任务标题
-                                task_title = task['title']
-                                if isinstance(task_title, dict):
-                                    # 默认使用中文，如果没有则使用第一个可用的语言
-                                    task_title = task_title.get('zh', list(task_title.values())[0] if task_title else "")
-                                
-                                return {
-                                    "status": "success",
-                                    "task_id": task['id'],
-                                    "task_title": task_title,
-                                    "reward": task['reward'],
-                                    "result": task_result
-                                }
-                            else:
-                                print(f"任务 {task_id} 提交失败")
-                                return {
-                                    "status": "submit_failed",
-                                    "message": f"任务 {task_id} 提交失败"
-                                }
+                            return {
+                                "status": "success",
+                                "task_id": task['id'],
+                                "task_title": task_title,
+                                "reward": task['reward'],
+                                "result": task_result
+                            }
+                        else:
+                            print(f"任务 {task_id} 提交失败")
+                            return {
+                                "status": "submit_failed",
+                                "message": f"任务 {task_id} 提交失败"
+                            }
                     else:
                         print(f"任务 {task_id} 不存在")
                 
@@ -339,7 +366,7 @@ class TaskAgent:
             
             # 2. 如果没有已认领的任务，获取新的可用任务
             print("没有已认领的任务，获取新的可用任务")
-            available_tasks = self.blockchain_client.get_available_tasks()
+            available_tasks = await self.async_blockchain_client.get_available_tasks()
             
             # 排除已完成的任务和已认领的任务
             if completed_task_ids:
@@ -351,38 +378,41 @@ class TaskAgent:
                 available_tasks = [task_id for task_id in available_tasks if task_id not in claimed_task_ids]
                 print(f"排除已认领任务后，可用任务: {available_tasks}")
             
+            # 排除之前预执行被永久拒绝的任务（任务列表可能落后于链上状态）
+            available_tasks = [task_id for task_id in available_tasks if task_id not in self.rejected_tasks]
+            
             if not available_tasks:
                 return {
                     "status": "no_tasks",
                     "message": "当前没有可用的任务"
                 }
             
-            # 3. 分析任务并选择最佳任务
-            selected_task = await self._select_best_task(available_tasks, execution_order, completed_task_ids)
-            
-            if not selected_task:
-                return {
-                    "status": "no_suitable_task",
-                    "message": "没有找到合适的任务"
-                }
-            
-            # 4. 认领任务
-            claim_success = self.blockchain_client.claim_task(selected_task['id'])
+            # 3-4. 选择最佳任务并认领，广播后立即开始执行（认领回滚时丢弃执行结果）；
+            # 预执行拒绝的任务不会广播交易，从候选列表移除后立即尝试下一个
+            while True:
+                selected_task = await self._select_best_task(available_tasks, execution_order, completed_task_ids)
+                
+                if not selected_task:
+                    return {
+                        "status": "no_suitable_task",
+                        "message": "没有找到合适的任务"
+                    }
+                
+                try:
+                    task_result = await self._claim_and_execute(selected_task, progress)
+                    break
+                except PreflightRejected as e:
+                    self.record_rejection(e)
+                    available_tasks = [task_id for task_id in available_tasks if task_id != selected_task['id']]
             
-            if not claim_success:
+            if task_result is None:
                 return {
                     "status": "claim_failed",
                     "message": "任务认领失败"
                 }
             
-            # 5. 执行任务
-            task_result = await self._execute_task(selected_task)
-            
-            # 6. 提交结果
-            submit_success = self.blockchain_client.complete_task(
-                selected_task['id'], 
-                task_result
-            )
+            # 5. 提交结果
+            submit_success = await self._submit_result(selected_task, task_result, progress)
             
             if submit_success:
                 # 处理多语言任务标题
@@ -411,18 +441,72 @@ class TaskAgent:
                 "message": f"工作周期执行失败: {str(e)}"
             }
     
+    def record_rejection(self, rejection: PreflightRejected) -> None:
+        """记录预执行拒绝，永久性的原因会把任务从之后的候选列表中排除"""
+        print(f"任务 {rejection.task_id} 预执行被拒绝: {rejection.reason.value}")
+        if rejection.reason.is_permanent:
+            self.rejected_tasks[rejection.task_id] = rejection.reason
+    
+    async def _claim_and_execute(self, task: Dict, progress: Optional[Callable[[str, Dict], None]] = None) -> Optional[str]:
+        """
+        广播认领交易后立即开始执行任务，认领交易回滚时取消执行并返回None
+        
+        预执行显示认领会回滚时不广播也不执行，直接抛出 PreflightRejected
+        """
+        self._emit(progress, 'claim', task, status='started')
+        try:
+            claim_future = await self.async_blockchain_client.submit_claim_task(task['id'])
+        except PreflightRejected as e:
+            self._emit(progress, 'claim', task, status='rejected', reason=e.reason.value)
+            raise
+        except Exception as e:
+            print(f"认领任务 {task['id']} 失败: {e}")
+            self._emit(progress, 'claim', task, status='failed')
+            return None
+        
+        self._emit(progress, 'claim', task, status='submitted')
+        return await self.execute_after_claim(task, claim_future, progress)
+    
+    async def execute_after_claim(self, task: Dict, claim_future, progress: Optional[Callable[[str, Dict], None]] = None) -> Optional[str]:
+        """认领交易广播后立即执行任务，与等待认领确认并行；认领未成功时取消执行并返回None"""
+        execution = asyncio.create_task(self._execute_task(task, progress))
+        try:
+            claim_success = await claim_future
+        except Exception as e:
+            print(f"等待认领交易确认失败: {e}")
+            claim_success = False
+        
+        self._emit(progress, 'claim', task, status='confirmed' if claim_success else 'failed')
+        if not claim_success:
+            print(f"任务 {task['id']} 认领交易未成功，丢弃执行结果")
+            execution.cancel()
+            await asyncio.gather(execution, return_exceptions=True)
+            return None
+        
+        return await execution
+    
     async def _select_best_task(self, task_ids: List[int], execution_order: str = 'ai', completed_task_ids: List[int] = None) -> Optional[Dict]:
         """根据执行顺序选择最佳任务"""
+        tasks = await self.rank_tasks(task_ids, execution_order)
+        return tasks[0] if tasks else None
+    
+    async def rank_tasks(self, task_ids: List[int], execution_order: str = 'ai') -> List[Dict]:
+        """获取任务详情，过滤掉无利可图的任务后按执行顺序排序"""
         tasks = []
         
-        # 获取所有任务详情
-        for task_id in task_ids:
-            task = self.blockchain_client.get_task(task_id)
-            if task:
-                tasks.append(task)
+        # 批量获取所有任务详情
+        tasks.extend(await self.async_blockchain_client.get_tasks(task_ids))
+        
+        # 按费用预言机的当前Gas价格过滤掉无利可图的任务（认领+提交两笔交易）
+        fees = await self.async_blockchain_client.get_fee_info()
+        if fees:
+            tasks = [
+                task for task in tasks
+                if is_task_profitable(task['reward'], CLAIM_TASK_GAS + COMPLETE_TASK_GAS, fees['gas_price'])
+            ]
         
         if not tasks:
-            return None
+            return []
         
         # 根据执行顺序排序任务
         if execution_order == 'price-high':
@@ -441,8 +525,7 @@ class TaskAgent:
                 task['_score'] = self._calculate_task_score(task)
             tasks.sort(key=lambda x: x['_score'], reverse=True)
         
-        # 返回排序后的第一个任务
-        return tasks[0] if tasks else None
+        return tasks
     
     def _calculate_task_score(self, task: Dict) -> float:
         """计算任务评分"""
@@ -479,48 +562,136 @@ class TaskAgent:
         
         return score
     
-    async def _execute_task(self, task: Dict) -> str:
-        """执行具体任务"""
-        # 构建任务信息
-        task_info = {
-            "task_type": task.get('taskType', 'general'),
-            "description": task['description'],
-            "requirements": task.get('requirements', ''),
-            "title": task['title']
-        }
+    async def _submit_result(self, task: Dict, task_result: str, progress: Optional[Callable[[str, Dict], None]] = None) -> bool:
+        """提交任务结果并等待确认"""
+        self._emit(progress, 'submit', task, status='started')
+        submit_success = await self.async_blockchain_client.complete_task(task['id'], task_result)
+        self._emit(progress, 'submit', task, status='confirmed' if submit_success else 'failed')
+        return submit_success
+    
+    @staticmethod
+    def _emit(progress: Optional[Callable[[str, Dict], None]], event: str, task: Dict, **data) -> None:
+        """向进度回调发送事件，回调出错不影响工作周期"""
+        if progress is None:
+            return
+        try:
+            progress(event, {'task_id': task['id'], **data})
+        except Exception as e:
+            print(f"进度回调失败: {e}")
+    
+    async def _execute_task(self, task: Dict, progress: Optional[Callable[[str, Dict], None]] = None) -> str:
+        """
+        执行具体任务：内容相同的任务复用缓存结果，已知类型的任务直接调用一次LLM，其他任务交给Agent循环
         
-        # 使用Agent执行任务
+        有进度回调时直接执行模式流式生成，每段输出作为 token 事件发送；其他模式在完成后一次发送全部输出
+        """
+        task_type = task.get('taskType', 'general')
+        mode = 'direct' if self.execution_mode == 'direct' and task_type in DIRECT_TASK_TYPES else 'agent'
+        # 两种模式下生成结果的都是任务类型对应的模型（Agent循环通过 TaskExecutionTool 调用它）
+        model = self.llm_registry.profile_for(task_type).model
+        cache_key = ResponseCache.make_key(
+            task_type, task['description'], task.get('requirements', ''), model, f"{PROMPT_VERSION}:{mode}"
+        )
+        
+        started = time.monotonic()
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            self.execution_metrics.record('cached', task_type, time.monotonic() - started)
+            self._emit(progress, 'execute', task, status='started', mode='cached')
+            self._emit(progress, 'token', task, text=cached)
+            self._emit(progress, 'execute', task, status='done')
+            return cached
+        
+        self._emit(progress, 'execute', task, status='started', mode=mode)
+        streamed = progress is not None and mode == 'direct'
+        # 流式响应不返回Token用量，单独记录，避免拉低 direct 模式的平均Token数
+        metrics_mode = 'direct_stream' if streamed else mode
+        with get_openai_callback() as usage:
+            try:
+                if streamed:
+                    result = await self._stream_direct(task, task_type, progress)
+                elif mode == 'direct':
+                    result = await asyncio.to_thread(
+                        self.execution_tool.execute_typed,
+                        task_type, task['description'], task.get('requirements', ''), self.llm_registry.get(task_type)
+                    )
+                else:
+                    result = await self._execute_with_agent(task)
+            except Exception:
+                self._record_execution(metrics_mode, task_type, started, usage, success=False)
+                self._emit(progress, 'execute', task, status='failed')
+                raise
+        
+        self._record_execution(metrics_mode, task_type, started, usage, llm_calls=1 if streamed else None)
+        if not streamed:
+            self._emit(progress, 'token', task, text=result)
+        self._emit(progress, 'execute', task, status='done')
+        if result and result.strip():
+            self.response_cache.put(cache_key, result, task_type, model)
+        return result
+    
+    async def _stream_direct(self, task: Dict, task_type: str, progress: Callable[[str, Dict], None]) -> str:
+        """直接执行模式的流式版本：用 astream 生成，每段输出立即发送 token 事件"""
+        prompt = self.execution_tool.build_prompt(task_type, task['description'], task.get('requirements', ''))
+        chunks = []
+        async for chunk in self.llm_registry.get(task_type).astream(prompt):
+            if chunk.content:
+                chunks.append(chunk.content)
+                self._emit(progress, 'token', task, text=chunk.content)
+        return ''.join(chunks)
+    
+    async def _execute_with_agent(self, task: Dict) -> str:
+        """通过Agent循环执行任务（分析任务后调用工具，可能有多轮LLM调用）"""
         result = await self.agent_executor.ainvoke({
             "input": f"请执行以下任务：\n任务标题：{task['title']}\n任务描述：{task['description']}\n任务要求：{task.get('requirements', '无特殊要求')}\n\n请分析任务并执行，确保输出高质量的结果。",
             "chat_history": []
         })
         
-        return result["output"]
+        output = result["output"]
+        if output.strip() in AGENT_STOPPED_OUTPUTS:
+            # 按执行失败处理，停止提示不会被缓存或作为结果提交
+            raise RuntimeError(f"Agent循环未完成任务: {output}")
+        return output
     
-    def get_worker_stats(self) -> Dict[str, Any]:
-        """获取工人统计信息"""
-        worker_address = self.blockchain_client.get_account_address()
-        worker_info = self.blockchain_client.get_worker_info(worker_address)
-        
-        if worker_info:
-            return {
-                "address": worker_info['addr'],
-                "reputation": worker_info['reputation'],
-                "completed_tasks": worker_info['completedTasks'],
-                "total_earnings": worker_info['totalEarnings'],
-                "is_active": worker_info['isActive']
-            }
-        else:
-            return {
-                "address": worker_address,
-                "reputation": 0,
-                "completed_tasks": 0,
-                "total_earnings": 0,
-                "is_active": False
-            }
+    def _record_execution(self, mode: str, task_type: str, started: float, usage, success: bool = True,
+                          llm_calls: Optional[int] = None) -> None:
+        self.execution_metrics.record(
+            mode, task_type, time.monotonic() - started,
+            llm_calls=usage.successful_requests if llm_calls is None else llm_calls,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+            success=success
+        )
+    
+    async def get_worker_stats(self) -> Dict[str, Any]:
+        """获取工人统计信息（账户池中所有工作账户的合计）"""
+        worker_info = await self.async_blockchain_client.get_pool_worker_info()
+        return {
+            "address": worker_info['addr'],
+            "reputation": worker_info['reputation'],
+            "completed_tasks": worker_info['completedTasks'],
+            "total_earnings": worker_info['totalEarnings'],
+            "is_active": worker_info['isActive'],
+            "account_count": worker_info['accountCount']
+        }
+    
+    async def get_account_breakdown(self) -> List[Dict[str, Any]]:
+        """获取每个工作账户的统计、余额和进行中的任务"""
+        return await self.async_blockchain_client.get_account_breakdown()
+    
+    def get_execution_stats(self) -> Dict[str, Any]:
+        """获取各执行模式（direct/direct_stream/agent/cached）的任务数、延迟和Token用量，以及响应缓存命中率"""
+        return {
+            "mode": self.execution_mode,
+            "modes": self.execution_metrics.stats(),
+            "cache": self.response_cache.stats()
+        }
+    
+    def get_llm_stats(self) -> Dict[str, Any]:
+        """获取LLM连接复用统计（请求数、新建连接数、建连耗时）和模型配置"""
+        return self.llm_registry.stats()
     
-    def get_balance(self) -> int:
-        """获取账户余额"""
-        return self.blockchain_client.get_balance(
-            self.blockchain_client.get_account_address()
-        ) 
\ No newline at end of file
+    async def get_balance(self) -> int:
+        """获取账户余额（账户池中所有工作账户的合计）"""
+        return await self.async_blockchain_client.get_pool_balance()
\ No newline at end of file
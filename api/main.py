@@ -1,8 +1,10 @@
 import os
+import json
 import asyncio
 from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -12,6 +14,11 @@ from blockchain.blockchain_client import BlockchainClient
 
 load_dotenv()
 
+# 流式接口没有事件时发送保活注释的间隔（秒）
+SSE_KEEPALIVE_SECONDS = float(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+# 流式接口启动的工作周期（客户端断开后仍需保持引用直到完成）
+_streaming_cycles = set()
+
 app = FastAPI(
     title="FlowAI - 区块链AI Agent平台",
     description="去中心化的AI工作代理平台",
@@ -33,6 +40,7 @@ app.mount("/static", StaticFiles(directory="web/static"), name="static")
 # 初始化组件
 task_agent = TaskAgent()
 blockchain_client = task_agent.blockchain_client  # 使用TaskAgent的blockchain_client实例
+async_blockchain_client = task_agent.async_blockchain_client  # 路由处理函数使用异步客户端，避免阻塞事件循环
 
 # Pydantic模型
 class TaskInfo(BaseModel):
@@ -46,6 +54,9 @@ class TaskInfo(BaseModel):
     publisher: str
     is_claimed: bool
     is_completed: bool
+    # 已完成任务的链下结果（通过链上摘要从结果存储中解析）
+    result_digest: Optional[str] = None
+    result: Optional[str] = None
 
 class WorkerStats(BaseModel):
     address: str
@@ -53,6 +64,18 @@ class WorkerStats(BaseModel):
     completed_tasks: int
     total_earnings: int
     is_active: bool
+    # 账户池中的工作账户数（统计为所有账户的合计）
+    account_count: int = 1
+
+class AccountInfo(BaseModel):
+    address: str
+    reputation: int
+    completed_tasks: int
+    total_earnings: int
+    is_active: bool
+    balance: int
+    active_tasks: List[int]
+    pending_transactions: int
 
 class WorkResult(BaseModel):
     status: str
@@ -62,10 +85,18 @@ class WorkResult(BaseModel):
     reward: Optional[int] = None
     result: Optional[str] = None
 
+class BatchClaimRequest(BaseModel):
+    task_ids: List[int]
+
+class BatchCompleteRequest(BaseModel):
+    results: Dict[int, str]
+
 class NetworkInfo(BaseModel):
     chain_id: int
     block_number: int
     gas_price: int
+    base_fee: Optional[int] = None
+    max_priority_fee: Optional[int] = None
     is_connected: bool
 
 # API路由
@@ -88,7 +119,7 @@ async def api_root():
 async def health_check():
     """健康检查"""
     try:
-        network_info = blockchain_client.get_network_info()
+        network_info = await async_blockchain_client.get_network_info()
         return {
             "status": "healthy",
             "blockchain_connected": network_info.get("is_connected", False),
@@ -104,11 +135,10 @@ async def health_check():
 async def get_available_tasks(lang: str = 'zh'):
     """获取可用任务列表"""
     try:
-        available_task_ids = blockchain_client.get_available_tasks()
+        available_task_ids = await async_blockchain_client.get_available_tasks()
         tasks = []
         
-        for task_id in available_task_ids:
-            task_data = blockchain_client.get_task(task_id)
+        for task_data in await async_blockchain_client.get_tasks(available_task_ids):
             if task_data:
                 # 处理多语言内容
                 title = task_data['title']
@@ -145,7 +175,7 @@ async def get_available_tasks(lang: str = 'zh'):
 async def get_task(task_id: int, lang: str = 'zh'):
     """获取特定任务详情"""
     try:
-        task_data = blockchain_client.get_task(task_id)
+        task_data = await async_blockchain_client.get_task(task_id)
         if not task_data:
             raise HTTPException(status_code=404, detail="任务不存在")
         
@@ -162,6 +192,10 @@ async def get_task(task_id: int, lang: str = 'zh'):
         if isinstance(requirements, dict):
             requirements = requirements.get(lang, requirements.get('zh', str(requirements)))
         
+        task_result = None
+        if task_data['isCompleted']:
+            task_result = await async_blockchain_client.get_task_result(task_id)
+        
         return TaskInfo(
             id=task_data['id'],
             title=title,
@@ -172,7 +206,9 @@ async def get_task(task_id: int, lang: str = 'zh'):
             deadline=task_data['deadline'],
             publisher=task_data['publisher'],
             is_claimed=task_data['isClaimed'],
-            is_completed=task_data['isCompleted']
+            is_completed=task_data['isCompleted'],
+            result_digest=task_result['digest'] if task_result else None,
+            result=task_result['result'] if task_result else None
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取任务详情失败: {str(e)}")
@@ -181,7 +217,7 @@ async def get_task(task_id: int, lang: str = 'zh'):
 async def get_task_raw(task_id: int):
     """获取任务的原始多语言数据"""
     try:
-        task_data = blockchain_client.get_task(task_id)
+        task_data = await async_blockchain_client.get_task(task_id)
         if not task_data:
             raise HTTPException(status_code=404, detail="任务不存在")
         
@@ -189,11 +225,36 @@ async def get_task_raw(task_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取任务原始数据失败: {str(e)}")
 
+# 批量路由需在 /api/tasks/{task_id}/... 之前注册
+@app.post("/api/tasks/batch/claim")
+async def claim_tasks(request: BatchClaimRequest):
+    """在一笔交易中批量认领任务，返回每个任务的认领结果"""
+    try:
+        claimed = await async_blockchain_client.claim_tasks(request.task_ids)
+        return {
+            "status": "success" if any(claimed.values()) else "failed",
+            "results": [{"task_id": task_id, "success": success} for task_id, success in claimed.items()]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"批量认领任务失败: {str(e)}")
+
+@app.post("/api/tasks/batch/complete")
+async def complete_tasks(request: BatchCompleteRequest):
+    """在一笔交易中批量提交任务结果，返回每个任务的完成结果"""
+    try:
+        completed = await async_blockchain_client.complete_tasks(request.results)
+        return {
+            "status": "success" if any(completed.values()) else "failed",
+            "results": [{"task_id": task_id, "success": success} for task_id, success in completed.items()]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"批量完成任务失败: {str(e)}")
+
 @app.post("/api/tasks/{task_id}/claim")
 async def claim_task(task_id: int):
     """认领任务"""
     try:
-        success = blockchain_client.claim_task(task_id)
+        success = await async_blockchain_client.claim_task(task_id)
         if success:
             return {"status": "success", "message": "任务认领成功"}
         else:
@@ -205,7 +266,7 @@ async def claim_task(task_id: int):
 async def complete_task(task_id: int, result: str):
     """完成任务"""
     try:
-        success = blockchain_client.complete_task(task_id, result)
+        success = await async_blockchain_client.complete_task(task_id, result)
         if success:
             return {"status": "success", "message": "任务完成成功"}
         else:
@@ -217,16 +278,24 @@ async def complete_task(task_id: int, result: str):
 async def get_worker_stats():
     """获取工人统计信息"""
     try:
-        stats = task_agent.get_worker_stats()
+        stats = await task_agent.get_worker_stats()
         return WorkerStats(**stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取工人统计失败: {str(e)}")
 
+@app.get("/api/worker/accounts", response_model=List[AccountInfo])
+async def get_worker_accounts():
+    """获取账户池中每个工作账户的统计、余额和负载"""
+    try:
+        return [AccountInfo(**account) for account in await task_agent.get_account_breakdown()]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取工作账户失败: {str(e)}")
+
 @app.get("/api/worker/balance")
 async def get_worker_balance():
     """获取工人余额"""
     try:
-        balance = task_agent.get_balance()
+        balance = await task_agent.get_balance()
         return {
             "balance_wei": balance,
             "balance_eth": balance / 10**18
@@ -247,90 +316,189 @@ async def start_work_cycle(background_tasks: BackgroundTasks):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"启动工作周期失败: {str(e)}")
 
+async def _read_work_options(request: Request) -> Dict[str, Any]:
+    """解析工作周期请求体中的已认领任务、执行顺序、已完成任务和执行模式"""
+    options = {
+        'claimed_task_ids': [],
+        'execution_order': 'ai',  # 默认AI智能排序
+        'completed_task_ids': [],  # 已完成任务列表
+        'is_manual_execution': False  # 默认自动执行
+    }
+    try:
+        body = await request.json()
+        print(f"🔍 API接收到请求体: {body}")
+        if body:
+            if 'claimed_tasks' in body:
+                options['claimed_task_ids'] = body['claimed_tasks']
+                print(f"🔍 提取到已认领任务: {body['claimed_tasks']}")
+            if 'execution_order' in body:
+                options['execution_order'] = body['execution_order']
+                print(f"🔍 提取到执行顺序: {body['execution_order']}")
+            if 'completed_tasks' in body:
+                options['completed_task_ids'] = body['completed_tasks']
+                print(f"🔍 提取到已完成任务: {body['completed_tasks']}")
+            if 'is_manual_execution' in body:
+                options['is_manual_execution'] = body['is_manual_execution']
+                print(f"🔍 提取到执行模式: {'手动执行' if body['is_manual_execution'] else '自动执行'}")
+        else:
+            print(f"🔍 请求体中没有claimed_tasks字段")
+    except Exception as e:
+        print(f"🔍 解析请求体失败: {e}")
+        # 如果没有JSON body，使用默认值
+        pass
+    
+    print(f"🔍 最终传递给TaskAgent的参数: {options}")
+    return options
+
+def _to_work_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """把工作周期结果转换为 WorkResult 字段"""
+    # 处理多语言任务标题
+    task_title = result.get("task_title", "")
+    if isinstance(task_title, dict):
+        # 默认使用中文，如果没有则使用第一个可用的语言
+        task_title = task_title.get('zh', list(task_title.values())[0] if task_title else "")
+    
+    # 确保返回的数据符合WorkResult模型
+    return {
+        "status": result.get("status", "unknown"),
+        "message": result.get("message", ""),
+        "task_id": result.get("task_id"),
+        "task_title": task_title,
+        "reward": result.get("reward"),
+        "result": result.get("result")
+    }
+
 @app.post("/api/agent/work/sync", response_model=WorkResult)
 async def work_cycle_sync(request: Request):
     """同步执行AI Agent工作周期"""
     try:
-        claimed_tasks = []
-        execution_order = 'ai'  # 默认AI智能排序
-        completed_tasks = []  # 已完成任务列表
-        is_manual_execution = False  # 默认自动执行
-        try:
-            body = await request.json()
-            print(f"🔍 API接收到请求体: {body}")
-            if body:
-                if 'claimed_tasks' in body:
-                    claimed_tasks = body['claimed_tasks']
-                    print(f"🔍 提取到已认领任务: {claimed_tasks}")
-                if 'execution_order' in body:
-                    execution_order = body['execution_order']
-                    print(f"🔍 提取到执行顺序: {execution_order}")
-                if 'completed_tasks' in body:
-                    completed_tasks = body['completed_tasks']
-                    print(f"🔍 提取到已完成任务: {completed_tasks}")
-                if 'is_manual_execution' in body:
-                    is_manual_execution = body['is_manual_execution']
-                    print(f"🔍 提取到执行模式: {'手动执行' if is_manual_execution else '自动执行'}")
-            else:
-                print(f"🔍 请求体中没有claimed_tasks字段")
-        except Exception as e:
-            print(f"🔍 解析请求体失败: {e}")
-            # 如果没有JSON body，使用空列表
-            pass
-        
-        print(f"🔍 最终传递给TaskAgent的claimed_tasks: {claimed_tasks}, execution_order: {execution_order}, completed_tasks: {completed_tasks}, is_manual_execution: {is_manual_execution}")
-        result = await task_agent.work_cycle(claimed_tasks, execution_order, completed_tasks, is_manual_execution)
-        
-        # 处理多语言任务标题
-        task_title = result.get("task_title", "")
-        if isinstance(task_title, dict):
-            # 默认使用中文，如果没有则使用第一个可用的语言
-            task_title = task_title.get('zh', list(task_title.values())[0] if task_title else "")
-        
-        # 确保返回的数据符合WorkResult模型
-        work_result = {
-            "status": result.get("status", "unknown"),
-            "message": result.get("message", ""),
-            "task_id": result.get("task_id"),
-            "task_title": task_title,
-            "reward": result.get("reward"),
-            "result": result.get("result")
-        }
-        
-        return WorkResult(**work_result)
+        options = await _read_work_options(request)
+        result = await task_agent.work_cycle(**options)
+        return WorkResult(**_to_work_result(result))
     except Exception as e:
         print(f"工作周期执行失败: {e}")
         raise HTTPException(status_code=500, detail=f"工作周期执行失败: {str(e)}")
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/api/agent/work/stream")
+async def work_cycle_stream(request: Request):
+    """
+    以Server-Sent Events流式执行AI Agent工作周期
+    
+    依次发送 claim/execute/submit 阶段事件和逐段生成的 token 事件，最后发送与 /api/agent/work/sync 相同格式的 result 事件；
+    长时间没有事件时发送注释行保持连接，避免代理超时
+    """
+    options = await _read_work_options(request)
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def progress(event: str, data: Dict[str, Any]) -> None:
+        events.put_nowait((event, data))
+    
+    async def run_cycle():
+        try:
+            result = await task_agent.work_cycle(**options, progress=progress)
+        except Exception as e:
+            print(f"工作周期执行失败: {e}")
+            result = {"status": "error", "message": f"工作周期执行失败: {str(e)}"}
+        events.put_nowait(('result', _to_work_result(result)))
+    
+    # 客户端断开后工作周期继续在后台完成，避免已认领的任务没有提交
+    cycle = asyncio.create_task(run_cycle())
+    _streaming_cycles.add(cycle)
+    cycle.add_done_callback(_streaming_cycles.discard)
+    
+    async def stream():
+        yield _sse('started', {"message": "AI Agent已开始工作"})
+        while True:
+            try:
+                event, data = await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event, data)
+            if event == 'result':
+                break
+        await cycle
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/agent/execution")
+async def get_execution_stats():
+    """获取各执行模式（直接调用/Agent循环）的延迟和Token用量"""
+    try:
+        return task_agent.get_execution_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取执行统计失败: {str(e)}")
+
+@app.get("/api/agent/llm")
+async def get_llm_stats():
+    """获取LLM连接复用统计和各任务类型的模型配置"""
+    try:
+        return task_agent.get_llm_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取LLM统计失败: {str(e)}")
+
 @app.get("/api/network/info", response_model=NetworkInfo)
 async def get_network_info():
     """获取网络信息"""
     try:
-        network_info = blockchain_client.get_network_info()
+        network_info = await async_blockchain_client.get_network_info()
         return NetworkInfo(**network_info)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取网络信息失败: {str(e)}")
 
+@app.get("/api/network/rpc")
+async def get_rpc_stats():
+    """获取各RPC节点的延迟与错误统计"""
+    try:
+        return async_blockchain_client.get_rpc_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取RPC统计失败: {str(e)}")
+
+@app.get("/api/network/transactions")
+async def get_transaction_stats():
+    """获取交易替换、预执行拒绝和确认延迟统计"""
+    try:
+        return blockchain_client.get_transaction_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取交易统计失败: {str(e)}")
+
 @app.get("/api/account/address")
 async def get_account_address():
     """获取当前账户地址"""
     try:
-        address = blockchain_client.get_account_address()
+        address = async_blockchain_client.get_account_address()
         return {"address": address}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取账户地址失败: {str(e)}")
 
 # 后台任务
+async def _warm_read_cache():
+    """预热区块链读缓存"""
+    try:
+        await async_blockchain_client.warm_cache()
+        print("读缓存预热完成")
+    except Exception as e:
+        print(f"读缓存预热失败: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     """应用启动时的初始化"""
     print("FlowAI 应用启动中...")
     
     # 检查区块链连接
-    if not blockchain_client.is_connected():
+    if not await async_blockchain_client.is_connected():
         print("警告: 无法连接到区块链网络")
     else:
         print("区块链连接正常")
+        # 后台预热读缓存，首次加载面板时无需等待完整的链上读取
+        app.state.cache_warmup_task = asyncio.create_task(_warm_read_cache())
     
     print("FlowAI 应用启动完成")
 
@@ -338,6 +506,8 @@ async def startup_event():
 async def shutdown_event():
     """应用关闭时的清理"""
     print("FlowAI 应用关闭中...")
+    await async_blockchain_client.close()
+    await task_agent.llm_registry.aclose()
 
 if __name__ == "__main__":
     import uvicorn
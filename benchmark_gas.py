@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+FlowAI 合约Gas基准测试
+在进程内EVM（eth-tester + py-evm）上部署 TaskContract，测量创建、逐个与批量认领/完成任务的单任务Gas消耗；
+--baseline-ref 可与指定git版本的合约对比（如存储布局调整前后）
+
+依赖（不在运行时依赖中）: pip install "eth-tester[py-evm]" py-solc-x
+OpenZeppelin 合约路径通过 OPENZEPPELIN_PATH 指定（默认 node_modules/@openzeppelin）
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from web3 import Web3
+
+CONTRACTS_DIR = Path(__file__).parent / 'contracts'
+DEFAULT_SOLC_VERSION = '0.8.19'
+INITIAL_SUPPLY = 10 ** 27
+REWARD = 10 ** 18
+TASK_DEADLINE = 86400
+DIGEST = b'\x11' * 32
+LOCATOR = 'fs'
+
+
+def compile_contracts(source_dir: Path = CONTRACTS_DIR, solc_version: str = DEFAULT_SOLC_VERSION) -> dict:
+    """编译 TaskContract 和测试代币，返回 {合约名: {'abi', 'bin'}}"""
+    import solcx
+
+    if solc_version not in {str(version) for version in solcx.get_installed_solc_versions()}:
+        print(f"📦 安装 solc {solc_version}...")
+        solcx.install_solc(solc_version)
+
+    openzeppelin = Path(os.getenv('OPENZEPPELIN_PATH', 'node_modules/@openzeppelin')).resolve()
+    output = solcx.compile_files(
+        [source_dir / 'TaskContract.sol', CONTRACTS_DIR / 'MockRewardToken.sol'],
+        output_values=['abi', 'bin'],
+        import_remappings={'@openzeppelin/': f"{openzeppelin}/"},
+        allow_paths=[str(openzeppelin), str(source_dir), str(CONTRACTS_DIR)],
+        solc_version=solc_version,
+        optimize=True,
+        optimize_runs=200
+    )
+    return {key.split(':')[-1]: value for key, value in output.items()}
+
+
+def deploy(w3: Web3, compiled: dict):
+    """部署代币和任务合约，并给任务合约注入奖励资金，返回任务合约实例"""
+    deployer = w3.eth.accounts[0]
+
+    def deploy_one(name, *args):
+        factory = w3.eth.contract(abi=compiled[name]['abi'], bytecode=compiled[name]['bin'])
+        receipt = w3.eth.wait_for_transaction_receipt(factory.constructor(*args).transact({'from': deployer}))
+        return w3.eth.contract(address=receipt.contractAddress, abi=compiled[name]['abi'])
+
+    token = deploy_one('MockRewardToken', INITIAL_SUPPLY)
+    task_contract = deploy_one('TaskContract', token.address)
+    token.functions.transfer(task_contract.address, INITIAL_SUPPLY // 2).transact({'from': deployer})
+    return task_contract
+
+
+def create_tasks(w3: Web3, task_contract, count: int) -> tuple:
+    """创建 count 个任务，返回 (任务ID列表, 单个任务的平均Gas)"""
+    publisher = w3.eth.accounts[0]
+    deadline = w3.eth.get_block('latest').timestamp + TASK_DEADLINE
+    first_id = task_contract.functions.getTaskCount().call() + 1
+    gas = sum(
+        _gas_used(w3, task_contract.functions.createTask(
+            f"Benchmark task {index}", "Gas benchmark", REWARD, deadline, 'data_analysis', ''
+        ).transact({'from': publisher}))
+        for index in range(count)
+    )
+    return list(range(first_id, first_id + count)), gas // count
+
+
+def _gas_used(w3: Web3, tx_hash) -> int:
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    if receipt.status != 1:
+        raise RuntimeError(f"交易回滚: {tx_hash.hex()}")
+    return receipt.gasUsed
+
+
+def _has_function(task_contract, name: str) -> bool:
+    return any(item.get('name') == name for item in task_contract.abi)
+
+
+def _complete_args(task_contract, task_id: int) -> list:
+    """completeTask 的参数：旧版本合约直接提交结果字符串"""
+    inputs = next(item['inputs'] for item in task_contract.abi if item.get('name') == 'completeTask')
+    return [task_id, DIGEST, LOCATOR] if len(inputs) == 3 else [task_id, 'benchmark result']
+
+
+def measure(w3: Web3, task_contract, count: int) -> dict:
+    """测量各操作的单任务平均Gas，批量操作按批量大小 count 均摊；合约没有的函数跳过"""
+    worker = w3.eth.accounts[1]
+    functions = task_contract.functions
+    single_ids, create_gas = create_tasks(w3, task_contract, count)
+    results = {'createTask': create_gas}
+
+    results['claimTask'] = sum(
+        _gas_used(w3, functions.claimTask(task_id).transact({'from': worker})) for task_id in single_ids
+    ) // count
+    results['completeTask'] = sum(
+        _gas_used(w3, functions.completeTask(*_complete_args(task_contract, task_id)).transact({'from': worker}))
+        for task_id in single_ids
+    ) // count
+
+    if _has_function(task_contract, 'claimTasks'):
+        batch_ids, _ = create_tasks(w3, task_contract, count)
+        results['claimTasks'] = _gas_used(w3, functions.claimTasks(batch_ids).transact({'from': worker})) // count
+        results['completeTasks'] = _gas_used(
+            w3, functions.completeTasks(batch_ids, [DIGEST] * count, LOCATOR).transact({'from': worker})
+        ) // count
+    return results
+
+
+def export_contracts(ref: str, target: Path) -> Path:
+    """把指定git版本的合约源码导出到 target 目录，用作对比基线"""
+    source = subprocess.run(
+        ['git', 'show', f"{ref}:contracts/TaskContract.sol"],
+        cwd=Path(__file__).parent, check=True, capture_output=True
+    ).stdout
+    (target / 'TaskContract.sol').write_bytes(source)
+    return target
+
+
+def run_benchmark(source_dir: Path, count: int, solc_version: str) -> dict:
+    """在新的进程内EVM上编译、部署并测量"""
+    from web3 import EthereumTesterProvider
+
+    w3 = Web3(EthereumTesterProvider())
+    task_contract = deploy(w3, compile_contracts(source_dir, solc_version))
+    return measure(w3, task_contract, count)
+
+
+def print_report(results: dict, count: int, baseline: Optional[dict] = None) -> None:
+    """打印各操作的单任务平均Gas，指定基线时同时打印变化"""
+    print(f"\n📊 单任务平均Gas（批量操作按 {count} 个任务均摊）")
+    if baseline is None:
+        print(f"{'操作':<16}{'Gas':>12}")
+        for operation, gas in results.items():
+            print(f"{operation:<16}{gas:>12}")
+        return
+
+    print(f"{'操作':<16}{'基线':>12}{'当前':>12}{'变化':>10}")
+    for operation, gas in results.items():
+        before = baseline.get(operation)
+        if before is None:
+            print(f"{operation:<16}{'-':>12}{gas:>12}{'-':>10}")
+        else:
+            print(f"{operation:<16}{before:>12}{gas:>12}{gas / before - 1:>+10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FlowAI 合约Gas基准测试')
+    parser.add_argument('--tasks', type=int, default=20, help='每种操作测量的任务数量（即批量大小）')
+    parser.add_argument('--solc-version', default=os.getenv('SOLC_VERSION', DEFAULT_SOLC_VERSION))
+    parser.add_argument('--baseline-ref', help='与指定git版本（如 HEAD~1）的合约对比')
+    args = parser.parse_args()
+
+    try:
+        baseline = None
+        if args.baseline_ref:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                baseline_dir = export_contracts(args.baseline_ref, Path(tmpdir))
+                baseline = run_benchmark(baseline_dir, args.tasks, args.solc_version)
+        results = run_benchmark(CONTRACTS_DIR, args.tasks, args.solc_version)
+    except ImportError as e:
+        print(f"❌ 缺少依赖: {e}，请安装 eth-tester[py-evm] 和 py-solc-x")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ 基准测试失败: {e}")
+        sys.exit(1)
+
+    print_report(results, args.tasks, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+多账户工作通道
+每个工作账户拥有独立的nonce分配器（一条nonce通道），认领任务时按负载选择账户，
+完成任务时使用认领该任务的账户，使链上吞吐量不再受单一账户的确认速度限制
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+from eth_account import Account
+
+from blockchain.nonce_manager import NonceManager
+
+
+class WorkerLane:
+    """一个工作账户及其nonce通道"""
+
+    def __init__(self, account):
+        self.account = account
+        self.nonce_manager = NonceManager()
+        # 已认领（或正在认领）但尚未完成的任务
+        self.active_tasks = set()
+
+    @property
+    def address(self) -> str:
+        return self.account.address
+
+    def load(self) -> int:
+        """账户当前负载：进行中的任务数 + 尚未确认的交易数"""
+        return len(self.active_tasks) + self.nonce_manager.pending_count()
+
+
+class AccountPool:
+    """
+    工作账户池
+
+    assign() 为新认领的任务选择负载最低的账户并记录归属，lane_for() 返回认领该任务的账户，
+    release() 在任务完成或认领失败后解除归属。
+    """
+
+    def __init__(self, accounts: List):
+        if not accounts:
+            raise ValueError("账户池至少需要一个账户")
+        self.lanes = [WorkerLane(account) for account in accounts]
+        self._by_address = {lane.address.lower(): lane for lane in self.lanes}
+        self._by_task: Dict[int, WorkerLane] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'AccountPool':
+        """PRIVATE_KEYS 为逗号分隔的私钥列表，未设置时使用 PRIVATE_KEY 单账户"""
+        keys = [key.strip() for key in os.getenv('PRIVATE_KEYS', '').split(',') if key.strip()]
+        if not keys:
+            keys = [os.getenv('PRIVATE_KEY')]
+        return cls([Account.from_key(key) for key in keys])
+
+    @property
+    def primary(self) -> WorkerLane:
+        """主账户（PRIVATE_KEYS 中的第一个），单账户接口使用它"""
+        return self.lanes[0]
+
+    @property
+    def addresses(self) -> List[str]:
+        return [lane.address for lane in self.lanes]
+
+    def assign(self, task_ids: List[int]) -> WorkerLane:
+        """
+        为一批任务选择账户并登记全部任务的归属
+
+        批次中已有任务登记在某个账户上时沿用该账户，否则选择负载最低的账户；
+        已登记的任务分属不同账户时无法在一笔交易中发送，抛出 ValueError
+        """
+        with self._lock:
+            owners = {self._by_task[task_id] for task_id in task_ids if task_id in self._by_task}
+            if len(owners) > 1:
+                raise ValueError(f"任务 {list(task_ids)} 已分属 {len(owners)} 个账户，不能在一笔交易中认领")
+            lane = owners.pop() if owners else min(self.lanes, key=lambda candidate: candidate.load())
+            for task_id in task_ids:
+                if task_id not in self._by_task:
+                    self._by_task[task_id] = lane
+                    lane.active_tasks.add(task_id)
+            return lane
+
+    def lane_for(self, task_id: int, worker: Optional[str] = None) -> Optional[WorkerLane]:
+        """认领该任务的账户；本地没有记录时按链上的 worker 地址查找（如进程重启后）"""
+        with self._lock:
+            lane = self._by_task.get(task_id)
+            if lane is None and worker:
+                lane = self._by_address.get(worker.lower())
+                if lane is not None:
+                    self._by_task[task_id] = lane
+                    lane.active_tasks.add(task_id)
+            return lane
+
+    def lane_by_address(self, address: str) -> Optional[WorkerLane]:
+        return self._by_address.get(address.lower())
+
+    def release(self, task_ids: List[int]) -> None:
+        """任务完成或认领失败后解除账户归属"""
+        with self._lock:
+            for task_id in task_ids:
+                lane = self._by_task.pop(task_id, None)
+                if lane is not None:
+                    lane.active_tasks.discard(task_id)
+
+    def settle(self, task_ids: List[int], done, release_on_success: bool) -> None:
+        """
+        交易结果确定后解除账户归属（done 为认领/完成交易的Future，结果为bool或 {任务ID: bool}）
+
+        认领交易传 release_on_success=False：认领失败的任务解除归属；
+        完成交易传 release_on_success=True：完成成功的任务解除归属，失败的任务保留原账户以便重试。
+        """
+        if done.cancelled() or done.exception() is not None:
+            outcome = dict.fromkeys(task_ids, False)
+        else:
+            result = done.result()
+            outcome = result if isinstance(result, dict) else dict.fromkeys(task_ids, bool(result))
+        self.release([task_id for task_id in task_ids if bool(outcome.get(task_id)) == release_on_success])
+
+    def stats(self) -> List[Dict]:
+        """各账户的负载"""
+        with self._lock:
+            return [
+                {
+                    'address': lane.address,
+                    'active_tasks': sorted(lane.active_tasks),
+                    'pending_transactions': lane.nonce_manager.pending_count()
+                }
+                for lane in self.lanes
+            ]
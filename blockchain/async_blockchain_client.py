@@ -0,0 +1,516 @@
+import os
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from web3 import AsyncWeb3
+from dotenv import load_dotenv
+
+from blockchain.blockchain_client import BlockchainClient, TransactionPlan
+from blockchain.account_pool import WorkerLane
+from blockchain.multicall import AsyncMulticall, DEFAULT_CHUNK_SIZE
+from blockchain.rpc_pool import async_pool_from_env
+
+load_dotenv()
+
+class AsyncBlockchainClient:
+    """
+    异步区块链客户端
+
+    基于 AsyncWeb3 + 带连接池的批量Provider，所有RPC调用都可以await，
+    不会阻塞FastAPI/Agent的事件循环；同时发出的只读调用会自动合并为一个JSON-RPC批量请求。账户、合约ABI和模拟后端与同步客户端共享。
+    """
+
+    def __init__(self, sync_client: Optional[BlockchainClient] = None):
+        self.sync_client = sync_client or BlockchainClient()
+        self.w3 = AsyncWeb3(async_pool_from_env(os.getenv('ETHEREUM_RPC_URL')))
+        self.account = self.sync_client.account
+        self.task_contract_address = self.sync_client.task_contract_address
+
+        # 初始化合约实例（仅在非测试模式下）
+        if not self._is_test_mode():
+            self.task_contract = self.w3.eth.contract(
+                address=self.task_contract_address,
+                abi=self.sync_client.task_contract_abi
+            )
+            self.multicall = AsyncMulticall(
+                self.w3,
+                address=os.getenv('MULTICALL_ADDRESS'),
+                chunk_size=int(os.getenv('MULTICALL_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+            )
+        else:
+            self.task_contract = None
+            self.multicall = None
+
+    def _is_test_mode(self) -> bool:
+        """合约地址为零地址时使用模拟后端"""
+        return self.sync_client.simulator is not None
+
+    @property
+    def simulator(self):
+        return self.sync_client.simulator
+
+    async def get_available_tasks(self) -> List[int]:
+        """获取可用的任务列表"""
+        if self._is_test_mode():
+            return await self.simulator.call_async('get_available_tasks')
+
+        # 索引已追上链头时直接本地查询
+        task_indexer = self.sync_client.task_indexer
+        if task_indexer and task_indexer.is_synced():
+            return task_indexer.get_available_task_ids()
+
+        try:
+            # 所有分页固定在同一区块并发读取，避免翻页期间集合变化导致遗漏或重复
+            block_identifier = await self._current_block_number() or 'latest'
+            functions = self.task_contract.functions
+            page_size = self.sync_client.available_tasks_page_size
+            total = await functions.getAvailableTaskCount().call(block_identifier=block_identifier)
+
+            pages = await asyncio.gather(*[
+                functions.getAvailableTasks(offset, page_size).call(block_identifier=block_identifier)
+                for offset in range(0, total, page_size)
+            ])
+            return sorted(task_id for page in pages for task_id in page if task_id > 0)
+        except Exception as e:
+            print(f"获取可用任务失败: {e}")
+            return []
+
+    async def get_task(self, task_id: int) -> Optional[Dict]:
+        """获取任务详情"""
+        if self._is_test_mode():
+            return await self.simulator.call_async('get_task', task_id)
+
+        task_indexer = self.sync_client.task_indexer
+        if task_indexer and task_indexer.is_synced():
+            task = task_indexer.get_task(task_id)
+            if task:
+                return task
+
+        read_cache = self.sync_client.read_cache
+        block_number = await self._current_block_number()
+        hit, task = read_cache.get(('task', task_id), block_number)
+        if hit:
+            return dict(task)
+
+        try:
+            task_data = await self.task_contract.functions.getTask(task_id).call()
+            task = self.sync_client._parse_task(task_data)
+            read_cache.put(('task', task_id), block_number, task)
+            return dict(task)
+        except Exception as e:
+            print(f"获取任务详情失败: {e}")
+            return None
+
+    async def get_tasks(self, task_ids: List[int]) -> List[Dict]:
+        """批量获取任务详情（Multicall3各分块并发请求）"""
+        if self._is_test_mode():
+            return await self.simulator.call_async('get_tasks', task_ids)
+
+        task_indexer = self.sync_client.task_indexer
+        if not (task_indexer and task_indexer.is_synced()):
+            return await self._get_tasks_from_chain(task_ids)
+
+        # 优先从本地索引读取，索引中缺失的任务再从链上批量读取
+        indexed = {task['id']: task for task in task_indexer.get_tasks(task_ids)}
+        missing = [task_id for task_id in task_ids if task_id not in indexed]
+        if missing:
+            indexed.update((task['id'], task) for task in await self._get_tasks_from_chain(missing))
+        return [indexed[task_id] for task_id in task_ids if task_id in indexed]
+
+    async def _get_tasks_from_chain(self, task_ids: List[int]) -> List[Dict]:
+        """通过Multicall3从链上批量读取任务"""
+        if not task_ids:
+            return []
+
+        # 当前区块内已读取过的任务直接使用缓存
+        block_number = await self._current_block_number()
+        cached, missing = self.sync_client._split_cached_tasks(task_ids, block_number)
+        if missing:
+            try:
+                results = await self.multicall.aggregate(self.sync_client._build_get_task_calls(missing))
+                fetched = self.sync_client._decode_get_task_results(missing, results)
+            except Exception as e:
+                # 链上没有Multicall3时退化为并发逐个读取
+                print(f"批量获取任务失败，退化为逐个读取: {e}")
+                fetched = [task for task in await asyncio.gather(*[self.get_task(task_id) for task_id in missing]) if task]
+            self.sync_client._store_cached_tasks(fetched, block_number, cached)
+
+        return [dict(cached[task_id]) for task_id in task_ids if task_id in cached]
+
+    async def _current_block_number(self) -> Optional[int]:
+        """读缓存使用的最新区块号，获取失败时返回None（不使用缓存）"""
+        try:
+            return await self.sync_client.fee_oracle.latest_block_number_async(self.w3)
+        except Exception:
+            return None
+
+    async def warm_cache(self) -> None:
+        """预热读缓存：可用任务详情、本账户的工人信息和余额"""
+        if self._is_test_mode():
+            return
+
+        address = self.get_account_address()
+        task_ids = await self.get_available_tasks()
+        await asyncio.gather(
+            self.get_tasks(task_ids),
+            self.get_worker_info(address),
+            self.get_balance(address)
+        )
+
+    async def claim_task(self, task_id: int, wait: bool = True) -> bool:
+        """认领任务（wait=False时广播后立即返回，不等待上链）"""
+        if self._is_test_mode():
+            account_pool = self.sync_client.account_pool
+            lane = account_pool.assign([task_id])
+            claimed = await self.simulator.call_async('claim_task', task_id, lane.address)
+            if not claimed:
+                account_pool.release([task_id])
+            return claimed
+
+        try:
+            claim_future = await self.submit_claim_task(task_id)
+            return await claim_future if wait else True
+        except Exception as e:
+            print(f"认领任务失败: {e}")
+            return False
+
+    async def submit_claim_task(self, task_id: int) -> asyncio.Future:
+        """
+        用负载最低的账户广播认领交易，返回可await的Future，交易确认后其结果为是否认领成功
+
+        预执行显示交易会回滚时不广播，直接抛出 PreflightRejected
+        """
+        account_pool = self.sync_client.account_pool
+        lane = account_pool.assign([task_id])
+        try:
+            claim_future = await self._submit_claim_task(task_id, lane)
+        except Exception:
+            account_pool.release([task_id])
+            raise
+        claim_future.add_done_callback(lambda done: account_pool.settle([task_id], done, release_on_success=False))
+        return claim_future
+
+    async def _submit_claim_task(self, task_id: int, lane: WorkerLane) -> asyncio.Future:
+        preflight = self.sync_client.preflight
+        if self._is_test_mode():
+            preflight.check_message(
+                task_id, 'claim', await self.simulator.call_async('preflight_claim', task_id, lane.address)
+            )
+            return _completed_future(await self.simulator.call_async('claim_task', task_id, lane.address))
+
+        return await self._send_planned(self.sync_client._plan_claim(task_id, lane), lane)
+
+    async def complete_task(self, task_id: int, result: str, wait: bool = True) -> bool:
+        """完成任务（wait=False时广播后立即返回，不等待上链）"""
+        if self._is_test_mode():
+            lane = await self._completion_lane(task_id)
+            digest, locator = self.sync_client.result_store.put(result)
+            completed = await self.simulator.call_async('complete_task', task_id, lane.address, digest, locator)
+            if completed:
+                self.sync_client.account_pool.release([task_id])
+            return completed
+
+        try:
+            complete_future = await self.submit_complete_task(task_id, result)
+            return await complete_future if wait else True
+        except Exception as e:
+            print(f"完成任务失败: {e}")
+            return False
+
+    async def submit_complete_task(self, task_id: int, result: str) -> asyncio.Future:
+        """
+        用认领该任务的账户广播完成交易，返回可await的Future，交易确认后其结果为是否提交成功
+
+        预执行显示交易会回滚时不广播，直接抛出 PreflightRejected
+        """
+        account_pool = self.sync_client.account_pool
+        complete_future = await self._submit_complete_task(task_id, result, await self._completion_lane(task_id))
+        complete_future.add_done_callback(lambda done: account_pool.settle([task_id], done, release_on_success=True))
+        return complete_future
+
+    async def _submit_complete_task(self, task_id: int, result: str, lane: WorkerLane) -> asyncio.Future:
+        preflight = self.sync_client.preflight
+        digest, locator = self.sync_client.result_store.put(result)
+        if self._is_test_mode():
+            preflight.check_message(task_id, 'complete', await self.simulator.call_async(
+                'preflight_complete', task_id, lane.address, digest
+            ))
+            return _completed_future(
+                await self.simulator.call_async('complete_task', task_id, lane.address, digest, locator)
+            )
+
+        return await self._send_planned(self.sync_client._plan_complete(task_id, digest, locator, lane), lane)
+
+    async def _completion_lane(self, task_id: int) -> WorkerLane:
+        """完成任务必须使用认领它的账户：优先用本地记录，否则按链上的 worker 地址查找"""
+        account_pool = self.sync_client.account_pool
+        lane = account_pool.lane_for(task_id)
+        if lane is None and len(account_pool.lanes) > 1:
+            task = await self.get_task(task_id)
+            lane = account_pool.lane_for(task_id, task['worker'] if task else None)
+        return lane or account_pool.primary
+
+    async def claim_tasks(self, task_ids: List[int], wait: bool = True) -> Dict[int, bool]:
+        """在一笔交易中批量认领任务，返回每个任务是否认领成功（wait=False时广播后立即返回）"""
+        if not task_ids:
+            return {}
+
+        try:
+            claim_future = await self.submit_claim_tasks(task_ids)
+            return await claim_future if wait else dict.fromkeys(task_ids, True)
+        except Exception as e:
+            print(f"批量认领任务失败: {e}")
+            return dict.fromkeys(task_ids, False)
+
+    async def submit_claim_tasks(self, task_ids: List[int]) -> asyncio.Future:
+        """用负载最低的账户广播批量认领交易，交易确认后Future的结果为 {任务ID: 是否认领成功}"""
+        account_pool = self.sync_client.account_pool
+        task_ids = list(task_ids)
+        lane = account_pool.assign(task_ids)
+        try:
+            claim_future = await self._submit_claim_tasks(task_ids, lane)
+        except Exception:
+            account_pool.release(task_ids)
+            raise
+        claim_future.add_done_callback(lambda done: account_pool.settle(task_ids, done, release_on_success=False))
+        return claim_future
+
+    async def _submit_claim_tasks(self, task_ids: List[int], lane: WorkerLane) -> asyncio.Future:
+        if self._is_test_mode():
+            return _completed_future({
+                task_id: await self.simulator.call_async('claim_task', task_id, lane.address)
+                for task_id in task_ids
+            })
+
+        return await self._send_planned(self.sync_client._plan_claim_batch(task_ids, lane), lane)
+
+    async def complete_tasks(self, results: Dict[int, str], wait: bool = True) -> Dict[int, bool]:
+        """批量提交任务结果（每个认领账户一笔交易），返回每个任务是否完成成功（wait=False时广播后立即返回）"""
+        if not results:
+            return {}
+
+        try:
+            complete_future = await self.submit_complete_tasks(results)
+            return await complete_future if wait else dict.fromkeys(results, True)
+        except Exception as e:
+            print(f"批量完成任务失败: {e}")
+            return dict.fromkeys(results, False)
+
+    async def submit_complete_tasks(self, results: Dict[int, str]) -> asyncio.Future:
+        """按认领账户分组并发广播批量完成交易，全部确认后Future的结果为 {任务ID: 是否完成成功}"""
+        account_pool = self.sync_client.account_pool
+        groups: Dict[WorkerLane, Dict[int, str]] = {}
+        for task_id, result in results.items():
+            groups.setdefault(await self._completion_lane(task_id), {})[task_id] = result
+
+        async def submit_group(lane: WorkerLane, group: Dict[int, str]) -> Dict[int, bool]:
+            try:
+                return await (await self._submit_complete_tasks(group, lane))
+            except Exception as e:
+                print(f"账户 {lane.address} 批量完成任务失败: {e}")
+                return dict.fromkeys(group, False)
+
+        async def merge() -> Dict[int, bool]:
+            outcomes = await asyncio.gather(*[submit_group(lane, group) for lane, group in groups.items()])
+            return {task_id: done for outcome in outcomes for task_id, done in outcome.items()}
+
+        complete_future = asyncio.ensure_future(merge())
+        complete_future.add_done_callback(
+            lambda done: account_pool.settle(list(results), done, release_on_success=True)
+        )
+        return complete_future
+
+    async def _submit_complete_tasks(self, results: Dict[int, str], lane: WorkerLane) -> asyncio.Future:
+        sync_client = self.sync_client
+        task_ids = list(results)
+        digests, locator = sync_client._store_results(results)
+        if self._is_test_mode():
+            return _completed_future({
+                task_id: await self.simulator.call_async('complete_task', task_id, lane.address, digest, locator)
+                for task_id, digest in zip(task_ids, digests)
+            })
+
+        return await self._send_planned(sync_client._plan_complete_batch(task_ids, digests, locator, lane), lane)
+
+    async def get_task_result(self, task_id: int) -> Optional[Dict]:
+        """读取链上的结果摘要并从结果存储中解析出结果内容，任务未完成时返回None"""
+        try:
+            if self._is_test_mode():
+                submitted = await self.simulator.call_async('get_task_result', task_id)
+            else:
+                submitted = await self.task_contract.functions.getTaskResult(task_id).call()
+            return self.sync_client._resolve_result(submitted)
+        except Exception as e:
+            print(f"获取任务结果失败: {e}")
+            return None
+
+    async def _fetch_chain_nonce(self, address: Optional[str] = None) -> int:
+        """读取链上pending nonce"""
+        return await self.w3.eth.get_transaction_count(address or self.account.address, 'pending')
+
+    async def _send_planned(self, plan: TransactionPlan, lane: WorkerLane) -> asyncio.Future:
+        """预执行、广播一笔与同步客户端共用计划的交易，回执由同步客户端的跟踪器处理"""
+        contract_function = plan.bind(self.task_contract)
+        if plan.preflight:
+            await self.sync_client.preflight.check_async(contract_function, lane.address, *plan.preflight)
+        tx_hash, nonce = await self._broadcast_transaction(contract_function, plan.default_gas, lane)
+        return asyncio.wrap_future(
+            self.sync_client._track_transaction(tx_hash, nonce, plan.on_confirmed, plan.outcome, lane)
+        )
+
+    async def _broadcast_transaction(self, contract_function, default_gas: int,
+                                     lane: Optional[WorkerLane] = None) -> Tuple[bytes, int]:
+        """
+        构建、签名并广播交易，nonce由与同步客户端共享的账户通道分配器提供，返回 (交易哈希, nonce)
+
+        Gas上限由共享的估算器给出，估算失败时使用 default_gas；交易字段、签名和广播后的登记与同步客户端共用
+        """
+        sync_client = self.sync_client
+        lane = lane or sync_client.account_pool.primary
+        gas = await sync_client.gas_estimator.estimate_async(contract_function, lane.address, default_gas)
+        nonce = await lane.nonce_manager.allocate_async(lambda: self._fetch_chain_nonce(lane.address))
+        try:
+            fee_params = await sync_client.fee_oracle.transaction_fee_params_async(self.w3)
+            transaction = await contract_function.build_transaction(
+                sync_client._transaction_fields(lane, gas, nonce, fee_params)
+            )
+            raw_transaction = sync_client._sign_transaction(transaction, lane)
+        except Exception:
+            # 交易没有广播，归还nonce
+            lane.nonce_manager.release(nonce)
+            raise
+        try:
+            tx_hash = await self.w3.eth.send_raw_transaction(raw_transaction)
+        except Exception:
+            # 节点拒绝（nonce冲突、替换费用不足等）：下次分配时与链重新同步
+            lane.nonce_manager.reject(nonce)
+            raise
+        sync_client._register_broadcast(tx_hash, transaction, contract_function, gas, lane)
+        return tx_hash, nonce
+
+    async def get_worker_info(self, worker_address: str) -> Optional[Dict]:
+        """获取工人信息"""
+        if self._is_test_mode():
+            return await self.simulator.call_async('get_worker_info', worker_address)
+
+        read_cache = self.sync_client.read_cache
+        block_number = await self._current_block_number()
+        hit, worker_info = read_cache.get(('worker', worker_address), block_number)
+        if hit:
+            return dict(worker_info)
+
+        try:
+            worker_data = await self.task_contract.functions.getWorker(worker_address).call()
+            worker_info = self.sync_client._parse_worker(worker_data)
+            read_cache.put(('worker', worker_address), block_number, worker_info)
+            return dict(worker_info)
+        except Exception as e:
+            print(f"获取工人信息失败: {e}")
+            return None
+
+    async def get_balance(self, address: str) -> int:
+        """获取账户余额"""
+        if self._is_test_mode():
+            return await self.simulator.call_async('get_balance', address)
+
+        read_cache = self.sync_client.read_cache
+        block_number = await self._current_block_number()
+        hit, balance = read_cache.get(('balance', address), block_number)
+        if hit:
+            return balance
+
+        try:
+            balance = await self.w3.eth.get_balance(address)
+            read_cache.put(('balance', address), block_number, balance)
+            return balance
+        except Exception as e:
+            print(f"获取余额失败: {e}")
+            return 0
+
+    def get_account_address(self) -> str:
+        """获取当前账户地址"""
+        return self.account.address
+
+    async def get_pool_worker_info(self) -> Dict:
+        """账户池中所有工作账户的链上统计之和（并发读取）"""
+        addresses = self.sync_client.account_pool.addresses
+        worker_infos = await asyncio.gather(*[self.get_worker_info(address) for address in addresses])
+        return self.sync_client._aggregate_worker_info(list(worker_infos))
+
+    async def get_pool_balance(self) -> int:
+        """账户池中所有工作账户的余额之和（并发读取）"""
+        addresses = self.sync_client.account_pool.addresses
+        return sum(await asyncio.gather(*[self.get_balance(address) for address in addresses]))
+
+    async def get_account_breakdown(self) -> List[Dict]:
+        """每个工作账户的链上统计、余额和本地负载（并发读取）"""
+        loads = self.sync_client.account_pool.stats()
+        worker_infos, balances = await asyncio.gather(
+            asyncio.gather(*[self.get_worker_info(load['address']) for load in loads]),
+            asyncio.gather(*[self.get_balance(load['address']) for load in loads])
+        )
+        return [
+            self.sync_client._account_entry(load, worker_info, balance)
+            for load, worker_info, balance in zip(loads, worker_infos, balances)
+        ]
+
+    async def is_connected(self) -> bool:
+        """检查是否连接到区块链网络"""
+        if self._is_test_mode():
+            return True
+        return await self.w3.is_connected()
+
+    async def get_chain_id(self) -> int:
+        """获取链ID（与同步客户端共享缓存）"""
+        if self._is_test_mode():
+            return (await self.simulator.call_async('get_network_info'))['chain_id']
+        if self.sync_client._chain_id is None:
+            self.sync_client._chain_id = await self.w3.eth.chain_id
+        return self.sync_client._chain_id
+
+    async def get_fee_info(self) -> Dict:
+        """获取费用预言机的当前区块费用估算"""
+        if self._is_test_mode():
+            return await self.simulator.call_async('get_fee_info')
+        try:
+            return await self.sync_client.fee_oracle.get_fees_async(self.w3)
+        except Exception as e:
+            print(f"获取费用信息失败: {e}")
+            return {}
+
+    def get_rpc_stats(self) -> Dict:
+        """异步RPC节点池的延迟、错误率和对冲请求统计"""
+        return self.w3.provider.stats()
+
+    async def get_network_info(self) -> Dict:
+        """获取网络信息（区块号和费用来自按区块缓存的费用预言机）"""
+        if self._is_test_mode():
+            return await self.simulator.call_async('get_network_info')
+        try:
+            chain_id, fees = await asyncio.gather(
+                self.get_chain_id(),
+                self.sync_client.fee_oracle.get_fees_async(self.w3)
+            )
+            return {
+                'chain_id': chain_id,
+                'block_number': fees['block_number'],
+                'gas_price': fees['gas_price'],
+                'base_fee': fees['base_fee'],
+                'max_priority_fee': fees['max_priority_fee_per_gas'],
+                'is_connected': True
+            }
+        except Exception as e:
+            print(f"获取网络信息失败: {e}")
+            return {}
+
+    async def close(self) -> None:
+        """关闭异步Provider的连接池"""
+        close = getattr(self.w3.provider, 'close', None)
+        if close:
+            await close()
+
+
+def _completed_future(value) -> asyncio.Future:
+    """创建一个已经完成的asyncio Future"""
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(value)
+    return future
@@ -1,25 +1,105 @@
 import os
-import json
-from typing import Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 from web3 import Web3
-from eth_account import Account
+from web3._utils.abi import get_abi_output_types
 from dotenv import load_dotenv
 
+from blockchain.multicall import Multicall, DEFAULT_CHUNK_SIZE
+from blockchain.contract_artifacts import load_artifact
+from blockchain.account_pool import AccountPool, WorkerLane
+from blockchain.task_indexer import TaskIndexer
+from blockchain.receipt_tracker import ReceiptTracker
+from blockchain.fee_oracle import FeeOracle
+from blockchain.read_cache import BlockReadCache
+from blockchain.rpc_pool import pool_from_env
+from blockchain.result_store import ResultStore, digest_to_bytes32
+from blockchain.preflight import PreflightChecker
+from blockchain.gas_estimator import GasEstimator
+from blockchain.tx_supervisor import TransactionSupervisor
+from blockchain.simulated_backend import SimulatedBackend, get_default_backend, is_simulated_address
+
 load_dotenv()
 
+# 交易Gas上限的默认值：Gas估算关闭或失败时使用（也用于收益预估）
+CLAIM_TASK_GAS = 200000
+COMPLETE_TASK_GAS = 300000
+# 分页读取可用任务时每页的任务数
+DEFAULT_AVAILABLE_TASKS_PAGE_SIZE = 500
+
+
+class TransactionPlan(NamedTuple):
+    """
+    一笔任务交易中与同步/异步客户端无关的部分：合约函数名和参数、默认Gas上限、确认回调、
+    批量交易的结果解析，以及预执行的 (任务ID, 动作)
+    """
+    fn_name: str
+    args: List[Any]
+    default_gas: int
+    on_confirmed: Callable
+    outcome: Optional[Callable] = None
+    preflight: Optional[Tuple[int, str]] = None
+
+    def bind(self, contract):
+        """绑定到同步或异步合约实例，返回合约函数"""
+        return getattr(contract.functions, self.fn_name)(*self.args)
+
+
 class BlockchainClient:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(os.getenv('ETHEREUM_RPC_URL')))
-        self.account = Account.from_key(os.getenv('PRIVATE_KEY'))
+        # ETHEREUM_RPC_URL 可以是逗号分隔的多个节点：读请求路由到最快的健康节点，写请求固定在同一节点
+        self.w3 = Web3(pool_from_env(os.getenv('ETHEREUM_RPC_URL')))
+        # 工作账户池（PRIVATE_KEYS，未设置时为 PRIVATE_KEY 单账户），每个账户一条独立的nonce通道
+        self.account_pool = AccountPool.from_env()
+        self.account = self.account_pool.primary.account
         self.task_contract_address = os.getenv('TASK_CONTRACT_ADDRESS')
         self.dao_contract_address = os.getenv('DAO_CONTRACT_ADDRESS')
         
+        # 本地nonce分配器，允许同一账户连续发送多笔交易
+        self.nonce_manager = self.account_pool.primary.nonce_manager
+        # 后台回执跟踪器，交易广播后无需阻塞等待上链
+        self.receipt_tracker = ReceiptTracker(
+            self.w3,
+            poll_interval=float(os.getenv('RECEIPT_POLL_INTERVAL', 1)),
+            timeout=float(os.getenv('RECEIPT_TIMEOUT', 300))
+        )
+        # 按区块缓存的EIP-1559费用预言机
+        self.fee_oracle = FeeOracle(
+            self.w3,
+            history_blocks=int(os.getenv('FEE_HISTORY_BLOCKS', 20)),
+            priority_percentile=int(os.getenv('FEE_PRIORITY_PERCENTILE', 50))
+        )
+        # 卡住交易监督器：交易若干区块未上链时用相同nonce提高费用替换
+        self.tx_supervisor = TransactionSupervisor.from_env(self.w3, self.account, self.receipt_tracker, self.fee_oracle)
+        self._chain_id: Optional[int] = None
+        # 按最新区块号失效的LRU读缓存（任务、工人信息、余额）
+        self.read_cache = BlockReadCache(max_size=int(os.getenv('READ_CACHE_SIZE', 2048)))
+        # 任务结果保存在链下的内容寻址存储中，链上只提交摘要和定位符
+        self.result_store = ResultStore.from_env()
+        # 可用任务分页读取，避免单次eth_call随任务数增长触及节点的Gas上限
+        self.available_tasks_page_size = int(os.getenv('AVAILABLE_TASKS_PAGE_SIZE', DEFAULT_AVAILABLE_TASKS_PAGE_SIZE))
+        # 广播前在pending区块上预执行认领/完成交易，会回滚的直接拒绝
+        self.preflight = PreflightChecker(enabled=os.getenv('PREFLIGHT_ENABLED', 'true').lower() == 'true')
+        # 按函数估算交易Gas上限（claimTask缓存估算值，completeTask按calldata长度拟合）
+        self.gas_estimator = GasEstimator.from_env()
+        
         # 加载合约ABI
-        self.task_contract_abi = self._load_contract_abi('TaskContract')
-        self.dao_contract_abi = self._load_contract_abi('DAOContract')
+        # 预解析的合约产物（进程内只加载一次，包含函数选择器和事件主题）
+        self.task_artifact = load_artifact('TaskContract', fallback=lambda: self._get_basic_abi('TaskContract'))
+        self.dao_artifact = load_artifact('DAOContract', fallback=lambda: self._get_basic_abi('DAOContract'))
+        self.task_contract_abi = self.task_artifact.abi
+        self.dao_contract_abi = self.dao_artifact.abi
+        
+        # 合约地址为零地址时使用进程内共享的模拟后端代替链上合约
+        self.simulator: Optional[SimulatedBackend] = None
+        if is_simulated_address(self.task_contract_address):
+            self.simulator = get_default_backend()
+            print(f"🔧 使用测试模式 - 模拟后端共 {self.simulator.task_count} 个任务")
         
         # 初始化合约实例（仅在非测试模式下）
-        if self.task_contract_address != '0x0000000000000000000000000000000000000000':
+        if not self.simulator:
             self.task_contract = self.w3.eth.contract(
                 address=self.task_contract_address,
                 abi=self.task_contract_abi
@@ -28,20 +108,23 @@ class BlockchainClient:
                 address=self.dao_contract_address,
                 abi=self.dao_contract_abi
             )
+            # 批量读取使用的Multicall3合约
+            self.multicall = Multicall(
+                self.w3,
+                address=os.getenv('MULTICALL_ADDRESS'),
+                chunk_size=int(os.getenv('MULTICALL_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+            )
+            # 本地任务索引，追上链头后任务列表和详情直接从索引读取
+            self.task_indexer = None
+            if os.getenv('TASK_INDEX_ENABLED', 'true').lower() == 'true':
+                self.task_indexer = TaskIndexer.from_env(self)
+                self.task_indexer.start()
         else:
             # 测试模式下设置None
             self.task_contract = None
             self.dao_contract = None
-    
-    def _load_contract_abi(self, contract_name: str) -> List:
-        """加载合约ABI"""
-        try:
-            with open(f'contracts/{contract_name}.json', 'r') as f:
-                contract_data = json.load(f)
-                return contract_data['abi']
-        except FileNotFoundError:
-            # 如果ABI文件不存在，返回基本ABI
-            return self._get_basic_abi(contract_name)
+            self.multicall = None
+            self.task_indexer = None
     
     def _get_basic_abi(self, contract_name: str) -> List:
         """获取基本ABI（用于测试）"""
@@ -57,13 +140,42 @@ class BlockchainClient:
                 {
                     "inputs": [
                         {"internalType": "uint256", "name": "taskId", "type": "uint256"},
-                        {"internalType": "string", "name": "result", "type": "string"}
+                        {"internalType": "bytes32", "name": "resultDigest", "type": "bytes32"},
+                        {"internalType": "string", "name": "resultLocator", "type": "string"}
                     ],
                     "name": "completeTask",
                     "outputs": [],
                     "stateMutability": "nonpayable",
                     "type": "function"
                 },
+                {
+                    "inputs": [{"internalType": "uint256[]", "name": "taskIds", "type": "uint256[]"}],
+                    "name": "claimTasks",
+                    "outputs": [{"internalType": "bool[]", "name": "claimed", "type": "bool[]"}],
+                    "stateMutability": "nonpayable",
+                    "type": "function"
+                },
+                {
+                    "inputs": [
+                        {"internalType": "uint256[]", "name": "taskIds", "type": "uint256[]"},
+                        {"internalType": "bytes32[]", "name": "resultDigests", "type": "bytes32[]"},
+                        {"internalType": "string", "name": "resultLocator", "type": "string"}
+                    ],
+                    "name": "completeTasks",
+                    "outputs": [{"internalType": "bool[]", "name": "completed", "type": "bool[]"}],
+                    "stateMutability": "nonpayable",
+                    "type": "function"
+                },
+                {
+                    "inputs": [{"internalType": "uint256", "name": "taskId", "type": "uint256"}],
+                    "name": "getTaskResult",
+                    "outputs": [
+                        {"internalType": "bytes32", "name": "digest", "type": "bytes32"},
+                        {"internalType": "string", "name": "locator", "type": "string"}
+                    ],
+                    "stateMutability": "view",
+                    "type": "function"
+                },
                 {
                     "inputs": [{"internalType": "uint256", "name": "taskId", "type": "uint256"}],
                     "name": "getTask",
@@ -85,344 +197,596 @@ class BlockchainClient:
                     "type": "function"
                 },
                 {
-                    "inputs": [],
+                    "inputs": [
+                        {"internalType": "uint256", "name": "offset", "type": "uint256"},
+                        {"internalType": "uint256", "name": "limit", "type": "uint256"}
+                    ],
                     "name": "getAvailableTasks",
-                    "outputs": [{"internalType": "uint256[]", "name": "", "type": "uint256[]"}],
+                    "outputs": [{"internalType": "uint256[]", "name": "page", "type": "uint256[]"}],
                     "stateMutability": "view",
                     "type": "function"
+                },
+                {
+                    "inputs": [],
+                    "name": "getAvailableTaskCount",
+                    "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+                    "stateMutability": "view",
+                    "type": "function"
+                },
+                {
+                    "anonymous": False,
+                    "inputs": [
+                        {"indexed": True, "internalType": "uint256", "name": "taskId", "type": "uint256"},
+                        {"indexed": True, "internalType": "address", "name": "publisher", "type": "address"},
+                        {"indexed": False, "internalType": "string", "name": "title", "type": "string"},
+                        {"indexed": False, "internalType": "uint256", "name": "reward", "type": "uint256"}
+                    ],
+                    "name": "TaskCreated",
+                    "type": "event"
+                },
+                {
+                    "anonymous": False,
+                    "inputs": [
+                        {"indexed": True, "internalType": "uint256", "name": "taskId", "type": "uint256"},
+                        {"indexed": True, "internalType": "address", "name": "worker", "type": "address"}
+                    ],
+                    "name": "TaskClaimed",
+                    "type": "event"
+                },
+                {
+                    "anonymous": False,
+                    "inputs": [
+                        {"indexed": True, "internalType": "uint256", "name": "taskId", "type": "uint256"},
+                        {"indexed": True, "internalType": "address", "name": "worker", "type": "address"},
+                        {"indexed": False, "internalType": "uint256", "name": "reward", "type": "uint256"}
+                    ],
+                    "name": "TaskCompleted",
+                    "type": "event"
                 }
             ]
         return []
     
     def get_available_tasks(self) -> List[int]:
         """获取可用的任务列表"""
-        # 检查是否在测试模式（合约地址为零地址）
-        if self.task_contract_address == '0x0000000000000000000000000000000000000000':
-            print("🔧 使用测试模式 - 返回模拟任务数据")
-            
-            # 使用类变量来跟踪已完成的任务和已认领的任务
-            if not hasattr(BlockchainClient, '_completed_tasks'):
-                BlockchainClient._completed_tasks = set()
-            if not hasattr(BlockchainClient, '_claimed_tasks'):
-                BlockchainClient._claimed_tasks = set()
-            
-            # 所有可用任务
-            all_tasks = [1, 2, 3, 4, 5]
-            
-            # 过滤掉已完成和已认领的任务
-            available_tasks = [task_id for task_id in all_tasks if task_id not in BlockchainClient._completed_tasks and task_id not in BlockchainClient._claimed_tasks]
-            
-            print(f"🔧 测试模式 - 当前可用任务: {available_tasks} (已完成: {list(BlockchainClient._completed_tasks)})")
-            return available_tasks
+        if self.simulator:
+            return self.simulator.get_available_tasks()
+        
+        # 索引已追上链头时直接本地查询
+        if self.task_indexer and self.task_indexer.is_synced():
+            return self.task_indexer.get_available_task_ids()
         
         try:
-            tasks = self.task_contract.functions.getAvailableTasks().call()
-            return [task_id for task_id in tasks if task_id > 0]
+            # 所有分页固定在同一区块读取，避免翻页期间集合变化导致遗漏或重复
+            block_identifier = self._current_block_number() or 'latest'
+            functions = self.task_contract.functions
+            total = functions.getAvailableTaskCount().call(block_identifier=block_identifier)
+            
+            tasks = []
+            for offset in range(0, total, self.available_tasks_page_size):
+                tasks.extend(functions.getAvailableTasks(offset, self.available_tasks_page_size).call(
+                    block_identifier=block_identifier
+                ))
+            return sorted(task_id for task_id in tasks if task_id > 0)
         except Exception as e:
             print(f"获取可用任务失败: {e}")
             return []
     
     def get_task(self, task_id: int) -> Optional[Dict]:
         """获取任务详情"""
-        # 检查是否在测试模式
-        if self.task_contract_address == '0x0000000000000000000000000000000000000000':
-            print(f"🔧 使用测试模式 - 返回模拟任务 {task_id} 数据")
-            
-            # 检查任务是否已完成或已认领
-            if not hasattr(BlockchainClient, '_completed_tasks'):
-                BlockchainClient._completed_tasks = set()
-            if not hasattr(BlockchainClient, '_claimed_tasks'):
-                BlockchainClient._claimed_tasks = set()
-            
-            if task_id in BlockchainClient._completed_tasks:
-                print(f"🔧 测试模式 - 任务 {task_id} 已完成，返回None")
-                return None  # 已完成的任务返回None
-            
-            if task_id in BlockchainClient._claimed_tasks:
-                print(f"🔧 测试模式 - 任务 {task_id} 已被认领，但仍可获取任务信息")
-                # 已认领的任务仍然返回任务信息，但标记为已认领
-            
-            # 返回模拟任务数据
-            mock_tasks = {
-                1: {
-                    'id': 1,
-                    'publisher': '0x1234567890123456789012345678901234567890',
-                    'title': {
-                        'zh': '编写技术博客文章',
-                        'en': 'Write Technical Blog Post'
-                    },
-                    'description': {
-                        'zh': '需要一篇关于区块链技术的技术博客文章，字数1000-1500字',
-                        'en': 'Need a technical blog post about blockchain technology, 1000-1500 words'
-                    },
-                    'reward': 1000000000000000000,  # 1 ETH
-                    'isCompleted': task_id in BlockchainClient._completed_tasks,
-                    'isClaimed': task_id in BlockchainClient._claimed_tasks or task_id in BlockchainClient._completed_tasks,
-                    'worker': '0x0000000000000000000000000000000000000000' if task_id not in BlockchainClient._claimed_tasks and task_id not in BlockchainClient._completed_tasks else self.get_account_address(),
-                    'createdAt': 1640995200,
-                    'deadline': 1641081600,
-                    'taskType': 'content_writing',
-                    'requirements': {
-                        'zh': '技术准确，语言流畅，结构清晰',
-                        'en': 'Technically accurate, fluent language, clear structure'
-                    }
-                },
-                2: {
-                    'id': 2,
-                    'publisher': '0x2345678901234567890123456789012345678901',
-                    'title': {
-                        'zh': '开发智能合约',
-                        'en': 'Develop Smart Contract'
-                    },
-                    'description': {
-                        'zh': '开发一个简单的ERC-20代币合约，包含基本的转账功能',
-                        'en': 'Develop a simple ERC-20 token contract with basic transfer functionality'
-                    },
-                    'reward': 2000000000000000000,  # 2 ETH
-                    'isCompleted': task_id in BlockchainClient._completed_tasks,
-                    'isClaimed': task_id in BlockchainClient._claimed_tasks or task_id in BlockchainClient._completed_tasks,
-                    'worker': '0x0000000000000000000000000000000000000000' if task_id not in BlockchainClient._claimed_tasks and task_id not in BlockchainClient._completed_tasks else self.get_account_address(),
-                    'createdAt': 1640995200,
-                    'deadline': 1641168000,
-                    'taskType': 'programming',
-                    'requirements': {
-                        'zh': '代码规范，注释完整，测试通过',
-                        'en': 'Code standards, complete comments, tests passed'
-                    }
-                },
-                3: {
-                    'id': 3,
-                    'publisher': '0x3456789012345678901234567890123456789012',
-                    'title': {
-                        'zh': '设计UI界面',
-                        'en': 'Design UI Interface'
-                    },
-                    'description': {
-                        'zh': '为DeFi应用设计现代化的用户界面，包含钱包连接功能',
-                        'en': 'Design a modern user interface for DeFi application with wallet connection functionality'
-                    },
-                    'reward': 1500000000000000000,  # 1.5 ETH
-                    'isCompleted': task_id in BlockchainClient._completed_tasks,
-                    'isClaimed': task_id in BlockchainClient._claimed_tasks or task_id in BlockchainClient._completed_tasks,
-                    'worker': '0x0000000000000000000000000000000000000000' if task_id not in BlockchainClient._claimed_tasks and task_id not in BlockchainClient._completed_tasks else self.get_account_address(),
-                    'createdAt': 1640995200,
-                    'deadline': 1641254400,
-                    'taskType': 'design',
-                    'requirements': {
-                        'zh': '现代化设计，用户体验良好，响应式布局',
-                        'en': 'Modern design, good user experience, responsive layout'
-                    }
-                },
-                4: {
-                    'id': 4,
-                    'publisher': '0x4567890123456789012345678901234567890123',
-                    'title': {
-                        'zh': '翻译技术文档',
-                        'en': 'Translate Technical Documentation'
-                    },
-                    'description': {
-                        'zh': '将英文技术文档翻译成中文，保持专业术语的准确性',
-                        'en': 'Translate English technical documentation to Chinese, maintaining accuracy of professional terms'
-                    },
-                    'reward': 800000000000000000,  # 0.8 ETH
-                    'isCompleted': task_id in BlockchainClient._completed_tasks,
-                    'isClaimed': task_id in BlockchainClient._claimed_tasks or task_id in BlockchainClient._completed_tasks,
-                    'worker': '0x0000000000000000000000000000000000000000' if task_id not in BlockchainClient._claimed_tasks and task_id not in BlockchainClient._completed_tasks else self.get_account_address(),
-                    'createdAt': 1640995200,
-                    'deadline': 1641340800,
-                    'taskType': 'translation',
-                    'requirements': {
-                        'zh': '翻译准确，术语统一，语言流畅',
-                        'en': 'Accurate translation, unified terminology, fluent language'
-                    }
-                },
-                5: {
-                    'id': 5,
-                    'publisher': '0x5678901234567890123456789012345678901234',
-                    'title': {
-                        'zh': '市场调研报告',
-                        'en': 'Market Research Report'
-                    },
-                    'description': {
-                        'zh': '对DeFi市场进行深入调研，分析当前趋势和机会',
-                        'en': 'Conduct in-depth research on DeFi market, analyze current trends and opportunities'
-                    },
-                    'reward': 3000000000000000000,  # 3 ETH
-                    'isCompleted': task_id in BlockchainClient._completed_tasks,
-                    'isClaimed': task_id in BlockchainClient._claimed_tasks or task_id in BlockchainClient._completed_tasks,
-                    'worker': '0x0000000000000000000000000000000000000000' if task_id not in BlockchainClient._claimed_tasks and task_id not in BlockchainClient._completed_tasks else self.get_account_address(),
-                    'createdAt': 1640995200,
-                    'deadline': 1641427200,
-                    'taskType': 'research',
-                    'requirements': {
-                        'zh': '数据准确，分析深入，结论有价值',
-                        'en': 'Accurate data, in-depth analysis, valuable conclusions'
-                    }
-                }
-            }
-            return mock_tasks.get(task_id)
+        if self.simulator:
+            return self.simulator.get_task(task_id)
+        
+        if self.task_indexer and self.task_indexer.is_synced():
+            task = self.task_indexer.get_task(task_id)
+            if task:
+                return task
+        
+        block_number = self._current_block_number()
+        hit, task = self.read_cache.get(('task', task_id), block_number)
+        if hit:
+            return dict(task)
         
         try:
             task_data = self.task_contract.functions.getTask(task_id).call()
-            return {
-                'id': task_data[0],
-                'publisher': task_data[1],
-                'title': task_data[2],
-                'description': task_data[3],
-                'reward': task_data[4],
-                'isCompleted': task_data[5],
-                'isClaimed': task_data[6],
-                'worker': task_data[7],
-                'createdAt': task_data[8],
-                'deadline': task_data[9],
-                'taskType': task_data[10],
-                'requirements': task_data[11]
-            }
+            task = self._parse_task(task_data)
+            self.read_cache.put(('task', task_id), block_number, task)
+            return dict(task)
         except Exception as e:
             print(f"获取任务详情失败: {e}")
             return None
     
-    def claim_task(self, task_id: int) -> bool:
-        """认领任务"""
-        # 检查是否在测试模式
-        if self.task_contract_address == '0x0000000000000000000000000000000000000000':
-            print(f"🔧 使用测试模式 - 模拟认领任务 {task_id}")
-            
-            # 将任务添加到已认领任务集合中
-            if not hasattr(BlockchainClient, '_claimed_tasks'):
-                BlockchainClient._claimed_tasks = set()
-            BlockchainClient._claimed_tasks.add(task_id)
-            
-            print(f"🔧 测试模式 - 任务 {task_id} 已认领，已从可用任务中移除")
-            return True  # 在测试模式下总是成功
+    def get_tasks(self, task_ids: List[int]) -> List[Dict]:
+        """批量获取任务详情（通过Multicall3聚合getTask调用）"""
+        if self.simulator:
+            return self.simulator.get_tasks(task_ids)
+        
+        if not (self.task_indexer and self.task_indexer.is_synced()):
+            return self._get_tasks_from_chain(task_ids)
         
+        # 优先从本地索引读取，索引中缺失的任务再从链上批量读取
+        indexed = {task['id']: task for task in self.task_indexer.get_tasks(task_ids)}
+        missing = [task_id for task_id in task_ids if task_id not in indexed]
+        if missing:
+            indexed.update((task['id'], task) for task in self._get_tasks_from_chain(missing))
+        return [indexed[task_id] for task_id in task_ids if task_id in indexed]
+    
+    def _get_tasks_from_chain(self, task_ids: List[int]) -> List[Dict]:
+        """通过Multicall3从链上批量读取任务"""
+        if not task_ids:
+            return []
+        
+        # 当前区块内已读取过的任务直接使用缓存
+        block_number = self._current_block_number()
+        cached, missing = self._split_cached_tasks(task_ids, block_number)
+        if missing:
+            try:
+                results = self.multicall.aggregate(self._build_get_task_calls(missing))
+                fetched = self._decode_get_task_results(missing, results)
+            except Exception as e:
+                # 链上没有Multicall3时退化为逐个读取
+                print(f"批量获取任务失败，退化为逐个读取: {e}")
+                fetched = [task for task in (self.get_task(task_id) for task_id in missing) if task]
+            self._store_cached_tasks(fetched, block_number, cached)
+        
+        return [dict(cached[task_id]) for task_id in task_ids if task_id in cached]
+    
+    def _split_cached_tasks(self, task_ids: List[int], block_number: Optional[int]) -> Tuple[Dict[int, Dict], List[int]]:
+        """把任务ID分为缓存命中的任务和需要从链上读取的ID"""
+        cached = {}
+        missing = []
+        for task_id in task_ids:
+            hit, task = self.read_cache.get(('task', task_id), block_number)
+            if hit:
+                cached[task_id] = task
+            else:
+                missing.append(task_id)
+        return cached, missing
+    
+    def _store_cached_tasks(self, tasks: List[Dict], block_number: Optional[int], cached: Dict[int, Dict]) -> None:
+        """把从链上读取的任务写入缓存"""
+        for task in tasks:
+            self.read_cache.put(('task', task['id']), block_number, task)
+            cached[task['id']] = task
+    
+    def _current_block_number(self) -> Optional[int]:
+        """读缓存使用的最新区块号，获取失败时返回None（不使用缓存）"""
         try:
-            # 构建交易
-            transaction = self.task_contract.functions.claimTask(task_id).build_transaction({
-                'from': self.account.address,
-                'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            })
-            
-            # 签名交易
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.account.key)
-            
-            # 发送交易
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            # 等待交易确认
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return tx_receipt.status == 1
+            return self.fee_oracle.latest_block_number()
+        except Exception:
+            return None
+    
+    def _invalidate_account_reads(self, task_id: int, address: Optional[str] = None) -> None:
+        """本账户的认领/完成交易确认后，清除受影响的缓存条目"""
+        address = address or self.account.address
+        self.read_cache.invalidate(('task', task_id), ('worker', address), ('balance', address))
+    
+    def _build_get_task_calls(self, task_ids: List[int]) -> List[Tuple[str, bytes]]:
+        """构造批量getTask调用的 (合约地址, calldata) 列表"""
+        return [
+            (self.task_contract.address, self.task_contract.encodeABI(fn_name='getTask', args=[task_id]))
+            for task_id in task_ids
+        ]
+    
+    def _decode_get_task_results(self, task_ids: List[int], results: List[Tuple[bool, bytes]]) -> List[Dict]:
+        """解码批量getTask调用结果，跳过回滚或无法解析的任务"""
+        output_types = get_abi_output_types(self.task_contract.get_function_by_name('getTask').abi)
+        tasks = []
+        for task_id, (success, return_data) in zip(task_ids, results):
+            if not success:
+                print(f"获取任务详情失败: 任务 {task_id} 调用回滚")
+                continue
+            try:
+                decoded = self.w3.codec.decode(output_types, return_data)
+                task_data = decoded[0] if len(decoded) == 1 else decoded
+                tasks.append(self._parse_task(task_data))
+            except Exception as e:
+                print(f"解析任务 {task_id} 失败: {e}")
+        return tasks
+    
+    def _parse_task(self, task_data) -> Dict:
+        """把getTask的返回值转换为任务字典"""
+        return {
+            'id': task_data[0],
+            'publisher': task_data[1],
+            'title': task_data[2],
+            'description': task_data[3],
+            'reward': task_data[4],
+            'isCompleted': task_data[5],
+            'isClaimed': task_data[6],
+            'worker': task_data[7],
+            'createdAt': task_data[8],
+            'deadline': task_data[9],
+            'taskType': task_data[10],
+            'requirements': task_data[11]
+        }
+    
+    def claim_task(self, task_id: int, wait: bool = True) -> bool:
+        """认领任务（wait=False时广播后立即返回，不等待上链）"""
+        if self.simulator:
+            lane = self.account_pool.assign([task_id])
+            claimed = self.simulator.claim_task(task_id, lane.address)
+            if not claimed:
+                self.account_pool.release([task_id])
+            return claimed
+        
+        try:
+            claim_future = self.submit_claim_task(task_id)
+            return claim_future.result() if wait else True
         except Exception as e:
             print(f"认领任务失败: {e}")
             return False
     
-    def complete_task(self, task_id: int, result: str) -> bool:
-        """完成任务"""
-        # 检查是否在测试模式
-        if self.task_contract_address == '0x0000000000000000000000000000000000000000':
-            print(f"🔧 使用测试模式 - 模拟完成任务 {task_id}")
-            
-            # 将任务添加到已完成任务集合中
-            if not hasattr(BlockchainClient, '_completed_tasks'):
-                BlockchainClient._completed_tasks = set()
-            BlockchainClient._completed_tasks.add(task_id)
-            
-            # 更新工人统计数据
-            if not hasattr(BlockchainClient, '_worker_stats'):
-                BlockchainClient._worker_stats = {
-                    'completed_tasks': 0,
-                    'total_earnings': 0,
-                    'reputation': 50
-                }
-            
-            # 获取任务信息以计算奖励
-            task_info = self.get_task(task_id)
-            if task_info:
-                reward = task_info.get('reward', 0)
-            else:
-                # 如果任务信息获取失败，使用模拟数据
-                mock_rewards = {1: 1000000000000000000, 2: 2000000000000000000, 3: 1500000000000000000, 4: 800000000000000000, 5: 3000000000000000000}
-                reward = mock_rewards.get(task_id, 1000000000000000000)
-            
-            BlockchainClient._worker_stats['completed_tasks'] += 1
-            BlockchainClient._worker_stats['total_earnings'] += reward
-            BlockchainClient._worker_stats['reputation'] += 5  # 每完成一个任务增加5点声誉
-            
-            # 更新余额（增加任务奖励）
-            if not hasattr(BlockchainClient, '_balance'):
-                BlockchainClient._balance = 0  # 初始0 ETH
-            BlockchainClient._balance += reward
-            
-            print(f"🔧 测试模式 - 任务 {task_id} 已完成")
-            print(f"🔧 测试模式 - 更新统计: 完成任务数={BlockchainClient._worker_stats['completed_tasks']}, 总收入={BlockchainClient._worker_stats['total_earnings']}, 声誉={BlockchainClient._worker_stats['reputation']}, 余额={BlockchainClient._balance}")
-            
-            return True  # 在测试模式下总是成功
+    def submit_claim_task(self, task_id: int) -> Future:
+        """
+        用负载最低的账户广播认领交易，立即返回Future，交易确认后其结果为是否认领成功
         
+        预执行显示交易会回滚时不广播，直接抛出 PreflightRejected
+        """
+        lane = self.account_pool.assign([task_id])
         try:
-            # 构建交易
-            transaction = self.task_contract.functions.completeTask(task_id, result).build_transaction({
-                'from': self.account.address,
-                'gas': 300000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            })
-            
-            # 签名交易
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.account.key)
-            
-            # 发送交易
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            # 等待交易确认
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return tx_receipt.status == 1
+            claim_future = self._submit_claim_task(task_id, lane)
+        except Exception:
+            self.account_pool.release([task_id])
+            raise
+        claim_future.add_done_callback(lambda done: self.account_pool.settle([task_id], done, release_on_success=False))
+        return claim_future
+    
+    def _submit_claim_task(self, task_id: int, lane: WorkerLane) -> Future:
+        if self.simulator:
+            self.preflight.check_message(task_id, 'claim', self.simulator.preflight_claim(task_id, lane.address))
+            return _completed_future(self.simulator.claim_task(task_id, lane.address))
+        
+        return self._send_planned(self._plan_claim(task_id, lane), lane)
+    
+    def complete_task(self, task_id: int, result: str, wait: bool = True) -> bool:
+        """完成任务（wait=False时广播后立即返回，不等待上链）"""
+        if self.simulator:
+            lane = self._completion_lane(task_id)
+            digest, locator = self.result_store.put(result)
+            completed = self.simulator.complete_task(task_id, lane.address, digest, locator)
+            if completed:
+                self.account_pool.release([task_id])
+            return completed
+        
+        try:
+            complete_future = self.submit_complete_task(task_id, result)
+            return complete_future.result() if wait else True
         except Exception as e:
             print(f"完成任务失败: {e}")
             return False
     
+    def submit_complete_task(self, task_id: int, result: str) -> Future:
+        """
+        用认领该任务的账户广播完成交易，立即返回Future，交易确认后其结果为是否提交成功
+        
+        预执行显示交易会回滚时不广播，直接抛出 PreflightRejected
+        """
+        complete_future = self._submit_complete_task(task_id, result, self._completion_lane(task_id))
+        complete_future.add_done_callback(lambda done: self.account_pool.settle([task_id], done, release_on_success=True))
+        return complete_future
+    
+    def _submit_complete_task(self, task_id: int, result: str, lane: WorkerLane) -> Future:
+        digest, locator = self.result_store.put(result)
+        if self.simulator:
+            self.preflight.check_message(
+                task_id, 'complete', self.simulator.preflight_complete(task_id, lane.address, digest)
+            )
+            return _completed_future(self.simulator.complete_task(task_id, lane.address, digest, locator))
+        
+        return self._send_planned(self._plan_complete(task_id, digest, locator, lane), lane)
+    
+    def _completion_lane(self, task_id: int) -> WorkerLane:
+        """完成任务必须使用认领它的账户：优先用本地记录，否则按链上的 worker 地址查找"""
+        lane = self.account_pool.lane_for(task_id)
+        if lane is None and len(self.account_pool.lanes) > 1:
+            task = self.get_task(task_id)
+            lane = self.account_pool.lane_for(task_id, task['worker'] if task else None)
+        return lane or self.account_pool.primary
+    
+    def claim_tasks(self, task_ids: List[int], wait: bool = True) -> Dict[int, bool]:
+        """在一笔交易中批量认领任务，返回每个任务是否认领成功（wait=False时广播后立即返回）"""
+        if not task_ids:
+            return {}
+        
+        try:
+            claim_future = self.submit_claim_tasks(task_ids)
+            return claim_future.result() if wait else dict.fromkeys(task_ids, True)
+        except Exception as e:
+            print(f"批量认领任务失败: {e}")
+            return dict.fromkeys(task_ids, False)
+    
+    def submit_claim_tasks(self, task_ids: List[int]) -> Future:
+        """用负载最低的账户广播批量认领交易，交易确认后Future的结果为 {任务ID: 是否认领成功}"""
+        task_ids = list(task_ids)
+        lane = self.account_pool.assign(task_ids)
+        try:
+            claim_future = self._submit_claim_tasks(task_ids, lane)
+        except Exception:
+            self.account_pool.release(task_ids)
+            raise
+        claim_future.add_done_callback(lambda done: self.account_pool.settle(task_ids, done, release_on_success=False))
+        return claim_future
+    
+    def _submit_claim_tasks(self, task_ids: List[int], lane: WorkerLane) -> Future:
+        if self.simulator:
+            return _completed_future({task_id: self.simulator.claim_task(task_id, lane.address) for task_id in task_ids})
+        
+        return self._send_planned(self._plan_claim_batch(task_ids, lane), lane)
+    
+    def complete_tasks(self, results: Dict[int, str], wait: bool = True) -> Dict[int, bool]:
+        """批量提交任务结果（每个认领账户一笔交易），返回每个任务是否完成成功（wait=False时广播后立即返回）"""
+        if not results:
+            return {}
+        
+        try:
+            complete_future = self.submit_complete_tasks(results)
+            return complete_future.result() if wait else dict.fromkeys(results, True)
+        except Exception as e:
+            print(f"批量完成任务失败: {e}")
+            return dict.fromkeys(results, False)
+    
+    def submit_complete_tasks(self, results: Dict[int, str]) -> Future:
+        """按认领账户分组广播批量完成交易，全部确认后Future的结果为 {任务ID: 是否完成成功}"""
+        groups: Dict[WorkerLane, Dict[int, str]] = {}
+        for task_id, result in results.items():
+            groups.setdefault(self._completion_lane(task_id), {})[task_id] = result
+        
+        pending = []
+        for lane, group in groups.items():
+            try:
+                pending.append((list(group), self._submit_complete_tasks(group, lane)))
+            except Exception as e:
+                print(f"账户 {lane.address} 批量完成任务失败: {e}")
+                pending.append((list(group), _completed_future(dict.fromkeys(group, False))))
+        
+        complete_future = _merge_batch_futures(pending)
+        complete_future.add_done_callback(
+            lambda done: self.account_pool.settle(list(results), done, release_on_success=True)
+        )
+        return complete_future
+    
+    def _submit_complete_tasks(self, results: Dict[int, str], lane: WorkerLane) -> Future:
+        task_ids = list(results)
+        digests, locator = self._store_results(results)
+        if self.simulator:
+            return _completed_future({
+                task_id: self.simulator.complete_task(task_id, lane.address, digest, locator)
+                for task_id, digest in zip(task_ids, digests)
+            })
+        
+        return self._send_planned(self._plan_complete_batch(task_ids, digests, locator, lane), lane)
+    
+    # ---- 交易计划（同步和异步客户端共用） ----
+    
+    def _plan_claim(self, task_id: int, lane: WorkerLane) -> TransactionPlan:
+        def on_confirmed(tx_receipt):
+            self._record_claims([task_id], lane, tx_receipt)
+        
+        return TransactionPlan('claimTask', [task_id], CLAIM_TASK_GAS, on_confirmed, preflight=(task_id, 'claim'))
+    
+    def _plan_complete(self, task_id: int, digest: str, locator: str, lane: WorkerLane) -> TransactionPlan:
+        def on_confirmed(tx_receipt):
+            self._record_completions([task_id], lane, tx_receipt)
+        
+        return TransactionPlan(
+            'completeTask', [task_id, digest_to_bytes32(digest), locator], COMPLETE_TASK_GAS, on_confirmed,
+            preflight=(task_id, 'complete')
+        )
+    
+    def _plan_claim_batch(self, task_ids: List[int], lane: WorkerLane) -> TransactionPlan:
+        def outcome(tx_receipt):
+            return self._batch_outcome(tx_receipt, task_ids, 'TaskClaimed')
+        
+        def on_confirmed(tx_receipt):
+            self._record_claims([task_id for task_id, claimed in outcome(tx_receipt).items() if claimed], lane, tx_receipt)
+        
+        return TransactionPlan('claimTasks', [task_ids], CLAIM_TASK_GAS * len(task_ids), on_confirmed, outcome)
+    
+    def _plan_complete_batch(self, task_ids: List[int], digests: List[str], locator: str,
+                             lane: WorkerLane) -> TransactionPlan:
+        def outcome(tx_receipt):
+            return self._batch_outcome(tx_receipt, task_ids, 'TaskCompleted')
+        
+        def on_confirmed(tx_receipt):
+            self._record_completions(
+                [task_id for task_id, completed in outcome(tx_receipt).items() if completed], lane, tx_receipt
+            )
+        
+        return TransactionPlan(
+            'completeTasks', [task_ids, [digest_to_bytes32(digest) for digest in digests], locator],
+            COMPLETE_TASK_GAS * len(task_ids), on_confirmed, outcome
+        )
+    
+    def _record_claims(self, task_ids: List[int], lane: WorkerLane, tx_receipt) -> None:
+        """认领交易确认后清除缓存并写入索引"""
+        for task_id in task_ids:
+            self._invalidate_account_reads(task_id, lane.address)
+            if self.task_indexer:
+                self.task_indexer.record_claim(task_id, lane.address, tx_receipt.blockNumber)
+    
+    def _record_completions(self, task_ids: List[int], lane: WorkerLane, tx_receipt) -> None:
+        """完成交易确认后清除缓存并写入索引"""
+        for task_id in task_ids:
+            self._invalidate_account_reads(task_id, lane.address)
+            if self.task_indexer:
+                self.task_indexer.record_completion(task_id, tx_receipt.blockNumber)
+    
+    def _store_results(self, results: Dict[int, str]) -> Tuple[List[str], str]:
+        """把一批结果写入结果存储，返回 (按任务顺序的摘要列表, 定位符)"""
+        digests = []
+        locator = self.result_store.backend.name
+        for result in results.values():
+            digest, locator = self.result_store.put(result)
+            digests.append(digest)
+        return digests, locator
+    
+    def _batch_outcome(self, tx_receipt, task_ids: List[int], event_name: str) -> Dict[int, bool]:
+        """根据回执中的事件判断批量交易里每个任务是否成功"""
+        succeeded = set()
+        if tx_receipt.status == 1:
+            # 先按合约地址和预先计算的事件主题过滤，只解码匹配的日志
+            topic = self.task_artifact.topics[event_name]
+            event = getattr(self.task_contract.events, event_name)()
+            for log in tx_receipt.logs:
+                if log.address != self.task_contract.address or not log.topics or bytes(log.topics[0]) != topic:
+                    continue
+                try:
+                    succeeded.add(event.process_log(log).args.taskId)
+                except Exception:
+                    continue
+        return {task_id: task_id in succeeded for task_id in task_ids}
+    
+    def get_task_result(self, task_id: int) -> Optional[Dict]:
+        """读取链上的结果摘要并从结果存储中解析出结果内容，任务未完成时返回None"""
+        try:
+            if self.simulator:
+                submitted = self.simulator.get_task_result(task_id)
+            else:
+                submitted = self.task_contract.functions.getTaskResult(task_id).call()
+            return self._resolve_result(submitted)
+        except Exception as e:
+            print(f"获取任务结果失败: {e}")
+            return None
+    
+    def _resolve_result(self, submitted) -> Optional[Dict]:
+        """把 (摘要, 定位符) 解析为结果字典"""
+        if not submitted:
+            return None
+        digest, locator = submitted
+        if isinstance(digest, (bytes, bytearray)):
+            if not any(digest):
+                return None
+            digest = bytes(digest).hex()
+        return {
+            'digest': digest,
+            'locator': locator,
+            'result': self.result_store.get(digest, locator)
+        }
+    
+    def _fetch_chain_nonce(self, address: Optional[str] = None) -> int:
+        """读取链上pending nonce"""
+        return self.w3.eth.get_transaction_count(address or self.account.address, 'pending')
+    
+    def _send_planned(self, plan: TransactionPlan, lane: WorkerLane) -> Future:
+        """预执行、广播并跟踪一笔计划好的交易"""
+        contract_function = plan.bind(self.task_contract)
+        if plan.preflight:
+            self.preflight.check(contract_function, lane.address, *plan.preflight)
+        tx_hash, nonce = self._broadcast_transaction(contract_function, plan.default_gas, lane)
+        return self._track_transaction(tx_hash, nonce, plan.on_confirmed, plan.outcome, lane)
+    
+    def _broadcast_transaction(self, contract_function, default_gas: int,
+                               lane: Optional[WorkerLane] = None) -> Tuple[bytes, int]:
+        """
+        构建、签名并广播交易，nonce由发送账户通道的本地分配器提供，返回 (交易哈希, nonce)
+        
+        Gas上限由估算器给出，估算失败时使用 default_gas
+        """
+        lane = lane or self.account_pool.primary
+        gas = self.gas_estimator.estimate(contract_function, lane.address, default_gas)
+        nonce = lane.nonce_manager.allocate(lambda: self._fetch_chain_nonce(lane.address))
+        try:
+            transaction = contract_function.build_transaction(
+                self._transaction_fields(lane, gas, nonce, self.fee_oracle.transaction_fee_params())
+            )
+            raw_transaction = self._sign_transaction(transaction, lane)
+        except Exception:
+            # 交易没有广播，归还nonce
+            lane.nonce_manager.release(nonce)
+            raise
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(raw_transaction)
+        except Exception:
+            # 节点拒绝（nonce冲突、替换费用不足等）：下次分配时与链重新同步
+            lane.nonce_manager.reject(nonce)
+            raise
+        self._register_broadcast(tx_hash, transaction, contract_function, gas, lane)
+        return tx_hash, nonce
+    
+    @staticmethod
+    def _transaction_fields(lane: WorkerLane, gas: int, nonce: int, fee_params: Dict) -> Dict:
+        """构建交易使用的发送账户、Gas上限、nonce和费用字段"""
+        return {'from': lane.address, 'gas': gas, 'nonce': nonce, **fee_params}
+    
+    @staticmethod
+    def _sign_transaction(transaction: Dict, lane: WorkerLane) -> bytes:
+        """用发送账户签名，返回原始交易"""
+        return lane.account.sign_transaction(transaction).rawTransaction
+    
+    def _register_broadcast(self, tx_hash, transaction: Dict, contract_function, gas: int, lane: WorkerLane) -> None:
+        """交易进入交易池后交给卡住交易监督器和Gas估算器"""
+        self.tx_supervisor.register(tx_hash, transaction, lane.account)
+        self.gas_estimator.register(tx_hash, contract_function, gas)
+    
+    def _track_transaction(self, tx_hash, nonce: int, on_confirmed: Optional[Callable] = None,
+                           outcome: Optional[Callable] = None, lane: Optional[WorkerLane] = None) -> Future:
+        """
+        把已广播的交易交给回执跟踪器，返回结果为交易是否成功的Future
+        
+        outcome 用于从回执中解析自定义结果（如批量交易中每个任务的成败）
+        """
+        result = Future()
+        nonce_manager = (lane or self.account_pool.primary).nonce_manager
+        
+        def on_receipt(receipt_future: Future):
+            try:
+                tx_receipt = receipt_future.result()
+            except Exception as e:
+                # 超时未上链说明交易可能被丢弃，下次分配时与链重新同步
+                nonce_manager.invalidate()
+                self.gas_estimator.discard(tx_hash)
+                result.set_exception(e)
+                return
+            
+            nonce_manager.confirm(nonce)
+            # 因Gas不足回滚的交易反馈给估算器
+            self.gas_estimator.observe(tx_hash, tx_receipt)
+            success = tx_receipt.status == 1
+            if success and on_confirmed:
+                try:
+                    on_confirmed(tx_receipt)
+                except Exception as e:
+                    print(f"交易确认回调失败: {e}")
+            result.set_result(outcome(tx_receipt) if outcome else success)
+        
+        # 由监督器跟踪回执：交易卡住时被替换，原交易或替换交易上链都会回调
+        self.tx_supervisor.track(tx_hash, callback=on_receipt)
+        return result
+    
     def get_worker_info(self, worker_address: str) -> Optional[Dict]:
         """获取工人信息"""
-        # 检查是否在测试模式
-        if self.task_contract_address == '0x0000000000000000000000000000000000000000':
-            print(f"🔧 使用测试模式 - 返回动态工人信息")
-            
-            # 使用类变量来跟踪统计数据
-            if not hasattr(BlockchainClient, '_worker_stats'):
-                BlockchainClient._worker_stats = {
-                    'completed_tasks': 0,
-                    'total_earnings': 0,
-                    'reputation': 50  # 初始声誉
-                }
-            
-            print(f"🔧 测试模式 - 当前统计: 完成任务={BlockchainClient._worker_stats['completed_tasks']}, 总收入={BlockchainClient._worker_stats['total_earnings']}, 声誉={BlockchainClient._worker_stats['reputation']}")
-            
-            return {
-                'addr': worker_address,
-                'reputation': BlockchainClient._worker_stats['reputation'],
-                'completedTasks': BlockchainClient._worker_stats['completed_tasks'],
-                'totalEarnings': BlockchainClient._worker_stats['total_earnings'],
-                'isActive': True
-            }
+        if self.simulator:
+            return self.simulator.get_worker_info(worker_address)
+        
+        block_number = self._current_block_number()
+        hit, worker_info = self.read_cache.get(('worker', worker_address), block_number)
+        if hit:
+            return dict(worker_info)
         
         try:
             worker_data = self.task_contract.functions.getWorker(worker_address).call()
-            return {
-                'addr': worker_data[0],
-                'reputation': worker_data[1],
-                'completedTasks': worker_data[2],
-                'totalEarnings': worker_data[3],
-                'isActive': worker_data[4]
-            }
+            worker_info = self._parse_worker(worker_data)
+            self.read_cache.put(('worker', worker_address), block_number, worker_info)
+            return dict(worker_info)
         except Exception as e:
             print(f"获取工人信息失败: {e}")
             return None
     
+    def _parse_worker(self, worker_data) -> Dict:
+        """把getWorker的返回值转换为工人信息字典"""
+        return {
+            'addr': worker_data[0],
+            'reputation': worker_data[1],
+            'completedTasks': worker_data[2],
+            'totalEarnings': worker_data[3],
+            'isActive': worker_data[4]
+        }
+    
     def get_worker_tasks(self, worker_address: str) -> List[int]:
         """获取工人的任务列表"""
+        if self.simulator:
+            return self.simulator.get_worker_tasks(worker_address)
+        
         try:
             tasks = self.task_contract.functions.getWorkerTasks(worker_address).call()
             return [task_id for task_id in tasks if task_id > 0]
@@ -432,18 +796,18 @@ class BlockchainClient:
     
     def get_balance(self, address: str) -> int:
         """获取账户余额"""
-        # 检查是否在测试模式
-        if self.task_contract_address == '0x0000000000000000000000000000000000000000':
-            print(f"🔧 使用测试模式 - 返回模拟余额")
-            
-            # 使用类变量来跟踪余额
-            if not hasattr(BlockchainClient, '_balance'):
-                BlockchainClient._balance = 0  # 初始0 ETH
-            
-            return BlockchainClient._balance
+        if self.simulator:
+            return self.simulator.get_balance(address)
+        
+        block_number = self._current_block_number()
+        hit, balance = self.read_cache.get(('balance', address), block_number)
+        if hit:
+            return balance
         
         try:
-            return self.w3.eth.get_balance(address)
+            balance = self.w3.eth.get_balance(address)
+            self.read_cache.put(('balance', address), block_number, balance)
+            return balance
         except Exception as e:
             print(f"获取余额失败: {e}")
             return 0
@@ -452,19 +816,131 @@ class BlockchainClient:
         """获取当前账户地址"""
         return self.account.address
     
+    def get_pool_worker_info(self) -> Dict:
+        """账户池中所有工作账户的链上统计之和"""
+        return self._aggregate_worker_info([self.get_worker_info(address) for address in self.account_pool.addresses])
+    
+    def get_pool_balance(self) -> int:
+        """账户池中所有工作账户的余额之和"""
+        return sum(self.get_balance(address) for address in self.account_pool.addresses)
+    
+    def get_account_breakdown(self) -> List[Dict]:
+        """每个工作账户的链上统计、余额和本地负载"""
+        return [
+            self._account_entry(load, self.get_worker_info(load['address']), self.get_balance(load['address']))
+            for load in self.account_pool.stats()
+        ]
+    
+    def _aggregate_worker_info(self, worker_infos: List[Optional[Dict]]) -> Dict:
+        """合并多个账户的工人信息，地址为主账户地址"""
+        worker_infos = [info for info in worker_infos if info]
+        return {
+            'addr': self.account_pool.primary.address,
+            'reputation': sum(info['reputation'] for info in worker_infos),
+            'completedTasks': sum(info['completedTasks'] for info in worker_infos),
+            'totalEarnings': sum(info['totalEarnings'] for info in worker_infos),
+            'isActive': any(info['isActive'] for info in worker_infos),
+            'accountCount': len(self.account_pool.lanes)
+        }
+    
+    @staticmethod
+    def _account_entry(load: Dict, worker_info: Optional[Dict], balance: int) -> Dict:
+        worker_info = worker_info or {}
+        return {
+            'address': load['address'],
+            'reputation': worker_info.get('reputation', 0),
+            'completed_tasks': worker_info.get('completedTasks', 0),
+            'total_earnings': worker_info.get('totalEarnings', 0),
+            'is_active': worker_info.get('isActive', False),
+            'balance': balance,
+            'active_tasks': load['active_tasks'],
+            'pending_transactions': load['pending_transactions']
+        }
+    
     def is_connected(self) -> bool:
         """检查是否连接到区块链网络"""
+        if self.simulator:
+            return True
         return self.w3.is_connected()
     
+    def get_chain_id(self) -> int:
+        """获取链ID（进程内缓存）"""
+        if self.simulator:
+            return self.simulator.get_network_info()['chain_id']
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+    
+    def get_fee_info(self) -> Dict:
+        """获取费用预言机的当前区块费用估算"""
+        if self.simulator:
+            return self.simulator.get_fee_info()
+        try:
+            return self.fee_oracle.get_fees()
+        except Exception as e:
+            print(f"获取费用信息失败: {e}")
+            return {}
+    
+    def get_rpc_stats(self) -> Dict:
+        """RPC节点池的延迟、错误率和对冲请求统计"""
+        return self.w3.provider.stats()
+    
+    def get_transaction_stats(self) -> Dict:
+        """卡住交易替换统计、预执行拒绝统计、Gas估算统计和待确认交易数"""
+        return {
+            'pending_nonces': sum(lane.nonce_manager.pending_count() for lane in self.account_pool.lanes),
+            'supervisor': self.tx_supervisor.stats(),
+            'preflight': self.preflight.stats(),
+            'gas_estimator': self.gas_estimator.stats()
+        }
+    
     def get_network_info(self) -> Dict:
         """获取网络信息"""
+        if self.simulator:
+            return self.simulator.get_network_info()
         try:
+            fees = self.fee_oracle.get_fees()
             return {
-                'chain_id': self.w3.eth.chain_id,
-                'block_number': self.w3.eth.block_number,
-                'gas_price': self.w3.eth.gas_price,
-                'is_connected': self.w3.is_connected()
+                'chain_id': self.get_chain_id(),
+                'block_number': fees['block_number'],
+                'gas_price': fees['gas_price'],
+                'base_fee': fees['base_fee'],
+                'max_priority_fee': fees['max_priority_fee_per_gas'],
+                'is_connected': True
             }
         except Exception as e:
             print(f"获取网络信息失败: {e}")
-            return {} 
\ No newline at end of file
+            return {}
+
+
+def _completed_future(value) -> Future:
+    """创建一个已经完成的Future"""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _merge_batch_futures(pending: List[Tuple[List[int], Future]]) -> Future:
+    """合并多笔批量交易的Future，全部完成后结果为 {任务ID: 是否成功}，失败的交易其中的任务均为False"""
+    merged = Future()
+    outcome: Dict[int, bool] = {}
+    remaining = [len(pending)]
+    lock = threading.Lock()
+    
+    def on_done(task_ids: List[int], done: Future):
+        try:
+            result = done.result()
+        except Exception:
+            result = dict.fromkeys(task_ids, False)
+        with lock:
+            outcome.update(result)
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished:
+            merged.set_result(outcome)
+    
+    if not pending:
+        merged.set_result(outcome)
+    for task_ids, future in pending:
+        future.add_done_callback(partial(on_done, task_ids))
+    return merged
@@ -0,0 +1,223 @@
+"""
+合约构建缓存和ABI产物
+build_contracts() 按源文件增量编译：缓存键为源文件及其导入文件的内容哈希加编译器版本和编译设置，
+未变化的 .sol 文件直接跳过；产物 contracts/<合约名>.json 中预先计算好函数选择器和事件主题。
+load_artifact() 在每个进程中只读取、解析一次产物
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+from web3._utils.abi import abi_to_signature
+
+CONTRACTS_DIR = Path(__file__).resolve().parent.parent / 'contracts'
+# 构建缓存清单：源文件名 -> {缓存键, 产出的合约名}
+MANIFEST_NAME = '.build_cache.json'
+DEFAULT_OPTIMIZE_RUNS = 200
+
+_IMPORT_PATTERN = re.compile(r'^\s*import\s+(?:[^;]*?\bfrom\s+)?["\']([^"\']+)["\']', re.MULTILINE)
+
+
+class ContractArtifact:
+    """
+    预解析的合约产物
+
+    selectors 为 函数签名 -> 4字节选择器，topics 为 事件名 -> 事件主题（topic0）
+    """
+
+    def __init__(self, name: str, abi: List, bytecode: Optional[str] = None, build_key: Optional[str] = None,
+                 selectors: Optional[Dict[str, bytes]] = None, topics: Optional[Dict[str, bytes]] = None):
+        self.name = name
+        self.abi = abi
+        self.bytecode = bytecode
+        self.build_key = build_key
+        self.selectors = selectors if selectors is not None else {
+            abi_to_signature(item): function_abi_to_4byte_selector(item)
+            for item in abi if item.get('type') == 'function'
+        }
+        self.topics = topics if topics is not None else {
+            item['name']: event_abi_to_log_topic(item)
+            for item in abi if item.get('type') == 'event' and not item.get('anonymous')
+        }
+
+    @classmethod
+    def from_json(cls, name: str, data: Dict) -> 'ContractArtifact':
+        """从产物JSON创建（只有 abi 字段的旧产物会在这里计算选择器和主题）"""
+        selectors = data.get('selectors')
+        topics = data.get('topics')
+        return cls(
+            data.get('contractName', name),
+            data['abi'],
+            data.get('bytecode'),
+            data.get('buildKey'),
+            {signature: bytes.fromhex(selector[2:]) for signature, selector in selectors.items()} if selectors else None,
+            {event: bytes.fromhex(topic[2:]) for event, topic in topics.items()} if topics else None
+        )
+
+    def to_json(self) -> Dict:
+        return {
+            'contractName': self.name,
+            'abi': self.abi,
+            'bytecode': self.bytecode,
+            'buildKey': self.build_key,
+            'selectors': {signature: '0x' + selector.hex() for signature, selector in self.selectors.items()},
+            'topics': {event: '0x' + topic.hex() for event, topic in self.topics.items()}
+        }
+
+
+_artifacts: Dict[tuple, ContractArtifact] = {}
+_artifacts_lock = threading.Lock()
+
+
+def load_artifact(name: str, fallback: Optional[Callable[[], List]] = None,
+                  artifact_dir: Optional[Path] = None) -> ContractArtifact:
+    """
+    读取合约产物（进程内缓存，每个合约只解析一次）
+
+    产物文件不存在时使用 fallback 返回的ABI，没有 fallback 时抛出 FileNotFoundError
+    """
+    artifact_dir = Path(artifact_dir or CONTRACTS_DIR)
+    key = (str(artifact_dir), name)
+    with _artifacts_lock:
+        artifact = _artifacts.get(key)
+        if artifact is not None:
+            return artifact
+
+        try:
+            with open(artifact_dir / f'{name}.json', 'r') as f:
+                artifact = ContractArtifact.from_json(name, json.load(f))
+        except FileNotFoundError:
+            if fallback is None:
+                raise
+            artifact = ContractArtifact(name, fallback())
+        _artifacts[key] = artifact
+        return artifact
+
+
+def clear_artifact_cache() -> None:
+    """清空进程内的产物缓存（重新构建合约后调用）"""
+    with _artifacts_lock:
+        _artifacts.clear()
+
+
+def build_contracts(source_dir: Optional[Path] = None, artifact_dir: Optional[Path] = None,
+                    solc: Optional[str] = None, optimize_runs: int = DEFAULT_OPTIMIZE_RUNS,
+                    force: bool = False) -> Dict[str, str]:
+    """
+    增量编译 source_dir 下的所有 .sol 文件，返回 {源文件名: 'cached' 或 'compiled'}
+
+    solc 默认取环境变量 SOLC_BINARY（未设置时为 PATH 中的 solc），OpenZeppelin 路径取 OPENZEPPELIN_PATH
+    """
+    source_dir = Path(source_dir or CONTRACTS_DIR)
+    artifact_dir = Path(artifact_dir or source_dir)
+    solc = solc or os.getenv('SOLC_BINARY', 'solc')
+
+    openzeppelin = Path(os.getenv('OPENZEPPELIN_PATH', 'node_modules/@openzeppelin')).resolve()
+    remappings = {'@openzeppelin/': f"{openzeppelin}/"}
+    settings = {
+        'optimizer': {'enabled': True, 'runs': optimize_runs},
+        'remappings': [f"{prefix}={target}" for prefix, target in remappings.items()],
+        'outputSelection': {'*': {'*': ['abi', 'evm.bytecode.object']}}
+    }
+    compiler_version = subprocess.run(
+        [solc, '--version'], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+    manifest_path = artifact_dir / MANIFEST_NAME
+    manifest = _read_manifest(manifest_path)
+    status = {}
+    for source in sorted(source_dir.glob('*.sol')):
+        build_key = _build_key(source, remappings, compiler_version, settings)
+        entry = manifest.get(source.name)
+        if not force and entry and entry['key'] == build_key and all(
+            (artifact_dir / f'{name}.json').exists() for name in entry['contracts']
+        ):
+            status[source.name] = 'cached'
+            continue
+
+        output = _compile_source(solc, source, settings, [str(source_dir), str(openzeppelin)])
+        names = []
+        for name, contract in output['contracts'].get(source.name, {}).items():
+            artifact = ContractArtifact(name, contract['abi'], contract['evm']['bytecode']['object'], build_key)
+            with open(artifact_dir / f'{name}.json', 'w') as f:
+                json.dump(artifact.to_json(), f, indent=2)
+            names.append(name)
+        manifest[source.name] = {'key': build_key, 'contracts': names}
+        _write_manifest(manifest_path, manifest)
+        status[source.name] = 'compiled'
+
+    clear_artifact_cache()
+    return status
+
+
+def _build_key(source: Path, remappings: Dict[str, str], compiler_version: str, settings: Dict) -> str:
+    """源文件及其递归导入文件的内容、编译器版本和编译设置的哈希"""
+    digest = hashlib.sha256()
+    digest.update(compiler_version.encode())
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+
+    visited = set()
+    pending = [source.resolve()]
+    while pending:
+        path = pending.pop()
+        if path in visited:
+            continue
+        visited.add(path)
+        try:
+            content = path.read_bytes()
+        except OSError:
+            # 无法读取的导入（如未安装依赖）只记录路径，由编译器报告错误
+            digest.update(str(path).encode())
+            continue
+        digest.update(str(path).encode())
+        digest.update(hashlib.sha256(content).digest())
+        for imported in _IMPORT_PATTERN.findall(content.decode('utf-8', errors='replace')):
+            pending.append(_resolve_import(path, imported, remappings))
+    return digest.hexdigest()
+
+
+def _resolve_import(importer: Path, imported: str, remappings: Dict[str, str]) -> Path:
+    for prefix, target in remappings.items():
+        if imported.startswith(prefix):
+            return Path(target + imported[len(prefix):]).resolve()
+    if imported.startswith('.'):
+        return (importer.parent / imported).resolve()
+    return (CONTRACTS_DIR / imported).resolve()
+
+
+def _compile_source(solc: str, source: Path, settings: Dict, allow_paths: List[str]) -> Dict:
+    """用 solc --standard-json 编译单个源文件"""
+    standard_input = {
+        'language': 'Solidity',
+        'sources': {source.name: {'content': source.read_text()}},
+        'settings': settings
+    }
+    completed = subprocess.run(
+        [solc, '--standard-json', '--base-path', str(source.parent), '--allow-paths', ','.join(allow_paths)],
+        input=json.dumps(standard_input), capture_output=True, text=True, check=True
+    )
+    output = json.loads(completed.stdout)
+    errors = [error for error in output.get('errors', []) if error.get('severity') == 'error']
+    if errors:
+        raise RuntimeError(f"编译 {source.name} 失败:\n" + '\n'.join(error['formattedMessage'] for error in errors))
+    return output
+
+
+def _read_manifest(path: Path) -> Dict:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(path: Path, manifest: Dict) -> None:
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
@@ -0,0 +1,197 @@
+"""
+区块级费用预言机
+基于 eth_feeHistory 计算EIP-1559基础费用和优先费分位数，并按区块缓存，
+避免每笔交易、每次网络信息查询都单独读取 gas_price
+"""
+
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from blockchain.rpc_transport import batch_request, batch_request_async, supports_batch
+
+DEFAULT_PERCENTILES = (25, 50, 75)
+
+
+class FeeOracle:
+    """
+    EIP-1559 费用预言机
+
+    最新区块号按 block_ttl 秒缓存，费用数据按区块号缓存：同一区块内的所有查询只触发一次RPC。
+    链不支持EIP-1559（没有baseFee）时退化为 eth_gasPrice。
+    """
+
+    def __init__(self, w3, history_blocks: int = 20, percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+                 priority_percentile: int = 50, block_ttl: float = 1.0, max_fee_multiplier: int = 2):
+        self.w3 = w3
+        self.history_blocks = history_blocks
+        self.percentiles = list(percentiles)
+        if priority_percentile not in self.percentiles:
+            self.percentiles.append(priority_percentile)
+            self.percentiles.sort()
+        self.priority_percentile = priority_percentile
+        self.block_ttl = block_ttl
+        self.max_fee_multiplier = max_fee_multiplier
+
+        self._lock = threading.Lock()
+        self._block_number: Optional[int] = None
+        self._block_checked_at = 0.0
+        self._fees: Optional[Dict] = None
+
+    # ---- 同步接口 ----
+
+    def latest_block_number(self) -> int:
+        """获取最新区块号（短时间缓存）"""
+        cached = self._cached_block_number()
+        if cached is not None:
+            return cached
+        return self._store_block_number(self.w3.eth.block_number)
+
+    def get_fees(self) -> Dict:
+        """获取当前区块的费用估算"""
+        if self._cached_block_number() is None and supports_batch(self.w3):
+            try:
+                return self._store_batch(batch_request(self.w3, self._batch_calls()))
+            except Exception:
+                pass
+
+        block_number = self.latest_block_number()
+        cached = self._cached_fees(block_number)
+        if cached:
+            return cached
+
+        try:
+            fee_history = self.w3.eth.fee_history(self.history_blocks, 'latest', self.percentiles)
+            fees = self._compute(block_number, fee_history)
+        except Exception:
+            fees = None
+        if fees is None:
+            fees = self._legacy_fees(block_number, self.w3.eth.gas_price)
+        return self._store_fees(fees)
+
+    def transaction_fee_params(self) -> Dict:
+        """交易构建用的费用字段"""
+        return self._fee_params(self.get_fees())
+
+    # ---- 异步接口（与同步接口共享缓存） ----
+
+    async def latest_block_number_async(self, w3) -> int:
+        """异步获取最新区块号"""
+        cached = self._cached_block_number()
+        if cached is not None:
+            return cached
+        return self._store_block_number(await w3.eth.block_number)
+
+    async def get_fees_async(self, w3) -> Dict:
+        """异步获取当前区块的费用估算"""
+        if self._cached_block_number() is None and supports_batch(w3):
+            try:
+                return self._store_batch(await batch_request_async(w3, self._batch_calls()))
+            except Exception:
+                pass
+
+        block_number = await self.latest_block_number_async(w3)
+        cached = self._cached_fees(block_number)
+        if cached:
+            return cached
+
+        try:
+            fee_history = await w3.eth.fee_history(self.history_blocks, 'latest', self.percentiles)
+            fees = self._compute(block_number, fee_history)
+        except Exception:
+            fees = None
+        if fees is None:
+            fees = self._legacy_fees(block_number, await w3.eth.gas_price)
+        return self._store_fees(fees)
+
+    async def transaction_fee_params_async(self, w3) -> Dict:
+        """异步获取交易构建用的费用字段"""
+        return self._fee_params(await self.get_fees_async(w3))
+
+    # ---- 内部实现 ----
+
+    def _cached_block_number(self) -> Optional[int]:
+        with self._lock:
+            if self._block_number is not None and time.monotonic() - self._block_checked_at < self.block_ttl:
+                return self._block_number
+        return None
+
+    def _store_block_number(self, block_number: int) -> int:
+        with self._lock:
+            self._block_number = block_number
+            self._block_checked_at = time.monotonic()
+        return block_number
+
+    def _cached_fees(self, block_number: int) -> Optional[Dict]:
+        with self._lock:
+            if self._fees and self._fees['block_number'] == block_number:
+                return self._fees
+        return None
+
+    def _store_fees(self, fees: Dict) -> Dict:
+        with self._lock:
+            self._fees = fees
+        return fees
+
+    def _batch_calls(self) -> List:
+        """区块号过期时，把区块号、feeHistory和gasPrice放在一个批量请求中读取"""
+        return [
+            ('eth_blockNumber', []),
+            ('eth_feeHistory', [hex(self.history_blocks), 'latest', self.percentiles]),
+            ('eth_gasPrice', [])
+        ]
+
+    def _store_batch(self, results: List) -> Dict:
+        block_number, fee_history, gas_price = results
+        self._store_block_number(block_number)
+        cached = self._cached_fees(block_number)
+        if cached:
+            return cached
+        fees = self._compute(block_number, fee_history) or self._legacy_fees(block_number, gas_price)
+        return self._store_fees(fees)
+
+    def _compute(self, block_number: int, fee_history) -> Optional[Dict]:
+        """根据 feeHistory 计算费用；没有baseFee时返回None"""
+        base_fees = fee_history.get('baseFeePerGas') or []
+        if not base_fees or not any(base_fees):
+            return None
+
+        # baseFeePerGas 的最后一项是下一个区块的基础费用
+        base_fee = base_fees[-1]
+        rewards: List[List[int]] = fee_history.get('reward') or []
+        priority_fees = {}
+        for index, percentile in enumerate(self.percentiles):
+            samples = [block_rewards[index] for block_rewards in rewards if len(block_rewards) > index]
+            priority_fees[percentile] = int(statistics.median(samples)) if samples else 0
+
+        max_priority_fee = priority_fees[self.priority_percentile]
+        return {
+            'block_number': block_number,
+            'eip1559': True,
+            'base_fee': base_fee,
+            'priority_fees': priority_fees,
+            'max_priority_fee_per_gas': max_priority_fee,
+            'max_fee_per_gas': base_fee * self.max_fee_multiplier + max_priority_fee,
+            'gas_price': base_fee + max_priority_fee
+        }
+
+    def _legacy_fees(self, block_number: int, gas_price: int) -> Dict:
+        """不支持EIP-1559的链"""
+        return {
+            'block_number': block_number,
+            'eip1559': False,
+            'base_fee': 0,
+            'priority_fees': {},
+            'max_priority_fee_per_gas': 0,
+            'max_fee_per_gas': gas_price,
+            'gas_price': gas_price
+        }
+
+    def _fee_params(self, fees: Dict) -> Dict:
+        if fees['eip1559']:
+            return {
+                'maxFeePerGas': fees['max_fee_per_gas'],
+                'maxPriorityFeePerGas': fees['max_priority_fee_per_gas']
+            }
+        return {'gasPrice': fees['gas_price']}
@@ -0,0 +1,206 @@
+"""
+交易Gas上限估算
+按合约函数分别维护 calldata长度 -> Gas 的线性模型：样本来自 eth_estimateGas，
+样本足够后直接用模型预测（calldata长度固定的函数如 claimTask 相当于缓存估算值），每隔一定次数重新采样；
+交易因Gas不足回滚时提高该函数的修正系数，使后续估算不再偏低
+"""
+
+import math
+import os
+import threading
+from collections import Counter, deque
+from typing import Dict, Optional, Tuple
+
+from hexbytes import HexBytes
+
+# 因Gas不足失败后修正系数的增幅和上限
+UNDER_ESTIMATE_STEP = 1.25
+MAX_CORRECTION = 3.0
+
+
+def calldata_size(contract_function) -> int:
+    """合约调用的calldata字节数"""
+    return len(HexBytes(contract_function._encode_transaction_data()))
+
+
+class _GasModel:
+    """单个合约函数的 calldata长度 -> Gas 线性模型"""
+
+    def __init__(self, max_samples: int):
+        self.samples = deque(maxlen=max_samples)
+        self.correction = 1.0
+        self.predictions_since_sample = 0
+
+    def add(self, size: int, gas: int) -> None:
+        self.samples.append((size, gas))
+        self.predictions_since_sample = 0
+
+    def predict(self, size: int, min_samples: int) -> Optional[int]:
+        """预测值为最小二乘拟合值加上样本中的最大正残差；样本不足时返回None"""
+        same_size = [gas for sample_size, gas in self.samples if sample_size == size]
+        sizes = {sample_size for sample_size, _ in self.samples}
+        if len(sizes) < 2:
+            # 只有一种calldata长度（如 claimTask）：直接使用该长度下的最大估算值
+            return max(same_size) if same_size else None
+        if len(self.samples) < min_samples:
+            return None
+
+        count = len(self.samples)
+        mean_size = sum(sample_size for sample_size, _ in self.samples) / count
+        mean_gas = sum(gas for _, gas in self.samples) / count
+        variance = sum((sample_size - mean_size) ** 2 for sample_size, _ in self.samples)
+        slope = sum((sample_size - mean_size) * (gas - mean_gas) for sample_size, gas in self.samples) / variance
+        intercept = mean_gas - slope * mean_size
+        residual = max(gas - (intercept + slope * sample_size) for sample_size, gas in self.samples)
+        predicted = intercept + slope * size + max(residual, 0)
+        return max(int(math.ceil(predicted)), max(same_size, default=0))
+
+
+class GasEstimator:
+    """
+    Gas上限估算器
+
+    estimate()/estimate_async() 返回带安全余量的Gas上限：模型可用时不发起RPC，否则调用 eth_estimateGas 并记录样本；
+    估算失败（节点错误或预计回滚）时使用调用方给出的默认值。register() 登记已广播交易使用的Gas上限，
+    observe() 在回执到达后检查是否因Gas不足而失败并修正模型。
+    """
+
+    def __init__(self, margin_percent: float = 20, min_samples: int = 3, resample_interval: int = 50,
+                 max_samples: int = 200, enabled: bool = True):
+        self.margin_percent = margin_percent
+        self.min_samples = min_samples
+        self.resample_interval = resample_interval
+        self.max_samples = max_samples
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._models: Dict[str, _GasModel] = {}
+        # 交易哈希 -> (函数名, 使用的Gas上限)
+        self._inflight: Dict[HexBytes, Tuple[str, int]] = {}
+        self._counts: Counter = Counter()
+        self._under_estimates: Counter = Counter()
+        self._utilization: Dict[str, deque] = {}
+
+    @classmethod
+    def from_env(cls) -> 'GasEstimator':
+        """根据环境变量创建估算器"""
+        return cls(
+            margin_percent=float(os.getenv('GAS_LIMIT_MARGIN_PERCENT', 20)),
+            min_samples=int(os.getenv('GAS_MODEL_MIN_SAMPLES', 3)),
+            resample_interval=int(os.getenv('GAS_MODEL_RESAMPLE_INTERVAL', 50)),
+            enabled=os.getenv('GAS_ESTIMATION_ENABLED', 'true').lower() == 'true'
+        )
+
+    def estimate(self, contract_function, sender: str, default: int) -> int:
+        """估算交易的Gas上限（同步）"""
+        if not self.enabled:
+            return default
+        name, size, predicted = self._predict(contract_function)
+        if predicted is not None:
+            return predicted
+        try:
+            gas = contract_function.estimate_gas({'from': sender}, block_identifier='pending')
+        except Exception as e:
+            return self._estimate_failed(name, default, e)
+        return self._record_sample(name, size, gas)
+
+    async def estimate_async(self, contract_function, sender: str, default: int) -> int:
+        """估算交易的Gas上限（异步）"""
+        if not self.enabled:
+            return default
+        name, size, predicted = self._predict(contract_function)
+        if predicted is not None:
+            return predicted
+        try:
+            gas = await contract_function.estimate_gas({'from': sender}, block_identifier='pending')
+        except Exception as e:
+            return self._estimate_failed(name, default, e)
+        return self._record_sample(name, size, gas)
+
+    def register(self, tx_hash, contract_function, gas: int) -> None:
+        """登记已广播交易使用的Gas上限"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._inflight[HexBytes(tx_hash)] = (contract_function.fn_name, gas)
+
+    def observe(self, tx_hash, receipt) -> None:
+        """交易上链后检查Gas使用情况，因Gas不足回滚时提高该函数的修正系数并要求重新采样"""
+        with self._lock:
+            entry = self._inflight.pop(HexBytes(tx_hash), None)
+        if entry is None or receipt is None:
+            return
+        name, gas_limit = entry
+        gas_used = receipt['gasUsed']
+        with self._lock:
+            self._utilization.setdefault(name, deque(maxlen=self.max_samples)).append(gas_used / gas_limit)
+            if receipt['status'] == 0 and gas_used >= gas_limit:
+                self._under_estimates[name] += 1
+                model = self._model(name)
+                model.correction = min(model.correction * UNDER_ESTIMATE_STEP, MAX_CORRECTION)
+                model.predictions_since_sample = self.resample_interval
+                print(f"{name} 交易因Gas不足失败（上限 {gas_limit}），修正系数调整为 {model.correction:.2f}")
+
+    def discard(self, tx_hash) -> None:
+        """交易没有回执（超时或被丢弃）时移除登记"""
+        with self._lock:
+            self._inflight.pop(HexBytes(tx_hash), None)
+
+    def stats(self) -> Dict:
+        """各函数的估算来源次数、Gas不足失败次数、修正系数和平均Gas利用率"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'margin_percent': self.margin_percent,
+                'counts': dict(self._counts),
+                'functions': {
+                    name: {
+                        'samples': len(model.samples),
+                        'correction': model.correction,
+                        'under_estimates': self._under_estimates[name],
+                        'avg_utilization': (
+                            sum(self._utilization[name]) / len(self._utilization[name])
+                            if self._utilization.get(name) else None
+                        )
+                    }
+                    for name, model in self._models.items()
+                }
+            }
+
+    # ---- 内部实现 ----
+
+    def _model(self, name: str) -> _GasModel:
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = _GasModel(self.max_samples)
+        return model
+
+    def _predict(self, contract_function) -> Tuple[str, int, Optional[int]]:
+        name = contract_function.fn_name
+        size = calldata_size(contract_function)
+        with self._lock:
+            model = self._model(name)
+            if model.predictions_since_sample >= self.resample_interval:
+                return name, size, None
+            predicted = model.predict(size, self.min_samples)
+            if predicted is None:
+                return name, size, None
+            model.predictions_since_sample += 1
+            self._counts['model'] += 1
+            return name, size, self._with_margin(predicted, model.correction)
+
+    def _record_sample(self, name: str, size: int, gas: int) -> int:
+        with self._lock:
+            model = self._model(name)
+            model.add(size, gas)
+            self._counts['rpc'] += 1
+            return self._with_margin(gas, model.correction)
+
+    def _estimate_failed(self, name: str, default: int, error: Exception) -> int:
+        print(f"估算 {name} 的Gas失败，使用默认上限 {default}: {error}")
+        with self._lock:
+            self._counts['default'] += 1
+        return default
+
+    def _with_margin(self, gas: int, correction: float) -> int:
+        return int(math.ceil(gas * correction * (100 + self.margin_percent) / 100))
@@ -0,0 +1,101 @@
+"""
+Multicall3 聚合调用
+把多个只读 eth_call 打包成少量 aggregate3 调用，减少RPC往返次数
+"""
+
+import asyncio
+from typing import Iterable, List, Optional, Tuple
+from web3 import AsyncWeb3, Web3
+
+# Multicall3 在绝大多数EVM链上都部署在同一地址
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def chunked(items: List, size: int) -> Iterable[List]:
+    """按固定大小切分列表"""
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Multicall:
+    """Multicall3 合约封装"""
+
+    def __init__(self, w3: Web3, address: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address or MULTICALL3_ADDRESS)
+        self.chunk_size = chunk_size
+        self.contract = w3.eth.contract(address=self.address, abi=MULTICALL3_ABI)
+
+    def aggregate(self, calls: List[Tuple[str, bytes]]) -> List[Tuple[bool, bytes]]:
+        """
+        执行聚合调用
+
+        calls 为 (目标合约地址, calldata) 列表，返回与之一一对应的 (是否成功, 返回数据)。
+        单个调用失败不会影响同批次的其他调用。
+        """
+        results = []
+        for chunk in chunked(calls, self.chunk_size):
+            payload = [(target, True, call_data) for target, call_data in chunk]
+            results.extend(
+                (success, bytes(return_data))
+                for success, return_data in self.contract.functions.aggregate3(payload).call()
+            )
+        return results
+
+
+class AsyncMulticall:
+    """Multicall3 合约的异步封装，各分块并发发送"""
+
+    def __init__(self, w3: AsyncWeb3, address: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address or MULTICALL3_ADDRESS)
+        self.chunk_size = chunk_size
+        self.contract = w3.eth.contract(address=self.address, abi=MULTICALL3_ABI)
+
+    async def aggregate(self, calls: List[Tuple[str, bytes]]) -> List[Tuple[bool, bytes]]:
+        """执行聚合调用，语义与 Multicall.aggregate 相同"""
+        chunk_results = await asyncio.gather(*[
+            self.contract.functions.aggregate3(
+                [(target, True, call_data) for target, call_data in chunk]
+            ).call()
+            for chunk in chunked(calls, self.chunk_size)
+        ])
+        return [
+            (success, bytes(return_data))
+            for results in chunk_results
+            for success, return_data in results
+        ]
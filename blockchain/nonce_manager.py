@@ -0,0 +1,96 @@
+"""
+本地nonce分配器
+在本地顺序分配交易nonce，使同一账户可以连续发送多笔交易而无需等待上一笔上链
+"""
+
+import threading
+from typing import Awaitable, Callable, Optional, Set
+
+
+class NonceManager:
+    """
+    线程/协程安全的nonce分配器
+
+    首次分配时从链上读取pending nonce，之后在本地递增。
+    交易在广播前失败（构建、签名出错）时调用 release 归还nonce；节点拒绝广播（如 nonce too low、
+    replacement transaction underpriced）时调用 reject，交易被丢弃时调用 invalidate，下一次分配会重新与链同步。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_nonce: Optional[int] = None
+        self._in_flight: Set[int] = set()
+
+    def needs_sync(self) -> bool:
+        """是否需要从链上重新同步"""
+        with self._lock:
+            return self._next_nonce is None
+
+    def sync(self, chain_nonce: int, only_if_unsynced: bool = False) -> None:
+        """使用链上的pending nonce重新同步本地计数"""
+        with self._lock:
+            if only_if_unsynced and self._next_nonce is not None:
+                return
+            self._next_nonce = chain_nonce
+            # 小于链上nonce的交易已经被打包或替换
+            self._in_flight = {nonce for nonce in self._in_flight if nonce >= chain_nonce}
+
+    def invalidate(self) -> None:
+        """标记本地计数失效（交易被丢弃或nonce冲突），下次分配时重新同步"""
+        with self._lock:
+            self._next_nonce = None
+
+    def allocate(self, fetch_chain_nonce: Optional[Callable[[], int]] = None) -> int:
+        """分配下一个nonce，本地计数失效时调用 fetch_chain_nonce 同步"""
+        with self._lock:
+            if self._next_nonce is None:
+                if fetch_chain_nonce is None:
+                    raise RuntimeError("nonce未同步")
+                self._next_nonce = fetch_chain_nonce()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            self._in_flight.add(nonce)
+            return nonce
+
+    async def allocate_async(self, fetch_chain_nonce: Callable[[], Awaitable[int]]) -> int:
+        """异步版本的分配，RPC读取在锁外await，不阻塞事件循环"""
+        while True:
+            if self.needs_sync():
+                self.sync(await fetch_chain_nonce(), only_if_unsynced=True)
+            try:
+                return self.allocate()
+            except RuntimeError:
+                # 同步后又被其他调用方标记失效，重新同步
+                continue
+
+    def confirm(self, nonce: int) -> None:
+        """交易已上链（无论成功或回滚，nonce都已被消耗）"""
+        with self._lock:
+            self._in_flight.discard(nonce)
+
+    def reject(self, nonce: int) -> None:
+        """
+        节点拒绝了已签名的交易，或广播结果未知
+
+        被拒绝的nonce可能已被其他进程/钱包使用（nonce过低、替换费用不足），回退后会再次分配同一个过期的nonce，
+        因此不回退，而是标记失效，下次分配时重新读取链上的pending nonce
+        """
+        with self._lock:
+            self._in_flight.discard(nonce)
+            self._next_nonce = None
+
+    def release(self, nonce: int) -> None:
+        """交易在广播前失败（构建或签名出错），归还nonce"""
+        with self._lock:
+            self._in_flight.discard(nonce)
+            if self._next_nonce is not None and nonce == self._next_nonce - 1:
+                # 最后分配的nonce直接回退
+                self._next_nonce = nonce
+            else:
+                # 中间出现空洞，后续交易会卡住，需要与链重新同步
+                self._next_nonce = None
+
+    def pending_count(self) -> int:
+        """已分配但尚未确认的交易数"""
+        with self._lock:
+            return len(self._in_flight)
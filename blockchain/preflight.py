@@ -0,0 +1,134 @@
+"""
+交易广播前的预执行检查
+在pending区块上用 eth_call 模拟 claimTask/completeTask：会回滚的交易直接拒绝并给出类型化的原因，
+不再签名、广播后等待回滚白白支付Gas和等待时间
+"""
+
+import threading
+from collections import Counter
+from enum import Enum
+from typing import Dict, Optional
+
+from web3.exceptions import ContractLogicError
+
+
+class RejectReason(str, Enum):
+    """预执行失败的原因，对应合约中的 require 错误信息"""
+
+    TASK_NOT_FOUND = 'task_not_found'
+    ALREADY_CLAIMED = 'already_claimed'
+    ALREADY_COMPLETED = 'already_completed'
+    DEADLINE_PASSED = 'deadline_passed'
+    NOT_ASSIGNED_WORKER = 'not_assigned_worker'
+    NOT_CLAIMED = 'not_claimed'
+    DIGEST_REQUIRED = 'digest_required'
+    REWARD_TRANSFER_FAILED = 'reward_transfer_failed'
+    UNKNOWN = 'unknown'
+
+    @property
+    def is_permanent(self) -> bool:
+        """该任务对本账户是否再也不可能成功（候选列表可以直接排除）"""
+        return self not in (RejectReason.REWARD_TRANSFER_FAILED, RejectReason.UNKNOWN)
+
+
+# 合约 require 错误信息 -> 拒绝原因
+REVERT_MESSAGES = {
+    'Task does not exist': RejectReason.TASK_NOT_FOUND,
+    'Task already claimed': RejectReason.ALREADY_CLAIMED,
+    'Task already completed': RejectReason.ALREADY_COMPLETED,
+    'Task deadline passed': RejectReason.DEADLINE_PASSED,
+    'Only assigned worker can complete task': RejectReason.NOT_ASSIGNED_WORKER,
+    'Task not claimed': RejectReason.NOT_CLAIMED,
+    'Result digest required': RejectReason.DIGEST_REQUIRED,
+    'Reward transfer failed': RejectReason.REWARD_TRANSFER_FAILED,
+}
+
+
+def classify_revert(message: str) -> RejectReason:
+    """根据回滚信息判断拒绝原因"""
+    for revert_message, reason in REVERT_MESSAGES.items():
+        if revert_message in (message or ''):
+            return reason
+    return RejectReason.UNKNOWN
+
+
+class PreflightRejected(Exception):
+    """预执行显示交易会回滚，交易没有广播"""
+
+    def __init__(self, task_id: int, action: str, reason: RejectReason, message: str = ''):
+        self.task_id = task_id
+        self.action = action
+        self.reason = reason
+        self.message = message
+        super().__init__(f"任务 {task_id} 的 {action} 交易预执行失败: {reason.value} ({message})")
+
+
+class PreflightChecker:
+    """
+    预执行检查器
+
+    check()/check_async() 在pending区块上模拟合约调用，会回滚时抛出 PreflightRejected；
+    节点错误等非回滚异常不阻止交易（按原流程广播）。模拟后端使用 check_message() 传入它给出的回滚信息。
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._checked = 0
+        self._rejected: Counter = Counter()
+        self._errors = 0
+
+    def check(self, contract_function, sender: str, task_id: int, action: str) -> None:
+        """同步模拟调用，会回滚时抛出 PreflightRejected"""
+        if not self.enabled:
+            return
+        try:
+            contract_function.call({'from': sender}, block_identifier='pending')
+            message = None
+        except ContractLogicError as e:
+            message = e.message or str(e)
+        except Exception as e:
+            self._record_error(e)
+            return
+        self.check_message(task_id, action, message)
+
+    async def check_async(self, contract_function, sender: str, task_id: int, action: str) -> None:
+        """异步模拟调用，会回滚时抛出 PreflightRejected"""
+        if not self.enabled:
+            return
+        try:
+            await contract_function.call({'from': sender}, block_identifier='pending')
+            message = None
+        except ContractLogicError as e:
+            message = e.message or str(e)
+        except Exception as e:
+            self._record_error(e)
+            return
+        self.check_message(task_id, action, message)
+
+    def check_message(self, task_id: int, action: str, message: Optional[str]) -> None:
+        """记录一次预执行结果，message 为回滚信息（None表示不会回滚）"""
+        if not self.enabled:
+            return
+        reason = classify_revert(message) if message is not None else None
+        with self._lock:
+            self._checked += 1
+            if reason is not None:
+                self._rejected[reason.value] += 1
+        if reason is not None:
+            raise PreflightRejected(task_id, action, reason, message)
+
+    def _record_error(self, error: Exception) -> None:
+        print(f"预执行检查失败，按原流程广播交易: {error}")
+        with self._lock:
+            self._errors += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'checked': self._checked,
+                'rejected': sum(self._rejected.values()),
+                'rejected_by_reason': dict(self._rejected),
+                'errors': self._errors
+            }
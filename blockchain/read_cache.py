@@ -0,0 +1,68 @@
+"""
+按区块号失效的读缓存
+同一区块内链上状态不变，对任务、工人信息和余额的重复读取直接命中缓存
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class BlockReadCache:
+    """
+    LRU读缓存
+
+    每个条目记录写入时的最新区块号，只有当前区块号与之相同时才命中；
+    超过 max_size 时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, max_size: int = 2048):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Hashable, Tuple[int, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, block_number: Optional[int]) -> Tuple[bool, Any]:
+        """查询缓存，返回 (是否命中, 值)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if block_number is None or entry is None or entry[0] != block_number:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: Hashable, block_number: Optional[int], value: Any) -> None:
+        """写入缓存，区块号未知时不缓存"""
+        if block_number is None:
+            return
+        with self._lock:
+            self._entries[key] = (block_number, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """删除指定条目（本账户的交易改变了对应状态）"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """缓存统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
@@ -0,0 +1,149 @@
+"""
+交易回执跟踪器
+在后台线程中分批轮询已广播交易的回执，通过Future/回调通知调用方，调用方无需阻塞等待上链
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from hexbytes import HexBytes
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from blockchain.multicall import chunked
+from blockchain.rpc_transport import batch_request, supports_batch
+
+
+class _PendingTransaction:
+    def __init__(self, tx_hash: HexBytes, future: Future, deadline: float):
+        self.tx_hash = tx_hash
+        self.future = future
+        self.deadline = deadline
+
+
+class ReceiptTracker:
+    """
+    后台回执跟踪器
+
+    track() 接收交易哈希并立即返回 concurrent.futures.Future，交易上链后Future的结果为回执，
+    超时未上链则以 TimeExhausted 结束。asyncio 调用方可以用 asyncio.wrap_future 等待。
+    """
+
+    def __init__(self, w3, poll_interval: float = 2.0, batch_size: int = 50, timeout: float = 300.0):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._pending: Dict[HexBytes, _PendingTransaction] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, tx_hash, callback: Optional[Callable[[Future], None]] = None,
+              timeout: Optional[float] = None) -> Future:
+        """登记待确认交易，返回回执Future；callback 在交易确认或超时后被调用"""
+        tx_hash = HexBytes(tx_hash)
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout)
+        with self._lock:
+            existing = self._pending.get(tx_hash)
+            if existing:
+                # 同一交易重复登记时共用结果
+                existing.future.add_done_callback(lambda done: _copy_result(done, future))
+                return future
+            self._pending[tx_hash] = _PendingTransaction(tx_hash, future, deadline)
+        self._ensure_running()
+        return future
+
+    def untrack(self, tx_hash) -> None:
+        """停止跟踪一笔交易（如已被同nonce的替换交易取代），其Future不再完成"""
+        with self._lock:
+            self._pending.pop(HexBytes(tx_hash), None)
+
+    def pending_count(self) -> int:
+        """尚未确认的交易数"""
+        with self._lock:
+            return len(self._pending)
+
+    def stop(self) -> None:
+        """停止后台线程"""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def _ensure_running(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='receipt-tracker', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"轮询交易回执失败: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def poll_once(self) -> int:
+        """轮询一轮所有待确认交易，返回本轮确认的交易数"""
+        with self._lock:
+            pending = list(self._pending.values())
+
+        resolved = 0
+        now = time.monotonic()
+        for batch in chunked(pending, self.batch_size):
+            for item, receipt in zip(batch, self._fetch_receipts(batch)):
+                if receipt is not None:
+                    self._resolve(item, receipt)
+                    resolved += 1
+                elif now >= item.deadline:
+                    self._fail(item, TimeExhausted(f"交易 {item.tx_hash.hex()} 在超时时间内未上链"))
+        return resolved
+
+    def _fetch_receipts(self, batch: List[_PendingTransaction]) -> List[Optional[dict]]:
+        """查询一批交易的回执，未上链的交易返回None；Provider支持时用一个批量请求查询"""
+        if supports_batch(self.w3):
+            try:
+                return batch_request(self.w3, [('eth_getTransactionReceipt', [item.tx_hash]) for item in batch])
+            except Exception as e:
+                print(f"批量查询交易回执失败，退化为逐个查询: {e}")
+
+        receipts = []
+        for item in batch:
+            try:
+                receipts.append(self.w3.eth.get_transaction_receipt(item.tx_hash))
+            except TransactionNotFound:
+                receipts.append(None)
+        return receipts
+
+    def _resolve(self, item: _PendingTransaction, receipt) -> None:
+        with self._lock:
+            self._pending.pop(item.tx_hash, None)
+        if not item.future.done():
+            item.future.set_result(receipt)
+
+    def _fail(self, item: _PendingTransaction, error: Exception) -> None:
+        with self._lock:
+            self._pending.pop(item.tx_hash, None)
+        if not item.future.done():
+            item.future.set_exception(error)
+
+
+def _copy_result(source: Future, target: Future) -> None:
+    """把一个Future的结果复制到另一个Future"""
+    if target.done():
+        return
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
@@ -0,0 +1,174 @@
+"""
+内容寻址的链下结果存储
+任务结果压缩后按SHA-256摘要保存到本地（或其他可插拔后端），链上只提交摘要和简短的定位符，
+completeTask 的calldata大小和Gas因此与结果长度无关
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_RESULT_DIR = 'data/results'
+DEFAULT_BACKEND = 'fs'
+
+
+class ResultBackend:
+    """结果存储后端接口：按十六进制摘要读写压缩后的数据"""
+
+    name = ''
+
+    def put(self, digest: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def get(self, digest: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        return self.get(digest) is not None
+
+
+class FileSystemBackend(ResultBackend):
+    """本地文件系统后端，按摘要前两位分目录保存"""
+
+    name = 'fs'
+
+    def __init__(self, root: str = DEFAULT_RESULT_DIR):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        if os.path.exists(path):
+            # 内容寻址：相同摘要的内容必然相同，无需重复写入
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再原子替换，避免并发读到写了一半的文件
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+
+class MemoryBackend(ResultBackend):
+    """进程内存后端（测试和模拟后端使用）"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._blobs: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, digest: str, data: bytes) -> None:
+        with self._lock:
+            self._blobs.setdefault(digest, data)
+
+    def get(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            return self._blobs.get(digest)
+
+
+# 可插拔后端注册表：定位符即后端名称
+BACKEND_FACTORIES: Dict[str, Callable[[], ResultBackend]] = {
+    FileSystemBackend.name: lambda: FileSystemBackend(os.getenv('RESULT_STORE_DIR', DEFAULT_RESULT_DIR)),
+    MemoryBackend.name: MemoryBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], ResultBackend]) -> None:
+    """注册新的结果存储后端"""
+    BACKEND_FACTORIES[name] = factory
+
+
+class ResultStore:
+    """
+    内容寻址结果存储
+
+    put() 返回 (摘要, 定位符)：摘要是原始结果UTF-8编码的SHA-256，定位符是保存该结果的后端名称。
+    get() 读取后会重新计算摘要校验内容。
+    """
+
+    def __init__(self, backend: Optional[ResultBackend] = None, compression_level: int = 6):
+        self.backend = backend or FileSystemBackend()
+        self.compression_level = compression_level
+        self._backends: Dict[str, ResultBackend] = {self.backend.name: self.backend}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'ResultStore':
+        """根据环境变量创建结果存储"""
+        name = os.getenv('RESULT_STORE_BACKEND', DEFAULT_BACKEND)
+        if name not in BACKEND_FACTORIES:
+            raise ValueError(f"未知的结果存储后端: {name}")
+        return cls(BACKEND_FACTORIES[name](), int(os.getenv('RESULT_COMPRESSION_LEVEL', 6)))
+
+    @staticmethod
+    def digest(result: str) -> str:
+        """结果内容的十六进制SHA-256摘要"""
+        return hashlib.sha256(result.encode('utf-8')).hexdigest()
+
+    def put(self, result: str) -> Tuple[str, str]:
+        """压缩并保存结果，返回 (摘要, 定位符)"""
+        digest = self.digest(result)
+        if not self.backend.exists(digest):
+            self.backend.put(digest, zlib.compress(result.encode('utf-8'), self.compression_level))
+        return digest, self.backend.name
+
+    def get(self, digest: str, locator: Optional[str] = None) -> Optional[str]:
+        """按摘要读取结果，内容与摘要不符时返回None"""
+        backend = self._resolve_backend(locator)
+        if backend is None:
+            return None
+
+        data = backend.get(_normalize_digest(digest))
+        if data is None:
+            return None
+        result = zlib.decompress(data).decode('utf-8')
+        if self.digest(result) != _normalize_digest(digest):
+            print(f"结果 {digest} 校验失败")
+            return None
+        return result
+
+    def _resolve_backend(self, locator: Optional[str]) -> Optional[ResultBackend]:
+        if not locator or locator == self.backend.name:
+            return self.backend
+        with self._lock:
+            if locator not in self._backends:
+                factory = BACKEND_FACTORIES.get(locator)
+                if factory is None:
+                    print(f"未知的结果定位符: {locator}")
+                    return None
+                self._backends[locator] = factory()
+            return self._backends[locator]
+
+
+def _normalize_digest(digest) -> str:
+    """链上读出的bytes32或带0x前缀的字符串统一为小写十六进制"""
+    if isinstance(digest, (bytes, bytearray)):
+        return bytes(digest).hex()
+    digest = digest.lower()
+    return digest[2:] if digest.startswith('0x') else digest
+
+
+def digest_to_bytes32(digest: str) -> bytes:
+    """十六进制摘要转换为合约的bytes32参数"""
+    return bytes.fromhex(_normalize_digest(digest))
@@ -0,0 +1,410 @@
+"""
+多节点RPC池
+记录每个节点的延迟和错误率，读请求发送到最快的健康节点，慢请求在超过p95延迟后向第二个节点发送对冲请求；
+写请求（以及pending nonce查询）固定发送到同一个节点，保证nonce一致
+"""
+
+import asyncio
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence
+
+from web3.providers import JSONBaseProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from blockchain.rpc_transport import (
+    BATCHABLE_METHODS, AsyncBatchHTTPProvider, BatchHTTPProvider, provider_options_from_env
+)
+
+# 这些读请求必须和交易发送到同一个节点，否则可能读到其他节点尚未同步的nonce
+PINNED_METHODS = frozenset({'eth_getTransactionCount'})
+
+DEFAULT_HEDGE_MIN_DELAY = 0.05
+DEFAULT_HEDGE_DEFAULT_DELAY = 0.5
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 30.0
+LATENCY_WINDOW = 100
+MIN_P95_SAMPLES = 20
+
+# 节点自身原因（限流、内部错误、区块数据未同步）导致的JSON-RPC错误，换一个节点可能成功，计为节点失败；
+# 其他错误（执行回滚、参数错误等）与节点无关，原样返回给调用方
+RETRYABLE_ERROR_CODES = frozenset({-32005, -32603, 429})
+RETRYABLE_ERROR_MESSAGES = (
+    'rate limit', 'limit exceeded', 'too many requests', 'header not found', 'missing trie node', 'timeout'
+)
+
+
+class RPCNodeError(Exception):
+    """节点以可重试的JSON-RPC错误响应（响应保存在 response 中）"""
+
+    def __init__(self, response, error: Dict):
+        super().__init__(f"节点返回错误 {error.get('code')}: {error.get('message')}")
+        self.response = response
+
+
+def node_error(response) -> Optional[Dict]:
+    """返回响应（或批量响应中任一条）里可重试的JSON-RPC错误，没有时返回None"""
+    for item in response if isinstance(response, list) else [response]:
+        error = item.get('error') if isinstance(item, dict) else None
+        if not isinstance(error, dict):
+            continue
+        message = str(error.get('message', '')).lower()
+        if error.get('code') in RETRYABLE_ERROR_CODES or any(marker in message for marker in RETRYABLE_ERROR_MESSAGES):
+            return error
+    return None
+
+
+class EndpointStats:
+    """单个节点的延迟与错误统计"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.consecutive_failures = 0
+            self.unhealthy_until = 0.0
+
+    def record_failure(self, failure_threshold: int, cooldown: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= failure_threshold:
+                # 连续失败的节点暂时下线，冷却后重新尝试
+                self.unhealthy_until = time.monotonic() + cooldown
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def latency_score(self) -> float:
+        """路由用的延迟评分（中位数），没有样本的节点评分为0以便先探测"""
+        with self._lock:
+            return statistics.median(self.latencies) if self.latencies else 0.0
+
+    def p95(self) -> Optional[float]:
+        """p95延迟，样本不足时返回None"""
+        with self._lock:
+            if len(self.latencies) < MIN_P95_SAMPLES:
+                return None
+            samples = sorted(self.latencies)
+        return samples[int(len(samples) * 0.95) - 1]
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            requests = self.requests
+            errors = self.errors
+            latencies = list(self.latencies)
+        return {
+            'url': self.url,
+            'requests': requests,
+            'errors': errors,
+            'error_rate': errors / requests if requests else 0.0,
+            'median_latency': statistics.median(latencies) if latencies else None,
+            'p95_latency': self.p95(),
+            'healthy': self.is_healthy()
+        }
+
+
+class _RPCPoolBase:
+    """同步和异步节点池共用的路由逻辑"""
+
+    def _init_pool(self, urls: Sequence[str], hedge_reads: bool, hedge_min_delay: float,
+                   hedge_default_delay: float, failure_threshold: int, cooldown: float) -> None:
+        if not urls:
+            raise ValueError("至少需要一个RPC节点")
+        self.urls = list(urls)
+        self.endpoint_stats = [EndpointStats(url) for url in self.urls]
+        self.hedge_reads = hedge_reads
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        # 写请求固定使用的节点，只有它连续失败时才切换
+        self.write_index = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    def _read_order(self) -> List[int]:
+        """读请求的节点顺序：健康节点按延迟从低到高，不健康节点排在最后"""
+        indexes = range(len(self.urls))
+        healthy = sorted((i for i in indexes if self.endpoint_stats[i].is_healthy()),
+                         key=lambda i: self.endpoint_stats[i].latency_score())
+        unhealthy = [i for i in indexes if i not in healthy]
+        return healthy + unhealthy
+
+    def _write_order(self) -> List[int]:
+        """写请求的节点顺序：固定节点优先，失败时切换到下一个节点并固定下来"""
+        return [(self.write_index + offset) % len(self.urls) for offset in range(len(self.urls))]
+
+    def _is_read(self, method) -> bool:
+        return method in BATCHABLE_METHODS and method not in PINNED_METHODS
+
+    def _hedge_delay(self, index: int) -> float:
+        p95 = self.endpoint_stats[index].p95()
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_default_delay)
+
+    @staticmethod
+    def _raise_or_respond(error: Exception):
+        """所有节点都失败时：节点返回的错误响应交给web3按普通RPC错误处理，连接错误直接抛出"""
+        if isinstance(error, RPCNodeError):
+            return error.response
+        raise error
+
+    def _checked(self, index: int, started: float, response):
+        """记录请求结果；响应中包含可重试的错误时计为节点失败并抛出 RPCNodeError"""
+        error = node_error(response)
+        if error is not None:
+            self._record(index, started, RPCNodeError(response, error))
+            raise RPCNodeError(response, error)
+        self._record(index, started, None)
+        return response
+
+    def _record(self, index: int, started: float, error: Optional[Exception]) -> None:
+        stats = self.endpoint_stats[index]
+        if error is None:
+            stats.record_success(time.monotonic() - started)
+        else:
+            stats.record_failure(self.failure_threshold, self.cooldown)
+
+    def stats(self) -> Dict:
+        """各节点统计和对冲请求统计"""
+        return {
+            'endpoints': [stats.to_dict() for stats in self.endpoint_stats],
+            'write_endpoint': self.urls[self.write_index],
+            'hedged_requests': self.hedged_requests,
+            'hedge_wins': self.hedge_wins
+        }
+
+
+class RPCPoolProvider(_RPCPoolBase, JSONBaseProvider):
+    """
+    同步多节点Provider
+
+    每个节点使用一个带连接池的 BatchHTTPProvider。读请求按延迟路由并在失败时依次尝试其他节点；
+    开启 hedge_reads 时，主节点在其p95延迟内没有返回，就同时向下一个节点发送同一请求，取先返回的结果。
+    """
+
+    def __init__(self, urls: Sequence[str], hedge_reads: bool = True,
+                 hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+                 hedge_default_delay: float = DEFAULT_HEDGE_DEFAULT_DELAY,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN,
+                 **provider_options):
+        super().__init__()
+        self._init_pool(urls, hedge_reads, hedge_min_delay, hedge_default_delay, failure_threshold, cooldown)
+        self.providers = [BatchHTTPProvider(url, **provider_options) for url in self.urls]
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 4 * len(self.urls)), thread_name_prefix='rpc-pool')
+
+    def __str__(self) -> str:
+        return f"RPC pool {', '.join(self.urls)}"
+
+    def make_request(self, method, params) -> Dict:
+        if self._is_read(method):
+            return self._read(lambda provider: provider.make_request(method, params))
+        return self._write(lambda provider: provider.make_request(method, params))
+
+    def make_batch_request(self, calls) -> List[Dict]:
+        """批量读请求按读请求路由"""
+        return self._read(lambda provider: provider.make_batch_request(calls))
+
+    def _call(self, index: int, request):
+        started = time.monotonic()
+        try:
+            response = request(self.providers[index])
+        except Exception as e:
+            self._record(index, started, e)
+            raise
+        return self._checked(index, started, response)
+
+    def _write(self, request) -> Dict:
+        last_error = None
+        for index in self._write_order():
+            try:
+                response = self._call(index, request)
+                self.write_index = index
+                return response
+            except Exception as e:
+                last_error = e
+                if self.endpoint_stats[index].is_healthy():
+                    # 节点仍被视为健康（偶发错误），不切换写节点，避免交易分散到多个节点
+                    return self._raise_or_respond(e)
+        return self._raise_or_respond(last_error)
+
+    def _read(self, request) -> Dict:
+        order = self._read_order()
+        if self.hedge_reads and len(order) > 1:
+            return self._hedged_read(order, request)
+
+        last_error = None
+        for index in order:
+            try:
+                return self._call(index, request)
+            except Exception as e:
+                last_error = e
+        return self._raise_or_respond(last_error)
+
+    def _hedged_read(self, order: List[int], request) -> Dict:
+        primary = self._executor.submit(self._call, order[0], request)
+        done, _ = wait([primary], timeout=self._hedge_delay(order[0]))
+        if done and primary.exception() is None:
+            return primary.result()
+
+        # 主节点超过p95仍未返回（或已经失败），向下一个节点发送对冲请求
+        self.hedged_requests += 1
+        remaining = list(order[1:])
+        pending = {primary, self._executor.submit(self._call, remaining.pop(0), request)}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self.hedge_wins += 1
+                    return future.result()
+                last_error = future.exception()
+            if not pending and remaining:
+                pending = {self._executor.submit(self._call, remaining.pop(0), request)}
+        return self._raise_or_respond(last_error)
+
+
+class AsyncRPCPoolProvider(_RPCPoolBase, AsyncJSONBaseProvider):
+    """
+    异步多节点Provider
+
+    路由规则与 RPCPoolProvider 相同，对冲请求使用 asyncio 任务实现。
+    """
+
+    def __init__(self, urls: Sequence[str], hedge_reads: bool = True,
+                 hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+                 hedge_default_delay: float = DEFAULT_HEDGE_DEFAULT_DELAY,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN,
+                 **provider_options):
+        super().__init__()
+        self._init_pool(urls, hedge_reads, hedge_min_delay, hedge_default_delay, failure_threshold, cooldown)
+        self.providers = [AsyncBatchHTTPProvider(url, **provider_options) for url in self.urls]
+
+    def __str__(self) -> str:
+        return f"Async RPC pool {', '.join(self.urls)}"
+
+    async def make_request(self, method, params) -> Dict:
+        if self._is_read(method):
+            return await self._read(lambda provider: provider.make_request(method, params))
+        return await self._write(lambda provider: provider.make_request(method, params))
+
+    async def make_batch_request(self, calls) -> List[Dict]:
+        """批量读请求按读请求路由"""
+        return await self._read(lambda provider: provider.make_batch_request(calls))
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            response = await self.make_request('web3_clientVersion', [])
+        except Exception:
+            if show_traceback:
+                raise
+            return False
+        return 'result' in response
+
+    async def close(self) -> None:
+        """关闭所有节点的连接池"""
+        for provider in self.providers:
+            await provider.close()
+
+    async def _call(self, index: int, request):
+        started = time.monotonic()
+        try:
+            response = await request(self.providers[index])
+        except Exception as e:
+            self._record(index, started, e)
+            raise
+        return self._checked(index, started, response)
+
+    async def _write(self, request) -> Dict:
+        last_error = None
+        for index in self._write_order():
+            try:
+                response = await self._call(index, request)
+                self.write_index = index
+                return response
+            except Exception as e:
+                last_error = e
+                if self.endpoint_stats[index].is_healthy():
+                    return self._raise_or_respond(e)
+        return self._raise_or_respond(last_error)
+
+    async def _read(self, request) -> Dict:
+        order = self._read_order()
+        if self.hedge_reads and len(order) > 1:
+            return await self._hedged_read(order, request)
+
+        last_error = None
+        for index in order:
+            try:
+                return await self._call(index, request)
+            except Exception as e:
+                last_error = e
+        return self._raise_or_respond(last_error)
+
+    async def _hedged_read(self, order: List[int], request) -> Dict:
+        primary = asyncio.ensure_future(self._call(order[0], request))
+        done, _ = await asyncio.wait([primary], timeout=self._hedge_delay(order[0]))
+        if done and primary.exception() is None:
+            return primary.result()
+
+        self.hedged_requests += 1
+        remaining = list(order[1:])
+        pending = {primary, asyncio.ensure_future(self._call(remaining.pop(0), request))}
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                if not pending and remaining:
+                    pending = {asyncio.ensure_future(self._call(remaining.pop(0), request))}
+        finally:
+            # 取消仍在进行的慢请求
+            for task in pending:
+                task.cancel()
+        return self._raise_or_respond(last_error)
+
+
+def parse_rpc_urls(value: Optional[str]) -> List[str]:
+    """解析逗号分隔的RPC节点列表"""
+    return [url.strip() for url in (value or '').split(',') if url.strip()]
+
+
+def _pool_options() -> Dict:
+    return {
+        'hedge_reads': os.getenv('RPC_HEDGE_READS', 'true').lower() == 'true',
+        'hedge_min_delay': float(os.getenv('RPC_HEDGE_MIN_DELAY', DEFAULT_HEDGE_MIN_DELAY)),
+        'hedge_default_delay': float(os.getenv('RPC_HEDGE_DEFAULT_DELAY', DEFAULT_HEDGE_DEFAULT_DELAY)),
+        'failure_threshold': int(os.getenv('RPC_FAILURE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)),
+        'cooldown': float(os.getenv('RPC_COOLDOWN', DEFAULT_COOLDOWN)),
+        **provider_options_from_env()
+    }
+
+
+def pool_from_env(urls: Optional[str]) -> RPCPoolProvider:
+    """根据 ETHEREUM_RPC_URL（可以是逗号分隔的多个节点）创建同步节点池"""
+    return RPCPoolProvider(parse_rpc_urls(urls) or ['http://localhost:8545'], **_pool_options())
+
+
+def async_pool_from_env(urls: Optional[str]) -> AsyncRPCPoolProvider:
+    """根据 ETHEREUM_RPC_URL 创建异步节点池"""
+    return AsyncRPCPoolProvider(parse_rpc_urls(urls) or ['http://localhost:8545'], **_pool_options())
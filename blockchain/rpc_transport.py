@@ -0,0 +1,323 @@
+"""
+JSON-RPC 批量传输层
+使用带连接池的长连接HTTP会话，并把同时发出的读请求合并为一个JSON-RPC批量请求，
+减少套接字创建、TLS握手和HTTP往返
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+from web3._utils.method_formatters import PYTHONIC_RESULT_FORMATTERS
+from web3.datastructures import AttributeDict
+
+# 只读方法可以安全地合并发送；交易广播等写请求总是单独发送
+BATCHABLE_METHODS = frozenset({
+    'eth_chainId',
+    'eth_blockNumber',
+    'eth_gasPrice',
+    'eth_maxPriorityFeePerGas',
+    'eth_feeHistory',
+    'eth_call',
+    'eth_estimateGas',
+    'eth_getBalance',
+    'eth_getCode',
+    'eth_getTransactionCount',
+    'eth_getTransactionReceipt',
+    'eth_getTransactionByHash',
+    'eth_getBlockByNumber',
+    'net_version',
+    'web3_clientVersion',
+})
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_TIMEOUT = 30
+
+RPCCall = Tuple[str, Sequence[Any]]
+
+
+class _PendingRequest:
+    def __init__(self, request: Dict):
+        self.request = request
+        self.response: Optional[Dict] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+
+
+class BatchHTTPProvider(HTTPProvider):
+    """
+    带连接池和自动批量合并的同步HTTP Provider
+
+    所有线程共用一个 requests.Session（最多 pool_size 个长连接）。
+    只读请求先进入队列，有其他读请求正在进行时，第一个请求等待 batch_window 秒收集同时到达的其他请求，
+    再作为一个批量请求发送；没有其他请求时立即发送，单线程调用不增加延迟。batch_window 为0时不合并，逐个发送。
+    """
+
+    def __init__(self, endpoint_uri: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 batch_window: float = DEFAULT_BATCH_WINDOW, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(endpoint_uri, request_kwargs={'timeout': timeout})
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._queue: List[_PendingRequest] = []
+        self._collecting = False
+        # 正在进行（排队、发送或等待响应）的可合并读请求数
+        self._active = 0
+        self.http_requests = 0
+        self.rpc_requests = 0
+
+    def make_request(self, method, params) -> Dict:
+        request = self._build_request(method, params)
+        if method not in BATCHABLE_METHODS or self.batch_window <= 0:
+            return self._post([request])[0]
+
+        pending = _PendingRequest(request)
+        with self._lock:
+            self._queue.append(pending)
+            self._active += 1
+            leader = not self._collecting
+            if leader:
+                self._collecting = True
+                concurrent = self._active > 1
+
+        try:
+            if leader:
+                if concurrent:
+                    # 有并发请求时收集窗口内到达的请求，一起发送
+                    time.sleep(self.batch_window)
+                with self._lock:
+                    batch, self._queue = self._queue, []
+                    self._collecting = False
+                for start in range(0, len(batch), self.max_batch_size):
+                    self._send_pending(batch[start:start + self.max_batch_size])
+
+            pending.done.wait()
+        finally:
+            with self._lock:
+                self._active -= 1
+        if pending.error:
+            raise pending.error
+        return pending.response
+
+    def make_batch_request(self, calls: Sequence[RPCCall]) -> List[Dict]:
+        """在一个HTTP请求中发送多个JSON-RPC调用，按调用顺序返回原始响应"""
+        requests_ = [self._build_request(method, params) for method, params in calls]
+        responses = []
+        for start in range(0, len(requests_), self.max_batch_size):
+            responses.extend(self._post(requests_[start:start + self.max_batch_size]))
+        return responses
+
+    def stats(self) -> Dict:
+        """传输统计：JSON-RPC调用数与实际HTTP请求数"""
+        return {'rpc_requests': self.rpc_requests, 'http_requests': self.http_requests}
+
+    def _build_request(self, method, params) -> Dict:
+        return {'jsonrpc': '2.0', 'method': method, 'params': params or [], 'id': next(self.request_counter)}
+
+    def _send_pending(self, batch: List[_PendingRequest]) -> None:
+        try:
+            responses = self._post([pending.request for pending in batch])
+            for pending, response in zip(batch, responses):
+                pending.response = response
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def _post(self, requests_: List[Dict]) -> List[Dict]:
+        """发送请求：单个请求按普通JSON-RPC发送，多个请求按批量格式发送"""
+        body = requests_[0] if len(requests_) == 1 else requests_
+        response = self.session.post(
+            self.endpoint_uri,
+            data=_encode(body),
+            headers=self.get_request_headers(),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        with self._lock:
+            self.http_requests += 1
+            self.rpc_requests += len(requests_)
+        return _match_responses(requests_, response.json())
+
+
+class AsyncBatchHTTPProvider(AsyncHTTPProvider):
+    """
+    带连接池和自动批量合并的异步HTTP Provider
+
+    在同一个事件循环中用 asyncio.gather 等方式同时发出的只读请求合并为一个批量请求：
+    先让出一次事件循环收集同一轮发出的请求，有多个请求时再等待 batch_window 秒，只有一个请求时立即发送。
+    """
+
+    def __init__(self, endpoint_uri: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 batch_window: float = DEFAULT_BATCH_WINDOW, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(endpoint_uri)
+        self.pool_size = pool_size
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: List[Tuple[Dict, asyncio.Future]] = []
+        self._flush_scheduled = False
+        # 正在进行（排队、发送或等待响应）的可合并读请求数
+        self._active = 0
+        self.http_requests = 0
+        self.rpc_requests = 0
+
+    async def make_request(self, method, params) -> Dict:
+        request = self._build_request(method, params)
+        if method not in BATCHABLE_METHODS or self.batch_window <= 0:
+            return (await self._post([request]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((request, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.create_task(self._flush())
+        self._active += 1
+        try:
+            return await future
+        finally:
+            self._active -= 1
+
+    async def make_batch_request(self, calls: Sequence[RPCCall]) -> List[Dict]:
+        """在一个HTTP请求中发送多个JSON-RPC调用，按调用顺序返回原始响应"""
+        requests_ = [self._build_request(method, params) for method, params in calls]
+        chunks = [requests_[start:start + self.max_batch_size]
+                  for start in range(0, len(requests_), self.max_batch_size)]
+        results = await asyncio.gather(*[self._post(chunk) for chunk in chunks])
+        return [response for chunk_responses in results for response in chunk_responses]
+
+    def stats(self) -> Dict:
+        """传输统计：JSON-RPC调用数与实际HTTP请求数"""
+        return {'rpc_requests': self.rpc_requests, 'http_requests': self.http_requests}
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _build_request(self, method, params) -> Dict:
+        return {'jsonrpc': '2.0', 'method': method, 'params': params or [], 'id': next(self.request_counter)}
+
+    async def _flush(self) -> None:
+        # 同一轮事件循环中发出的请求都已入队
+        await asyncio.sleep(0)
+        if self._active > 1:
+            await asyncio.sleep(self.batch_window)
+        batch, self._queue = self._queue, []
+        self._flush_scheduled = False
+        chunks = [batch[start:start + self.max_batch_size] for start in range(0, len(batch), self.max_batch_size)]
+        await asyncio.gather(*[self._send_pending(chunk) for chunk in chunks])
+
+    async def _send_pending(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        try:
+            responses = await self._post([request for request, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp会话绑定创建它的事件循环，循环变化时重建
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, raise_for_status=True)
+            self._session_loop = loop
+        return self._session
+
+    async def _post(self, requests_: List[Dict]) -> List[Dict]:
+        body = requests_[0] if len(requests_) == 1 else requests_
+        session = self._get_session()
+        async with session.post(
+            self.endpoint_uri,
+            data=_encode(body),
+            headers=self.get_request_headers(),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as response:
+            payload = await response.json(content_type=None)
+        self.http_requests += 1
+        self.rpc_requests += len(requests_)
+        return _match_responses(requests_, payload)
+
+
+def _encode(body) -> str:
+    return FriendlyJsonSerde().json_encode(body, Web3JsonEncoder)
+
+
+def _match_responses(requests_: List[Dict], payload) -> List[Dict]:
+    """按id把批量响应对应回请求（节点返回的顺序不一定与请求一致）"""
+    if len(requests_) == 1 and isinstance(payload, dict):
+        return [payload]
+    if not isinstance(payload, list):
+        # 节点不支持批量请求时会返回单个错误对象
+        raise ValueError(f"节点不支持JSON-RPC批量请求: {payload}")
+    by_id = {response.get('id'): response for response in payload}
+    return [by_id.get(request['id'], {'id': request['id'], 'error': {'message': '批量响应中缺少该请求'}})
+            for request in requests_]
+
+
+def supports_batch(w3) -> bool:
+    """Web3实例的Provider是否支持批量请求"""
+    return hasattr(getattr(w3, 'provider', None), 'make_batch_request')
+
+
+def format_batch_results(calls: Sequence[RPCCall], responses: List[Dict]) -> List[Any]:
+    """把批量请求的原始响应转换为与web3方法相同的Python类型，任何一个调用出错时抛出ValueError"""
+    results = []
+    for (method, _), response in zip(calls, responses):
+        if response.get('error'):
+            raise ValueError(response['error'])
+        result = response.get('result')
+        formatter = PYTHONIC_RESULT_FORMATTERS.get(method)
+        if formatter and result is not None:
+            result = formatter(result)
+        results.append(AttributeDict.recursive(result) if isinstance(result, dict) else result)
+    return results
+
+
+def batch_request(w3, calls: Sequence[RPCCall]) -> List[Any]:
+    """通过一个HTTP请求执行多个只读调用"""
+    return format_batch_results(calls, w3.provider.make_batch_request(calls))
+
+
+async def batch_request_async(w3, calls: Sequence[RPCCall]) -> List[Any]:
+    """异步通过一个HTTP请求执行多个只读调用"""
+    return format_batch_results(calls, await w3.provider.make_batch_request(calls))
+
+
+def provider_options_from_env() -> Dict:
+    """从环境变量读取单节点Provider的连接池和批量合并参数"""
+    return {
+        'pool_size': int(os.getenv('RPC_POOL_SIZE', DEFAULT_POOL_SIZE)),
+        'batch_window': float(os.getenv('RPC_BATCH_WINDOW', DEFAULT_BATCH_WINDOW)),
+        'max_batch_size': int(os.getenv('RPC_MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE)),
+        'timeout': float(os.getenv('RPC_TIMEOUT', DEFAULT_TIMEOUT))
+    }
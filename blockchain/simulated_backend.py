@@ -0,0 +1,385 @@
+"""
+模拟区块链后端
+合约地址为零地址（测试模式）时代替链上合约：按种子生成任意数量的模拟任务，
+认领、完成、余额和工人统计保存在线程安全的内存状态中，并可注入每次调用的延迟，
+用于在没有链的情况下以接近生产的规模压测API和Agent
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+MAX_TASK_COUNT = 100000
+DEFAULT_TASK_COUNT = 5
+
+# 任务模板：前几个任务与原测试模式数据一致，之后的任务按种子在模板基础上生成
+TASK_TEMPLATES = [
+    {
+        'publisher': '0x1234567890123456789012345678901234567890',
+        'title': {'zh': '编写技术博客文章', 'en': 'Write Technical Blog Post'},
+        'description': {
+            'zh': '需要一篇关于区块链技术的技术博客文章，字数1000-1500字',
+            'en': 'Need a technical blog post about blockchain technology, 1000-1500 words'
+        },
+        'reward': 1000000000000000000,  # 1 ETH
+        'deadline': 1641081600,
+        'taskType': 'content_writing',
+        'requirements': {
+            'zh': '技术准确，语言流畅，结构清晰',
+            'en': 'Technically accurate, fluent language, clear structure'
+        }
+    },
+    {
+        'publisher': '0x2345678901234567890123456789012345678901',
+        'title': {'zh': '开发智能合约', 'en': 'Develop Smart Contract'},
+        'description': {
+            'zh': '开发一个简单的ERC-20代币合约，包含基本的转账功能',
+            'en': 'Develop a simple ERC-20 token contract with basic transfer functionality'
+        },
+        'reward': 2000000000000000000,  # 2 ETH
+        'deadline': 1641168000,
+        'taskType': 'programming',
+        'requirements': {
+            'zh': '代码规范，注释完整，测试通过',
+            'en': 'Code standards, complete comments, tests passed'
+        }
+    },
+    {
+        'publisher': '0x3456789012345678901234567890123456789012',
+        'title': {'zh': '设计UI界面', 'en': 'Design UI Interface'},
+        'description': {
+            'zh': '为DeFi应用设计现代化的用户界面，包含钱包连接功能',
+            'en': 'Design a modern user interface for DeFi application with wallet connection functionality'
+        },
+        'reward': 1500000000000000000,  # 1.5 ETH
+        'deadline': 1641254400,
+        'taskType': 'design',
+        'requirements': {
+            'zh': '现代化设计，用户体验良好，响应式布局',
+            'en': 'Modern design, good user experience, responsive layout'
+        }
+    },
+    {
+        'publisher': '0x4567890123456789012345678901234567890123',
+        'title': {'zh': '翻译技术文档', 'en': 'Translate Technical Documentation'},
+        'description': {
+            'zh': '将英文技术文档翻译成中文，保持专业术语的准确性',
+            'en': 'Translate English technical documentation to Chinese, maintaining accuracy of professional terms'
+        },
+        'reward': 800000000000000000,  # 0.8 ETH
+        'deadline': 1641340800,
+        'taskType': 'translation',
+        'requirements': {
+            'zh': '翻译准确，术语统一，语言流畅',
+            'en': 'Accurate translation, unified terminology, fluent language'
+        }
+    },
+    {
+        'publisher': '0x5678901234567890123456789012345678901234',
+        'title': {'zh': '市场调研报告', 'en': 'Market Research Report'},
+        'description': {
+            'zh': '对DeFi市场进行深入调研，分析当前趋势和机会',
+            'en': 'Conduct in-depth research on DeFi market, analyze current trends and opportunities'
+        },
+        'reward': 3000000000000000000,  # 3 ETH
+        'deadline': 1641427200,
+        'taskType': 'research',
+        'requirements': {
+            'zh': '数据准确，分析深入，结论有价值',
+            'en': 'Accurate data, in-depth analysis, valuable conclusions'
+        }
+    }
+]
+
+CREATED_AT = 1640995200
+SIMULATED_CHAIN_ID = 1337
+INITIAL_REPUTATION = 50
+REPUTATION_PER_TASK = 5
+
+
+class SimulatedBackend:
+    """
+    内存中的模拟任务合约
+
+    任务数据由 (种子, 任务ID) 确定性生成，不在内存中保存，只保存认领/完成状态，
+    因此10万个任务也只占用很少的内存。所有状态读写都在同一把锁内完成。
+    """
+
+    def __init__(self, task_count: int = DEFAULT_TASK_COUNT, seed: int = 0,
+                 latency: float = 0.0, latency_jitter: float = 0.0, initial_balance: int = 0):
+        if not 0 <= task_count <= MAX_TASK_COUNT:
+            raise ValueError(f"模拟任务数必须在0到{MAX_TASK_COUNT}之间")
+        self.task_count = task_count
+        self.seed = seed
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.initial_balance = initial_balance
+
+        self._lock = threading.Lock()
+        self._latency_random = random.Random(seed)
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> 'SimulatedBackend':
+        """根据环境变量创建模拟后端"""
+        return cls(
+            task_count=int(os.getenv('SIMULATOR_TASK_COUNT', DEFAULT_TASK_COUNT)),
+            seed=int(os.getenv('SIMULATOR_SEED', 0)),
+            latency=float(os.getenv('SIMULATOR_LATENCY', 0)),
+            latency_jitter=float(os.getenv('SIMULATOR_LATENCY_JITTER', 0)),
+            initial_balance=int(os.getenv('SIMULATOR_INITIAL_BALANCE', 0))
+        )
+
+    def reset(self) -> None:
+        """清空所有认领、完成、余额和工人统计"""
+        with self._lock:
+            # dict 作为有序集合：按任务ID顺序保存尚未认领的任务
+            self._open_tasks: Dict[int, None] = dict.fromkeys(range(1, self.task_count + 1))
+            self._workers_by_task: Dict[int, str] = {}
+            # 已完成任务 -> (结果摘要, 定位符)，与合约一样只保存链下结果的摘要
+            self._completed: Dict[int, Tuple[str, str]] = {}
+            self._worker_stats: Dict[str, Dict] = {}
+            self._worker_tasks: Dict[str, List[int]] = {}
+            self._balances: Dict[str, int] = {}
+            # 每笔成功的认领/完成交易出一个块
+            self._block_number = 0
+
+    # ---- 与区块链客户端相同的接口 ----
+
+    def get_available_tasks(self) -> List[int]:
+        return self._call(self._available_tasks)
+
+    def get_task(self, task_id: int) -> Optional[Dict]:
+        return self._call(self._task, task_id)
+
+    def get_tasks(self, task_ids: List[int]) -> List[Dict]:
+        return self._call(self._tasks, task_ids)
+
+    def claim_task(self, task_id: int, worker: str) -> bool:
+        return self._call(self._claim, task_id, worker)
+
+    def complete_task(self, task_id: int, worker: str, result_digest: str, result_locator: str) -> bool:
+        return self._call(self._complete, task_id, worker, result_digest, result_locator)
+
+    def get_task_result(self, task_id: int) -> Optional[Tuple[str, str]]:
+        return self._call(self._task_result, task_id)
+
+    def preflight_claim(self, task_id: int, worker: str) -> Optional[str]:
+        """认领会失败时返回与合约相同的回滚信息，否则返回None"""
+        return self._call(self._preflight_claim, task_id, worker)
+
+    def preflight_complete(self, task_id: int, worker: str, result_digest: str) -> Optional[str]:
+        """完成会失败时返回与合约相同的回滚信息，否则返回None"""
+        return self._call(self._preflight_complete, task_id, worker, result_digest)
+
+    def get_worker_info(self, worker: str) -> Dict:
+        return self._call(self._worker_info, worker)
+
+    def get_worker_tasks(self, worker: str) -> List[int]:
+        return self._call(self._worker_task_ids, worker)
+
+    def get_balance(self, address: str) -> int:
+        return self._call(self._balance, address)
+
+    def get_fee_info(self) -> Dict:
+        return self._call(self._fee_info)
+
+    def get_network_info(self) -> Dict:
+        return self._call(self._network_info)
+
+    async def call_async(self, name: str, *args):
+        """异步调用上述接口（用 asyncio.sleep 注入延迟，不阻塞事件循环）"""
+        await asyncio.sleep(self._next_latency())
+        with self._lock:
+            return getattr(self, _OPERATIONS[name])(*args)
+
+    # ---- 内部实现（调用方持有锁） ----
+
+    def _call(self, operation, *args):
+        delay = self._next_latency()
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            return operation(*args)
+
+    def _next_latency(self) -> float:
+        if not self.latency_jitter:
+            return self.latency
+        with self._lock:
+            jitter = self._latency_random.uniform(-self.latency_jitter, self.latency_jitter)
+        return max(0.0, self.latency + jitter)
+
+    def _available_tasks(self) -> List[int]:
+        return list(self._open_tasks)
+
+    def _task(self, task_id: int) -> Optional[Dict]:
+        if not 1 <= task_id <= self.task_count:
+            return None
+
+        task = self._generate_task(task_id)
+        worker = self._workers_by_task.get(task_id)
+        task['isCompleted'] = task_id in self._completed
+        task['isClaimed'] = worker is not None
+        task['worker'] = worker or ZERO_ADDRESS
+        return task
+
+    def _tasks(self, task_ids: List[int]) -> List[Dict]:
+        tasks = [self._task(task_id) for task_id in task_ids]
+        return [task for task in tasks if task]
+
+    def _claim(self, task_id: int, worker: str) -> bool:
+        if task_id in self._open_tasks:
+            del self._open_tasks[task_id]
+            self._workers_by_task[task_id] = worker
+            self._worker_tasks.setdefault(worker, []).append(task_id)
+            self._block_number += 1
+            return True
+        # 重复认领自己已认领的任务视为成功
+        return self._workers_by_task.get(task_id) == worker and task_id not in self._completed
+
+    def _complete(self, task_id: int, worker: str, result_digest: str, result_locator: str) -> bool:
+        if self._workers_by_task.get(task_id) != worker or task_id in self._completed or not result_digest:
+            return False
+
+        self._completed[task_id] = (result_digest, result_locator)
+        reward = self._generate_task(task_id)['reward']
+        stats = self._stats(worker)
+        stats['completedTasks'] += 1
+        stats['totalEarnings'] += reward
+        stats['reputation'] += REPUTATION_PER_TASK
+        self._balances[worker] = self._balance(worker) + reward
+        self._block_number += 1
+        return True
+
+    def _task_result(self, task_id: int) -> Optional[Tuple[str, str]]:
+        return self._completed.get(task_id)
+
+    def _preflight_claim(self, task_id: int, worker: str) -> Optional[str]:
+        if not 1 <= task_id <= self.task_count:
+            return 'Task does not exist'
+        if task_id in self._completed:
+            return 'Task already completed'
+        claimed_by = self._workers_by_task.get(task_id)
+        if claimed_by is not None and claimed_by != worker:
+            return 'Task already claimed'
+        return None
+
+    def _preflight_complete(self, task_id: int, worker: str, result_digest: str) -> Optional[str]:
+        if not 1 <= task_id <= self.task_count:
+            return 'Task does not exist'
+        if task_id in self._completed:
+            return 'Task already completed'
+        if self._workers_by_task.get(task_id) != worker:
+            return 'Only assigned worker can complete task'
+        if not result_digest:
+            return 'Result digest required'
+        return None
+
+    def _worker_info(self, worker: str) -> Dict:
+        return {'addr': worker, **self._stats(worker)}
+
+    def _worker_task_ids(self, worker: str) -> List[int]:
+        return list(self._worker_tasks.get(worker, []))
+
+    def _balance(self, address: str) -> int:
+        return self._balances.get(address, self.initial_balance)
+
+    def _fee_info(self) -> Dict:
+        # 模拟链上交易不收取Gas费用
+        return {
+            'block_number': self._block_number,
+            'eip1559': False,
+            'base_fee': 0,
+            'priority_fees': {},
+            'max_priority_fee_per_gas': 0,
+            'max_fee_per_gas': 0,
+            'gas_price': 0
+        }
+
+    def _network_info(self) -> Dict:
+        return {
+            'chain_id': SIMULATED_CHAIN_ID,
+            'block_number': self._block_number,
+            'gas_price': 0,
+            'base_fee': 0,
+            'max_priority_fee': 0,
+            'is_connected': True
+        }
+
+    def _stats(self, worker: str) -> Dict:
+        if worker not in self._worker_stats:
+            self._worker_stats[worker] = {
+                'reputation': INITIAL_REPUTATION,
+                'completedTasks': 0,
+                'totalEarnings': 0,
+                'isActive': True
+            }
+        return self._worker_stats[worker]
+
+    def _generate_task(self, task_id: int) -> Dict:
+        """按 (种子, 任务ID) 确定性生成任务数据"""
+        index = task_id - 1
+        template = TASK_TEMPLATES[index % len(TASK_TEMPLATES)]
+        task = {
+            'id': task_id,
+            'publisher': template['publisher'],
+            'title': dict(template['title']),
+            'description': dict(template['description']),
+            'reward': template['reward'],
+            'isCompleted': False,
+            'isClaimed': False,
+            'worker': ZERO_ADDRESS,
+            'createdAt': CREATED_AT,
+            'deadline': template['deadline'],
+            'taskType': template['taskType'],
+            'requirements': dict(template['requirements'])
+        }
+        if index < len(TASK_TEMPLATES):
+            return task
+
+        # 模板之外的任务：奖励、发布者和截止时间由种子决定
+        rng = random.Random(f"{self.seed}:{task_id}")
+        task['publisher'] = '0x' + format(rng.getrandbits(160), '040x')
+        task['title'] = {language: f"{title} #{task_id}" for language, title in template['title'].items()}
+        task['reward'] = rng.randint(1, 50) * 100000000000000000  # 0.1 - 5 ETH
+        task['createdAt'] = CREATED_AT + rng.randint(0, 30 * 86400)
+        task['deadline'] = task['createdAt'] + rng.randint(1, 14) * 86400
+        return task
+
+
+_OPERATIONS = {
+    'get_available_tasks': '_available_tasks',
+    'get_task': '_task',
+    'get_tasks': '_tasks',
+    'claim_task': '_claim',
+    'complete_task': '_complete',
+    'preflight_claim': '_preflight_claim',
+    'preflight_complete': '_preflight_complete',
+    'get_task_result': '_task_result',
+    'get_worker_info': '_worker_info',
+    'get_worker_tasks': '_worker_task_ids',
+    'get_balance': '_balance',
+    'get_fee_info': '_fee_info',
+    'get_network_info': '_network_info'
+}
+
+_default_backend: Optional[SimulatedBackend] = None
+_default_lock = threading.Lock()
+
+
+def get_default_backend() -> SimulatedBackend:
+    """进程内共享的模拟后端（同一进程中的多个客户端看到同一份状态）"""
+    global _default_backend
+    with _default_lock:
+        if _default_backend is None:
+            _default_backend = SimulatedBackend.from_env()
+        return _default_backend
+
+
+def is_simulated_address(address: Optional[str]) -> bool:
+    """合约地址为零地址时使用模拟后端"""
+    return address == ZERO_ADDRESS
@@ -0,0 +1,348 @@
+"""
+链上任务事件索引器
+跟随 TaskContract 的 TaskCreated/TaskClaimed/TaskCompleted 事件，把任务状态维护在本地SQLite中，
+使可用任务列表变成本地查询，而不是每次都对合约做全量扫描
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from eth_utils import event_abi_to_log_topic
+
+from blockchain.multicall import chunked
+
+TRACKED_EVENTS = ('TaskCreated', 'TaskClaimed', 'TaskCompleted')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    publisher TEXT,
+    title TEXT,
+    description TEXT,
+    reward TEXT,
+    is_claimed INTEGER NOT NULL DEFAULT 0,
+    is_completed INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at INTEGER,
+    deadline INTEGER,
+    task_type TEXT,
+    requirements TEXT,
+    created_block INTEGER NOT NULL,
+    claimed_block INTEGER,
+    completed_block INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_open ON tasks (is_claimed, is_completed, deadline);
+CREATE TABLE IF NOT EXISTS blocks (
+    number INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scope (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    contract TEXT NOT NULL,
+    chain_id INTEGER NOT NULL
+);
+"""
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+class TaskIndexer:
+    """
+    TaskContract 事件索引器
+
+    从检查点区块开始按区块范围分批追赶，记录最后处理的区块及其哈希；
+    发现已索引区块的哈希与链上不一致时回滚到分叉点重新处理（浅层重组）。
+    索引数据属于一个 (合约地址, 链ID)，合约重新部署或切换网络后清空索引重新同步。
+    """
+
+    def __init__(self, client, db_path: str = 'data/task_index.db', start_block: int = 0,
+                 batch_size: int = 2000, reorg_depth: int = 12, poll_interval: float = 5.0):
+        self.client = client
+        self.w3 = client.w3
+        self.contract = client.task_contract
+        self.start_block = start_block
+        self.batch_size = batch_size
+        self.reorg_depth = reorg_depth
+        self.poll_interval = poll_interval
+
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._synced = False
+        self._scope_checked = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._events = {name: getattr(self.contract.events, name)() for name in TRACKED_EVENTS}
+        self._topics = {event_abi_to_log_topic(event.abi): name for name, event in self._events.items()}
+
+    @classmethod
+    def from_env(cls, client) -> 'TaskIndexer':
+        """根据环境变量创建索引器"""
+        return cls(
+            client,
+            db_path=os.getenv('TASK_INDEX_DB', 'data/task_index.db'),
+            start_block=int(os.getenv('TASK_INDEX_START_BLOCK', 0)),
+            batch_size=int(os.getenv('TASK_INDEX_BATCH_SIZE', 2000)),
+            reorg_depth=int(os.getenv('TASK_INDEX_REORG_DEPTH', 12)),
+            poll_interval=float(os.getenv('TASK_INDEX_POLL_INTERVAL', 5))
+        )
+
+    # ---- 后台运行 ----
+
+    def start(self) -> None:
+        """启动后台同步线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='task-indexer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台同步线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                print(f"任务索引同步失败: {e}")
+            self._stop_event.wait(self.poll_interval)
+
+    def is_synced(self) -> bool:
+        """索引是否已经追上链头"""
+        return self._synced
+
+    # ---- 同步 ----
+
+    def last_block(self) -> int:
+        """最后处理的区块号"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM checkpoint WHERE key = 'last_block'").fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def sync_once(self) -> int:
+        """追赶到当前链头，返回处理的区块数"""
+        try:
+            if not self._scope_checked:
+                self._check_scope()
+            latest = self.w3.eth.block_number
+            self._handle_reorg()
+
+            processed = 0
+            from_block = self.last_block() + 1
+            while from_block <= latest and not self._stop_event.is_set():
+                to_block = min(latest, from_block + self.batch_size - 1)
+                self._process_range(from_block, to_block)
+                processed += to_block - from_block + 1
+                from_block = to_block + 1
+        except Exception:
+            # 任一步骤失败时无法确认索引追上链头，查询回退到链上读取
+            self._synced = False
+            raise
+
+        self._synced = self.last_block() >= latest
+        return processed
+
+    def _check_scope(self) -> None:
+        """索引数据属于其他合约或其他链时清空，从起始区块重新同步"""
+        contract = self.contract.address.lower()
+        chain_id = self.w3.eth.chain_id
+        with self._lock, self._db:
+            row = self._db.execute("SELECT contract, chain_id FROM scope WHERE id = 0").fetchone()
+            if row != (contract, chain_id):
+                if row is not None:
+                    print(f"任务索引属于合约 {row[0]}（链 {row[1]}），当前为 {contract}（链 {chain_id}），重建索引")
+                self._db.execute("DELETE FROM tasks")
+                self._db.execute("DELETE FROM blocks")
+                self._db.execute("DELETE FROM checkpoint")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO scope (id, contract, chain_id) VALUES (0, ?, ?)", (contract, chain_id)
+                )
+        self._synced = False
+        self._scope_checked = True
+
+    def _process_range(self, from_block: int, to_block: int) -> None:
+        """处理一个区块范围内的事件"""
+        logs = self.w3.eth.get_logs({
+            'address': self.contract.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [list(self._topics.keys())]
+        })
+        events = []
+        for log in logs:
+            name = self._topics.get(bytes(log['topics'][0]))
+            if name:
+                events.append((name, self._events[name].process_log(log)))
+
+        # 新建任务的完整数据通过Multicall批量读取
+        created_ids = [event['args']['taskId'] for name, event in events if name == 'TaskCreated']
+        created_tasks = {task['id']: task for task in self.client._get_tasks_from_chain(created_ids)}
+        missing = sorted(set(created_ids) - set(created_tasks))
+        if missing:
+            # 不推进检查点，下次同步时重新处理这个区块范围
+            raise RuntimeError(f"区块 {from_block}-{to_block} 中的新建任务读取失败: {missing}")
+        block_hash = self.w3.eth.get_block(to_block)['hash'].hex()
+
+        with self._lock, self._db:
+            for name, event in events:
+                task_id = event['args']['taskId']
+                block_number = event['blockNumber']
+                if name == 'TaskCreated':
+                    task = created_tasks.get(task_id)
+                    if task:
+                        self._insert_task(task, block_number)
+                elif name == 'TaskClaimed':
+                    self._db.execute(
+                        "UPDATE tasks SET is_claimed = 1, worker = ?, claimed_block = ? WHERE id = ?",
+                        (event['args']['worker'], block_number, task_id)
+                    )
+                elif name == 'TaskCompleted':
+                    self._db.execute(
+                        "UPDATE tasks SET is_completed = 1, completed_block = ? WHERE id = ?",
+                        (block_number, task_id)
+                    )
+            self._db.execute("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)", (to_block, block_hash))
+            self._db.execute(
+                "DELETE FROM blocks WHERE number < (SELECT MAX(number) FROM blocks) - ?",
+                (self.reorg_depth * 4,)
+            )
+            self._db.execute("INSERT OR REPLACE INTO checkpoint (key, value) VALUES ('last_block', ?)", (to_block,))
+
+    def _insert_task(self, task: Dict, block_number: int) -> None:
+        """写入新任务，事件中的认领/完成状态由后续事件更新"""
+        self._db.execute(
+            """INSERT OR REPLACE INTO tasks
+               (id, publisher, title, description, reward, is_claimed, is_completed, worker,
+                created_at, deadline, task_type, requirements, created_block)
+               VALUES (?, ?, ?, ?, ?, 0, 0, ?, ?, ?, ?, ?, ?)""",
+            (task['id'], task['publisher'], task['title'], task['description'], str(task['reward']),
+             ZERO_ADDRESS, task['createdAt'], task['deadline'], task['taskType'], task['requirements'],
+             block_number)
+        )
+
+    def _handle_reorg(self) -> None:
+        """检测并处理浅层重组"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT number, hash FROM blocks ORDER BY number DESC LIMIT ?", (self.reorg_depth,)
+            ).fetchall()
+        if not rows:
+            return
+
+        for number, block_hash in rows:
+            block = self.w3.eth.get_block(number)
+            if block and block['hash'].hex() == block_hash:
+                if number != rows[0][0]:
+                    print(f"检测到链重组，回滚任务索引到区块 {number}")
+                    self.rollback(number)
+                return
+
+        # 重组深度超过保存的区块哈希，重新建立索引
+        print("链重组超过可回滚深度，重建任务索引")
+        self.rollback(self.start_block - 1)
+
+    def rollback(self, block_number: int) -> None:
+        """撤销区块号大于 block_number 的所有事件效果"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM tasks WHERE created_block > ?", (block_number,))
+            self._db.execute(
+                "UPDATE tasks SET is_claimed = 0, worker = ?, claimed_block = NULL WHERE claimed_block > ?",
+                (ZERO_ADDRESS, block_number)
+            )
+            self._db.execute(
+                "UPDATE tasks SET is_completed = 0, completed_block = NULL WHERE completed_block > ?",
+                (block_number,)
+            )
+            self._db.execute("DELETE FROM blocks WHERE number > ?", (block_number,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoint (key, value) VALUES ('last_block', ?)", (block_number,)
+            )
+        self._synced = False
+
+    # ---- 本地写入（自己发送的交易上链后立即生效，事件到达后幂等覆盖） ----
+
+    def record_claim(self, task_id: int, worker: str, block_number: int) -> None:
+        """记录本账户的认领"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE tasks SET is_claimed = 1, worker = ?, claimed_block = ? WHERE id = ?",
+                (worker, block_number, task_id)
+            )
+
+    def record_completion(self, task_id: int, block_number: int) -> None:
+        """记录本账户的完成"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE tasks SET is_completed = 1, completed_block = ? WHERE id = ?",
+                (block_number, task_id)
+            )
+
+    # ---- 查询 ----
+
+    def get_available_task_ids(self, now: Optional[int] = None) -> List[int]:
+        """查询未认领、未完成且未过期的任务"""
+        now = int(time.time()) if now is None else now
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM tasks WHERE is_claimed = 0 AND is_completed = 0 AND deadline >= ? ORDER BY id",
+                (now,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_task(self, task_id: int) -> Optional[Dict]:
+        """查询单个任务，返回与 BlockchainClient.get_task 相同的结构"""
+        tasks = self.get_tasks([task_id])
+        return tasks[0] if tasks else None
+
+    def get_tasks(self, task_ids: List[int]) -> List[Dict]:
+        """批量查询任务，索引中不存在的任务会被跳过"""
+        by_id = {}
+        # 分批查询，避免超出SQLite的参数数量限制
+        for chunk in chunked(list(task_ids), 500):
+            placeholders = ','.join('?' * len(chunk))
+            with self._lock:
+                rows = self._db.execute(
+                    f"""SELECT id, publisher, title, description, reward, is_completed, is_claimed, worker,
+                               created_at, deadline, task_type, requirements
+                        FROM tasks WHERE id IN ({placeholders})""",
+                    chunk
+                ).fetchall()
+            by_id.update((row[0], self._row_to_task(row)) for row in rows)
+        return [by_id[task_id] for task_id in task_ids if task_id in by_id]
+
+    def _row_to_task(self, row) -> Dict:
+        return {
+            'id': row[0],
+            'publisher': row[1],
+            'title': row[2],
+            'description': row[3],
+            'reward': int(row[4]),
+            'isCompleted': bool(row[5]),
+            'isClaimed': bool(row[6]),
+            'worker': row[7],
+            'createdAt': row[8],
+            'deadline': row[9],
+            'taskType': row[10],
+            'requirements': row[11]
+        }
+
+    def close(self) -> None:
+        """关闭索引器"""
+        self.stop()
+        with self._lock:
+            self._db.close()
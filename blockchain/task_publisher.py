@@ -0,0 +1,298 @@
+"""
+批量任务发布
+按可配置的分布（任务类型权重、奖励区间、截止时间区间）生成任务，通过 createTasks 分批发布；
+nonce由本地分配器连续分配，最多 window 笔交易同时在途（流水线），用于在进程内EVM或本地开发链上
+生成大量开放任务，对索引器、API和Agent做压测
+"""
+
+import json
+import math
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from blockchain.gas_estimator import GasEstimator
+from blockchain.nonce_manager import NonceManager
+from blockchain.simulated_backend import TASK_TEMPLATES
+
+# 合约产物不存在时发布所需的最小ABI
+PUBLISHER_ABI = [
+    {
+        "inputs": [
+            {"internalType": "string", "name": "title", "type": "string"},
+            {"internalType": "string", "name": "description", "type": "string"},
+            {"internalType": "uint256", "name": "reward", "type": "uint256"},
+            {"internalType": "uint256", "name": "deadline", "type": "uint256"},
+            {"internalType": "string", "name": "taskType", "type": "string"},
+            {"internalType": "string", "name": "requirements", "type": "string"}
+        ],
+        "name": "createTask",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "string", "name": "title", "type": "string"},
+                    {"internalType": "string", "name": "description", "type": "string"},
+                    {"internalType": "uint256", "name": "reward", "type": "uint256"},
+                    {"internalType": "uint256", "name": "deadline", "type": "uint256"},
+                    {"internalType": "string", "name": "taskType", "type": "string"},
+                    {"internalType": "string", "name": "requirements", "type": "string"}
+                ],
+                "internalType": "struct TaskContract.NewTask[]",
+                "name": "newTasks",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "createTasks",
+        "outputs": [{"internalType": "uint256", "name": "firstTaskId", "type": "uint256"}],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "getTaskCount",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "internalType": "uint256", "name": "taskId", "type": "uint256"},
+            {"indexed": True, "internalType": "address", "name": "publisher", "type": "address"},
+            {"indexed": False, "internalType": "string", "name": "title", "type": "string"},
+            {"indexed": False, "internalType": "uint256", "name": "reward", "type": "uint256"}
+        ],
+        "name": "TaskCreated",
+        "type": "event"
+    }
+]
+
+# 单个任务的默认Gas上限（Gas估算失败时按批量大小放大）
+CREATE_TASK_GAS = 400000
+WEI_PER_ETH = 10 ** 18
+
+
+class TaskDistribution:
+    """
+    任务参数分布
+
+    task_types 为 任务类型 -> 权重；奖励（ETH）在 [reward_min, reward_max] 内按 uniform 或 lognormal 分布抽取，
+    lognormal 时中位数为区间的几何平均；截止时间为发布时刻之后 [deadline_min_hours, deadline_max_hours] 内均匀分布。
+    相同的种子生成相同的任务序列。
+    """
+
+    def __init__(self, task_types: Optional[Dict[str, float]] = None, reward_min: float = 0.1, reward_max: float = 5.0,
+                 reward_distribution: str = 'uniform', deadline_min_hours: float = 24, deadline_max_hours: float = 336,
+                 language: str = 'zh', seed: int = 0):
+        templates = {template['taskType']: template for template in TASK_TEMPLATES}
+        self.task_types = task_types or {task_type: 1.0 for task_type in templates}
+        unknown = set(self.task_types) - set(templates)
+        if unknown:
+            raise ValueError(f"未知的任务类型: {', '.join(sorted(unknown))}")
+        if not 0 < reward_min <= reward_max:
+            raise ValueError("奖励区间无效")
+        if reward_distribution not in ('uniform', 'lognormal'):
+            raise ValueError(f"不支持的奖励分布: {reward_distribution}")
+        if not 0 < deadline_min_hours <= deadline_max_hours:
+            raise ValueError("截止时间区间无效")
+
+        self.templates = templates
+        self.reward_min = reward_min
+        self.reward_max = reward_max
+        self.reward_distribution = reward_distribution
+        self.deadline_min_hours = deadline_min_hours
+        self.deadline_max_hours = deadline_max_hours
+        self.language = language
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> 'TaskDistribution':
+        """从配置字典创建，格式同 from_file"""
+        reward = config.get('reward_eth', {})
+        deadline = config.get('deadline_hours', {})
+        return cls(
+            task_types=config.get('task_types'),
+            reward_min=reward.get('min', 0.1),
+            reward_max=reward.get('max', 5.0),
+            reward_distribution=reward.get('distribution', 'uniform'),
+            deadline_min_hours=deadline.get('min', 24),
+            deadline_max_hours=deadline.get('max', 336),
+            language=config.get('language', 'zh'),
+            seed=config.get('seed', 0)
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> 'TaskDistribution':
+        """
+        从JSON文件创建，例如：
+        {"task_types": {"programming": 3, "translation": 1},
+         "reward_eth": {"min": 0.1, "max": 5, "distribution": "lognormal"},
+         "deadline_hours": {"min": 24, "max": 168}, "language": "zh", "seed": 7}
+        """
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def sample(self, count: int, now: int, start_index: int = 0) -> List[Dict]:
+        """生成 count 个任务参数（createTask 的参数字典）"""
+        rng = random.Random(f"{self.seed}:{start_index}")
+        task_types = list(self.task_types)
+        weights = [self.task_types[task_type] for task_type in task_types]
+        tasks = []
+        for index in range(start_index, start_index + count):
+            template = self.templates[rng.choices(task_types, weights)[0]]
+            tasks.append({
+                'title': f"{self._text(template['title'])} #{index + 1}",
+                'description': self._text(template['description']),
+                'reward': self._reward(rng),
+                'deadline': now + int(rng.uniform(self.deadline_min_hours, self.deadline_max_hours) * 3600),
+                'taskType': template['taskType'],
+                'requirements': self._text(template['requirements'])
+            })
+        return tasks
+
+    def _text(self, texts: Dict[str, str]) -> str:
+        return texts.get(self.language, texts['en'])
+
+    def _reward(self, rng: random.Random) -> int:
+        if self.reward_distribution == 'lognormal':
+            low, high = math.log(self.reward_min), math.log(self.reward_max)
+            # 区间约覆盖均值两侧各两个标准差，超出部分截断
+            value = math.exp(min(max(rng.gauss((low + high) / 2, (high - low) / 4), low), high))
+        else:
+            value = rng.uniform(self.reward_min, self.reward_max)
+        # 精确到 0.001 ETH
+        return max(int(round(value * 1000)), 1) * (WEI_PER_ETH // 1000)
+
+
+class TaskPublisher:
+    """
+    批量任务发布器
+
+    account 为本地签名账户（开发链上的私钥）；为None时用节点托管的 sender 账户直接发送（eth-tester、anvil等）。
+    合约没有 createTasks 时退化为每笔交易一个 createTask。
+    """
+
+    def __init__(self, w3, task_contract, sender: Optional[str] = None, account=None, batch_size: int = 50,
+                 window: int = 16, receipt_timeout: float = 120, gas_estimator: Optional[GasEstimator] = None):
+        if account is None and sender is None:
+            raise ValueError("需要指定签名账户或发送地址")
+        self.w3 = w3
+        self.task_contract = task_contract
+        self.account = account
+        self.sender = account.address if account is not None else sender
+        self.supports_batch = any(item.get('name') == 'createTasks' for item in task_contract.abi)
+        self.batch_size = max(batch_size, 1) if self.supports_batch else 1
+        self.window = max(window, 1)
+        self.receipt_timeout = receipt_timeout
+        self.gas_estimator = gas_estimator or GasEstimator()
+        self.nonce_manager = NonceManager()
+        self._created_topic = self.w3.keccak(text='TaskCreated(uint256,address,string,uint256)')
+
+    def publish(self, count: int, distribution: TaskDistribution, now: Optional[int] = None,
+                progress: bool = False) -> Dict:
+        """发布 count 个任务，返回发布统计"""
+        now = now or self.w3.eth.get_block('latest')['timestamp']
+        tasks = distribution.sample(count, now)
+        batches = [tasks[start:start + self.batch_size] for start in range(0, len(tasks), self.batch_size)]
+
+        report = {
+            'requested': count,
+            'created': 0,
+            'failed': 0,
+            'transactions': 0,
+            'gas_used': 0,
+            'task_ids': []
+        }
+        started = time.monotonic()
+        in_flight = deque()
+        for batch in batches:
+            # 在途交易达到窗口上限时先等待最早的一笔上链
+            if len(in_flight) >= self.window:
+                self._settle(in_flight.popleft(), report)
+            try:
+                in_flight.append((*self._send(batch), batch))
+            except Exception as e:
+                print(f"发布 {len(batch)} 个任务失败: {e}")
+                report['failed'] += len(batch)
+                continue
+            report['transactions'] += 1
+            if progress:
+                print(f"📤 已广播 {report['transactions']}/{len(batches)} 笔交易")
+        while in_flight:
+            self._settle(in_flight.popleft(), report)
+
+        elapsed = time.monotonic() - started
+        report['task_ids'].sort()
+        report['elapsed_seconds'] = elapsed
+        report['tasks_per_second'] = report['created'] / elapsed if elapsed > 0 else None
+        report['gas_per_task'] = report['gas_used'] // report['created'] if report['created'] else None
+        return report
+
+    def _contract_function(self, batch: List[Dict]):
+        functions = self.task_contract.functions
+        if self.supports_batch:
+            return functions.createTasks([
+                (task['title'], task['description'], task['reward'], task['deadline'], task['taskType'],
+                 task['requirements'])
+                for task in batch
+            ])
+        task = batch[0]
+        return functions.createTask(
+            task['title'], task['description'], task['reward'], task['deadline'], task['taskType'], task['requirements']
+        )
+
+    def _send(self, batch: List[Dict]) -> tuple:
+        """分配nonce并广播一批任务的交易，返回 (交易哈希, nonce)"""
+        contract_function = self._contract_function(batch)
+        gas = self.gas_estimator.estimate(contract_function, self.sender, CREATE_TASK_GAS * len(batch))
+        nonce = self.nonce_manager.allocate(lambda: self.w3.eth.get_transaction_count(self.sender, 'pending'))
+        if self.account is None:
+            # 由节点签名：构建和广播在同一次调用中，失败时无法区分，按广播失败处理
+            try:
+                tx_hash = contract_function.transact({'from': self.sender, 'nonce': nonce, 'gas': gas})
+            except Exception:
+                self.nonce_manager.reject(nonce)
+                raise
+        else:
+            try:
+                transaction = contract_function.build_transaction({'from': self.sender, 'nonce': nonce, 'gas': gas})
+                signed_txn = self.account.sign_transaction(transaction)
+            except Exception:
+                self.nonce_manager.release(nonce)
+                raise
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            except Exception:
+                self.nonce_manager.reject(nonce)
+                raise
+        self.gas_estimator.register(tx_hash, contract_function, gas)
+        return tx_hash, nonce
+
+    def _settle(self, entry, report: Dict) -> None:
+        """等待一笔交易上链并记录结果"""
+        tx_hash, nonce, batch = entry
+        try:
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout)
+        except Exception as e:
+            print(f"等待交易 {tx_hash.hex()} 上链失败: {e}")
+            self.nonce_manager.invalidate()
+            report['failed'] += len(batch)
+            return
+
+        self.nonce_manager.confirm(nonce)
+        self.gas_estimator.observe(tx_hash, receipt)
+        report['gas_used'] += receipt['gasUsed']
+        task_ids = [
+            int.from_bytes(bytes(log['topics'][1]), 'big') for log in receipt['logs']
+            if log['address'] == self.task_contract.address and log['topics']
+            and bytes(log['topics'][0]) == bytes(self._created_topic)
+        ]
+        report['created'] += len(task_ids)
+        report['failed'] += len(batch) - len(task_ids)
+        report['task_ids'].extend(task_ids)
@@ -0,0 +1,295 @@
+"""
+卡住交易监督器
+跟踪本账户已广播但未上链的交易，超过指定区块数仍未打包时用相同nonce、提高后的费用重新广播替换交易，
+使认领/提交在费用飙升时的上链延迟保持有界
+"""
+
+import math
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set
+
+from hexbytes import HexBytes
+
+# 节点接受同nonce替换交易要求的最小费用涨幅（geth/erigon默认10%）
+MIN_REPLACEMENT_BUMP_PERCENT = 10
+# 替换交易广播时表示原交易已上链或已在交易池中的错误
+_ALREADY_HANDLED_ERRORS = ('nonce too low', 'already known', 'known transaction')
+
+
+class _SupervisedTransaction:
+    def __init__(self, transaction: Dict, tx_hash: HexBytes, block_number: Optional[int], account):
+        self.transaction = dict(transaction)
+        self.account = account
+        self.hashes: List[HexBytes] = [tx_hash]
+        # 仍在等待回执的交易哈希（原交易和所有替换交易中任意一个上链即完成）
+        self.pending_hashes: Set[HexBytes] = {tx_hash}
+        self.sent_block = block_number
+        self.sent_at = time.monotonic()
+        self.replacements = 0
+        self.fee_capped = False
+        self.future: Optional[Future] = None
+
+    @property
+    def nonce(self) -> int:
+        return self.transaction['nonce']
+
+
+class TransactionSupervisor:
+    """
+    交易监督器
+
+    register() 登记已广播的交易，track() 代替 ReceiptTracker.track() 返回回执Future：
+    原交易或任意一笔替换交易上链即以该回执完成。后台线程每轮检查一次，交易在 stuck_blocks 个区块后仍未上链时，
+    按 bump_percent（不低于节点要求的10%）同时提高 maxFeePerGas/maxPriorityFeePerGas（或gasPrice），
+    并且不低于当前市场费用、不超过 max_fee_per_gas 上限后重新签名广播。
+    上限内无法满足替换规则时不再替换该交易。
+    """
+
+    def __init__(self, w3, account, receipt_tracker, fee_oracle, stuck_blocks: int = 3,
+                 bump_percent: float = 12.5, max_fee_per_gas: Optional[int] = None, max_replacements: int = 5,
+                 poll_interval: float = 2.0, enabled: bool = True):
+        self.w3 = w3
+        self.account = account
+        self.receipt_tracker = receipt_tracker
+        self.fee_oracle = fee_oracle
+        self.stuck_blocks = stuck_blocks
+        self.bump_percent = max(bump_percent, MIN_REPLACEMENT_BUMP_PERCENT)
+        self.max_fee_per_gas = max_fee_per_gas
+        self.max_replacements = max_replacements
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._by_hash: Dict[HexBytes, _SupervisedTransaction] = {}
+        # (发送账户, nonce) -> 监督中的交易
+        self._tracked: Dict[tuple, _SupervisedTransaction] = {}
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._stuck_detected = 0
+        self._replacements = 0
+        self._replacement_failures = 0
+        self._fee_cap_hits = 0
+        self._confirmed = 0
+        self._confirmed_after_replacement = 0
+        self._latencies = deque(maxlen=500)
+
+    @classmethod
+    def from_env(cls, w3, account, receipt_tracker, fee_oracle) -> 'TransactionSupervisor':
+        """根据环境变量创建监督器，TX_MAX_FEE_GWEI 为0表示不设上限"""
+        max_fee_gwei = float(os.getenv('TX_MAX_FEE_GWEI', 500))
+        return cls(
+            w3, account, receipt_tracker, fee_oracle,
+            stuck_blocks=int(os.getenv('TX_STUCK_BLOCKS', 3)),
+            bump_percent=float(os.getenv('TX_FEE_BUMP_PERCENT', 12.5)),
+            max_fee_per_gas=int(max_fee_gwei * 10 ** 9) if max_fee_gwei > 0 else None,
+            max_replacements=int(os.getenv('TX_MAX_REPLACEMENTS', 5)),
+            poll_interval=float(os.getenv('TX_SUPERVISOR_POLL_INTERVAL', 2)),
+            enabled=os.getenv('TX_SUPERVISOR_ENABLED', 'true').lower() == 'true'
+        )
+
+    def register(self, tx_hash, transaction: Dict, account=None) -> None:
+        """登记一笔已广播的交易（签名前的交易字段），account 为发送账户（默认为监督器的账户）"""
+        if not self.enabled:
+            return
+        tx_hash = HexBytes(tx_hash)
+        item = _SupervisedTransaction(transaction, tx_hash, self._block_number(), account or self.account)
+        with self._lock:
+            self._by_hash[tx_hash] = item
+
+    def track(self, tx_hash, callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """返回交易回执Future；未登记的交易直接交给回执跟踪器"""
+        tx_hash = HexBytes(tx_hash)
+        with self._lock:
+            item = self._by_hash.pop(tx_hash, None)
+            if item is not None:
+                item.future = Future()
+                self._tracked[(item.account.address, item.nonce)] = item
+        if item is None:
+            return self.receipt_tracker.track(tx_hash, callback=callback)
+
+        if callback:
+            item.future.add_done_callback(callback)
+        self.receipt_tracker.track(tx_hash, callback=partial(self._on_receipt, item, tx_hash))
+        self._ensure_running()
+        return item.future
+
+    def pending_count(self) -> int:
+        """监督中尚未上链的交易数"""
+        with self._lock:
+            return len(self._tracked)
+
+    def stop(self) -> None:
+        """停止后台线程"""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def check_once(self) -> int:
+        """检查一轮，替换已卡住的交易，返回本轮替换的交易数"""
+        block_number = self._block_number()
+        if block_number is None:
+            return 0
+
+        with self._lock:
+            stuck = [
+                item for item in self._tracked.values()
+                if item.sent_block is not None and block_number - item.sent_block >= self.stuck_blocks
+                and item.replacements < self.max_replacements and not item.fee_capped
+            ]
+
+        replaced = 0
+        for item in stuck:
+            with self._lock:
+                self._stuck_detected += 1
+            if self._replace(item, block_number):
+                replaced += 1
+        return replaced
+
+    def stats(self) -> Dict:
+        """替换统计和从广播到上链的延迟（秒）"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                'enabled': self.enabled,
+                'pending': len(self._tracked),
+                'stuck_detected': self._stuck_detected,
+                'replacements': self._replacements,
+                'replacement_failures': self._replacement_failures,
+                'fee_cap_hits': self._fee_cap_hits,
+                'confirmed': self._confirmed,
+                'confirmed_after_replacement': self._confirmed_after_replacement,
+                'avg_confirmation_seconds': statistics.mean(latencies) if latencies else None,
+                'p95_confirmation_seconds': latencies[int(len(latencies) * 0.95)] if latencies else None,
+                'max_confirmation_seconds': latencies[-1] if latencies else None
+            }
+
+    # ---- 内部实现 ----
+
+    def _block_number(self) -> Optional[int]:
+        try:
+            return self.fee_oracle.latest_block_number()
+        except Exception:
+            return None
+
+    def _ensure_running(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='tx-supervisor', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            try:
+                self.check_once()
+            except Exception as e:
+                print(f"检查卡住的交易失败: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _on_receipt(self, item: _SupervisedTransaction, tx_hash: HexBytes, receipt_future: Future) -> None:
+        with self._lock:
+            if item.future.done():
+                return
+            item.pending_hashes.discard(tx_hash)
+            error = receipt_future.exception()
+            if error is not None and item.pending_hashes:
+                # 被替换的交易超时，等待其他替换交易的结果
+                return
+            self._tracked.pop((item.account.address, item.nonce), None)
+            others = [other for other in item.pending_hashes if other != tx_hash]
+            if error is None:
+                self._confirmed += 1
+                if item.replacements:
+                    self._confirmed_after_replacement += 1
+                self._latencies.append(time.monotonic() - item.sent_at)
+
+        # 同nonce的其他交易已不可能上链，停止轮询
+        for other in others:
+            self.receipt_tracker.untrack(other)
+        if error is not None:
+            item.future.set_exception(error)
+        else:
+            item.future.set_result(receipt_future.result())
+
+    def _replace(self, item: _SupervisedTransaction, block_number: int) -> bool:
+        """用提高后的费用重新广播同nonce交易"""
+        transaction = self._bumped_transaction(item.transaction)
+        if transaction is None:
+            print(f"nonce {item.nonce} 的交易已卡住，但费用上限内无法满足替换规则")
+            with self._lock:
+                item.fee_capped = True
+                self._fee_cap_hits += 1
+            return False
+
+        try:
+            signed_txn = item.account.sign_transaction(transaction)
+            tx_hash = HexBytes(self.w3.eth.send_raw_transaction(signed_txn.rawTransaction))
+        except Exception as e:
+            if any(message in str(e).lower() for message in _ALREADY_HANDLED_ERRORS):
+                # 原交易已经上链，等待其回执即可
+                return False
+            print(f"替换nonce {item.nonce} 的交易失败: {e}")
+            with self._lock:
+                self._replacement_failures += 1
+                # 下一轮重新判断
+                item.sent_block = block_number
+            return False
+
+        with self._lock:
+            if item.future.done():
+                return False
+            item.transaction = transaction
+            item.hashes.append(tx_hash)
+            item.pending_hashes.add(tx_hash)
+            item.sent_block = block_number
+            item.replacements += 1
+            self._replacements += 1
+        print(f"nonce {item.nonce} 的交易 {self.stuck_blocks} 个区块未上链，已提高费用替换为 {tx_hash.hex()}")
+        self.receipt_tracker.track(tx_hash, callback=partial(self._on_receipt, item, tx_hash))
+        return True
+
+    def _bumped_transaction(self, transaction: Dict) -> Optional[Dict]:
+        """计算替换交易的费用字段，上限内无法满足替换规则时返回None"""
+        try:
+            market = self.fee_oracle.transaction_fee_params()
+        except Exception:
+            market = {}
+
+        if 'maxFeePerGas' in transaction:
+            fields = ('maxFeePerGas', 'maxPriorityFeePerGas')
+        else:
+            fields = ('gasPrice',)
+
+        replacement = dict(transaction)
+        for field in fields:
+            minimum = self._min_replacement_fee(transaction[field])
+            fee = max(self._bump(transaction[field]), market.get(field, 0))
+            if self.max_fee_per_gas is not None:
+                fee = min(fee, self.max_fee_per_gas)
+            if fee < minimum:
+                return None
+            replacement[field] = fee
+
+        if 'maxFeePerGas' in replacement and replacement['maxPriorityFeePerGas'] > replacement['maxFeePerGas']:
+            replacement['maxPriorityFeePerGas'] = replacement['maxFeePerGas']
+            if replacement['maxPriorityFeePerGas'] < self._min_replacement_fee(transaction['maxPriorityFeePerGas']):
+                return None
+        return replacement
+
+    def _bump(self, fee: int) -> int:
+        return math.ceil(fee * (100 + self.bump_percent) / 100)
+
+    @staticmethod
+    def _min_replacement_fee(fee: int) -> int:
+        return math.ceil(fee * (100 + MIN_REPLACEMENT_BUMP_PERCENT) / 100)
@@ -0,0 +1,11 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+// 仅用于本地Gas基准测试的奖励代币，部署时把全部供应量铸造给部署者
+contract MockRewardToken is ERC20 {
+    constructor(uint256 initialSupply) ERC20("FlowAI Reward", "FLOW") {
+        _mint(msg.sender, initialSupply);
+    }
+}
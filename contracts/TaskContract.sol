@@ -6,6 +6,7 @@ import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 
 contract TaskContract is Ownable, ReentrancyGuard {
+    // getTask 返回的任务视图（ABI保持不变）
     struct Task {
         uint256 id;
         address publisher;
@@ -21,6 +22,30 @@ contract TaskContract is Ownable, ReentrancyGuard {
         string requirements;
     }
     
+    // 紧凑存储布局：认领/完成只读写 worker 所在的一个槽，完成时额外读取 reward 所在的槽
+    struct TaskStorage {
+        // 槽0: 20 + 5 + 5 + 1 + 1 字节
+        address worker;
+        uint40 createdAt;
+        uint40 deadline;
+        bool isClaimed;
+        bool isCompleted;
+        // 槽1: 20 + 12 字节
+        address publisher;
+        uint96 reward;
+        string title;
+        string description;
+        string taskType;
+        string requirements;
+    }
+    
+    // 链下结果的内容摘要和定位符（结果本身保存在链下的内容寻址存储中）
+    struct TaskResult {
+        bytes32 digest;
+        string locator;
+    }
+    
+    // getWorker 返回的工人视图（ABI保持不变）
     struct Worker {
         address addr;
         uint256 reputation;
@@ -29,10 +54,25 @@ contract TaskContract is Ownable, ReentrancyGuard {
         bool isActive;
     }
     
+    // 工人统计打包在一个槽中（1 + 8 + 8 + 15 字节），地址即映射的键，无需保存
+    struct WorkerStorage {
+        bool isActive;
+        uint64 reputation;
+        uint64 completedTasks;
+        uint120 totalEarnings;
+    }
+    
     IERC20 public rewardToken;
-    mapping(uint256 => Task) public tasks;
-    mapping(address => Worker) public workers;
+    mapping(uint256 => TaskStorage) private taskStore;
+    mapping(address => WorkerStorage) private workerStore;
     mapping(address => uint256[]) public workerTasks;
+    mapping(uint256 => TaskResult) public taskResults;
+    
+    // 未认领任务ID集合：认领/完成/过期清理时以交换末尾元素再pop的方式O(1)删除，位置下标加1保存（0表示不在集合中）
+    uint256[] private openTaskIds;
+    mapping(uint256 => uint256) private openTaskPosition;
+    // pruneExpired 下一次开始检查的位置，多次调用依次扫过整个集合
+    uint256 private pruneCursor;
     
     uint256 public taskCounter;
     uint256 public totalTasks;
@@ -43,26 +83,38 @@ contract TaskContract is Ownable, ReentrancyGuard {
     event TaskCompleted(uint256 indexed taskId, address indexed worker, uint256 reward);
     event WorkerRegistered(address indexed worker);
     event RewardPaid(address indexed worker, uint256 amount);
+    event TaskResultSubmitted(uint256 indexed taskId, bytes32 digest, string locator);
+    event ExpiredTasksPruned(uint256 count);
     
     constructor(address _rewardToken) {
         rewardToken = IERC20(_rewardToken);
     }
     
     modifier taskExists(uint256 taskId) {
-        require(tasks[taskId].id != 0, "Task does not exist");
+        require(taskStore[taskId].publisher != address(0), "Task does not exist");
         _;
     }
     
     modifier taskNotCompleted(uint256 taskId) {
-        require(!tasks[taskId].isCompleted, "Task already completed");
+        require(!taskStore[taskId].isCompleted, "Task already completed");
         _;
     }
     
     modifier taskNotClaimed(uint256 taskId) {
-        require(!tasks[taskId].isClaimed, "Task already claimed");
+        require(!taskStore[taskId].isClaimed, "Task already claimed");
         _;
     }
     
+    // createTasks 的单个任务参数
+    struct NewTask {
+        string title;
+        string description;
+        uint256 reward;
+        uint256 deadline;
+        string taskType;
+        string requirements;
+    }
+    
     function createTask(
         string memory title,
         string memory description,
@@ -71,25 +123,56 @@ contract TaskContract is Ownable, ReentrancyGuard {
         string memory taskType,
         string memory requirements
     ) external {
+        _createTask(title, description, reward, deadline, taskType, requirements);
+    }
+    
+    // 批量创建任务（批量发布/压测用），任一任务参数无效时整个批次回滚，新任务ID从 taskCounter + 1 起连续分配
+    function createTasks(NewTask[] calldata newTasks) external returns (uint256 firstTaskId) {
+        firstTaskId = taskCounter + 1;
+        for (uint256 i = 0; i < newTasks.length; i++) {
+            NewTask calldata newTask = newTasks[i];
+            _createTask(
+                newTask.title,
+                newTask.description,
+                newTask.reward,
+                newTask.deadline,
+                newTask.taskType,
+                newTask.requirements
+            );
+        }
+    }
+    
+    function _createTask(
+        string memory title,
+        string memory description,
+        uint256 reward,
+        uint256 deadline,
+        string memory taskType,
+        string memory requirements
+    ) internal {
         require(reward > 0, "Reward must be greater than 0");
+        require(reward <= type(uint96).max, "Reward too large");
         require(deadline > block.timestamp, "Deadline must be in the future");
+        require(deadline <= type(uint40).max, "Deadline too large");
         
         taskCounter++;
-        tasks[taskCounter] = Task({
-            id: taskCounter,
+        taskStore[taskCounter] = TaskStorage({
+            worker: address(0),
+            createdAt: uint40(block.timestamp),
+            deadline: uint40(deadline),
+            isClaimed: false,
+            isCompleted: false,
             publisher: msg.sender,
+            reward: uint96(reward),
             title: title,
             description: description,
-            reward: reward,
-            isCompleted: false,
-            isClaimed: false,
-            worker: address(0),
-            createdAt: block.timestamp,
-            deadline: deadline,
             taskType: taskType,
             requirements: requirements
         });
         
+        openTaskIds.push(taskCounter);
+        openTaskPosition[taskCounter] = openTaskIds.length;
+        
         totalTasks++;
         totalRewards += reward;
         
@@ -97,78 +180,255 @@ contract TaskContract is Ownable, ReentrancyGuard {
     }
     
     function claimTask(uint256 taskId) external taskExists(taskId) taskNotCompleted(taskId) taskNotClaimed(taskId) {
-        Task storage task = tasks[taskId];
-        require(block.timestamp <= task.deadline, "Task deadline passed");
+        require(block.timestamp <= taskStore[taskId].deadline, "Task deadline passed");
+        _claim(taskId);
+    }
+    
+    // 批量认领：不满足条件的任务直接跳过而不回滚整个批次，返回每个任务是否认领成功
+    function claimTasks(uint256[] calldata taskIds) external returns (bool[] memory claimed) {
+        claimed = new bool[](taskIds.length);
+        for (uint256 i = 0; i < taskIds.length; i++) {
+            TaskStorage storage task = taskStore[taskIds[i]];
+            if (task.publisher == address(0) || task.isCompleted || task.isClaimed) {
+                continue;
+            }
+            if (block.timestamp > task.deadline) {
+                // 过期任务顺便移出未认领集合（单个认领过期时整笔回滚，无法在 claimTask 中清理）
+                _removeOpenTask(taskIds[i]);
+                continue;
+            }
+            _claim(taskIds[i]);
+            claimed[i] = true;
+        }
+    }
+    
+    function completeTask(
+        uint256 taskId,
+        bytes32 resultDigest,
+        string calldata resultLocator
+    ) external taskExists(taskId) taskNotCompleted(taskId) {
+        TaskStorage storage task = taskStore[taskId];
+        require(task.worker == msg.sender, "Only assigned worker can complete task");
+        require(task.isClaimed, "Task not claimed");
+        require(resultDigest != bytes32(0), "Result digest required");
+        
+        uint256 reward = _complete(taskId, resultDigest, resultLocator);
+        
+        // 转移奖励
+        require(rewardToken.transfer(msg.sender, reward), "Reward transfer failed");
+        emit RewardPaid(msg.sender, reward);
+    }
+    
+    // 批量完成：所有结果使用同一个定位符，不满足条件的任务跳过，奖励合并为一次转账
+    function completeTasks(
+        uint256[] calldata taskIds,
+        bytes32[] calldata resultDigests,
+        string calldata resultLocator
+    ) external nonReentrant returns (bool[] memory completed) {
+        require(taskIds.length == resultDigests.length, "Length mismatch");
+        completed = new bool[](taskIds.length);
+        uint256 totalReward = 0;
+        
+        for (uint256 i = 0; i < taskIds.length; i++) {
+            TaskStorage storage task = taskStore[taskIds[i]];
+            if (task.publisher == address(0) || task.isCompleted || !task.isClaimed || task.worker != msg.sender
+                || resultDigests[i] == bytes32(0)) {
+                continue;
+            }
+            totalReward += _complete(taskIds[i], resultDigests[i], resultLocator);
+            completed[i] = true;
+        }
         
+        if (totalReward > 0) {
+            require(rewardToken.transfer(msg.sender, totalReward), "Reward transfer failed");
+            emit RewardPaid(msg.sender, totalReward);
+        }
+    }
+    
+    function _claim(uint256 taskId) internal {
         // 注册工人（如果还没有注册）
-        if (!workers[msg.sender].isActive) {
-            workers[msg.sender] = Worker({
-                addr: msg.sender,
-                reputation: 0,
-                completedTasks: 0,
-                totalEarnings: 0,
-                isActive: true
-            });
+        if (!workerStore[msg.sender].isActive) {
+            workerStore[msg.sender].isActive = true;
             emit WorkerRegistered(msg.sender);
         }
         
+        TaskStorage storage task = taskStore[taskId];
         task.isClaimed = true;
         task.worker = msg.sender;
         workerTasks[msg.sender].push(taskId);
+        _removeOpenTask(taskId);
         
         emit TaskClaimed(taskId, msg.sender);
     }
     
-    function completeTask(uint256 taskId, string memory result) external taskExists(taskId) taskNotCompleted(taskId) {
-        Task storage task = tasks[taskId];
-        require(task.worker == msg.sender, "Only assigned worker can complete task");
-        require(task.isClaimed, "Task not claimed");
-        
+    function _complete(
+        uint256 taskId,
+        bytes32 resultDigest,
+        string calldata resultLocator
+    ) internal returns (uint256 reward) {
+        TaskStorage storage task = taskStore[taskId];
         task.isCompleted = true;
+        _removeOpenTask(taskId);
+        // 只保存结果摘要和定位符，Gas与结果长度无关
+        taskResults[taskId] = TaskResult({digest: resultDigest, locator: resultLocator});
+        reward = task.reward;
         
-        // 更新工人统计
-        Worker storage worker = workers[msg.sender];
+        // 更新工人统计（三个字段在同一个槽内）
+        WorkerStorage storage worker = workerStore[msg.sender];
         worker.completedTasks++;
-        worker.totalEarnings += task.reward;
+        worker.totalEarnings += uint120(reward);
         worker.reputation += 10; // 简单声誉系统
         
-        // 转移奖励
-        require(rewardToken.transfer(msg.sender, task.reward), "Reward transfer failed");
+        emit TaskCompleted(taskId, msg.sender, reward);
+        emit TaskResultSubmitted(taskId, resultDigest, resultLocator);
+    }
+    
+    function _removeOpenTask(uint256 taskId) internal {
+        uint256 position = openTaskPosition[taskId];
+        if (position == 0) {
+            return;
+        }
         
-        emit TaskCompleted(taskId, msg.sender, task.reward);
-        emit RewardPaid(msg.sender, task.reward);
+        uint256 lastTaskId = openTaskIds[openTaskIds.length - 1];
+        openTaskIds[position - 1] = lastTaskId;
+        openTaskPosition[lastTaskId] = position;
+        openTaskIds.pop();
+        delete openTaskPosition[taskId];
+    }
+    
+    // 从上次停止的位置起最多检查 maxCount 个未认领任务，把已过期的移出集合，返回移出的数量；任何人都可以调用
+    function pruneExpired(uint256 maxCount) external returns (uint256 pruned) {
+        uint256 position = pruneCursor;
+        for (uint256 checked = 0; checked < maxCount && openTaskIds.length > 0; checked++) {
+            if (position >= openTaskIds.length) {
+                position = 0;
+            }
+            uint256 taskId = openTaskIds[position];
+            if (block.timestamp > taskStore[taskId].deadline) {
+                // 末尾元素被换到当前位置，下一轮检查同一位置
+                _removeOpenTask(taskId);
+                pruned++;
+            } else {
+                position++;
+            }
+        }
+        pruneCursor = position;
+        if (pruned > 0) {
+            emit ExpiredTasksPruned(pruned);
+        }
     }
     
     function getTask(uint256 taskId) external view returns (Task memory) {
-        return tasks[taskId];
+        TaskStorage storage task = taskStore[taskId];
+        return Task({
+            id: task.publisher == address(0) ? 0 : taskId,
+            publisher: task.publisher,
+            title: task.title,
+            description: task.description,
+            reward: task.reward,
+            isCompleted: task.isCompleted,
+            isClaimed: task.isClaimed,
+            worker: task.worker,
+            createdAt: task.createdAt,
+            deadline: task.deadline,
+            taskType: task.taskType,
+            requirements: task.requirements
+        });
+    }
+    
+    function getTaskResult(uint256 taskId) external view returns (bytes32 digest, string memory locator) {
+        TaskResult storage taskResult = taskResults[taskId];
+        return (taskResult.digest, taskResult.locator);
     }
     
     function getWorker(address workerAddr) external view returns (Worker memory) {
-        return workers[workerAddr];
+        WorkerStorage storage worker = workerStore[workerAddr];
+        return Worker({
+            addr: worker.isActive ? workerAddr : address(0),
+            reputation: worker.reputation,
+            completedTasks: worker.completedTasks,
+            totalEarnings: worker.totalEarnings,
+            isActive: worker.isActive
+        });
+    }
+    
+    // 兼容旧ABI：与存储调整前自动生成的公共getter返回相同的字段（展开的元组），新代码应使用 getTask
+    function tasks(uint256 taskId) external view returns (
+        uint256 id,
+        address publisher,
+        string memory title,
+        string memory description,
+        uint256 reward,
+        bool isCompleted,
+        bool isClaimed,
+        address worker,
+        uint256 createdAt,
+        uint256 deadline,
+        string memory taskType,
+        string memory requirements
+    ) {
+        // 不使用局部存储指针，返回值较多时避免栈过深
+        publisher = taskStore[taskId].publisher;
+        id = publisher == address(0) ? 0 : taskId;
+        title = taskStore[taskId].title;
+        description = taskStore[taskId].description;
+        reward = taskStore[taskId].reward;
+        isCompleted = taskStore[taskId].isCompleted;
+        isClaimed = taskStore[taskId].isClaimed;
+        worker = taskStore[taskId].worker;
+        createdAt = taskStore[taskId].createdAt;
+        deadline = taskStore[taskId].deadline;
+        taskType = taskStore[taskId].taskType;
+        requirements = taskStore[taskId].requirements;
+    }
+    
+    // 兼容旧ABI：与存储调整前自动生成的公共getter返回相同的字段，新代码应使用 getWorker
+    function workers(address workerAddr) external view returns (
+        address addr,
+        uint256 reputation,
+        uint256 completedTasks,
+        uint256 totalEarnings,
+        bool isActive
+    ) {
+        WorkerStorage storage worker = workerStore[workerAddr];
+        isActive = worker.isActive;
+        addr = isActive ? workerAddr : address(0);
+        reputation = worker.reputation;
+        completedTasks = worker.completedTasks;
+        totalEarnings = worker.totalEarnings;
     }
     
     function getWorkerTasks(address workerAddr) external view returns (uint256[] memory) {
         return workerTasks[workerAddr];
     }
     
-    function getAvailableTasks() external view returns (uint256[] memory) {
-        uint256[] memory availableTasks = new uint256[](taskCounter);
-        uint256 count = 0;
+    // 分页读取未认领任务：集合顺序会随删除而变化，跨页读取时调用方应固定同一区块；已过期的任务会被过滤，单页结果可能少于limit
+    function getAvailableTasks(uint256 offset, uint256 limit) external view returns (uint256[] memory page) {
+        uint256 total = openTaskIds.length;
+        if (offset >= total) {
+            return new uint256[](0);
+        }
+        uint256 end = limit > total - offset ? total : offset + limit;
         
-        for (uint256 i = 1; i <= taskCounter; i++) {
-            if (!tasks[i].isClaimed && !tasks[i].isCompleted && block.timestamp <= tasks[i].deadline) {
-                availableTasks[count] = i;
+        page = new uint256[](end - offset);
+        uint256 count = 0;
+        for (uint256 i = offset; i < end; i++) {
+            uint256 taskId = openTaskIds[i];
+            if (block.timestamp <= taskStore[taskId].deadline) {
+                page[count] = taskId;
                 count++;
             }
         }
         
-        // 调整数组大小
-        uint256[] memory result = new uint256[](count);
-        for (uint256 i = 0; i < count; i++) {
-            result[i] = availableTasks[i];
+        // 截断数组长度为实际数量
+        assembly {
+            mstore(page, count)
         }
-        
-        return result;
+    }
+    
+    // 集合中的任务数（包含尚未被 pruneExpired 清理的过期任务），用于计算分页
+    function getAvailableTaskCount() external view returns (uint256) {
+        return openTaskIds.length;
     }
     
     function getTaskCount() external view returns (uint256) {
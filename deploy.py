@@ -75,18 +75,27 @@ def run_tests():
         return False
 
 def build_contracts():
-    """构建智能合约"""
+    """构建智能合约（增量编译：源文件、导入文件和编译设置都未变化的合约直接跳过）"""
     print("🔨 构建智能合约...")
     
     # 检查是否有solc编译器
+    solc = os.getenv("SOLC_BINARY", "solc")
     try:
-        subprocess.run(["solc", "--version"], check=True, capture_output=True)
+        subprocess.run([solc, "--version"], check=True, capture_output=True)
         print("✅ Solidity编译器已安装")
     except (subprocess.CalledProcessError, FileNotFoundError):
         print("⚠️  Solidity编译器未安装，跳过合约构建")
         return True
     
-    # 这里可以添加合约编译逻辑
+    from blockchain.contract_artifacts import build_contracts as build_contract_artifacts
+    try:
+        status = build_contract_artifacts(solc=solc, force="--force-build" in sys.argv)
+    except (subprocess.CalledProcessError, RuntimeError) as e:
+        print(f"❌ 合约构建失败: {e}")
+        return False
+    
+    for source, state in status.items():
+        print(f"   {source}: {'未变化，使用缓存' if state == 'cached' else '已编译'}")
     print("✅ 合约构建完成")
     return True
 
@@ -10,6 +10,7 @@ FlowAI - 区块链AI Agent平台
 import os
 import sys
 import asyncio
+import signal
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -108,41 +109,58 @@ async def start_web_server():
         print(f"❌ Web服务器启动失败: {e}")
 
 async def start_agent_worker():
-    """启动AI Agent工作模式"""
+    """启动AI Agent工作模式（多个任务并发认领、执行、提交）"""
     try:
         from agents.task_agent import TaskAgent
+        from agents.execution_engine import ExecutionEngine
         
         print("🤖 启动AI Agent工作模式...")
         agent = TaskAgent()
+        engine = ExecutionEngine(
+            agent,
+            concurrency=int(os.getenv('AGENT_CONCURRENCY', '4')),
+            poll_interval=float(os.getenv('AGENT_POLL_INTERVAL', '30')),
+            drain_timeout=float(os.getenv('AGENT_DRAIN_TIMEOUT', '300')),
+            on_result=print_work_result,
+            submit_retries=int(os.getenv('AGENT_SUBMIT_RETRIES', '3')),
+            submit_retry_delay=float(os.getenv('AGENT_SUBMIT_RETRY_DELAY', '5')),
+            stats_interval=float(os.getenv('AGENT_STATS_INTERVAL', '300')),
+            on_stats=print_engine_stats
+        )
+        
+        # Ctrl+C / SIGTERM 时停止认领新任务，等待在途任务提交后退出
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, engine.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
         
-        print("✅ AI Agent已启动，开始自动工作...")
+        print(f"✅ AI Agent已启动，最多同时处理 {engine.concurrency} 个任务...")
         print("按 Ctrl+C 停止工作")
         
-        while True:
-            try:
-                result = await agent.work_cycle()
-                print(f"📊 工作结果: {result}")
-                
-                if result['status'] == 'success':
-                    print(f"🎉 任务完成！获得 {result['reward'] / 1e18:.4f} ETH")
-                elif result['status'] == 'no_tasks':
-                    print("⏳ 当前没有可用任务，等待中...")
-                else:
-                    print(f"ℹ️  {result['message']}")
-                
-                # 等待一段时间再继续
-                await asyncio.sleep(30)
-                
-            except KeyboardInterrupt:
-                print("\n🛑 用户中断，停止工作")
-                break
-            except Exception as e:
-                print(f"❌ 工作周期出错: {e}")
-                await asyncio.sleep(10)
+        await engine.run()
+        print(f"🛑 AI Agent已停止，统计: {engine.stats()}")
                 
     except Exception as e:
         print(f"❌ AI Agent启动失败: {e}")
 
+def print_engine_stats(stats):
+    """定期打印执行引擎的吞吐量统计"""
+    per_hour = stats['completed_per_hour']
+    per_hour = f"{per_hour:.1f}" if per_hour is not None else "-"
+    print(f"📈 引擎统计: 在途 {len(stats['in_flight'])} 个, 队列 {stats['queues']}, 计数 {stats['counts']}, "
+          f"每小时完成 {per_hour} 个")
+
+def print_work_result(result):
+    """打印单个任务的处理结果"""
+    print(f"📊 工作结果: {result}")
+    
+    if result['status'] == 'success':
+        print(f"🎉 任务完成！获得 {result['reward'] / 1e18:.4f} ETH")
+    else:
+        print(f"ℹ️  {result['message']}")
+
 async def start_full_service():
     """启动完整服务（Web + Agent）"""
     print("🚀 启动完整服务...")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+FlowAI 批量任务发布工具
+按可配置的分布生成大量开放任务，用于对索引器、API和Agent做压测
+
+两种运行方式：
+  python publish_tasks.py --count 5000 --in-process       # 在进程内EVM上部署合约并发布（需要 eth-tester[py-evm] 和 py-solc-x）
+  python publish_tasks.py --count 5000                    # 发布到 ETHEREUM_RPC_URL 上的开发链（如 anvil/hardhat）
+
+开发链上使用 TASK_CONTRACT_ADDRESS 指定的合约，发布账户为 PUBLISHER_PRIVATE_KEY（未设置时为 PRIVATE_KEY），
+--unlocked 时使用节点托管的第一个账户
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import Web3
+
+from blockchain.contract_artifacts import load_artifact
+from blockchain.task_publisher import PUBLISHER_ABI, TaskDistribution, TaskPublisher
+
+load_dotenv()
+
+
+def connect_in_process(solc_version: str):
+    """在进程内EVM上部署代币和任务合约，返回 (w3, 任务合约, 发送地址)"""
+    from web3 import EthereumTesterProvider
+    from benchmark_gas import compile_contracts, deploy
+
+    w3 = Web3(EthereumTesterProvider())
+    task_contract = deploy(w3, compile_contracts(solc_version=solc_version))
+    return w3, task_contract, w3.eth.accounts[0]
+
+
+def connect_dev_chain(rpc_url: str, unlocked: bool):
+    """连接开发链上已部署的任务合约，返回 (w3, 任务合约, 发送地址, 签名账户)"""
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    abi = load_artifact('TaskContract', fallback=lambda: PUBLISHER_ABI).abi
+    task_contract = w3.eth.contract(address=Web3.to_checksum_address(os.getenv('TASK_CONTRACT_ADDRESS')), abi=abi)
+    if unlocked:
+        return w3, task_contract, w3.eth.accounts[0], None
+    account = Account.from_key(os.getenv('PUBLISHER_PRIVATE_KEY') or os.getenv('PRIVATE_KEY'))
+    return w3, task_contract, account.address, account
+
+
+def print_report(report: dict) -> None:
+    print("\n📊 发布结果")
+    print(f"   请求任务数: {report['requested']}")
+    print(f"   成功创建:   {report['created']}")
+    print(f"   失败:       {report['failed']}")
+    print(f"   交易数:     {report['transactions']}")
+    print(f"   总Gas:      {report['gas_used']}")
+    if report['gas_per_task']:
+        print(f"   单任务Gas:  {report['gas_per_task']}")
+    print(f"   耗时:       {report['elapsed_seconds']:.2f} 秒")
+    if report['tasks_per_second']:
+        print(f"   吞吐量:     {report['tasks_per_second']:.1f} 任务/秒")
+    if report['task_ids']:
+        print(f"   任务ID:     {report['task_ids'][0]} - {report['task_ids'][-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FlowAI 批量任务发布工具')
+    parser.add_argument('--count', type=int, default=1000, help='发布的任务数')
+    parser.add_argument('--batch-size', type=int, default=50, help='每笔 createTasks 交易包含的任务数')
+    parser.add_argument('--window', type=int, default=16, help='同时在途的最大交易数')
+    parser.add_argument('--distribution', help='任务分布配置JSON文件（任务类型权重、奖励区间和分布、截止时间区间）')
+    parser.add_argument('--seed', type=int, help='覆盖分布配置中的随机种子')
+    parser.add_argument('--in-process', action='store_true', help='在进程内EVM上部署合约并发布')
+    parser.add_argument('--rpc-url', default=os.getenv('ETHEREUM_RPC_URL', 'http://127.0.0.1:8545').split(',')[0])
+    parser.add_argument('--unlocked', action='store_true', help='使用节点托管的第一个账户发送交易')
+    parser.add_argument('--solc-version', default=os.getenv('SOLC_VERSION', '0.8.19'))
+    args = parser.parse_args()
+
+    try:
+        distribution = TaskDistribution.from_file(args.distribution) if args.distribution else TaskDistribution()
+        if args.seed is not None:
+            distribution.seed = args.seed
+
+        account = None
+        if args.in_process:
+            w3, task_contract, sender = connect_in_process(args.solc_version)
+        else:
+            w3, task_contract, sender, account = connect_dev_chain(args.rpc_url, args.unlocked)
+
+        publisher = TaskPublisher(
+            w3, task_contract, sender=sender, account=account, batch_size=args.batch_size, window=args.window
+        )
+        print(f"🚀 发布 {args.count} 个任务（每批 {publisher.batch_size} 个，最多 {publisher.window} 笔交易在途）")
+        report = publisher.publish(args.count, distribution, progress=True)
+    except ImportError as e:
+        print(f"❌ 缺少依赖: {e}，进程内EVM需要安装 eth-tester[py-evm] 和 py-solc-x")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ 发布任务失败: {e}")
+        sys.exit(1)
+
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
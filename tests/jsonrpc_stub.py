@@ -0,0 +1,90 @@
+"""
+测试用的本地JSON-RPC节点
+支持批量请求，可以注入响应延迟和JSON-RPC错误，并记录收到的HTTP请求
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubRPCServer:
+    """在本地随机端口上运行的JSON-RPC节点替身"""
+
+    def __init__(self, results=None, delay: float = 0.0):
+        self.results = {
+            'eth_chainId': '0x539',
+            'eth_blockNumber': '0x64',
+            'eth_gasPrice': '0x3b9aca00',
+            'eth_getBalance': '0xde0b6b3a7640000',
+            'eth_getTransactionReceipt': None,
+        }
+        self.results.update(results or {})
+        self.delay = delay
+        self.fail = False
+        # 设置后所有请求都以该JSON-RPC错误（{'code': ..., 'message': ...}）响应
+        self.error = None
+        self.http_requests = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with server._lock:
+                    server.http_requests.append(body)
+                if server.delay:
+                    time.sleep(server.delay)
+                if server.fail:
+                    self.send_response(500)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if isinstance(body, list):
+                    payload = [server._respond(request) for request in body]
+                else:
+                    payload = server._respond(body)
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    def start(self) -> 'StubRPCServer':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def rpc_calls(self) -> int:
+        """收到的JSON-RPC调用总数（批量请求按条计数）"""
+        with self._lock:
+            return sum(len(body) if isinstance(body, list) else 1 for body in self.http_requests)
+
+    def _respond(self, request):
+        if self.error:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': self.error}
+        method = request['method']
+        if method not in self.results:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32601, 'message': 'method not found'}}
+        result = self.results[method]
+        if callable(result):
+            result = result(request['params'])
+        if isinstance(result, Exception):
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32000, 'message': str(result)}}
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
@@ -0,0 +1,87 @@
+"""
+测试用的本地LLM接口
+模拟 OpenAI 兼容的 /chat/completions（HTTP/1.1 长连接，支持 stream=true 的SSE响应），记录收到的请求
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLLMServer:
+    """在本地随机端口上运行的 chat/completions 接口替身，回复内容为 reply(请求) 的返回值"""
+
+    def __init__(self, reply=None, usage=None):
+        self.reply = reply or (lambda request: f"来自 {request['model']} 的回复")
+        self.usage = usage or {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+        self.requests = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with server._lock:
+                    server.requests.append(request)
+                if request.get('stream'):
+                    data = server._stream(request).encode()
+                    content_type = 'text/event-stream'
+                else:
+                    data = json.dumps(server._respond(request)).encode()
+                    content_type = 'application/json'
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    def start(self) -> 'StubLLMServer':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _respond(self, request):
+        return {
+            'id': 'chatcmpl-1',
+            'object': 'chat.completion',
+            'created': 0,
+            'model': request['model'],
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': self.reply(request)},
+                'finish_reason': 'stop'
+            }],
+            'usage': self.usage
+        }
+
+    def _stream(self, request, chunk_size: int = 4) -> str:
+        """按 chunk_size 个字符切分回复，生成 chat.completion.chunk 事件流"""
+        reply = self.reply(request)
+        deltas = [{'role': 'assistant', 'content': ''}]
+        deltas += [{'content': reply[start:start + chunk_size]} for start in range(0, len(reply), chunk_size)]
+        events = []
+        for delta in deltas + [{}]:
+            chunk = {
+                'id': 'chatcmpl-1',
+                'object': 'chat.completion.chunk',
+                'created': 0,
+                'model': request['model'],
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': None if delta else 'stop'}]
+            }
+            events.append(f"data: {json.dumps(chunk)}\n\n")
+        events.append("data: [DONE]\n\n")
+        return ''.join(events)
@@ -0,0 +1,142 @@
+"""
+多账户工作通道测试
+"""
+
+import unittest
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from eth_account import Account
+
+from blockchain.account_pool import AccountPool
+from blockchain.blockchain_client import BlockchainClient, _merge_batch_futures
+from blockchain.preflight import PreflightChecker
+from blockchain.result_store import MemoryBackend, ResultStore
+from blockchain.simulated_backend import SimulatedBackend
+
+ACCOUNTS = [Account.from_key('0x' + f'{index:02x}' * 32) for index in range(1, 4)]
+
+
+def _done(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class TestAccountPool(unittest.TestCase):
+    """测试按负载分配账户和任务归属"""
+
+    def setUp(self):
+        self.pool = AccountPool(ACCOUNTS)
+
+    def test_assigns_least_loaded_lane(self):
+        """测试新任务分配给负载最低的账户"""
+        lanes = [self.pool.assign([task_id]) for task_id in range(1, 7)]
+        self.assertEqual({lane.address for lane in lanes}, set(self.pool.addresses))
+        self.assertEqual([len(lane.active_tasks) for lane in self.pool.lanes], [2, 2, 2])
+
+        # 未确认的交易也计入负载
+        self.pool.lanes[1].nonce_manager.sync(0)
+        self.pool.lanes[1].nonce_manager.allocate()
+        self.pool.release([1, 2, 3, 4, 5, 6])
+        self.assertIsNot(self.pool.assign([7]), self.pool.lanes[1])
+
+    def test_claimer_affinity(self):
+        """测试完成任务使用认领它的账户，进程重启后按链上worker地址恢复"""
+        lane = self.pool.assign([1, 2])
+        self.assertIs(self.pool.assign([2]), lane)
+        self.assertIs(self.pool.lane_for(1), lane)
+
+        restarted = AccountPool(ACCOUNTS)
+        self.assertIsNone(restarted.lane_for(1))
+        recovered = restarted.lane_for(1, ACCOUNTS[2].address.lower())
+        self.assertEqual(recovered.address, ACCOUNTS[2].address)
+        self.assertIn(1, recovered.active_tasks)
+        self.assertIsNone(restarted.lane_for(2, '0x' + '00' * 20))
+
+    def test_batch_registers_every_task(self):
+        """测试批次中部分任务已登记时，其余任务登记到同一账户；分属不同账户的批次被拒绝"""
+        lane = self.pool.assign([1])
+        other = self.pool.assign([2])
+        self.assertIsNot(lane, other)
+
+        self.assertIs(self.pool.assign([1, 3, 4]), lane)
+        self.assertEqual(lane.active_tasks, {1, 3, 4})
+        self.assertIs(self.pool.lane_for(4), lane)
+
+        with self.assertRaises(ValueError):
+            self.pool.assign([1, 2, 5])
+        self.assertIsNone(self.pool.lane_for(5))
+
+    def test_settle_releases_by_outcome(self):
+        """测试认领失败和完成成功的任务解除归属"""
+        lane = self.pool.assign([1, 2, 3])
+        self.pool.settle([1, 2, 3], _done({1: True, 2: False, 3: True}), release_on_success=False)
+        self.assertEqual(lane.active_tasks, {1, 3})
+
+        self.pool.settle([1, 3], _done({1: True, 3: False}), release_on_success=True)
+        self.assertEqual(lane.active_tasks, {3})
+
+        failed = Future()
+        failed.set_exception(RuntimeError('dropped'))
+        self.pool.settle([3], failed, release_on_success=False)
+        self.assertEqual(lane.active_tasks, set())
+
+    def test_merge_batch_futures(self):
+        """测试按账户拆分的批量交易结果合并，失败的交易其任务为False"""
+        failed = Future()
+        pending = Future()
+        merged = _merge_batch_futures([([1, 2], _done({1: True, 2: False})), ([3], failed), ([4], pending)])
+        failed.set_exception(RuntimeError('reverted'))
+        self.assertFalse(merged.done())
+        pending.set_result({4: True})
+        self.assertEqual(merged.result(timeout=1), {1: True, 2: False, 3: False, 4: True})
+
+
+class TestPooledClient(unittest.TestCase):
+    """测试客户端在模拟后端上用多个账户认领和完成任务"""
+
+    def setUp(self):
+        self.client = BlockchainClient.__new__(BlockchainClient)
+        self.client.simulator = SimulatedBackend(task_count=10)
+        self.client.account_pool = AccountPool(ACCOUNTS)
+        self.client.account = self.client.account_pool.primary.account
+        self.client.result_store = ResultStore(MemoryBackend())
+        self.client.preflight = PreflightChecker()
+        self.client.task_indexer = None
+
+    def test_claims_spread_and_complete_with_claimer(self):
+        """测试认领分摊到各账户，完成时使用认领账户并汇总统计"""
+        claimed = {task_id: self.client.submit_claim_task(task_id).result() for task_id in range(1, 7)}
+        self.assertTrue(all(claimed.values()))
+        workers = {self.client.get_task(task_id)['worker'] for task_id in range(1, 7)}
+        self.assertEqual(workers, set(self.client.account_pool.addresses))
+
+        outcome = self.client.submit_complete_tasks({task_id: f"结果{task_id}" for task_id in range(1, 7)}).result()
+        self.assertEqual(outcome, dict.fromkeys(range(1, 7), True))
+        self.assertTrue(all(not lane.active_tasks for lane in self.client.account_pool.lanes))
+
+        pooled = self.client.get_pool_worker_info()
+        self.assertEqual(pooled['completedTasks'], 6)
+        self.assertEqual(pooled['accountCount'], 3)
+        breakdown = self.client.get_account_breakdown()
+        self.assertEqual([entry['completed_tasks'] for entry in breakdown], [2, 2, 2])
+
+    def test_failed_claim_releases_lane(self):
+        """测试认领被拒绝后任务不再占用账户"""
+        self.client.simulator.claim_task(2, '0x' + 'ee' * 20)
+        self.assertTrue(self.client.claim_task(1))
+        # 重复认领沿用原账户
+        self.assertTrue(self.client.claim_task(1))
+        self.assertFalse(self.client.claim_task(2))
+        self.assertFalse(self.client.claim_task(999))
+        self.assertEqual([task_id for lane in self.client.account_pool.lanes for task_id in lane.active_tasks], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
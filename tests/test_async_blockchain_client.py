@@ -0,0 +1,248 @@
+"""
+异步区块链客户端测试
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import rlp
+from eth_abi import encode
+from eth_account import Account
+from web3 import AsyncWeb3, Web3
+
+from blockchain.account_pool import AccountPool
+from blockchain.async_blockchain_client import AsyncBlockchainClient
+from blockchain.blockchain_client import BlockchainClient
+from blockchain.contract_artifacts import ContractArtifact
+from blockchain.fee_oracle import FeeOracle
+from blockchain.gas_estimator import GasEstimator
+from blockchain.preflight import PreflightChecker
+from blockchain.read_cache import BlockReadCache
+from blockchain.receipt_tracker import ReceiptTracker
+from blockchain.result_store import MemoryBackend, ResultStore
+from blockchain.simulated_backend import SimulatedBackend
+from blockchain.tx_supervisor import TransactionSupervisor
+from jsonrpc_stub import StubRPCServer
+
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '12' * 20)
+ACCOUNT = Account.from_key('0x' + '11' * 32)
+TASK_OUTPUT_TYPES = [
+    'uint256', 'address', 'string', 'string', 'uint256', 'bool', 'bool', 'address', 'uint256', 'uint256', 'string', 'string'
+]
+
+
+def _selector(signature: str) -> str:
+    return bytes(Web3.keccak(text=signature)[:4]).hex()
+
+
+class StubTaskChain:
+    """在JSON-RPC节点替身上模拟任务合约的只读调用、交易广播和回执"""
+
+    def __init__(self):
+        self.sent = []
+        self.calls = []
+        self.chain_nonce = 5
+        self.rejections = []
+        self.get_task_selector = _selector('getTask(uint256)')
+        self.count_selector = _selector('getAvailableTaskCount()')
+        self.page_selector = _selector('getAvailableTasks(uint256,uint256)')
+
+    def results(self):
+        return {
+            'eth_call': self.eth_call,
+            'eth_estimateGas': '0x249f0',
+            'eth_getTransactionCount': lambda params: hex(self.chain_nonce),
+            'eth_sendRawTransaction': self.send_raw_transaction,
+            'eth_getTransactionReceipt': self.receipt
+        }
+
+    def eth_call(self, params):
+        transaction, block = params
+        data = transaction.get('data') or transaction.get('input')
+        selector = data[2:10]
+        self.calls.append((selector, block))
+        if selector == self.get_task_selector:
+            task_id = int(data[10:], 16)
+            return '0x' + encode(TASK_OUTPUT_TYPES, [
+                task_id, CONTRACT_ADDRESS, f"任务{task_id}", '描述', 10 ** 18, False, False,
+                '0x' + '00' * 20, 1, 2 ** 40 - 1, 'programming', '要求'
+            ]).hex()
+        if selector == self.count_selector:
+            return '0x' + encode(['uint256'], [3]).hex()
+        if selector == self.page_selector:
+            return '0x' + encode(['uint256[]'], [[3, 1, 2]]).hex()
+        # 认领/完成的预执行：没有返回值即为成功
+        return '0x'
+
+    def send_raw_transaction(self, params):
+        raw = bytes.fromhex(params[0][2:])
+        if self.rejections:
+            return ValueError(self.rejections.pop(0))
+        self.sent.append(raw)
+        return '0x' + Web3.keccak(raw).hex().removeprefix('0x')
+
+    def receipt(self, params):
+        tx_hash = params[0]
+        if not any('0x' + Web3.keccak(raw).hex().removeprefix('0x') == tx_hash for raw in self.sent):
+            return None
+        return {
+            'blockHash': '0x' + '11' * 32, 'blockNumber': '0x65', 'contractAddress': None,
+            'cumulativeGasUsed': '0x5208', 'effectiveGasPrice': '0x3b9aca00', 'from': ACCOUNT.address,
+            'gasUsed': '0x5208', 'logs': [], 'logsBloom': '0x' + '00' * 256, 'status': '0x1',
+            'to': CONTRACT_ADDRESS, 'transactionHash': tx_hash, 'transactionIndex': '0x0', 'type': '0x0'
+        }
+
+    def sent_nonces(self):
+        return [int.from_bytes(rlp.decode(raw)[0], 'big') for raw in self.sent]
+
+
+class TestAsyncClientOnChain(unittest.TestCase):
+    """测试异步客户端在JSON-RPC节点上的读取、认领和完成路径"""
+
+    def setUp(self):
+        self.chain = StubTaskChain()
+        self.server = StubRPCServer(self.chain.results()).start()
+
+        # 同步客户端只提供共享组件（账户通道、估算器、回执跟踪等），不连接真实节点
+        sync_client = BlockchainClient.__new__(BlockchainClient)
+        sync_client.w3 = Web3(Web3.HTTPProvider(self.server.url))
+        sync_client.simulator = None
+        sync_client.task_indexer = None
+        sync_client.account_pool = AccountPool([ACCOUNT])
+        sync_client.account = ACCOUNT
+        sync_client.task_artifact = ContractArtifact('TaskContract', sync_client._get_basic_abi('TaskContract'))
+        sync_client.task_contract_abi = sync_client.task_artifact.abi
+        sync_client.task_contract = sync_client.w3.eth.contract(address=CONTRACT_ADDRESS, abi=sync_client.task_contract_abi)
+        sync_client.read_cache = BlockReadCache()
+        sync_client.fee_oracle = FeeOracle(sync_client.w3)
+        sync_client.result_store = ResultStore(MemoryBackend())
+        sync_client.preflight = PreflightChecker()
+        sync_client.gas_estimator = GasEstimator()
+        sync_client.available_tasks_page_size = 500
+        sync_client.receipt_tracker = ReceiptTracker(sync_client.w3, poll_interval=0.01, timeout=5)
+        sync_client.tx_supervisor = TransactionSupervisor(
+            sync_client.w3, ACCOUNT, sync_client.receipt_tracker, sync_client.fee_oracle, enabled=False
+        )
+        sync_client._chain_id = None
+        self.sync_client = sync_client
+
+        self.client = AsyncBlockchainClient.__new__(AsyncBlockchainClient)
+        self.client.sync_client = sync_client
+        self.client.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(self.server.url))
+        self.client.account = ACCOUNT
+        self.client.task_contract_address = CONTRACT_ADDRESS
+        self.client.task_contract = self.client.w3.eth.contract(address=CONTRACT_ADDRESS, abi=sync_client.task_contract_abi)
+        self.client.multicall = None
+
+    def tearDown(self):
+        self.sync_client.receipt_tracker.stop()
+        self.server.stop()
+
+    def test_reads(self):
+        """测试可用任务分页读取和任务详情解析"""
+        async def read():
+            return await self.client.get_available_tasks(), await self.client.get_task(2)
+
+        task_ids, task = asyncio.run(read())
+        self.assertEqual(task_ids, [1, 2, 3])
+        self.assertEqual(task['id'], 2)
+        self.assertEqual(task['title'], '任务2')
+        self.assertEqual(task['deadline'], 2 ** 40 - 1)
+
+    def test_claim_and_complete(self):
+        """测试认领和完成交易经过预执行后用连续的nonce广播，回执确认后Future返回成功"""
+        async def run():
+            claimed = await self.client.claim_task(4)
+            completed = await self.client.complete_task(4, '结果')
+            return claimed, completed
+
+        self.assertEqual(asyncio.run(run()), (True, True))
+        self.assertEqual(self.chain.sent_nonces(), [5, 6])
+        # 两次预执行都在pending区块上
+        preflights = [block for selector, block in self.chain.calls if selector != self.chain.get_task_selector]
+        self.assertEqual(preflights, ['pending', 'pending'])
+
+        lane = self.sync_client.account_pool.primary
+        self.assertEqual(lane.nonce_manager.pending_count(), 0)
+        self.assertEqual(lane.active_tasks, set())
+
+
+    def test_nonce_too_low_resyncs_lane(self):
+        """测试节点以 nonce too low 拒绝后不再分配同一个nonce，而是重新读取链上nonce"""
+        # 其他钱包使用了同一私钥，链上nonce已经前进
+        self.chain.chain_nonce = 7
+        self.chain.rejections.append('nonce too low: next nonce 7, tx nonce 5')
+        lane = self.sync_client.account_pool.primary
+        lane.nonce_manager.sync(5)
+
+        async def run():
+            return await self.client.claim_task(4), await self.client.claim_task(4)
+
+        self.assertEqual(asyncio.run(run()), (False, True))
+        self.assertEqual(self.chain.sent_nonces(), [7])
+        self.assertEqual(lane.nonce_manager.pending_count(), 0)
+
+        # 同步客户端：替换费用不足同样触发重新同步
+        self.chain.chain_nonce = 9
+        self.chain.rejections.append('replacement transaction underpriced')
+        self.assertFalse(self.sync_client.claim_task(5))
+        self.assertTrue(self.sync_client.claim_task(5))
+        self.assertEqual(self.chain.sent_nonces(), [7, 9])
+
+
+class TestAsyncClientSimulated(unittest.TestCase):
+    """测试异步客户端在模拟后端上的读取、认领和完成"""
+
+    def setUp(self):
+        sync_client = BlockchainClient.__new__(BlockchainClient)
+        sync_client.simulator = SimulatedBackend(task_count=5)
+        sync_client.account_pool = AccountPool([ACCOUNT])
+        sync_client.account = ACCOUNT
+        sync_client.result_store = ResultStore(MemoryBackend())
+        sync_client.preflight = PreflightChecker()
+        sync_client.task_indexer = None
+
+        self.client = AsyncBlockchainClient.__new__(AsyncBlockchainClient)
+        self.client.sync_client = sync_client
+        self.client.account = ACCOUNT
+
+    def test_claim_complete_and_read_result(self):
+        """测试认领、完成后任务状态、结果和工人统计"""
+        self.client.simulator.claim_task(3, '0x' + 'ee' * 20)
+
+        async def run():
+            available = await self.client.get_available_tasks()
+            claimed = await self.client.claim_task(2)
+            batch = await (await self.client.submit_claim_tasks([2, 3]))
+            completed = await self.client.complete_task(2, '结果')
+            return available, claimed, batch, completed, await self.client.get_task(2), \
+                await self.client.get_task_result(2), await self.client.get_worker_info(ACCOUNT.address)
+
+        available, claimed, batch, completed, task, result, worker = asyncio.run(run())
+        self.assertEqual(available, [1, 2, 4, 5])
+        self.assertTrue(claimed)
+        # 已被其他账户认领的任务在批量结果中为False
+        self.assertEqual(batch, {2: True, 3: False})
+        self.assertTrue(completed)
+        self.assertTrue(task['isCompleted'])
+        self.assertEqual(task['worker'], ACCOUNT.address)
+        self.assertEqual(result['result'], '结果')
+        self.assertEqual(worker['completedTasks'], 1)
+
+    def test_preflight_rejects_unclaimed_completion(self):
+        """测试完成未认领的任务在预执行时被拒绝"""
+        async def run():
+            return await self.client.complete_task(1, '结果')
+
+        self.assertFalse(asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+可用任务分页读取测试
+"""
+
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from blockchain.blockchain_client import BlockchainClient
+from blockchain.fee_oracle import FeeOracle
+from jsonrpc_stub import StubRPCServer
+
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '12' * 20)
+
+
+class OpenTaskSet:
+    """模拟合约中按交换删除后顺序被打乱的未认领任务集合"""
+
+    def __init__(self, task_ids):
+        self.task_ids = list(task_ids)
+        self.blocks = []
+        self.count_selector = bytes(Web3.keccak(text='getAvailableTaskCount()')[:4]).hex()
+
+    def eth_call(self, params):
+        transaction, block = params
+        self.blocks.append(block)
+        data = transaction.get('data') or transaction.get('input')
+        selector, args = data[2:10], bytes.fromhex(data[10:])
+        if selector == self.count_selector:
+            return '0x' + encode(['uint256'], [len(self.task_ids)]).hex()
+        offset, limit = decode(['uint256', 'uint256'], args)
+        return '0x' + encode(['uint256[]'], [self.task_ids[offset:offset + limit]]).hex()
+
+
+class TestAvailableTasksPaging(unittest.TestCase):
+    """测试客户端按页读取可用任务并固定在同一区块"""
+
+    def setUp(self):
+        task_ids = list(range(1, 1201))
+        random.Random(0).shuffle(task_ids)
+        self.open_tasks = OpenTaskSet(task_ids)
+        self.server = StubRPCServer({'eth_call': self.open_tasks.eth_call}).start()
+
+        # 只需要读取路径，不连接真实节点
+        self.client = BlockchainClient.__new__(BlockchainClient)
+        self.client.w3 = Web3(Web3.HTTPProvider(self.server.url))
+        self.client.simulator = None
+        self.client.task_indexer = None
+        self.client.fee_oracle = FeeOracle(self.client.w3)
+        self.client.available_tasks_page_size = 500
+        self.client.task_contract = self.client.w3.eth.contract(
+            address=CONTRACT_ADDRESS, abi=self.client._get_basic_abi('TaskContract')
+        )
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_pages_through_all_tasks(self):
+        """测试按页读取全部任务并排序，所有调用使用同一区块"""
+        self.assertEqual(self.client.get_available_tasks(), list(range(1, 1201)))
+        # 1次计数 + 3页
+        self.assertEqual(len(self.open_tasks.blocks), 4)
+        self.assertEqual(set(self.open_tasks.blocks), {'0x64'})
+
+    def test_empty_set(self):
+        """测试集合为空时只读取计数"""
+        self.open_tasks.task_ids = []
+        self.assertEqual(self.client.get_available_tasks(), [])
+        self.assertEqual(len(self.open_tasks.blocks), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
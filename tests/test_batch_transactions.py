@@ -0,0 +1,77 @@
+"""
+批量认领/完成交易测试
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web3 import Web3
+from web3.datastructures import AttributeDict
+
+from blockchain.blockchain_client import BlockchainClient
+from blockchain.contract_artifacts import ContractArtifact
+
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '12' * 20)
+OTHER_ADDRESS = Web3.to_checksum_address('0x' + '34' * 20)
+WORKER = '0x' + 'ab' * 20
+
+
+def _claimed_log(task_id: int, address: str = CONTRACT_ADDRESS, log_index: int = 0) -> AttributeDict:
+    """构造 TaskClaimed 事件日志"""
+    return AttributeDict({
+        'address': address,
+        'topics': [
+            Web3.keccak(text='TaskClaimed(uint256,address)'),
+            task_id.to_bytes(32, 'big'),
+            bytes(12) + bytes.fromhex(WORKER[2:]),
+        ],
+        'data': b'',
+        'blockNumber': 7,
+        'blockHash': b'\x01' * 32,
+        'transactionHash': b'\x02' * 32,
+        'transactionIndex': 0,
+        'logIndex': log_index,
+        'removed': False,
+    })
+
+
+class TestBatchOutcome(unittest.TestCase):
+    """测试从批量交易回执的事件中解析每个任务的结果"""
+
+    def setUp(self):
+        # 只需要合约事件解析，不连接节点
+        self.client = BlockchainClient.__new__(BlockchainClient)
+        self.client.task_artifact = ContractArtifact('TaskContract', self.client._get_basic_abi('TaskContract'))
+        self.client.task_contract = Web3().eth.contract(
+            address=CONTRACT_ADDRESS, abi=self.client.task_artifact.abi
+        )
+
+    def test_per_item_results(self):
+        """测试被跳过的任务在结果中为False"""
+        receipt = AttributeDict({'status': 1, 'logs': [_claimed_log(1), _claimed_log(3, log_index=1)]})
+        outcome = self.client._batch_outcome(receipt, [1, 2, 3], 'TaskClaimed')
+        self.assertEqual(outcome, {1: True, 2: False, 3: True})
+
+    def test_ignores_foreign_logs_and_reverts(self):
+        """测试其他合约的同名事件和回滚交易不计为成功"""
+        receipt = AttributeDict({'status': 1, 'logs': [_claimed_log(1, OTHER_ADDRESS)]})
+        self.assertEqual(self.client._batch_outcome(receipt, [1], 'TaskClaimed'), {1: False})
+
+        receipt = AttributeDict({'status': 0, 'logs': [_claimed_log(1)]})
+        self.assertEqual(self.client._batch_outcome(receipt, [1], 'TaskClaimed'), {1: False})
+
+    def test_basic_abi_has_batch_functions(self):
+        """测试基本ABI包含批量函数"""
+        contract = self.client.task_contract
+        calldata = contract.encodeABI('completeTasks', [[1, 2], [b'\x01' * 32, b'\x02' * 32], 'fs'])
+        self.assertTrue(calldata.startswith('0x'))
+        self.assertTrue(contract.encodeABI('claimTasks', [[1, 2, 3]]).startswith('0x'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+合约构建缓存和ABI产物测试
+"""
+
+import json
+import os
+import stat
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web3 import Web3
+
+from blockchain.blockchain_client import BlockchainClient
+from blockchain.contract_artifacts import ContractArtifact, build_contracts, clear_artifact_cache, load_artifact
+
+# 模拟 solc：--version 输出版本号，--standard-json 时记录调用并为源文件中的每个合约返回固定ABI
+FAKE_SOLC = """#!{python}
+import json, re, sys
+if '--version' in sys.argv:
+    print('solc, the solidity compiler commandline interface\\nVersion: 0.8.19+fake')
+    sys.exit(0)
+request = json.load(sys.stdin)
+with open({log!r}, 'a') as log:
+    log.write(json.dumps(request['settings']['optimizer']) + '\\n')
+abi = [{{'type': 'function', 'name': 'claimTask', 'inputs': [{{'name': 'taskId', 'type': 'uint256'}}],
+        'outputs': [], 'stateMutability': 'nonpayable'}}]
+contracts = {{}}
+for name, source in request['sources'].items():
+    contracts[name] = {{
+        contract: {{'abi': abi, 'evm': {{'bytecode': {{'object': '6080'}}}}}}
+        for contract in re.findall(r'contract (\\w+)', source['content'])
+    }}
+print(json.dumps({{'contracts': contracts}}))
+"""
+
+
+class TestContractArtifact(unittest.TestCase):
+    """测试预计算的选择器和主题"""
+
+    def test_selectors_and_topics(self):
+        abi = BlockchainClient._get_basic_abi(None, 'TaskContract')
+        artifact = ContractArtifact('TaskContract', abi)
+        contract = Web3().eth.contract(abi=abi)
+
+        self.assertEqual(artifact.selectors['claimTask(uint256)'].hex(), '8dd33495')
+        self.assertEqual(artifact.topics['TaskClaimed'], Web3.keccak(text='TaskClaimed(uint256,address)'))
+        self.assertEqual(
+            '0x' + artifact.selectors['claimTasks(uint256[])'].hex(),
+            contract.encodeABI('claimTasks', [[]])[:10]
+        )
+
+        restored = ContractArtifact.from_json('TaskContract', json.loads(json.dumps(artifact.to_json())))
+        self.assertEqual(restored.selectors, artifact.selectors)
+        self.assertEqual(restored.topics, artifact.topics)
+
+
+class TestBuildCache(unittest.TestCase):
+    """测试增量编译和进程内产物缓存"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.source_dir = root / 'contracts'
+        self.source_dir.mkdir()
+        (self.source_dir / 'A.sol').write_text('import "./Lib.sol";\ncontract A {}\n')
+        (self.source_dir / 'Lib.sol').write_text('contract Lib {}\n')
+        (self.source_dir / 'B.sol').write_text('contract B {}\n')
+
+        self.log = root / 'solc.log'
+        self.solc = root / 'solc'
+        self.solc.write_text(FAKE_SOLC.format(python=sys.executable, log=str(self.log)))
+        self.solc.chmod(self.solc.stat().st_mode | stat.S_IEXEC)
+        clear_artifact_cache()
+
+    def tearDown(self):
+        clear_artifact_cache()
+        self.tmp.cleanup()
+
+    def _build(self, **kwargs):
+        return build_contracts(self.source_dir, solc=str(self.solc), **kwargs)
+
+    def _compiles(self) -> int:
+        return len(self.log.read_text().splitlines()) if self.log.exists() else 0
+
+    def test_unchanged_sources_are_skipped(self):
+        """测试未变化的源文件不重新编译，修改导入文件或设置会使依赖它的源文件重新编译"""
+        self.assertEqual(set(self._build().values()), {'compiled'})
+        self.assertEqual(self._compiles(), 3)
+        self.assertEqual(set(self._build().values()), {'cached'})
+        self.assertEqual(self._compiles(), 3)
+
+        (self.source_dir / 'Lib.sol').write_text('contract Lib { }\n')
+        status = self._build()
+        self.assertEqual(status, {'A.sol': 'compiled', 'B.sol': 'cached', 'Lib.sol': 'compiled'})
+
+        self.assertEqual(set(self._build(optimize_runs=1000).values()), {'compiled'})
+        self.assertEqual(set(self._build(optimize_runs=1000, force=True).values()), {'compiled'})
+
+        # 产物被删除时重新编译
+        os.remove(self.source_dir / 'B.json')
+        self.assertEqual(self._build(optimize_runs=1000)['B.sol'], 'compiled')
+
+    def test_artifact_loaded_once_per_process(self):
+        """测试产物在进程内只解析一次"""
+        self._build()
+        artifact = load_artifact('A', artifact_dir=self.source_dir)
+        self.assertEqual(artifact.bytecode, '6080')
+        self.assertIn('claimTask(uint256)', artifact.selectors)
+
+        (self.source_dir / 'A.json').write_text('{}')
+        self.assertIs(load_artifact('A', artifact_dir=self.source_dir), artifact)
+
+        missing = load_artifact('Missing', fallback=lambda: [], artifact_dir=self.source_dir)
+        self.assertEqual(missing.abi, [])
+        with self.assertRaises(FileNotFoundError):
+            load_artifact('Other', artifact_dir=self.source_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,241 @@
+"""
+任务直接执行模式测试
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.execution_metrics import ExecutionMetrics
+from agents.llm_registry import LLMProfile, LLMRegistry
+from agents.response_cache import ResponseCache
+from agents.task_agent import TaskAgent, TaskExecutionTool
+from blockchain.preflight import PreflightRejected, RejectReason
+from llm_stub import StubLLMServer
+
+
+class FakeAgentExecutor:
+    """记录调用次数的 AgentExecutor 替身"""
+
+    def __init__(self, output="Agent循环的结果"):
+        self.calls = 0
+        self.output = output
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        return {"output": self.output}
+
+
+class FakeChainClient:
+    """认领和提交立即确认的异步区块链客户端替身"""
+
+    def __init__(self, task, *others):
+        self.task = task
+        self.tasks = {item['id']: item for item in (task, *others)}
+        self.submitted = {}
+
+    async def get_task(self, task_id):
+        return self.task if task_id == self.task['id'] else None
+
+    async def get_tasks(self, task_ids):
+        return [self.tasks[task_id] for task_id in task_ids if task_id in self.tasks]
+
+    async def get_fee_info(self):
+        return None
+
+    async def submit_claim_task(self, task_id):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(True)
+        return future
+
+    async def complete_task(self, task_id, result):
+        self.submitted[task_id] = result
+        return True
+
+
+class TestDirectExecution(unittest.TestCase):
+    """测试已知任务类型直接调用一次LLM，其他任务回退到Agent循环"""
+
+    def setUp(self):
+        self.server = StubLLMServer(
+            reply=lambda request: request['messages'][0]['content'].strip().splitlines()[0],
+            usage={'prompt_tokens': 30, 'completion_tokens': 12, 'total_tokens': 42}
+        ).start()
+        self.registry = LLMRegistry(api_key='test-key', base_url=self.server.url, default=LLMProfile(model='base-model'))
+
+        # 不连接区块链，只设置执行任务需要的属性
+        self.agent = TaskAgent.__new__(TaskAgent)
+        self.agent.llm_registry = self.registry
+        self.agent.execution_tool = TaskExecutionTool()
+        self.agent.execution_mode = 'direct'
+        self.agent.execution_metrics = ExecutionMetrics()
+        self.agent.agent_executor = FakeAgentExecutor()
+        self.agent.response_cache = ResponseCache(':memory:')
+
+    def tearDown(self):
+        self.registry.close()
+        self.server.stop()
+
+    def _execute(self, task_type, description='把这段话翻译成英文'):
+        task = {'title': '任务', 'description': description, 'requirements': '准确', 'taskType': task_type}
+        return asyncio.run(self.agent._execute_task(task))
+
+    def test_known_type_uses_single_llm_call(self):
+        """测试已知类型的任务使用对应的执行策略，只调用一次LLM，不经过Agent循环"""
+        self.assertEqual(self._execute('translation'), "请根据以下要求进行翻译：")
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.agent.agent_executor.calls, 0)
+
+        direct = self.agent.get_execution_stats()['modes']['direct']
+        self.assertEqual(direct['tasks'], 1)
+        self.assertEqual(direct['llm_calls'], 1)
+        self.assertEqual(direct['total_tokens'], 42)
+        self.assertEqual(direct['task_types'], {'translation': 1})
+        self.assertIsNotNone(direct['avg_seconds'])
+
+    def test_unknown_type_falls_back_to_agent(self):
+        """测试未知类型的任务和 agent 模式使用Agent循环"""
+        self.assertEqual(self._execute('data_labeling'), "Agent循环的结果")
+        self.agent.execution_mode = 'agent'
+        self.assertEqual(self._execute('programming'), "Agent循环的结果")
+
+        self.assertEqual(self.agent.agent_executor.calls, 2)
+        self.assertEqual(self.server.requests, [])
+        stats = self.agent.get_execution_stats()['modes']
+        self.assertEqual(stats['agent']['tasks'], 2)
+        self.assertEqual(stats['direct']['tasks'], 0)
+
+    def test_duplicate_task_uses_cached_response(self):
+        """测试内容相同（只有空白差异）的任务命中缓存，不再调用LLM；切换执行模式后不复用"""
+        first = self._execute('translation')
+        self.assertEqual(self._execute('translation', description='  把这段话翻译成英文\n'), first)
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.agent.execution_mode = 'agent'
+        self.assertEqual(self._execute('translation'), "Agent循环的结果")
+
+        stats = self.agent.get_execution_stats()
+        self.assertEqual(stats['modes']['cached']['tasks'], 1)
+        self.assertEqual(stats['modes']['cached']['llm_calls'], 0)
+        self.assertEqual(stats['cache']['hits'], 1)
+        self.assertEqual(stats['cache']['entries'], 2)
+
+    def test_agent_cache_key_follows_task_type_model(self):
+        """测试Agent循环的缓存键使用任务类型对应的模型，修改该模型后不复用之前的结果"""
+        self.agent.execution_mode = 'agent'
+        self.registry.overrides['programming'] = LLMProfile(model='code-model')
+        self._execute('programming')
+        self._execute('programming')
+        self.assertEqual(self.agent.agent_executor.calls, 1)
+
+        self.registry.overrides['programming'] = LLMProfile(model='other-code-model')
+        self._execute('programming')
+        self.assertEqual(self.agent.agent_executor.calls, 2)
+
+    def test_empty_and_failed_results_not_cached(self):
+        """测试空结果不写入缓存，执行工具失败时抛出异常而不是返回错误文本"""
+        self.agent.execution_mode = 'agent'
+        self.agent.agent_executor = FakeAgentExecutor(output='  ')
+        self._execute('programming')
+        self._execute('programming')
+        self.assertEqual(self.agent.agent_executor.calls, 2)
+        self.assertEqual(self.agent.response_cache.stats()['entries'], 0)
+
+        with self.assertRaises(Exception):
+            TaskExecutionTool()._run('不是JSON')
+
+    def test_agent_iteration_limit_is_failure(self):
+        """测试Agent循环达到迭代上限返回的停止提示按执行失败处理，不写入缓存"""
+        self.agent.execution_mode = 'agent'
+        self.agent.agent_executor = FakeAgentExecutor(output="Agent stopped due to iteration limit or time limit.")
+
+        with self.assertRaises(RuntimeError):
+            self._execute('programming')
+        self.assertEqual(self.agent.response_cache.stats()['entries'], 0)
+        self.assertEqual(self.agent.get_execution_stats()['modes']['agent']['failures'], 1)
+
+        # 下一次执行不会命中缓存，再次运行Agent循环
+        with self.assertRaises(RuntimeError):
+            self._execute('programming')
+        self.assertEqual(self.agent.agent_executor.calls, 2)
+
+    def test_failure_is_recorded(self):
+        """测试执行失败时记录失败并抛出异常"""
+        self.registry.close()
+        self.registry = LLMRegistry(
+            api_key='test-key', base_url='http://127.0.0.1:1/v1', default=LLMProfile(max_retries=0, timeout=2)
+        )
+        self.agent.llm_registry = self.registry
+
+        with self.assertRaises(Exception):
+            self._execute('research')
+        self.assertEqual(self.agent.get_execution_stats()['modes']['direct']['failures'], 1)
+        self.assertEqual(self.agent.response_cache.stats()['entries'], 0)
+
+    def test_engine_interface(self):
+        """测试执行引擎使用的公开接口：任务排序、记录预执行拒绝、认领后执行"""
+        def make_task(task_id, reward, task_type='research'):
+            return {
+                'id': task_id, 'title': '任务', 'description': f"调研{task_id}", 'requirements': '',
+                'taskType': task_type, 'reward': reward, 'deadline': 2 ** 40 - 1
+            }
+
+        self.agent.async_blockchain_client = FakeChainClient(make_task(1, 10 ** 16), make_task(2, 10 ** 18))
+        self.agent.rejected_tasks = {}
+
+        async def run():
+            ranked = await self.agent.rank_tasks([1, 2, 3], 'price-low')
+            loop = asyncio.get_running_loop()
+            confirmed, reverted = loop.create_future(), loop.create_future()
+            confirmed.set_result(True)
+            reverted.set_result(False)
+            return (ranked, await self.agent.execute_after_claim(ranked[0], reverted),
+                    await self.agent.execute_after_claim(ranked[0], confirmed))
+
+        ranked, discarded, result = asyncio.run(run())
+        self.assertEqual([task['id'] for task in ranked], [1, 2])
+        self.assertIsNone(discarded)
+        self.assertEqual(result, "请根据以下要求进行研究分析：")
+
+        self.agent.record_rejection(PreflightRejected(1, 'claimTask', RejectReason.ALREADY_CLAIMED))
+        self.agent.record_rejection(PreflightRejected(2, 'claimTask', RejectReason.UNKNOWN))
+        self.assertEqual(self.agent.rejected_tasks, {1: RejectReason.ALREADY_CLAIMED})
+
+    def test_work_cycle_streams_progress_and_tokens(self):
+        """测试有进度回调时逐段发送生成的 token，以及认领、执行、提交各阶段事件"""
+        task = {
+            'id': 7, 'title': '任务', 'description': '写一篇短文', 'requirements': '', 'taskType': 'content_writing',
+            'reward': 10, 'isClaimed': False, 'isCompleted': False
+        }
+        self.agent.async_blockchain_client = FakeChainClient(task)
+        self.agent.rejected_tasks = {}
+        events = []
+
+        result = asyncio.run(self.agent.work_cycle([7], progress=lambda event, data: events.append((event, data))))
+
+        self.assertEqual(result['status'], 'success')
+        tokens = [data['text'] for event, data in events if event == 'token']
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual(''.join(tokens), result['result'])
+        self.assertEqual(self.agent.async_blockchain_client.submitted[7], result['result'])
+        self.assertTrue(self.server.requests[0]['stream'])
+
+        phases = [(event, data['status']) for event, data in events if event != 'token']
+        self.assertEqual(phases[0], ('claim', 'started'))
+        self.assertLess(phases.index(('execute', 'started')), phases.index(('execute', 'done')))
+        self.assertIn(('claim', 'confirmed'), phases)
+        self.assertEqual(phases[-2:], [('submit', 'started'), ('submit', 'confirmed')])
+        # 流式执行单独记录，不计入 direct 模式的Token统计
+        modes = self.agent.get_execution_stats()['modes']
+        self.assertEqual(modes['direct_stream']['llm_calls'], 1)
+        self.assertEqual(modes['direct_stream']['task_types'], {'content_writing': 1})
+        self.assertEqual(modes['direct']['tasks'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+并发任务执行引擎测试
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.execution_engine import ExecutionEngine
+from blockchain.preflight import PreflightRejected, RejectReason
+
+
+class FakeClient:
+    """
+    模拟异步区块链客户端：认领立即广播，提交立即确认；reject 中的任务预执行被拒绝，fail_claims 中的任务认领交易回滚，
+    fail_submits 为任务的前若干次提交失败次数
+    """
+
+    def __init__(self, task_ids, reject=(), fail_claims=(), fail_submits=None):
+        self.available = list(task_ids)
+        self.reject = set(reject)
+        self.fail_claims = set(fail_claims)
+        self.fail_submits = dict(fail_submits or {})
+        self.completed = []
+        self.submissions = []
+
+    async def get_available_tasks(self):
+        return list(self.available)
+
+    async def submit_claim_task(self, task_id):
+        if task_id in self.reject:
+            raise PreflightRejected(task_id, 'claimTask', RejectReason.ALREADY_CLAIMED, "Task already claimed")
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(task_id not in self.fail_claims)
+        if task_id in self.fail_claims:
+            # 认领失败：任务已被其他Worker认领
+            self.available.remove(task_id)
+        return future
+
+    async def complete_task(self, task_id, result):
+        self.submissions.append((task_id, result))
+        if self.fail_submits.get(task_id):
+            self.fail_submits[task_id] -= 1
+            raise RuntimeError("交易被丢弃")
+        self.available.remove(task_id)
+        self.completed.append(task_id)
+        return True
+
+
+class FakeAgent:
+    """模拟 TaskAgent：执行耗时 execution_seconds，记录最大并发执行数"""
+
+    def __init__(self, client, execution_seconds=0.05):
+        self.async_blockchain_client = client
+        self.execution_seconds = execution_seconds
+        self.rejected_tasks = {}
+        self.running = 0
+        self.max_running = 0
+
+    async def rank_tasks(self, task_ids, execution_order='ai'):
+        return [{'id': task_id, 'title': {'zh': f"任务{task_id}"}, 'reward': 10} for task_id in task_ids]
+
+    def record_rejection(self, rejection):
+        self.rejected_tasks[rejection.task_id] = rejection.reason
+
+    async def execute_after_claim(self, task, claim_future):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.execution_seconds)
+        finally:
+            self.running -= 1
+        if not await claim_future:
+            return None
+        return f"结果{task['id']}"
+
+
+class TestExecutionEngine(unittest.TestCase):
+    """测试并发上限、计数和停止时的排空"""
+
+    def _run(self, agent, concurrency, until, **kwargs):
+        async def scenario():
+            results = []
+            kwargs.setdefault('poll_interval', 0.01)
+            engine = ExecutionEngine(agent, concurrency=concurrency, on_result=results.append, **kwargs)
+            runner = asyncio.create_task(engine.run())
+            while not until(engine, results):
+                await asyncio.sleep(0.01)
+            engine.stop()
+            await asyncio.wait_for(runner, timeout=5)
+            return engine, results
+
+        return asyncio.run(scenario())
+
+    def test_tasks_run_concurrently_within_limit(self):
+        """测试最多 concurrency 个任务同时执行，所有任务都被提交"""
+        client = FakeClient(range(1, 11))
+        agent = FakeAgent(client)
+        engine, results = self._run(agent, 3, lambda engine, results: len(results) == 10)
+
+        self.assertEqual(agent.max_running, 3)
+        self.assertEqual(sorted(client.completed), list(range(1, 11)))
+        self.assertTrue(all(result['status'] == 'success' for result in results))
+        self.assertEqual(results[0]['task_title'], f"任务{results[0]['task_id']}")
+
+        stats = engine.stats()
+        self.assertFalse(stats['running'])
+        self.assertEqual(stats['counts']['submitted'], 10)
+        self.assertEqual(stats['rewards'], 100)
+        self.assertEqual(stats['in_flight'], [])
+        self.assertIsNotNone(stats['avg_stage_seconds']['execute'])
+
+    def test_rejected_and_failed_claims_release_slots(self):
+        """测试预执行拒绝和认领失败的任务释放槽位，被拒绝的任务不再作为候选"""
+        client = FakeClient([1, 2, 3, 4], reject=[2], fail_claims=[3])
+        agent = FakeAgent(client)
+        engine, results = self._run(agent, 1, lambda engine, results: len(client.completed) == 2)
+
+        self.assertEqual(sorted(client.completed), [1, 4])
+        self.assertEqual(agent.rejected_tasks, {2: RejectReason.ALREADY_CLAIMED})
+        counts = engine.stats()['counts']
+        self.assertEqual(counts['rejected'], 1)
+        self.assertEqual(counts['claim_failed'], 1)
+        self.assertIn('claim_failed', {result['status'] for result in results})
+
+    def test_stop_drains_in_flight_tasks(self):
+        """测试停止后不再选取新任务，在途任务提交完成后才退出"""
+        client = FakeClient(range(1, 21))
+        agent = FakeAgent(client, execution_seconds=0.2)
+        engine, results = self._run(agent, 4, lambda engine, results: len(engine.stats()['in_flight']) == 4)
+
+        self.assertEqual(len(client.completed), 4)
+        self.assertEqual(engine.stats()['counts']['admitted'], 4)
+        self.assertEqual(len(results), 4)
+
+    def test_drain_timeout_abandons_slow_tasks(self):
+        """测试排空超时后放弃未完成的任务"""
+        client = FakeClient([1, 2])
+        agent = FakeAgent(client, execution_seconds=10)
+        engine, results = self._run(
+            agent, 2, lambda engine, results: len(engine.stats()['in_flight']) == 2, drain_timeout=0.05
+        )
+
+        self.assertEqual(client.completed, [])
+        self.assertEqual(engine.stats()['counts']['abandoned'], 2)
+
+    def test_submit_failure_retries_same_result(self):
+        """测试提交失败后用同一个执行结果退避重试，重试耗尽才释放槽位并报告 submit_failed"""
+        client = FakeClient([1, 2], fail_submits={1: 2, 2: 5})
+        agent = FakeAgent(client, execution_seconds=0)
+        engine, results = self._run(
+            agent, 2, lambda engine, results: len(results) == 2,
+            submit_retries=2, submit_retry_delay=0.01, poll_interval=10
+        )
+
+        self.assertEqual(client.completed, [1])
+        self.assertEqual(client.submissions.count((1, "结果1")), 3)
+        self.assertEqual(client.submissions.count((2, "结果2")), 3)
+        statuses = {result['task_id']: result['status'] for result in results}
+        self.assertEqual(statuses, {1: 'success', 2: 'submit_failed'})
+        counts = engine.stats()['counts']
+        self.assertEqual(counts['submit_retries'], 4)
+        self.assertEqual(counts['submit_failed'], 1)
+        # 每个任务只认领、执行一次
+        self.assertEqual(counts['admitted'], 2)
+
+    def test_stats_reported_while_running(self):
+        """测试运行期间按 stats_interval 定期回调统计"""
+        client = FakeClient(range(1, 4))
+        agent = FakeAgent(client)
+        reports = []
+        engine, results = self._run(
+            agent, 1, lambda engine, results: len(reports) >= 2 and len(results) == 3,
+            stats_interval=0.02, on_stats=reports.append
+        )
+
+        self.assertTrue(all(report['running'] for report in reports))
+        self.assertLessEqual(reports[0]['counts'].get('submitted', 0), reports[-1]['counts']['submitted'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+费用预言机测试
+"""
+
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from blockchain.fee_oracle import FeeOracle
+from utils.helpers import estimate_gas_price
+
+
+class FakeEth:
+    def __init__(self, base_fees):
+        self.block_number = 100
+        self.base_fees = base_fees
+        self.fee_history_calls = 0
+        self.gas_price = 7
+
+    def fee_history(self, block_count, newest_block, percentiles):
+        self.fee_history_calls += 1
+        return {
+            'baseFeePerGas': self.base_fees,
+            'reward': [[1, 2, 3], [1, 4, 9], [1, 6, 9]]
+        }
+
+
+class TestFeeOracle(unittest.TestCase):
+    """测试费用计算与按区块缓存"""
+
+    def test_eip1559_fees(self):
+        """测试根据feeHistory计算基础费用和优先费分位数"""
+        eth = FakeEth([10, 20, 30, 40])
+        oracle = FeeOracle(SimpleNamespace(eth=eth), block_ttl=0)
+        fees = oracle.get_fees()
+
+        self.assertTrue(fees['eip1559'])
+        self.assertEqual(fees['base_fee'], 40)
+        self.assertEqual(fees['priority_fees'], {25: 1, 50: 4, 75: 9})
+        self.assertEqual(fees['gas_price'], 44)
+        self.assertEqual(oracle.transaction_fee_params(), {'maxFeePerGas': 84, 'maxPriorityFeePerGas': 4})
+
+    def test_cached_per_block(self):
+        """测试同一区块内只查询一次feeHistory"""
+        eth = FakeEth([10, 20])
+        oracle = FeeOracle(SimpleNamespace(eth=eth), block_ttl=0)
+        oracle.get_fees()
+        oracle.get_fees()
+        self.assertEqual(eth.fee_history_calls, 1)
+
+        eth.block_number += 1
+        oracle.get_fees()
+        self.assertEqual(eth.fee_history_calls, 2)
+
+    def test_legacy_chain(self):
+        """测试不支持EIP-1559的链退化为gasPrice"""
+        oracle = FeeOracle(SimpleNamespace(eth=FakeEth([0, 0])), block_ttl=0)
+        self.assertEqual(oracle.transaction_fee_params(), {'gasPrice': 7})
+
+    def test_estimate_gas_price_uses_fee_data(self):
+        """测试Gas价格估算使用基础费用加优先费"""
+        self.assertEqual(estimate_gas_price({'base_fee': 30, 'max_priority_fee': 2, 'gas_price': 99}), 32)
+        self.assertEqual(estimate_gas_price({'gas_price': 99}), 99)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Gas上限估算测试
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from blockchain.gas_estimator import GasEstimator
+
+
+class FakeFunction:
+    """记录 estimate_gas 调用次数的合约调用，Gas = 基础值 + 每字节Gas * calldata长度"""
+
+    calls = 0
+
+    def __init__(self, fn_name: str, size: int, base: int = 50000, per_byte: int = 16, fail: bool = False):
+        self.fn_name = fn_name
+        self.size = size
+        self.gas = base + per_byte * size
+        self.fail = fail
+
+    def _encode_transaction_data(self) -> str:
+        return '0x' + 'ab' * self.size
+
+    def estimate_gas(self, transaction, block_identifier=None):
+        FakeFunction.calls += 1
+        if self.fail:
+            raise ValueError('execution reverted')
+        return self.gas
+
+
+class AsyncFakeFunction(FakeFunction):
+    async def estimate_gas(self, transaction, block_identifier=None):
+        return FakeFunction.estimate_gas(self, transaction, block_identifier)
+
+
+class TestGasEstimator(unittest.TestCase):
+    """测试缓存、线性模型、安全余量和Gas不足反馈"""
+
+    def setUp(self):
+        FakeFunction.calls = 0
+        self.estimator = GasEstimator(margin_percent=10, min_samples=3, resample_interval=5)
+
+    def test_fixed_size_function_is_cached(self):
+        """测试calldata长度固定的函数只估算一次，之后按间隔重新采样"""
+        function = FakeFunction('claimTask', 36)
+        limits = [self.estimator.estimate(function, '0xworker', 200000) for _ in range(6)]
+        self.assertEqual(set(limits), {int((50000 + 16 * 36) * 1.1) + 1})
+        self.assertEqual(FakeFunction.calls, 1)
+
+        self.estimator.estimate(function, '0xworker', 200000)
+        self.assertEqual(FakeFunction.calls, 2)
+
+    def test_linear_model_predicts_new_lengths(self):
+        """测试样本足够后按calldata长度预测，不再发起估算"""
+        for size in (100, 200, 300):
+            self.estimator.estimate(FakeFunction('completeTask', size), '0xworker', 300000)
+        self.assertEqual(FakeFunction.calls, 3)
+
+        limit = self.estimator.estimate(FakeFunction('completeTask', 1000), '0xworker', 300000)
+        self.assertEqual(FakeFunction.calls, 3)
+        self.assertGreaterEqual(limit, int((50000 + 16 * 1000) * 1.1))
+        self.assertLess(limit, int((50000 + 16 * 1000) * 1.12))
+
+    def test_estimate_failure_uses_default(self):
+        """测试估算失败时使用默认值"""
+        function = FakeFunction('claimTask', 36, fail=True)
+        self.assertEqual(self.estimator.estimate(function, '0xworker', 200000), 200000)
+        self.assertEqual(self.estimator.stats()['counts'], {'default': 1})
+
+        disabled = GasEstimator(enabled=False)
+        self.assertEqual(disabled.estimate(FakeFunction('claimTask', 36), '0xworker', 123), 123)
+
+    def test_out_of_gas_feedback_raises_limit(self):
+        """测试因Gas不足回滚后提高修正系数并重新采样"""
+        function = FakeFunction('claimTask', 36)
+        limit = self.estimator.estimate(function, '0xworker', 200000)
+        self.estimator.register(b'\x01' * 32, function, limit)
+        self.estimator.observe(b'\x01' * 32, {'status': 0, 'gasUsed': limit})
+
+        raised = self.estimator.estimate(function, '0xworker', 200000)
+        self.assertEqual(FakeFunction.calls, 2)
+        self.assertGreater(raised, limit)
+        claim_stats = self.estimator.stats()['functions']['claimTask']
+        self.assertEqual(claim_stats['under_estimates'], 1)
+        self.assertAlmostEqual(claim_stats['avg_utilization'], 1.0)
+
+        # 正常回滚（未耗尽Gas）不计为估算偏低
+        self.estimator.register(b'\x02' * 32, function, raised)
+        self.estimator.observe(b'\x02' * 32, {'status': 0, 'gasUsed': raised // 2})
+        self.assertEqual(self.estimator.stats()['functions']['claimTask']['under_estimates'], 1)
+
+    def test_async_estimate(self):
+        """测试异步估算与同步估算共享模型"""
+        function = AsyncFakeFunction('claimTask', 36)
+        limit = asyncio.run(self.estimator.estimate_async(function, '0xworker', 200000))
+        self.assertEqual(limit, self.estimator.estimate(FakeFunction('claimTask', 36), '0xworker', 200000))
+        self.assertEqual(FakeFunction.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+共享LLM客户端注册表测试
+"""
+
+import asyncio
+import json
+import os
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.llm_registry import LLMProfile, LLMRegistry
+from llm_stub import StubLLMServer
+
+
+class TestLLMRegistry(unittest.TestCase):
+    """测试客户端复用、按任务类型覆盖和连接复用统计"""
+
+    def setUp(self):
+        self.server = StubLLMServer().start()
+        self.registry = LLMRegistry(
+            api_key='test-key',
+            base_url=self.server.url,
+            default=LLMProfile(model='base-model'),
+            overrides={'programming': LLMProfile(model='code-model', temperature=0.2, timeout=300)}
+        )
+
+    def tearDown(self):
+        self.registry.close()
+        self.server.stop()
+
+    def test_clients_are_shared_per_profile(self):
+        """测试相同参数的任务类型共用同一个客户端，覆盖的任务类型使用自己的模型"""
+        self.assertIs(self.registry.get(), self.registry.get('translation'))
+        self.assertIsNot(self.registry.get(), self.registry.get('programming'))
+        self.assertIs(self.registry.get('programming'), self.registry.get('programming'))
+        self.assertEqual(self.registry.get('programming').request_timeout, 300)
+
+        self.assertEqual(self.registry.get('programming').invoke("写代码").content, "来自 code-model 的回复")
+        self.assertEqual(self.server.requests[-1]['temperature'], 0.2)
+        self.assertEqual(self.registry.get('research').invoke("调研").content, "来自 base-model 的回复")
+
+    def test_connections_are_reused(self):
+        """测试多次调用（包括不同任务类型和异步调用）复用同一个长连接"""
+        for task_type in ('content_writing', 'programming', 'design'):
+            self.registry.get(task_type).invoke("任务")
+
+        stats = self.registry.stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['connections_opened'], 1)
+        self.assertEqual(stats['connections_reused'], 2)
+        self.assertGreater(stats['connect_seconds_total'], 0)
+        self.assertEqual(stats['clients'], 2)
+
+        async def invoke_async():
+            try:
+                for _ in range(2):
+                    await self.registry.get().ainvoke("任务")
+            finally:
+                await self.registry._async_http_client.aclose()
+
+        asyncio.run(invoke_async())
+        stats = self.registry.stats()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['connections_opened'], 2)
+
+    def test_from_env(self):
+        """测试从环境变量读取模型配置和按任务类型的覆盖"""
+        env = {
+            'OPENAI_API_KEY': 'test-key',
+            'LLM_MODEL': 'env-model',
+            'LLM_BASE_URL': 'http://127.0.0.1:1/v1',
+            'LLM_TIMEOUT': '60',
+            'LLM_TASK_OVERRIDES': json.dumps({'translation': {'temperature': 0.1}})
+        }
+        with mock.patch.dict(os.environ, env):
+            registry = LLMRegistry.from_env()
+        try:
+            self.assertEqual(registry.base_url, 'http://127.0.0.1:1/v1')
+            self.assertEqual(registry.default.model, 'env-model')
+            translation = registry.profile_for('translation')
+            self.assertEqual((translation.model, translation.temperature, translation.timeout), ('env-model', 0.1, 60))
+            self.assertIs(registry.profile_for('design'), registry.default)
+        finally:
+            registry.close()
+
+        with mock.patch.dict(os.environ, {'LLM_TASK_OVERRIDES': json.dumps({'design': {'modle': 'x'}})}):
+            with self.assertRaises(ValueError):
+                LLMRegistry.from_env()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Multicall 聚合调用测试
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web3 import Web3
+
+from blockchain.multicall import Multicall, chunked
+
+
+class _FakeAggregate:
+    def __init__(self, calls_log, payload):
+        self.calls_log = calls_log
+        self.payload = payload
+
+    def call(self):
+        self.calls_log.append(self.payload)
+        return [(True, call_data) for _, _, call_data in self.payload]
+
+
+class _FakeFunctions:
+    def __init__(self, calls_log):
+        self.calls_log = calls_log
+
+    def aggregate3(self, payload):
+        return _FakeAggregate(self.calls_log, payload)
+
+
+class TestMulticall(unittest.TestCase):
+    """测试Multicall分块聚合"""
+
+    def test_chunked(self):
+        """测试列表分块"""
+        self.assertEqual(list(chunked([1, 2, 3, 4, 5], 2)), [[1, 2], [3, 4], [5]])
+        self.assertEqual(list(chunked([], 3)), [])
+
+    def test_aggregate_respects_chunk_size(self):
+        """测试聚合调用按分块大小发送并保持结果顺序"""
+        multicall = Multicall(Web3(), chunk_size=3)
+        calls_log = []
+        multicall.contract.functions = _FakeFunctions(calls_log)
+
+        target = '0x1234567890123456789012345678901234567890'
+        calls = [(target, bytes([i])) for i in range(7)]
+        results = multicall.aggregate(calls)
+
+        self.assertEqual(len(calls_log), 3)
+        self.assertEqual([len(batch) for batch in calls_log], [3, 3, 1])
+        self.assertEqual(results, [(True, bytes([i])) for i in range(7)])
+
+
+if __name__ == "__main__":
+    unittest.main()
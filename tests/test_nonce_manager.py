@@ -0,0 +1,96 @@
+"""
+本地nonce分配器测试
+"""
+
+import asyncio
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from blockchain.nonce_manager import NonceManager
+
+
+class TestNonceManager(unittest.TestCase):
+    """测试nonce分配、归还和重新同步"""
+
+    def test_allocate_syncs_once_then_increments(self):
+        """测试首次分配从链上同步，之后本地递增"""
+        fetch_count = []
+
+        def fetch():
+            fetch_count.append(1)
+            return 7
+
+        manager = NonceManager()
+        self.assertEqual([manager.allocate(fetch) for _ in range(3)], [7, 8, 9])
+        self.assertEqual(len(fetch_count), 1)
+        self.assertEqual(manager.pending_count(), 3)
+
+    def test_release_last_nonce_rolls_back(self):
+        """测试归还最后分配的nonce会直接回退"""
+        manager = NonceManager()
+        manager.allocate(lambda: 0)
+        nonce = manager.allocate(lambda: 0)
+        manager.release(nonce)
+        self.assertFalse(manager.needs_sync())
+        self.assertEqual(manager.allocate(), nonce)
+
+    def test_release_with_gap_forces_resync(self):
+        """测试归还中间的nonce会触发重新同步"""
+        manager = NonceManager()
+        first = manager.allocate(lambda: 3)
+        manager.allocate()
+        manager.release(first)
+        self.assertTrue(manager.needs_sync())
+        self.assertEqual(manager.allocate(lambda: 3), 3)
+
+    def test_reject_forces_resync(self):
+        """测试节点拒绝最后分配的nonce时不回退，下次分配重新读取链上nonce"""
+        manager = NonceManager()
+        nonce = manager.allocate(lambda: 5)
+        manager.reject(nonce)
+        self.assertTrue(manager.needs_sync())
+        self.assertEqual(manager.pending_count(), 0)
+        self.assertEqual(manager.allocate(lambda: 6), 6)
+
+    def test_concurrent_allocation_is_unique(self):
+        """测试多线程并发分配不会重复"""
+        manager = NonceManager()
+        allocated = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(100):
+                nonce = manager.allocate(lambda: 0)
+                with lock:
+                    allocated.append(nonce)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(allocated), list(range(800)))
+
+    def test_allocate_async(self):
+        """测试协程并发分配"""
+        manager = NonceManager()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            return 10
+
+        async def run():
+            return await asyncio.gather(*[manager.allocate_async(fetch) for _ in range(5)])
+
+        self.assertEqual(sorted(asyncio.run(run())), [10, 11, 12, 13, 14])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+交易预执行检查测试
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web3.exceptions import ContractLogicError
+
+from blockchain.preflight import PreflightChecker, PreflightRejected, RejectReason, classify_revert
+from blockchain.simulated_backend import SimulatedBackend
+
+WORKER = '0x' + 'ab' * 20
+OTHER_WORKER = '0x' + 'cd' * 20
+DIGEST = 'ef' * 32
+
+
+class FakeFunction:
+    """记录调用参数的合约函数替身"""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = []
+
+    def call(self, transaction, block_identifier='latest'):
+        self.calls.append((transaction, block_identifier))
+        if self.error:
+            raise self.error
+        return True
+
+
+class AsyncFakeFunction(FakeFunction):
+    async def call(self, transaction, block_identifier='latest'):
+        return super().call(transaction, block_identifier)
+
+
+class TestPreflightChecker(unittest.TestCase):
+    """测试回滚信息分类和拒绝统计"""
+
+    def test_classify_revert(self):
+        """测试节点返回的回滚信息映射为拒绝原因"""
+        self.assertEqual(classify_revert('execution reverted: Task already claimed'), RejectReason.ALREADY_CLAIMED)
+        self.assertEqual(classify_revert('Only assigned worker can complete task'), RejectReason.NOT_ASSIGNED_WORKER)
+        self.assertEqual(classify_revert('execution reverted'), RejectReason.UNKNOWN)
+        self.assertTrue(RejectReason.ALREADY_CLAIMED.is_permanent)
+        self.assertFalse(RejectReason.UNKNOWN.is_permanent)
+
+    def test_rejects_reverting_call_at_pending_block(self):
+        """测试会回滚的调用抛出类型化的拒绝"""
+        checker = PreflightChecker()
+        function = FakeFunction(ContractLogicError('execution reverted: Task already claimed'))
+
+        with self.assertRaises(PreflightRejected) as context:
+            checker.check(function, WORKER, 3, 'claim')
+
+        self.assertEqual(context.exception.task_id, 3)
+        self.assertEqual(context.exception.reason, RejectReason.ALREADY_CLAIMED)
+        self.assertEqual(function.calls, [({'from': WORKER}, 'pending')])
+        self.assertEqual(checker.stats()['rejected_by_reason'], {'already_claimed': 1})
+
+    def test_passes_successful_call_and_node_errors(self):
+        """测试不会回滚或节点出错时不阻止交易"""
+        checker = PreflightChecker()
+        checker.check(FakeFunction(), WORKER, 1, 'claim')
+        checker.check(FakeFunction(ConnectionError('node down')), WORKER, 1, 'claim')
+
+        stats = checker.stats()
+        self.assertEqual(stats['checked'], 1)
+        self.assertEqual(stats['rejected'], 0)
+        self.assertEqual(stats['errors'], 1)
+
+    def test_async_and_disabled(self):
+        """测试异步检查，以及关闭后不发起模拟调用"""
+        checker = PreflightChecker()
+        function = AsyncFakeFunction(ContractLogicError('execution reverted: Task deadline passed'))
+        with self.assertRaises(PreflightRejected) as context:
+            asyncio.run(checker.check_async(function, WORKER, 2, 'claim'))
+        self.assertEqual(context.exception.reason, RejectReason.DEADLINE_PASSED)
+
+        disabled = PreflightChecker(enabled=False)
+        function = FakeFunction(ContractLogicError('execution reverted: Task already claimed'))
+        disabled.check(function, WORKER, 1, 'claim')
+        disabled.check_message(1, 'claim', 'Task already claimed')
+        self.assertEqual(function.calls, [])
+
+    def test_simulated_backend_revert_messages(self):
+        """测试模拟后端给出与合约一致的回滚信息"""
+        backend = SimulatedBackend()
+        self.assertIsNone(backend.preflight_claim(1, WORKER))
+        backend.claim_task(1, WORKER)
+        self.assertIsNone(backend.preflight_claim(1, WORKER))
+        self.assertEqual(classify_revert(backend.preflight_claim(1, OTHER_WORKER)), RejectReason.ALREADY_CLAIMED)
+        self.assertEqual(classify_revert(backend.preflight_claim(99, WORKER)), RejectReason.TASK_NOT_FOUND)
+
+        self.assertEqual(classify_revert(backend.preflight_complete(1, OTHER_WORKER, DIGEST)),
+                         RejectReason.NOT_ASSIGNED_WORKER)
+        self.assertIsNone(backend.preflight_complete(1, WORKER, DIGEST))
+        backend.complete_task(1, WORKER, DIGEST, 'fs')
+        self.assertEqual(classify_revert(backend.preflight_complete(1, WORKER, DIGEST)),
+                         RejectReason.ALREADY_COMPLETED)
+
+
+if __name__ == "__main__":
+    unittest.main()
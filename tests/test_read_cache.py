@@ -0,0 +1,51 @@
+"""
+区块读缓存测试
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from blockchain.read_cache import BlockReadCache
+
+
+class TestBlockReadCache(unittest.TestCase):
+    """测试按区块号失效的LRU缓存"""
+
+    def test_hit_within_same_block(self):
+        """测试同一区块内命中，新区块失效"""
+        cache = BlockReadCache()
+        cache.put(('task', 1), 10, {'id': 1})
+
+        self.assertEqual(cache.get(('task', 1), 10), (True, {'id': 1}))
+        self.assertEqual(cache.get(('task', 1), 11), (False, None))
+        self.assertEqual(cache.get(('task', 1), None), (False, None))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_lru_eviction(self):
+        """测试超过容量时淘汰最久未使用的条目"""
+        cache = BlockReadCache(max_size=2)
+        cache.put('a', 1, 'A')
+        cache.put('b', 1, 'B')
+        cache.get('a', 1)
+        cache.put('c', 1, 'C')
+
+        self.assertTrue(cache.get('a', 1)[0])
+        self.assertFalse(cache.get('b', 1)[0])
+        self.assertTrue(cache.get('c', 1)[0])
+
+    def test_invalidate(self):
+        """测试本账户交易确认后清除条目"""
+        cache = BlockReadCache()
+        cache.put(('balance', '0xabc'), 5, 100)
+        cache.invalidate(('balance', '0xabc'), ('task', 9))
+        self.assertFalse(cache.get(('balance', '0xabc'), 5)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
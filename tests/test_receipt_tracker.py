@@ -0,0 +1,74 @@
+"""
+交易回执跟踪器测试
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from hexbytes import HexBytes
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from blockchain.receipt_tracker import ReceiptTracker
+
+
+class FakeEth:
+    def __init__(self):
+        self.receipts = {}
+        self.calls = 0
+
+    def get_transaction_receipt(self, tx_hash):
+        self.calls += 1
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(f"{tx_hash.hex()} not found")
+        return self.receipts[tx_hash]
+
+
+class TestReceiptTracker(unittest.TestCase):
+    """测试回执跟踪"""
+
+    def setUp(self):
+        self.eth = FakeEth()
+        self.tracker = ReceiptTracker(SimpleNamespace(eth=self.eth), poll_interval=0.01, timeout=60)
+
+    def tearDown(self):
+        self.tracker.stop()
+
+    def test_future_resolves_when_mined(self):
+        """测试交易上链后Future得到回执并触发回调"""
+        tx_hash = HexBytes(b'\x01' * 32)
+        callback_results = []
+        future = self.tracker.track(tx_hash, callback=lambda done: callback_results.append(done.result()))
+
+        self.assertFalse(future.done())
+        self.eth.receipts[tx_hash] = {'status': 1, 'blockNumber': 5}
+
+        self.assertEqual(future.result(timeout=2)['status'], 1)
+        self.assertEqual(callback_results, [{'status': 1, 'blockNumber': 5}])
+        self.assertEqual(self.tracker.pending_count(), 0)
+
+    def test_timeout(self):
+        """测试超时未上链的交易以TimeExhausted结束"""
+        future = self.tracker.track(b'\x02' * 32, timeout=0)
+        with self.assertRaises(TimeExhausted):
+            future.result(timeout=2)
+
+    def test_asyncio_wrap(self):
+        """测试在asyncio中等待回执"""
+        tx_hash = HexBytes(b'\x03' * 32)
+        self.eth.receipts[tx_hash] = {'status': 0, 'blockNumber': 7}
+
+        async def wait_receipt():
+            return await asyncio.wrap_future(self.tracker.track(tx_hash))
+
+        self.assertEqual(asyncio.run(wait_receipt())['status'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
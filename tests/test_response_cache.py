@@ -0,0 +1,89 @@
+"""
+LLM响应缓存测试
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """测试缓存键规范化、TTL过期、LRU淘汰和持久化"""
+
+    def test_key_normalization(self):
+        """测试只有空白和全角/半角差异的任务得到相同的键，模型或提示词版本不同时键不同"""
+        key = ResponseCache.make_key('programming', '写一个 Python 函数', '附带测试', 'model-a', '1')
+        self.assertEqual(ResponseCache.make_key('programming', ' 写一个\n Python\t函数 ', '附带测试', 'model-a', '1'), key)
+        self.assertEqual(ResponseCache.make_key('programming', '写一个  Ｐｙｔｈｏｎ 函数', '附带测试 ', 'model-a', '1'), key)
+        self.assertNotEqual(ResponseCache.make_key('programming', '写一个 Python 函数', '附带测试', 'model-b', '1'), key)
+        self.assertNotEqual(ResponseCache.make_key('programming', '写一个 Python 函数', '附带测试', 'model-a', '2'), key)
+        self.assertNotEqual(ResponseCache.make_key('research', '写一个 Python 函数', '附带测试', 'model-a', '1'), key)
+
+        # 多语言字段
+        multilingual = ResponseCache.make_key('research', {'zh': '调研 ', 'en': 'Survey'}, '', 'model-a', '1')
+        self.assertEqual(ResponseCache.make_key('research', {'en': ' Survey', 'zh': '调研'}, '', 'model-a', '1'), multilingual)
+
+    def test_hit_rate_and_ttl(self):
+        """测试命中率统计和过期条目"""
+        cache = ResponseCache(':memory:', ttl=60)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', '结果A')
+        self.assertEqual(cache.get('a'), '结果A')
+
+        with mock.patch('agents.response_cache.time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.get('a'))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations']), (1, 2, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 1 / 3)
+        self.assertEqual(stats['entries'], 0)
+
+    def test_lru_eviction_by_entries_and_size(self):
+        """测试超过条目数或总大小上限时淘汰最久未访问的条目"""
+        cache = ResponseCache(':memory:', max_entries=2, max_bytes=10)
+        cache.put('a', 'aaa')
+        cache.put('b', 'bbb')
+        cache.get('a')
+        cache.put('c', 'ccc')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'aaa')
+
+        cache.put('d', 'dddddddd')
+        self.assertEqual(cache.get('d'), 'dddddddd')
+        self.assertLessEqual(cache.stats()['bytes'], 10)
+        self.assertEqual(cache.stats()['evictions'], 3)
+
+        # 单个响应超过总大小上限时不缓存
+        cache.put('e', 'e' * 11)
+        self.assertIsNone(cache.get('e'))
+
+    def test_persists_across_instances(self):
+        """测试缓存保存在磁盘上，重启后仍可命中"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'cache', 'llm.db')
+            cache = ResponseCache(db_path)
+            cache.put('a', '结果A', 'research', 'model-a')
+            cache.close()
+
+            cache = ResponseCache(db_path)
+            self.assertEqual(cache.get('a'), '结果A')
+            cache.close()
+
+        disabled = ResponseCache(':memory:', enabled=False)
+        disabled.put('a', '结果A')
+        self.assertIsNone(disabled.get('a'))
+        self.assertEqual(disabled.stats()['hits'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
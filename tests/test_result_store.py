@@ -0,0 +1,80 @@
+"""
+链下结果存储测试
+"""
+
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from blockchain.result_store import (
+    FileSystemBackend, MemoryBackend, ResultStore, digest_to_bytes32, register_backend
+)
+
+
+class TestResultStore(unittest.TestCase):
+    """测试压缩、内容寻址和后端解析"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = ResultStore(FileSystemBackend(self.tmpdir.name))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """测试保存后按摘要读取，相同内容只保存一次"""
+        result = '调研报告\n' * 5000
+        digest, locator = self.store.put(result)
+
+        self.assertEqual(locator, 'fs')
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(self.store.get(digest, locator), result)
+        self.assertEqual(self.store.get('0x' + digest.upper()), result)
+        self.assertEqual(self.store.put(result), (digest, locator))
+
+        # 压缩后的文件远小于原文
+        path = os.path.join(self.tmpdir.name, digest[:2], digest)
+        self.assertLess(os.path.getsize(path), len(result.encode('utf-8')) // 10)
+
+    def test_digest_is_constant_size(self):
+        """测试链上提交的摘要长度与结果长度无关"""
+        short_digest, _ = self.store.put('ok')
+        long_digest, _ = self.store.put('x' * 1000000)
+        self.assertEqual(len(digest_to_bytes32(short_digest)), 32)
+        self.assertEqual(len(digest_to_bytes32(long_digest)), 32)
+
+    def test_tampered_blob_rejected(self):
+        """测试内容与摘要不符时返回None"""
+        digest, _ = self.store.put('original')
+        other_digest, _ = self.store.put('tampered')
+        path = os.path.join(self.tmpdir.name, digest[:2], digest)
+        other_path = os.path.join(self.tmpdir.name, other_digest[:2], other_digest)
+        with open(other_path, 'rb') as src, open(path, 'wb') as dst:
+            dst.write(src.read())
+
+        self.assertIsNone(self.store.get(digest))
+        self.assertIsNone(self.store.get('00' * 32))
+
+    def test_pluggable_backend(self):
+        """测试通过定位符解析其他已注册后端"""
+        class SharedBackend(MemoryBackend):
+            name = 'shared-memory'
+
+        shared = SharedBackend()
+        register_backend(SharedBackend.name, lambda: shared)
+        other_store = ResultStore(shared)
+        digest, locator = other_store.put('from another node')
+
+        self.assertEqual(locator, 'shared-memory')
+        self.assertEqual(self.store.get(digest, locator), 'from another node')
+        self.assertIsNone(self.store.get(digest, 'unknown'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+多节点RPC池测试（使用带注入延迟的本地JSON-RPC节点）
+"""
+
+import asyncio
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from web3 import AsyncWeb3, Web3
+
+from blockchain.rpc_pool import AsyncRPCPoolProvider, RPCPoolProvider, parse_rpc_urls
+from jsonrpc_stub import StubRPCServer
+
+
+class TestRPCPool(unittest.TestCase):
+    """测试延迟路由、对冲读请求和写请求固定"""
+
+    def setUp(self):
+        self.slow = StubRPCServer(delay=0.15).start()
+        self.fast = StubRPCServer().start()
+        for server in (self.slow, self.fast):
+            server.results['eth_sendRawTransaction'] = '0x' + '11' * 32
+
+    def tearDown(self):
+        self.slow.stop()
+        self.fast.stop()
+
+    def test_parse_urls(self):
+        """测试解析逗号分隔的节点列表"""
+        self.assertEqual(parse_rpc_urls(' http://a , http://b,'), ['http://a', 'http://b'])
+        self.assertEqual(parse_rpc_urls(None), [])
+
+    def test_reads_routed_to_fastest(self):
+        """测试探测之后读请求都发送到最快的节点"""
+        provider = RPCPoolProvider([self.slow.url, self.fast.url], hedge_reads=False, batch_window=0)
+        w3 = Web3(provider)
+        for _ in range(2):
+            w3.eth.block_number
+        slow_calls = self.slow.rpc_calls()
+
+        for _ in range(10):
+            self.assertEqual(w3.eth.block_number, 100)
+        self.assertEqual(self.slow.rpc_calls(), slow_calls)
+        self.assertLessEqual(slow_calls, 1)
+
+    def test_hedged_read(self):
+        """测试主节点变慢时，超过对冲延迟后由第二个节点返回结果"""
+        provider = RPCPoolProvider([self.fast.url, self.slow.url], hedge_default_delay=0.02,
+                                   hedge_min_delay=0.02, batch_window=0)
+        w3 = Web3(provider)
+        for _ in range(3):
+            w3.eth.block_number
+        # 等待被对冲的慢请求完成并记录延迟
+        time.sleep(0.3)
+        stats = provider.stats()
+
+        # 主节点（快节点）变慢
+        self.slow.delay = 0
+        self.fast.delay = 0.5
+        started = time.monotonic()
+        self.assertEqual(w3.eth.block_number, 100)
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(provider.stats()['hedged_requests'], stats['hedged_requests'] + 1)
+        self.assertEqual(provider.stats()['hedge_wins'], stats['hedge_wins'] + 1)
+
+    def test_writes_pinned(self):
+        """测试写请求和nonce查询固定在同一个节点，即使它更慢"""
+        provider = RPCPoolProvider([self.slow.url, self.fast.url], hedge_reads=False, batch_window=0)
+        for _ in range(3):
+            provider.make_request('eth_sendRawTransaction', ['0x00'])
+            provider.make_request('eth_getTransactionCount', ['0x' + '00' * 20, 'pending'])
+
+        self.assertEqual(self.fast.rpc_calls(), 0)
+        self.assertEqual(self.slow.rpc_calls(), 6)
+
+    def test_failover_marks_unhealthy(self):
+        """测试失败的节点被跳过并在连续失败后标记为不健康"""
+        self.slow.delay = 0
+        self.slow.fail = True
+        provider = RPCPoolProvider([self.slow.url, self.fast.url], hedge_reads=False, batch_window=0,
+                                   failure_threshold=2)
+        w3 = Web3(provider)
+        for _ in range(3):
+            self.assertEqual(w3.eth.block_number, 100)
+
+        endpoints = provider.stats()['endpoints']
+        self.assertFalse(endpoints[0]['healthy'])
+        self.assertEqual(endpoints[0]['errors'], 2)
+        self.assertTrue(endpoints[1]['healthy'])
+
+    def test_error_payload_fails_over(self):
+        """测试节点以限流等JSON-RPC错误响应时计为失败并改用其他节点，执行回滚等错误原样返回"""
+        self.slow.delay = 0
+        self.slow.error = {'code': -32005, 'message': 'rate limit exceeded'}
+        provider = RPCPoolProvider([self.slow.url, self.fast.url], hedge_reads=False, batch_window=0,
+                                   failure_threshold=2)
+        w3 = Web3(provider)
+        for _ in range(3):
+            self.assertEqual(w3.eth.block_number, 100)
+        responses = provider.make_batch_request([('eth_blockNumber', []), ('eth_chainId', [])])
+        self.assertEqual([response['result'] for response in responses], ['0x64', '0x539'])
+
+        endpoints = provider.stats()['endpoints']
+        self.assertFalse(endpoints[0]['healthy'])
+        self.assertEqual(endpoints[0]['errors'], 2)
+        self.assertEqual(endpoints[1]['errors'], 0)
+
+        # 所有节点都返回错误时，错误响应交给web3处理
+        self.fast.error = {'code': -32005, 'message': 'rate limit exceeded'}
+        with self.assertRaises(ValueError):
+            w3.eth.block_number
+
+        # 与节点无关的错误不计为失败，也不重试
+        self.fast.error = {'code': 3, 'message': 'execution reverted'}
+        calls = self.fast.rpc_calls()
+        self.assertEqual(provider.make_request('eth_call', [{}, 'latest'])['error']['code'], 3)
+        self.assertEqual(self.fast.rpc_calls(), calls + 1)
+
+    def test_async_error_payload_fails_over(self):
+        """测试异步节点池对冲读请求在主节点返回错误响应时改用其他节点"""
+        self.slow.delay = 0
+        self.slow.error = {'code': -32603, 'message': 'internal error'}
+        provider = AsyncRPCPoolProvider([self.slow.url, self.fast.url], hedge_default_delay=1, batch_window=0)
+        w3 = AsyncWeb3(provider)
+
+        async def read():
+            try:
+                return await w3.eth.chain_id
+            finally:
+                await provider.close()
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(read()), 1337)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(provider.stats()['endpoints'][0]['errors'], 1)
+
+    def test_async_hedged_read(self):
+        """测试异步节点池的对冲读请求"""
+        provider = AsyncRPCPoolProvider([self.slow.url, self.fast.url], hedge_default_delay=0.02,
+                                        hedge_min_delay=0.02, batch_window=0)
+        self.slow.delay = 0.5
+        w3 = AsyncWeb3(provider)
+
+        async def read():
+            try:
+                return await w3.eth.chain_id
+            finally:
+                await provider.close()
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(read()), 1337)
+        self.assertLess(time.monotonic() - started, 0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+JSON-RPC批量传输层测试
+"""
+
+import asyncio
+import time
+import unittest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from web3 import AsyncWeb3, Web3
+
+from blockchain.fee_oracle import FeeOracle
+from blockchain.rpc_transport import AsyncBatchHTTPProvider, BatchHTTPProvider, batch_request
+from jsonrpc_stub import StubRPCServer
+
+
+class TestBatchHTTPProvider(unittest.TestCase):
+    """测试连接池与批量合并"""
+
+    def setUp(self):
+        self.server = StubRPCServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_explicit_batch(self):
+        """测试多个调用在一个HTTP请求中发送并转换为Python类型"""
+        w3 = Web3(BatchHTTPProvider(self.server.url))
+        results = batch_request(w3, [('eth_chainId', []), ('eth_blockNumber', []), ('eth_gasPrice', [])])
+
+        self.assertEqual(results, [1337, 100, 10 ** 9])
+        self.assertEqual(len(self.server.http_requests), 1)
+
+    def test_concurrent_reads_coalesced(self):
+        """测试多个线程同时发出的读请求被合并"""
+        provider = BatchHTTPProvider(self.server.url, batch_window=0.05)
+        w3 = Web3(provider)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: w3.eth.block_number, range(8)))
+
+        self.assertEqual(results, [100] * 8)
+        self.assertEqual(provider.stats()['rpc_requests'], 8)
+        self.assertLess(provider.stats()['http_requests'], 8)
+
+    def test_async_gather_coalesced(self):
+        """测试asyncio.gather同时发出的读请求合并为一个HTTP请求"""
+        provider = AsyncBatchHTTPProvider(self.server.url, batch_window=0.01)
+        w3 = AsyncWeb3(provider)
+
+        async def read_all():
+            try:
+                return await asyncio.gather(w3.eth.chain_id, w3.eth.block_number, w3.eth.gas_price)
+            finally:
+                await provider.close()
+
+        self.assertEqual(asyncio.run(read_all()), [1337, 100, 10 ** 9])
+        self.assertEqual(len(self.server.http_requests), 1)
+
+    def test_single_read_not_delayed(self):
+        """测试没有并发请求时读请求立即发送，不等待合并窗口"""
+        provider = BatchHTTPProvider(self.server.url, batch_window=0.5)
+        async_provider = AsyncBatchHTTPProvider(self.server.url, batch_window=0.5)
+
+        async def read():
+            try:
+                return await AsyncWeb3(async_provider).eth.block_number
+            finally:
+                await async_provider.close()
+
+        started = time.monotonic()
+        self.assertEqual(Web3(provider).eth.block_number, 100)
+        self.assertEqual(asyncio.run(read()), 100)
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(len(self.server.http_requests), 2)
+
+    def test_fee_oracle_single_round_trip(self):
+        """测试费用预言机在区块号过期时只发送一个批量请求"""
+        self.server.results['eth_feeHistory'] = {
+            'oldestBlock': '0x63',
+            'baseFeePerGas': ['0xa', '0x14'],
+            'gasUsedRatio': [0.5],
+            'reward': [['0x1', '0x2', '0x3']]
+        }
+        oracle = FeeOracle(Web3(BatchHTTPProvider(self.server.url)))
+        fees = oracle.get_fees()
+
+        self.assertEqual(fees['block_number'], 100)
+        self.assertEqual(fees['base_fee'], 20)
+        self.assertEqual(fees['max_priority_fee_per_gas'], 2)
+        self.assertEqual(len(self.server.http_requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
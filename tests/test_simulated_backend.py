@@ -0,0 +1,101 @@
+"""
+模拟区块链后端测试
+"""
+
+import asyncio
+import time
+import unittest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from blockchain.simulated_backend import SimulatedBackend, ZERO_ADDRESS
+
+WORKER = '0x' + 'ab' * 20
+OTHER_WORKER = '0x' + 'cd' * 20
+DIGEST = 'ef' * 32
+
+
+class TestSimulatedBackend(unittest.TestCase):
+    """测试任务生成、状态变更和延迟注入"""
+
+    def test_default_tasks_match_templates(self):
+        """测试默认的5个任务与原测试模式数据一致"""
+        backend = SimulatedBackend()
+        self.assertEqual(backend.get_available_tasks(), [1, 2, 3, 4, 5])
+
+        task = backend.get_task(2)
+        self.assertEqual(task['taskType'], 'programming')
+        self.assertEqual(task['reward'], 2000000000000000000)
+        self.assertEqual(task['worker'], ZERO_ADDRESS)
+        self.assertIsNone(backend.get_task(6))
+
+    def test_seeded_generation_at_scale(self):
+        """测试按种子确定性生成大量任务"""
+        backend = SimulatedBackend(task_count=100000, seed=7)
+        self.assertEqual(len(backend.get_available_tasks()), 100000)
+        self.assertEqual(backend.get_task(99999), SimulatedBackend(task_count=100000, seed=7).get_task(99999))
+        self.assertNotEqual(backend.get_task(99999)['publisher'],
+                            SimulatedBackend(task_count=100000, seed=8).get_task(99999)['publisher'])
+        self.assertIn('#99999', backend.get_task(99999)['title']['en'])
+
+        with self.assertRaises(ValueError):
+            SimulatedBackend(task_count=100001)
+
+    def test_claim_and_complete(self):
+        """测试认领、完成后更新工人统计和余额"""
+        backend = SimulatedBackend()
+        self.assertFalse(backend.complete_task(1, WORKER, DIGEST, 'fs'))
+        self.assertTrue(backend.claim_task(1, WORKER))
+        self.assertFalse(backend.claim_task(1, OTHER_WORKER))
+        self.assertEqual(backend.get_task(1)['worker'], WORKER)
+        self.assertNotIn(1, backend.get_available_tasks())
+
+        self.assertFalse(backend.complete_task(1, OTHER_WORKER, DIGEST, 'fs'))
+        self.assertTrue(backend.complete_task(1, WORKER, DIGEST, 'fs'))
+        self.assertTrue(backend.get_task(1)['isCompleted'])
+        self.assertEqual(backend.get_task_result(1), (DIGEST, 'fs'))
+
+        info = backend.get_worker_info(WORKER)
+        self.assertEqual(info['completedTasks'], 1)
+        self.assertEqual(info['totalEarnings'], 1000000000000000000)
+        self.assertEqual(info['reputation'], 55)
+        self.assertEqual(backend.get_balance(WORKER), 1000000000000000000)
+        self.assertEqual(backend.get_worker_tasks(WORKER), [1])
+
+    def test_concurrent_claims(self):
+        """测试多线程并发认领时每个任务只被认领一次"""
+        backend = SimulatedBackend(task_count=1000)
+        workers = [f"0x{index:040x}" for index in range(8)]
+
+        def claim_all(worker):
+            return sum(backend.claim_task(task_id, worker) for task_id in range(1, 1001))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            claimed = list(pool.map(claim_all, workers))
+
+        self.assertEqual(sum(claimed), 1000)
+        self.assertEqual(backend.get_available_tasks(), [])
+
+    def test_async_latency(self):
+        """测试异步调用注入的延迟可以并发等待"""
+        backend = SimulatedBackend(latency=0.05)
+
+        async def read_all():
+            return await asyncio.gather(*[backend.call_async('get_task', 1) for _ in range(50)])
+
+        started = time.monotonic()
+        tasks = asyncio.run(read_all())
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(tasks), 50)
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+TaskContract 合约测试
+在进程内EVM（eth-tester + py-evm）上部署合约；需要 py-solc-x、eth-tester[py-evm] 和 OpenZeppelin 合约（版本见 README），
+SOLC_VERSION 指定的 solc 未安装时自动下载，缺少依赖或无法下载时跳过
+"""
+
+import os
+import unittest
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web3 import Web3
+
+import benchmark_gas
+
+SOLC_VERSION = os.getenv('SOLC_VERSION', benchmark_gas.DEFAULT_SOLC_VERSION)
+OPENZEPPELIN_PATH = Path(os.getenv('OPENZEPPELIN_PATH', 'node_modules/@openzeppelin'))
+
+
+def _toolchain_available() -> bool:
+    try:
+        import solcx  # noqa: F401
+        from web3 import EthereumTesterProvider  # noqa: F401
+    except ImportError:
+        return False
+    return OPENZEPPELIN_PATH.exists()
+
+
+@unittest.skipUnless(_toolchain_available(), "需要 py-solc-x、OpenZeppelin 合约和 eth-tester[py-evm]")
+class TestTaskContract(unittest.TestCase):
+    """测试未认领任务集合的不变量，以及紧凑存储下任务和工人视图的读写"""
+
+    @classmethod
+    def setUpClass(cls):
+        import solcx
+
+        try:
+            # 未安装时 compile_contracts 自动下载指定版本的 solc
+            cls.compiled = benchmark_gas.compile_contracts(solc_version=SOLC_VERSION)
+        except (solcx.exceptions.SolcInstallationError, OSError) as e:
+            raise unittest.SkipTest(f"无法安装 solc {SOLC_VERSION}: {e}")
+
+    def setUp(self):
+        from web3 import EthereumTesterProvider
+
+        self.provider = EthereumTesterProvider()
+        self.w3 = Web3(self.provider)
+        self.contract = benchmark_gas.deploy(self.w3, self.compiled)
+        self.functions = self.contract.functions
+        self.publisher, self.worker = self.w3.eth.accounts[:2]
+
+    def _now(self) -> int:
+        return self.w3.eth.get_block('latest').timestamp
+
+    def _create(self, deadline: int) -> int:
+        self._transact(self.functions.createTask('任务', '描述', benchmark_gas.REWARD, deadline, 'research', ''),
+                       self.publisher)
+        return self.functions.getTaskCount().call()
+
+    def _transact(self, contract_function, sender):
+        receipt = self.w3.eth.wait_for_transaction_receipt(contract_function.transact({'from': sender}))
+        self.assertEqual(receipt.status, 1)
+        return receipt
+
+    def _travel(self, seconds: int) -> None:
+        """把链上时间向前推进并出一个块"""
+        self.provider.ethereum_tester.time_travel(self._now() + seconds)
+        self.provider.ethereum_tester.mine_blocks()
+
+    def _open_set(self) -> list:
+        return sorted(self.functions.getAvailableTasks(0, 100).call())
+
+    def test_open_set_add_claim_expire(self):
+        """测试创建加入集合、认领移出集合、过期任务被过滤并可清理"""
+        short = [self._create(self._now() + 100) for _ in range(3)]
+        long = [self._create(self._now() + 10000) for _ in range(3)]
+        self.assertEqual(self.functions.getAvailableTaskCount().call(), 6)
+        self.assertEqual(self._open_set(), short + long)
+
+        self._transact(self.functions.claimTask(long[0]), self.worker)
+        self.assertEqual(self.functions.getAvailableTaskCount().call(), 5)
+        self.assertEqual(self._open_set(), short + long[1:])
+
+        # 过期任务在读取时被过滤，但仍占用集合
+        self._travel(1000)
+        self.assertEqual(self._open_set(), long[1:])
+        self.assertEqual(self.functions.getAvailableTaskCount().call(), 5)
+
+        # 批量认领跳过并移出过期任务
+        receipt = self._transact(self.functions.claimTasks([short[0], long[1]]), self.worker)
+        self.assertEqual(self.functions.getAvailableTaskCount().call(), 3)
+        self.assertEqual(len(self.contract.events.TaskClaimed().process_receipt(receipt)), 1)
+
+        # 每次最多检查 maxCount 个，多次调用扫过整个集合
+        self._transact(self.functions.pruneExpired(1), self.publisher)
+        self._transact(self.functions.pruneExpired(10), self.publisher)
+        self.assertEqual(self.functions.getAvailableTaskCount().call(), 1)
+        self.assertEqual(self._open_set(), [long[2]])
+        self.assertEqual(self.functions.pruneExpired(10).call(), 0)
+
+        # 清理后集合中剩下的任务仍可认领和完成
+        self._transact(self.functions.claimTask(long[2]), self.worker)
+        self._transact(self.functions.completeTask(long[2], benchmark_gas.DIGEST, benchmark_gas.LOCATOR), self.worker)
+        self.assertEqual(self.functions.getAvailableTaskCount().call(), 0)
+        self.assertEqual(self._open_set(), [])
+
+    def test_available_tasks_pagination(self):
+        """测试分页边界：offset 超出集合、limit 为0、最后一页不足 limit、过期任务被过滤"""
+        task_ids = [self._create(self._now() + 10000) for _ in range(5)]
+        expiring = self._create(self._now() + 100)
+        get_page = self.functions.getAvailableTasks
+
+        self.assertEqual(get_page(0, 0).call(), [])
+        self.assertEqual(get_page(3, 0).call(), [])
+        self.assertEqual(get_page(6, 10).call(), [])
+        self.assertEqual(get_page(100, 10).call(), [])
+        self.assertEqual(get_page(2 ** 256 - 1, 2 ** 256 - 1).call(), [])
+        self.assertEqual(len(get_page(4, 10).call()), 2)
+        self.assertEqual(sorted(get_page(0, 3).call() + get_page(3, 3).call()), task_ids + [expiring])
+        # offset + limit 溢出时按读到集合末尾处理
+        self.assertEqual(len(get_page(1, 2 ** 256 - 1).call()), 5)
+
+        self._travel(1000)
+        self.assertEqual(sorted(get_page(0, 6).call()), task_ids)
+        self.assertEqual(self.functions.getAvailableTaskCount().call(), 6)
+
+    def test_get_task_and_worker_round_trip(self):
+        """测试紧凑存储下 getTask/getWorker 返回的字段与写入的值一致（包括 uint40 截止时间和 uint96 奖励的边界）"""
+        max_deadline = 2 ** 40 - 1
+        self._transact(self.functions.createTask(
+            '标题', '描述', 2 ** 96 - 1, max_deadline, 'programming', '要求'
+        ), self.publisher)
+        task_id = self.functions.getTaskCount().call()
+        created_at = self._now()
+
+        # 结构体返回值解码为元组
+        task = self.functions.getTask(task_id).call()
+        self.assertEqual(tuple(task), (
+            task_id, self.publisher, '标题', '描述', 2 ** 96 - 1, False, False,
+            '0x' + '00' * 20, created_at, max_deadline, 'programming', '要求'
+        ))
+        self.assertEqual(self.functions.getTask(task_id + 1).call()[0], 0)
+
+        # 超出紧凑字段范围的参数被拒绝
+        for reward, deadline in ((2 ** 96, max_deadline), (benchmark_gas.REWARD, 2 ** 40)):
+            with self.assertRaises(Exception):
+                self.functions.createTask('t', 'd', reward, deadline, 'research', '').transact({'from': self.publisher})
+
+        rewards = [benchmark_gas.REWARD, 3 * benchmark_gas.REWARD]
+        for reward in rewards:
+            self._transact(self.functions.createTask('t', 'd', reward, max_deadline, 'research', ''), self.publisher)
+            task_id = self.functions.getTaskCount().call()
+            self._transact(self.functions.claimTask(task_id), self.worker)
+            self._transact(self.functions.completeTask(task_id, benchmark_gas.DIGEST, benchmark_gas.LOCATOR), self.worker)
+
+        task = self.functions.getTask(task_id).call()
+        self.assertEqual(tuple(task[5:8]), (True, True, self.worker))
+        self.assertEqual(tuple(self.functions.getWorker(self.worker).call()), (self.worker, 20, 2, sum(rewards), True))
+        self.assertEqual(tuple(self.functions.getWorker(self.publisher).call()), ('0x' + '00' * 20, 0, 0, 0, False))
+
+        # 兼容旧ABI的 tasks()/workers() 返回与 getTask/getWorker 相同的字段
+        for checked_id in (1, task_id, task_id + 1):
+            self.assertEqual(tuple(self.functions.tasks(checked_id).call()),
+                             tuple(self.functions.getTask(checked_id).call()))
+        for address in (self.worker, self.publisher):
+            self.assertEqual(tuple(self.functions.workers(address).call()),
+                             tuple(self.functions.getWorker(address).call()))
+
+    def test_view_abi_unchanged(self):
+        """测试 getTask/getWorker 以及旧的 tasks()/workers() getter 的返回类型与存储调整前相同"""
+        abi = {item.get('name'): item for item in self.contract.abi}
+        task_fields = [
+            ('id', 'uint256'), ('publisher', 'address'), ('title', 'string'), ('description', 'string'),
+            ('reward', 'uint256'), ('isCompleted', 'bool'), ('isClaimed', 'bool'), ('worker', 'address'),
+            ('createdAt', 'uint256'), ('deadline', 'uint256'), ('taskType', 'string'), ('requirements', 'string')
+        ]
+        worker_fields = [
+            ('addr', 'address'), ('reputation', 'uint256'), ('completedTasks', 'uint256'),
+            ('totalEarnings', 'uint256'), ('isActive', 'bool')
+        ]
+        task_components = [(item['name'], item['type']) for item in abi['getTask']['outputs'][0]['components']]
+        self.assertEqual(task_components, task_fields)
+        worker_components = [(item['name'], item['type']) for item in abi['getWorker']['outputs'][0]['components']]
+        self.assertEqual(worker_components, worker_fields)
+
+        # 旧的公共getter返回展开的字段，而不是结构体
+        self.assertEqual([item['type'] for item in abi['tasks']['inputs']], ['uint256'])
+        self.assertEqual([(item['name'], item['type']) for item in abi['tasks']['outputs']], task_fields)
+        self.assertEqual([item['type'] for item in abi['workers']['inputs']], ['address'])
+        self.assertEqual([(item['name'], item['type']) for item in abi['workers']['outputs']], worker_fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+"""
+任务事件索引器测试
+使用内存中的假链数据验证事件处理、检查点和重组回滚
+"""
+
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+
+from blockchain.blockchain_client import BlockchainClient
+from blockchain.task_indexer import TaskIndexer
+
+CONTRACT_ADDRESS = '0x1234567890123456789012345678901234567890'
+WORKER = '0x2345678901234567890123456789012345678901'
+
+
+class FakeEth:
+    """按区块保存日志的假链"""
+
+    def __init__(self, contract):
+        self.contract = contract
+        self.logs = {}
+        self.hashes = {}
+        self._block_number = 0
+        self.chain_id = 1337
+        self.node_down = False
+
+    @property
+    def block_number(self):
+        if self.node_down:
+            raise ConnectionError("节点不可用")
+        return self._block_number
+
+    @block_number.setter
+    def block_number(self, value):
+        self._block_number = value
+
+    def mine(self, logs=(), fork=''):
+        self.block_number += 1
+        self.hashes[self.block_number] = HexBytes(Web3.keccak(text=f'{fork}{self.block_number}'))
+        self.logs[self.block_number] = list(logs)
+
+    def reorg(self, from_block):
+        """丢弃 from_block 及之后的区块"""
+        for number in range(from_block, self.block_number + 1):
+            self.logs.pop(number, None)
+            self.hashes.pop(number, None)
+        self.block_number = from_block - 1
+
+    def get_block(self, number):
+        return {'hash': self.hashes[number]}
+
+    def get_logs(self, params):
+        logs = []
+        for number in range(params['fromBlock'], params['toBlock'] + 1):
+            for index, (event_name, topics, data) in enumerate(self.logs.get(number, [])):
+                logs.append({
+                    'address': CONTRACT_ADDRESS,
+                    'topics': [HexBytes(topic) for topic in topics],
+                    'data': HexBytes(data),
+                    'blockNumber': number,
+                    'blockHash': self.hashes[number],
+                    'logIndex': index,
+                    'transactionIndex': 0,
+                    'transactionHash': HexBytes(b'\x00' * 32),
+                })
+        return logs
+
+
+def _event_topic(contract, name):
+    return event_abi_to_log_topic(getattr(contract.events, name)().abi)
+
+
+def created_log(contract, task_id):
+    return ('TaskCreated',
+            [_event_topic(contract, 'TaskCreated'), task_id.to_bytes(32, 'big'), bytes(12) + bytes.fromhex(WORKER[2:])],
+            encode(['string', 'uint256'], [f'task {task_id}', 10**18]))
+
+
+def claimed_log(contract, task_id):
+    return ('TaskClaimed',
+            [_event_topic(contract, 'TaskClaimed'), task_id.to_bytes(32, 'big'), bytes(12) + bytes.fromhex(WORKER[2:])],
+            b'')
+
+
+class FakeClient:
+    def __init__(self, address=CONTRACT_ADDRESS):
+        abi = BlockchainClient._get_basic_abi(None, 'TaskContract')
+        self.task_contract = Web3().eth.contract(address=address, abi=abi)
+        self.w3 = SimpleNamespace(eth=FakeEth(self.task_contract))
+        # 批量读取时失败的任务（结果中缺失）
+        self.unreadable = set()
+
+    def _get_tasks_from_chain(self, task_ids):
+        task_ids = [task_id for task_id in task_ids if task_id not in self.unreadable]
+        return [{
+            'id': task_id,
+            'publisher': WORKER,
+            'title': f'task {task_id}',
+            'description': 'desc',
+            'reward': 10**18,
+            'isCompleted': False,
+            'isClaimed': False,
+            'worker': '0x0000000000000000000000000000000000000000',
+            'createdAt': 0,
+            'deadline': 2**40,
+            'taskType': 'research',
+            'requirements': ''
+        } for task_id in task_ids]
+
+
+class TestTaskIndexer(unittest.TestCase):
+    """测试任务索引器"""
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.eth = self.client.w3.eth
+        self.contract = self.client.task_contract
+        self.indexer = TaskIndexer(self.client, db_path=':memory:', start_block=1, batch_size=2)
+
+    def tearDown(self):
+        self.indexer.close()
+
+    def test_sync_applies_events_in_batches(self):
+        """测试分批追赶并应用创建/认领事件"""
+        self.eth.mine([created_log(self.contract, 1)])
+        self.eth.mine([created_log(self.contract, 2)])
+        self.eth.mine([claimed_log(self.contract, 1)])
+
+        self.assertEqual(self.indexer.sync_once(), 3)
+        self.assertTrue(self.indexer.is_synced())
+        self.assertEqual(self.indexer.last_block(), 3)
+        self.assertEqual(self.indexer.get_available_task_ids(now=0), [2])
+
+        task = self.indexer.get_task(1)
+        self.assertTrue(task['isClaimed'])
+        self.assertEqual(task['worker'], WORKER)
+        self.assertEqual(task['reward'], 10**18)
+
+    def test_shallow_reorg_rolls_back(self):
+        """测试浅层重组后回滚并重新处理"""
+        self.eth.mine([created_log(self.contract, 1)])
+        self.eth.mine([created_log(self.contract, 2)])
+        self.indexer.sync_once()
+        self.eth.mine([claimed_log(self.contract, 1)])
+        self.indexer.sync_once()
+        self.assertEqual(self.indexer.get_available_task_ids(now=0), [2])
+
+        # 区块3被替换：认领事件消失，新区块中创建了任务3
+        self.eth.reorg(3)
+        self.eth.mine([created_log(self.contract, 3)], fork='b')
+        self.indexer.sync_once()
+
+        self.assertEqual(self.indexer.get_available_task_ids(now=0), [1, 2, 3])
+        self.assertFalse(self.indexer.get_task(1)['isClaimed'])
+
+    def test_missing_created_task_keeps_checkpoint(self):
+        """测试新建任务读取失败时不推进检查点，下次同步补上"""
+        self.eth.mine([created_log(self.contract, 1)])
+        self.indexer.sync_once()
+        self.eth.mine([created_log(self.contract, 2)])
+        self.client.unreadable.add(2)
+
+        with self.assertRaises(RuntimeError):
+            self.indexer.sync_once()
+        self.assertEqual(self.indexer.last_block(), 1)
+        self.assertFalse(self.indexer.is_synced())
+
+        self.client.unreadable.clear()
+        self.indexer.sync_once()
+        self.assertEqual(self.indexer.get_available_task_ids(now=0), [1, 2])
+
+    def test_node_failure_marks_index_unsynced(self):
+        """测试同步成功后读取链头失败时不再报告已同步，查询回退到链上读取"""
+        self.eth.mine([created_log(self.contract, 1)])
+        self.indexer.sync_once()
+        self.assertTrue(self.indexer.is_synced())
+
+        self.eth.node_down = True
+        with self.assertRaises(ConnectionError):
+            self.indexer.sync_once()
+        self.assertFalse(self.indexer.is_synced())
+
+        self.eth.node_down = False
+        self.indexer.sync_once()
+        self.assertTrue(self.indexer.is_synced())
+
+    def test_resets_for_other_contract_or_chain(self):
+        """测试合约重新部署或切换网络后不沿用旧索引"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'index.db')
+            indexer = TaskIndexer(self.client, db_path=db_path, start_block=1)
+            self.eth.mine([created_log(self.contract, 1)])
+            self.eth.mine([created_log(self.contract, 2)])
+            indexer.sync_once()
+            indexer.close()
+
+            # 同一合约、同一链：从检查点继续
+            indexer = TaskIndexer(self.client, db_path=db_path, start_block=1)
+            self.assertEqual(indexer.sync_once(), 0)
+            self.assertEqual(indexer.get_available_task_ids(now=0), [1, 2])
+            indexer.close()
+
+            # 新合约：清空旧合约的任务，从起始区块重新同步
+            redeployed = FakeClient(address='0x' + '56' * 20)
+            redeployed.w3.eth.mine([created_log(redeployed.task_contract, 1)])
+            indexer = TaskIndexer(redeployed, db_path=db_path, start_block=1)
+            self.assertEqual(indexer.sync_once(), 1)
+            self.assertEqual(indexer.get_available_task_ids(now=0), [1])
+            self.assertEqual(indexer.last_block(), 1)
+            indexer.close()
+
+            # 同一地址，其他链
+            redeployed.w3.eth.chain_id = 1
+            indexer = TaskIndexer(redeployed, db_path=db_path, start_block=1)
+            indexer._check_scope()
+            self.assertEqual(indexer.get_available_task_ids(now=0), [])
+            self.assertEqual(indexer.last_block(), 0)
+            indexer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
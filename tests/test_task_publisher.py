@@ -0,0 +1,148 @@
+"""
+批量任务发布测试
+"""
+
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from web3 import Web3
+
+from blockchain.task_publisher import PUBLISHER_ABI, TaskDistribution, TaskPublisher
+
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '12' * 20)
+SENDER = Web3.to_checksum_address('0x' + 'ab' * 20)
+CREATED_TOPIC = Web3.keccak(text='TaskCreated(uint256,address,string,uint256)')
+
+
+class FakeFunction:
+    def __init__(self, chain, fn_name, tasks):
+        self.chain = chain
+        self.fn_name = fn_name
+        self.tasks = tasks
+
+    def _encode_transaction_data(self):
+        return '0x' + 'ab' * (4 + 200 * len(self.tasks))
+
+    def estimate_gas(self, transaction, block_identifier=None):
+        return 30000 + 150000 * len(self.tasks)
+
+    def transact(self, transaction):
+        return self.chain.send(transaction, self.tasks)
+
+
+class FakeChain:
+    """按nonce顺序打包的模拟链，记录同时在途的最大交易数"""
+
+    def __init__(self, reject_deadline_before: int = 0):
+        self.task_counter = 0
+        self.nonces = []
+        self.pending = {}
+        self.max_in_flight = 0
+        self.reject_deadline_before = reject_deadline_before
+        abi = PUBLISHER_ABI
+        self.contract = SimpleNamespace(
+            address=CONTRACT_ADDRESS,
+            abi=abi,
+            functions=SimpleNamespace(
+                createTasks=lambda tasks: FakeFunction(self, 'createTasks', tasks),
+                createTask=lambda *task: FakeFunction(self, 'createTask', [task])
+            )
+        )
+        self.w3 = SimpleNamespace(eth=self, keccak=Web3.keccak)
+
+    def get_block(self, block_identifier):
+        return {'timestamp': 1700000000}
+
+    def get_transaction_count(self, address, block_identifier):
+        return 7
+
+    def send(self, transaction, tasks):
+        self.nonces.append(transaction['nonce'])
+        tx_hash = Web3.keccak(text=str(transaction['nonce']))
+        self.pending[tx_hash] = tasks
+        self.max_in_flight = max(self.max_in_flight, len(self.pending))
+        return tx_hash
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout=None):
+        tasks = self.pending.pop(tx_hash)
+        if any(task[3] < self.reject_deadline_before for task in tasks):
+            return {'status': 0, 'gasUsed': 21000, 'logs': []}
+        logs = []
+        for _ in tasks:
+            self.task_counter += 1
+            logs.append({
+                'address': CONTRACT_ADDRESS,
+                'topics': [CREATED_TOPIC, self.task_counter.to_bytes(32, 'big'), bytes(32)]
+            })
+        return {'status': 1, 'gasUsed': 100000 * len(tasks), 'logs': logs}
+
+
+class TestTaskDistribution(unittest.TestCase):
+    """测试任务参数分布"""
+
+    def test_deterministic_and_within_bounds(self):
+        distribution = TaskDistribution(
+            task_types={'programming': 3, 'translation': 1}, reward_min=0.5, reward_max=2,
+            reward_distribution='lognormal', deadline_min_hours=1, deadline_max_hours=2, seed=3
+        )
+        tasks = distribution.sample(400, now=1000)
+        self.assertEqual(tasks, distribution.sample(400, now=1000))
+        self.assertEqual({task['taskType'] for task in tasks}, {'programming', 'translation'})
+        programming = sum(task['taskType'] == 'programming' for task in tasks)
+        self.assertGreater(programming, 250)
+        self.assertTrue(all(5 * 10 ** 17 <= task['reward'] <= 2 * 10 ** 18 for task in tasks))
+        self.assertTrue(all(1000 + 3600 <= task['deadline'] <= 1000 + 7200 for task in tasks))
+        self.assertEqual(len({task['title'] for task in tasks}), 400)
+
+    def test_from_dict_validates(self):
+        distribution = TaskDistribution.from_dict({'reward_eth': {'min': 1, 'max': 1}, 'language': 'en'})
+        task = distribution.sample(1, now=0)[0]
+        self.assertEqual(task['reward'], 10 ** 18)
+        self.assertTrue(task['title'].isascii())
+        with self.assertRaises(ValueError):
+            TaskDistribution(task_types={'unknown': 1})
+        with self.assertRaises(ValueError):
+            TaskDistribution(reward_distribution='pareto')
+
+
+class TestTaskPublisher(unittest.TestCase):
+    """测试分批发布和nonce流水线"""
+
+    def test_pipelined_batches(self):
+        chain = FakeChain()
+        publisher = TaskPublisher(chain.w3, chain.contract, sender=SENDER, batch_size=10, window=3)
+        report = publisher.publish(95, TaskDistribution())
+
+        self.assertEqual(report['created'], 95)
+        self.assertEqual(report['failed'], 0)
+        self.assertEqual(report['transactions'], 10)
+        self.assertEqual(report['task_ids'], list(range(1, 96)))
+        self.assertEqual(chain.nonces, list(range(7, 17)))
+        self.assertEqual(chain.max_in_flight, 3)
+        self.assertEqual(report['gas_per_task'], 100000)
+
+    def test_failed_batch_counted(self):
+        chain = FakeChain(reject_deadline_before=1700000000 + 48 * 3600)
+        publisher = TaskPublisher(chain.w3, chain.contract, sender=SENDER, batch_size=1, window=4)
+        report = publisher.publish(20, TaskDistribution(deadline_min_hours=24, deadline_max_hours=72))
+        self.assertEqual(report['created'] + report['failed'], 20)
+        self.assertGreater(report['failed'], 0)
+        self.assertEqual(len(report['task_ids']), report['created'])
+
+    def test_single_create_fallback(self):
+        chain = FakeChain()
+        chain.contract.abi = [item for item in PUBLISHER_ABI if item['name'] != 'createTasks']
+        publisher = TaskPublisher(chain.w3, chain.contract, sender=SENDER, batch_size=50)
+        self.assertEqual(publisher.batch_size, 1)
+        report = publisher.publish(5, TaskDistribution())
+        self.assertEqual((report['created'], report['transactions']), (5, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
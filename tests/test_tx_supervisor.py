@@ -0,0 +1,153 @@
+"""
+卡住交易监督器测试
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from blockchain.receipt_tracker import ReceiptTracker
+from blockchain.tx_supervisor import TransactionSupervisor
+
+GWEI = 10 ** 9
+ACCOUNT = Account.from_key('0x' + '11' * 32)
+
+
+class FakeEth:
+    """记录广播的原始交易，按需返回回执"""
+
+    def __init__(self):
+        self.receipts = {}
+        self.sent = []
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(f"{tx_hash.hex()} not found")
+        return self.receipts[tx_hash]
+
+    def send_raw_transaction(self, raw_transaction):
+        self.sent.append(raw_transaction)
+        return Web3.keccak(raw_transaction)
+
+
+class FakeFeeOracle:
+    def __init__(self):
+        self.block_number = 100
+        self.market = {'maxFeePerGas': 30 * GWEI, 'maxPriorityFeePerGas': 1 * GWEI}
+
+    def latest_block_number(self):
+        return self.block_number
+
+    def transaction_fee_params(self):
+        return dict(self.market)
+
+
+def _transaction(nonce=0, max_fee=30 * GWEI, priority=1 * GWEI):
+    return {
+        'to': '0x' + '22' * 20, 'value': 0, 'data': '0x', 'gas': 200000, 'nonce': nonce, 'chainId': 1337,
+        'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': priority
+    }
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTransactionSupervisor(unittest.TestCase):
+    """测试卡住交易的检测、替换和统计"""
+
+    def setUp(self):
+        self.eth = FakeEth()
+        w3 = SimpleNamespace(eth=self.eth)
+        self.tracker = ReceiptTracker(w3, poll_interval=0.01, timeout=60)
+        self.fee_oracle = FakeFeeOracle()
+        self.supervisor = TransactionSupervisor(
+            w3, ACCOUNT, self.tracker, self.fee_oracle, stuck_blocks=3, bump_percent=12.5,
+            max_fee_per_gas=100 * GWEI, poll_interval=0.01
+        )
+
+    def tearDown(self):
+        self.supervisor.stop()
+        self.tracker.stop()
+
+    def _submit(self, transaction):
+        tx_hash = HexBytes(Web3.keccak(text=str(transaction)))
+        self.supervisor.register(tx_hash, transaction)
+        return tx_hash, self.supervisor.track(tx_hash)
+
+    def test_replaces_stuck_transaction_with_bumped_fee(self):
+        """测试超过区块数未上链时以相同nonce提高费用替换，替换交易上链后Future完成"""
+        tx_hash, future = self._submit(_transaction(nonce=7))
+        self.fee_oracle.block_number = 103
+
+        self.assertTrue(_wait_until(lambda: len(self.eth.sent) == 1))
+        replacement_hash = Web3.keccak(self.eth.sent[0])
+
+        self.eth.receipts[replacement_hash] = {'status': 1, 'blockNumber': 104}
+        self.assertEqual(future.result(timeout=2)['blockNumber'], 104)
+        # 原交易不再被轮询
+        self.assertEqual(self.tracker.pending_count(), 0)
+
+        stats = self.supervisor.stats()
+        self.assertEqual(stats['replacements'], 1)
+        self.assertEqual(stats['confirmed_after_replacement'], 1)
+        self.assertEqual(stats['pending'], 0)
+        self.assertIsNotNone(stats['max_confirmation_seconds'])
+
+    def test_bump_follows_replacement_rules_and_market(self):
+        """测试替换费用不低于10%涨幅，且跟随更高的市场费用"""
+        bumped = self.supervisor._bumped_transaction(_transaction())
+        self.assertEqual(bumped['maxFeePerGas'], 33750000000)
+        self.assertEqual(bumped['maxPriorityFeePerGas'], 1125000000)
+        self.assertEqual(bumped['nonce'], 0)
+
+        self.fee_oracle.market = {'maxFeePerGas': 60 * GWEI, 'maxPriorityFeePerGas': 3 * GWEI}
+        bumped = self.supervisor._bumped_transaction(_transaction())
+        self.assertEqual(bumped['maxFeePerGas'], 60 * GWEI)
+        self.assertEqual(bumped['maxPriorityFeePerGas'], 3 * GWEI)
+
+        legacy = self.supervisor._bumped_transaction({'nonce': 1, 'gasPrice': 20 * GWEI})
+        self.assertEqual(legacy['gasPrice'], 22500000000)
+
+    def test_fee_cap(self):
+        """测试达到费用上限后不再替换"""
+        self.assertEqual(self.supervisor._bumped_transaction(_transaction(max_fee=90 * GWEI))['maxFeePerGas'],
+                         100 * GWEI)
+        self.assertIsNone(self.supervisor._bumped_transaction(_transaction(max_fee=95 * GWEI)))
+
+        tx_hash, future = self._submit(_transaction(max_fee=99 * GWEI))
+        self.fee_oracle.block_number = 110
+        self.assertTrue(_wait_until(lambda: self.supervisor.stats()['fee_cap_hits'] == 1))
+        self.assertEqual(self.eth.sent, [])
+
+        # 原交易最终上链
+        self.eth.receipts[tx_hash] = {'status': 1, 'blockNumber': 111}
+        self.assertEqual(future.result(timeout=2)['blockNumber'], 111)
+        self.assertEqual(self.supervisor.stats()['confirmed_after_replacement'], 0)
+
+    def test_unregistered_transaction_passes_through(self):
+        """测试未登记的交易直接由回执跟踪器处理"""
+        tx_hash = HexBytes(b'\x05' * 32)
+        future = self.supervisor.track(tx_hash)
+        self.eth.receipts[tx_hash] = {'status': 1, 'blockNumber': 1}
+        self.assertEqual(future.result(timeout=2)['status'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -93,16 +93,12 @@ def generate_task_hash(task_data: Dict[str, Any]) -> str:
     return hashlib.sha256(task_string.encode()).hexdigest()
 
 def estimate_gas_price(network_info: Dict[str, Any]) -> int:
-    """估算Gas价格"""
-    base_gas_price = network_info.get('gas_price', 20000000000)  # 20 Gwei
+    """估算Gas价格（基础费用 + 优先费，数据来自费用预言机）"""
+    base_fee = network_info.get('base_fee')
+    if base_fee:
+        return base_fee + network_info.get('max_priority_fee', 0)
     
-    # 根据网络拥堵情况调整
-    block_number = network_info.get('block_number', 0)
-    # 简单的拥堵检测（实际应用中需要更复杂的逻辑）
-    if block_number % 100 == 0:
-        return int(base_gas_price * 1.2)  # 增加20%
-    
-    return base_gas_price
+    return network_info.get('gas_price', 20000000000)  # 20 Gwei
 
 def calculate_reward_ratio(task_reward: int, gas_cost: int) -> float:
     """计算奖励与成本比率"""
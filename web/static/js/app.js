@@ -499,8 +499,6 @@ class FlowAIApp {
             console.log('当前已认领任务:', this.claimedTasks);
             console.log('当前执行顺序:', this.autoExecutionOrder);
             
-            let response;
-            
             // 获取已认领任务ID列表
             const claimedTaskIds = this.claimedTasks.map(task => task.id);
             
@@ -516,20 +514,24 @@ class FlowAIApp {
             }
             
             // 发送请求到后端，始终包含已认领任务列表（用于优先执行或排除）
-            response = await fetch(`${this.apiBase}/agent/work/sync`, {
+            const requestBody = JSON.stringify({
+                claimed_tasks: claimedTaskIds,
+                execution_order: this.autoExecutionOrder,
+                completed_tasks: Array.from(this.completedTaskIds),
+                is_manual_execution: !this.isAutoWorkMode  // 根据工作模式决定
+            });
+            
+            // 支持流式读取时使用SSE接口，认领/执行/提交进度和生成的内容实时显示；否则回退到同步接口
+            const streaming = typeof ReadableStream !== 'undefined' && typeof TextDecoder !== 'undefined';
+            const response = await fetch(`${this.apiBase}/agent/work/${streaming ? 'stream' : 'sync'}`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
                 },
-                body: JSON.stringify({
-                    claimed_tasks: claimedTaskIds,
-                    execution_order: this.autoExecutionOrder,
-                    completed_tasks: Array.from(this.completedTaskIds),
-                    is_manual_execution: !this.isAutoWorkMode  // 根据工作模式决定
-                })
+                body: requestBody
             });
 
-            const result = await response.json();
+            const result = streaming && response.ok ? await this.readWorkStream(response) : await response.json();
             console.log('API返回结果:', result);
 
             if (result.status === 'success') {
@@ -544,14 +546,17 @@ class FlowAIApp {
                     taskTitle = this.taskTitleMap[result.task_id][currentLang];
                 }
                 
-                // 记录任务认领
-                this.addLogEntry('AI Agent', 'log.taskClaimed', { 
-                    title: taskTitle, 
-                    id: result.task_id 
-                });
-                
-                // 记录任务执行
-                this.addLogEntry('AI Agent', 'log.taskExecuting', { title: taskTitle });
+                // 流式接口已经实时记录了认领和执行
+                if (!streaming) {
+                    // 记录任务认领
+                    this.addLogEntry('AI Agent', 'log.taskClaimed', { 
+                        title: taskTitle, 
+                        id: result.task_id 
+                    });
+                    
+                    // 记录任务执行
+                    this.addLogEntry('AI Agent', 'log.taskExecuting', { title: taskTitle });
+                }
                 
                 // 记录任务完成
                 this.addLogEntry('AI Agent', 'log.taskCompleted', { title: taskTitle });
@@ -594,6 +599,110 @@ class FlowAIApp {
         }
     }
 
+    async readWorkStream(response) {
+        // 逐块读取SSE响应，按空行切分事件；result 事件为最终结果，其他事件实时显示
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+        let output = null;
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const message = this.parseSseEvent(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+                if (!message) continue;
+                
+                if (message.event === 'result') {
+                    result = message.data;
+                } else {
+                    output = this.handleWorkEvent(message.event, message.data, output);
+                }
+            }
+        }
+        
+        if (!result) {
+            throw new Error('流式响应在返回结果前中断');
+        }
+        return result;
+    }
+
+    parseSseEvent(frame) {
+        let event = 'message';
+        const dataLines = [];
+        frame.split('\n').forEach(line => {
+            // 以冒号开头的是保活注释
+            if (line.startsWith('event:')) {
+                event = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
+            }
+        });
+        if (dataLines.length === 0) return null;
+        return { event, data: JSON.parse(dataLines.join('\n')) };
+    }
+
+    handleWorkEvent(event, data, output) {
+        // 显示工作周期的进度事件，返回当前任务输出的显示元素
+        const currentLang = window.i18n ? window.i18n.currentLanguage : 'zh';
+        let taskTitle = `#${data.task_id}`;
+        if (this.taskTitleMap[data.task_id] && this.taskTitleMap[data.task_id][currentLang]) {
+            taskTitle = this.taskTitleMap[data.task_id][currentLang];
+        }
+        
+        if (event === 'claim') {
+            if (data.status === 'started') {
+                this.addLogEntry('AI Agent', 'log.claimSubmitting', { title: taskTitle, id: data.task_id });
+            } else if (data.status === 'confirmed') {
+                this.addLogEntry('AI Agent', 'log.taskClaimed', { title: taskTitle, id: data.task_id });
+            } else if (data.status === 'rejected') {
+                this.addLogEntry('AI Agent', 'log.claimRejected', { id: data.task_id, reason: data.reason });
+            } else if (data.status === 'failed') {
+                this.addLogEntry('AI Agent', 'log.claimFailed', { id: data.task_id });
+            }
+        } else if (event === 'execute') {
+            if (data.status === 'started') {
+                this.addLogEntry('AI Agent', 'log.taskExecuting', { title: taskTitle });
+                output = this.addOutputEntry();
+            } else if (data.status === 'failed') {
+                this.addLogEntry('AI Agent', 'log.executeFailed', { id: data.task_id });
+            }
+        } else if (event === 'token') {
+            if (!output) {
+                output = this.addOutputEntry();
+            }
+            output.textContent += data.text;
+            output.scrollTop = output.scrollHeight;
+            output.parentElement.parentElement.scrollTop = output.parentElement.parentElement.scrollHeight;
+        } else if (event === 'submit') {
+            if (data.status === 'started') {
+                this.addLogEntry('AI Agent', 'log.submittingResult', { title: taskTitle });
+            } else if (data.status === 'failed') {
+                this.addLogEntry('AI Agent', 'log.submitFailed', { id: data.task_id });
+            }
+        }
+        return output;
+    }
+
+    addOutputEntry() {
+        // 在日志中添加一个显示任务输出的区域，生成的内容逐段追加
+        const logContainer = document.getElementById(this.isAutoWorkMode ? 'autoLog' : 'manualLog');
+        const logEntry = document.createElement('div');
+        logEntry.className = 'log-entry log-output-entry';
+        const output = document.createElement('pre');
+        output.className = 'log-output';
+        logEntry.appendChild(output);
+        if (logContainer) {
+            logContainer.appendChild(logEntry);
+        }
+        return output;
+    }
+
     startAutoWork() {
         if (this.autoWorkInterval) return;
 
@@ -133,6 +133,12 @@ const i18n = {
         'log.autoWorkStarted': '启动自动工作模式',
         'log.autoWorkStopped': '停止自动工作模式',
         'log.walletConnected': '钱包连接成功: {address}',
+        'log.claimSubmitting': '📝 提交认领交易: {title} (任务ID: {id})',
+        'log.claimRejected': '⛔ 任务 {id} 预执行被拒绝: {reason}',
+        'log.claimFailed': '⚠️ 任务 {id} 认领失败',
+        'log.executeFailed': '❌ 任务 {id} 执行失败',
+        'log.submittingResult': '📤 提交任务结果: {title}',
+        'log.submitFailed': '⚠️ 任务 {id} 提交失败',
         'log.addressCopied': '地址已复制到剪贴板',
         'log.loadFailed': '加载数据失败，请检查网络连接'
     },
@@ -268,6 +274,12 @@ const i18n = {
         'log.autoWorkStarted': 'Auto work mode started',
         'log.autoWorkStopped': 'Auto work mode stopped',
         'log.walletConnected': 'Wallet connected successfully: {address}',
+        'log.claimSubmitting': '📝 Submitting claim: {title} (Task ID: {id})',
+        'log.claimRejected': '⛔ Task {id} rejected by preflight: {reason}',
+        'log.claimFailed': '⚠️ Failed to claim task {id}',
+        'log.executeFailed': '❌ Task {id} execution failed',
+        'log.submittingResult': '📤 Submitting result: {title}',
+        'log.submitFailed': '⚠️ Failed to submit task {id}',
         'log.addressCopied': 'Address copied to clipboard',
         'log.loadFailed': 'Failed to load data, please check network connection'
     },